@@ -1,41 +1,142 @@
 import datetime
 import os
+import weakref
+from typing import Any, Mapping, Optional
 
 import flask
 from flask import Flask
 
 from src.blueprints.factory import factory
+from src.blueprints.monitoring import monitoring
 from src.blueprints.warehouse import warehouse
+from src.database import instrumentation, migrations, pool
+from src.services import allocation, authorization, checkout, http_cache, metrics, passwords, reference_data
 
-app = Flask(__name__)
-app.secret_key = os.getenv('FLASK_SECRET_KEY')
+# Extensions holding the connections, caches and metrics of a single process, which each worker builds for itself.
+WORKER_EXTENSIONS = (
+    'database_pool', 'password_hasher', 'response_cache', 'authorization_cache', 'lot_allocator', 'reference_data',
+    'metrics'
+)
 
-app.config['SESSION_COOKIE_SECURE'] = True
-app.permanent_session_lifetime = datetime.timedelta(minutes=15)
+# Applications created in this process, prepared for the workers forked from it by a single hook.
+_apps: weakref.WeakSet[Flask] = weakref.WeakSet()
 
-app.register_blueprint(factory, url_prefix='/factory')
-app.register_blueprint(warehouse, url_prefix='/warehouse')
 
+def create_app(config: Optional[Mapping[str, Any]] = None) -> Flask:
+    """
+    Create the application, bring its database up to date and register its blueprints. Nothing is left open that a
+    worker process forked from the application could share with its master, and every worker builds its own
+    connection pool, caches and metrics after the fork, so a pre-fork server may create the application once in its
+    master and share the imported modules, compiled templates and migrated schema with every worker.
 
-@app.route('/')
-def homepage() -> str:
-    return flask.render_template('homepage/homepage.html')
+    @param config: Settings overriding the defaults and the environment, e.g. DATABASE_PATH.
+    @type config: Optional[Mapping[str, Any]]
 
+    @return: Application.
+    @rtype: Flask
+    """
+    app = Flask(__name__)
+    app.secret_key = os.getenv('FLASK_SECRET_KEY')
 
-@app.route('/factory')
-def factory_redirect() -> flask.Response:
-    return flask.redirect(flask.url_for('factory.login'))
+    app.config['SESSION_COOKIE_SECURE'] = True
+    app.config['PRELOAD_TEMPLATES'] = False
+    app.permanent_session_lifetime = datetime.timedelta(minutes=15)
+    app.config.update(config or {})
 
+    pool.init_app(app)
+    instrumentation.init_app(app)
+    authorization.init_app(app)
+    passwords.init_app(app)
+    http_cache.init_app(app)
+    checkout.init_app(app)
+    allocation.init_app(app)
+    reference_data.init_app(app)
+    metrics.init_app(app)
+    migrations.init_app(app)
 
-@app.route('/details')
-def details() -> str:
-    return flask.render_template('homepage/details.html')
+    with app.app_context():
+        migrations.migrate(pool.get_connection())
+        migrations.optimize(pool.get_connection())
 
+    # A connection must not be carried across a fork, so the workers open their own.
+    pool.get_pool(app).close()
 
-@app.route('/acknowledgements')
-def acknowledgements() -> str:
-    return flask.render_template('homepage/acknowledgements.html')
+    app.register_blueprint(factory, url_prefix='/factory')
+    app.register_blueprint(warehouse, url_prefix='/warehouse')
+    app.register_blueprint(monitoring)
+
+    @app.route('/')
+    def homepage() -> str:
+        return flask.render_template('homepage/homepage.html')
+
+    @app.route('/factory')
+    def factory_redirect() -> flask.Response:
+        return flask.redirect(flask.url_for('factory.login'))
+
+    @app.route('/details')
+    def details() -> str:
+        return flask.render_template('homepage/details.html')
+
+    @app.route('/acknowledgements')
+    def acknowledgements() -> str:
+        return flask.render_template('homepage/acknowledgements.html')
+
+    if app.config['PRELOAD_TEMPLATES']:
+        for template_name in app.jinja_env.list_templates():
+            app.jinja_env.get_template(template_name)
+
+    _apps.add(app)
+
+    return app
+
+
+def init_worker(app: Flask):
+    """
+    Replace the connection pool, caches and metrics a worker process inherited from its master with its own, so that
+    no lock, thread or connection is shared between processes and the metrics of each worker start from zero.
+
+    @param app: Application the worker serves.
+    @type app: Flask
+    """
+    for name in WORKER_EXTENSIONS:
+        app.extensions.pop(name, None)
+
+    # The pool and the password hasher are created on first use, the connections and threads only then.
+    http_cache.get_cache(app)
+    authorization.get_cache(app)
+    allocation.get_allocator(app)
+    reference_data.get_cache(app)
+    metrics.get_registry(app)
+
+
+def _after_fork():
+    for app in list(_apps):
+        init_worker(app)
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def shutdown_worker(app: Flask):
+    """
+    Close the connections and stop the password hashing threads of a worker process that has finished its requests.
+
+    @param app: Application the worker served.
+    @type app: Flask
+    """
+    connection_pool: Optional[pool.ConnectionPool] = app.extensions.get('database_pool')
+    hasher: Optional[passwords.PasswordHasher] = app.extensions.get('password_hasher')
+    reference_cache: Optional[reference_data.ReferenceCache] = app.extensions.get('reference_data')
+
+    if connection_pool is not None and connection_pool.pid == os.getpid():
+        connection_pool.close()
+
+    if hasher is not None and hasher.pid == os.getpid():
+        hasher.close()
+
+    if reference_cache is not None and reference_cache.pid == os.getpid():
+        reference_cache.close()
 
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    create_app().run(debug=True)
@@ -0,0 +1,302 @@
+"""
+Generate a deterministic database of the whole schema at production size, for the benchmarks and for trying the
+application against realistic data. The same sizes and seed always produce the same rows, but for the random salt of
+the password hash shared by the employees.
+
+Medicines are lots of products, each product being a name made by a manufacturer, with its lots expiring at
+different dates and sharing one salt composition. Manufacturers, salts and customers follow a Zipf-like popularity, so
+that a few large manufacturers make most products, a few common salts are in most compositions and regular customers
+make most purchases. Sales are in chronological order of their IDs, each with the items it sold.
+
+Run from the repository root, e.g. python -m benchmarks.data static/large.db --preset large
+"""
+import argparse
+import datetime
+import itertools
+import os
+import random
+import sqlite3
+from dataclasses import dataclass, fields, replace
+from typing import Iterator
+
+import werkzeug.security as security
+
+from src.database import migrations
+from src.models import medicine_salt, sale_item, stock
+
+PASSWORD = 'benchmark'
+ADMINISTRATOR_EMAIL_ADDRESS = 'admin@example.com'
+STAFF_EMAIL_ADDRESS = 'staff@example.com'
+
+START_DATE = datetime.date(2022, 1, 1)
+SALE_DAYS = 3 * 365
+LOTS_PER_PRODUCT = 6
+CHUNK_SIZE = 10_000
+
+_SYLLABLES = (
+    'al', 'am', 'ba', 'ce', 'cro', 'da', 'dol', 'fen', 'ga', 'lo', 'ma', 'met', 'na', 'no', 'pa', 'pra', 'ra', 'ri',
+    'sa', 'sol', 'ta', 'tin', 'to', 'vo', 'xa', 'zi', 'zol'
+)
+_SUFFIXES = ('', ' Forte', ' Plus', ' SR', ' DS', ' Kid')
+_FIRST_NAMES = (
+    'Aarav', 'Aditi', 'Amit', 'Ananya', 'Arjun', 'Deepa', 'Divya', 'Farhan', 'Gita', 'Ishaan', 'Kavya', 'Meera',
+    'Neha', 'Nikhil', 'Priya', 'Rahul', 'Rohan', 'Sanjay', 'Sneha', 'Tara', 'Vikram', 'Zoya'
+)
+_LAST_NAMES = (
+    'Bose', 'Das', 'Gupta', 'Iyer', 'Joshi', 'Kapoor', 'Khan', 'Kumar', 'Mehta', 'Nair', 'Patel', 'Rao', 'Reddy',
+    'Shah', 'Sharma', 'Singh', 'Verma'
+)
+_CITIES = ('Bengaluru', 'Chennai', 'Delhi', 'Hyderabad', 'Kolkata', 'Mumbai', 'Pune')
+_DESIGNATIONS = ('Pharmacist', 'Cashier', 'Store Manager', 'Stock Clerk', None)
+
+
+@dataclass(frozen=True, slots=True)
+class Sizes:
+    """Number of rows of each table, and of the salts in each product and the items in each sale at most."""
+    manufacturers: int
+    salts: int
+    medicines: int
+    employees: int
+    customers: int
+    sales: int
+    salts_per_product: int = 3
+    items_per_sale: int = 4
+
+
+PRESETS: dict[str, Sizes] = {
+    'tiny': Sizes(5, 20, 300, 4, 50, 1_000),
+    'small': Sizes(60, 300, 10_000, 20, 5_000, 50_000),
+    'medium': Sizes(400, 1_500, 100_000, 120, 100_000, 1_000_000),
+    'large': Sizes(1_500, 3_000, 300_000, 400, 500_000, 5_000_000)
+}
+
+
+class _Popularity:
+    """Deterministic draws of the IDs 1 to n, the lower IDs being drawn the most often."""
+
+    def __init__(self, generator: random.Random, n: int, skew: float):
+        self._generator = generator
+        self._population = range(1, n + 1)
+        self._cumulative = list(itertools.accumulate(1 / rank ** skew for rank in self._population))
+
+    def draw(self, k: int = 1) -> list[int]:
+        return self._generator.choices(self._population, cum_weights=self._cumulative, k=k)
+
+    def draw_distinct(self, k: int) -> list[int]:
+        drawn: dict[int, None] = {}
+
+        while len(drawn) < min(k, len(self._population)):
+            drawn.update(dict.fromkeys(self.draw(k - len(drawn))))
+
+        return list(drawn)
+
+
+def _name(generator: random.Random, syllables: int) -> str:
+    return ''.join(generator.choice(_SYLLABLES) for _ in range(syllables)).capitalize()
+
+
+def _phone_number(prefix: int, id_: int) -> str:
+    return f'+91 {prefix}{id_:09}'
+
+
+def _person(generator: random.Random) -> tuple[str, str, str, datetime.date]:
+    """Generate the first and last names, gender and birth date of a person."""
+    birth_date = datetime.date(1950, 1, 1) + datetime.timedelta(days=generator.randrange(365 * 55))
+    return generator.choice(_FIRST_NAMES), generator.choice(_LAST_NAMES), generator.choice('FM'), birth_date
+
+
+def _chunks(rows: Iterator[tuple]) -> Iterator[list[tuple]]:
+    while chunk := list(itertools.islice(rows, CHUNK_SIZE)):
+        yield chunk
+
+
+def _employees(generator: random.Random, sizes: Sizes) -> Iterator[tuple]:
+    password_hash = security.generate_password_hash(PASSWORD)
+
+    for id_ in range(1, sizes.employees + 1):
+        first_name, last_name, gender, birth_date = _person(generator)
+        email_address = {1: ADMINISTRATOR_EMAIL_ADDRESS, 2: STAFF_EMAIL_ADDRESS}.get(id_, f'employee{id_}@example.com')
+        joining_date = START_DATE - datetime.timedelta(days=generator.randrange(3650))
+
+        yield (
+            id_, first_name, last_name, _phone_number(8, id_), email_address, generator.choice(_CITIES), gender,
+            birth_date, joining_date, generator.choice(_DESIGNATIONS), float(generator.randrange(20_000, 90_000, 500)),
+            password_hash, generator.random() < 0.9 or id_ <= 2, id_ == 1
+        )
+
+
+def _customers(generator: random.Random, sizes: Sizes) -> Iterator[tuple]:
+    for id_ in range(1, sizes.customers + 1):
+        first_name, last_name, gender, birth_date = _person(generator)
+        email_address = f'customer{id_}@example.com' if generator.random() < 0.6 else None
+
+        yield (
+            id_, first_name, last_name, _phone_number(9, id_), email_address,
+            generator.choice(_CITIES) if generator.random() < 0.8 else None, gender,
+            birth_date if generator.random() < 0.7 else None
+        )
+
+
+def _products(generator: random.Random, sizes: Sizes) -> list[tuple[str, int, float, list[int]]]:
+    """Generate the name, manufacturer, base price and salt composition of each product."""
+    manufacturers = _Popularity(generator, sizes.manufacturers, 0.8)
+    salts = _Popularity(generator, sizes.salts, 0.9)
+    products = []
+    names = set()
+
+    for _ in range(max(sizes.medicines // LOTS_PER_PRODUCT, 1)):
+        name = f'{_name(generator, generator.randint(2, 4))}{generator.choice(_SUFFIXES)}'
+
+        while name in names:
+            name = f'{name} {generator.choice((100, 250, 500, 650, 1000))}'
+
+        names.add(name)
+        products.append((
+            name, manufacturers.draw()[0], round(generator.lognormvariate(3, 0.8), 2),
+            salts.draw_distinct(generator.randint(1, sizes.salts_per_product))
+        ))
+
+    return products
+
+
+def _medicines(
+        generator: random.Random, sizes: Sizes, products: list[tuple[str, int, float, list[int]]]
+) -> Iterator[tuple]:
+    for id_ in range(1, sizes.medicines + 1):
+        name, manufacturer_id, price, _salts = products[(id_ - 1) % len(products)]
+        manufacturing_date = START_DATE + datetime.timedelta(days=generator.randrange(SALE_DAYS))
+        purchase_date = manufacturing_date + datetime.timedelta(days=generator.randrange(7, 90))
+        expiry_date = manufacturing_date + datetime.timedelta(days=generator.choice((365, 540, 730, 1095)))
+
+        yield (
+            id_, name, manufacturer_id, round(price * 0.7, 2), price, generator.choice((None, 5, 10, 250, 500, 650)),
+            generator.choice((1, 10, 15, 30, 100)), manufacturing_date, purchase_date, expiry_date
+        )
+
+
+def _sales(generator: random.Random, sizes: Sizes, prices: list[float]) -> Iterator[tuple[tuple, list[tuple]]]:
+    """Generate each sale, in chronological order, with its items."""
+    customers = _Popularity(generator, sizes.customers, 0.6)
+    medicines = _Popularity(generator, sizes.medicines, 0.4)
+    daily_sales = [sizes.sales // SALE_DAYS] * SALE_DAYS
+
+    for day in generator.sample(range(SALE_DAYS), sizes.sales % SALE_DAYS):
+        daily_sales[day] += 1
+
+    sale_ids = itertools.count(1)
+
+    for day, count in enumerate(daily_sales):
+        opening = datetime.datetime.combine(START_DATE + datetime.timedelta(days=day), datetime.time(8))
+
+        # Spread the sales of the day over its thirteen opening hours, the evening being a little busier.
+        for seconds in sorted(int(13 * 3600 * generator.random() ** 0.8) for _ in range(count)):
+            id_ = next(sale_ids)
+            items = [
+                (id_, medicine_id, generator.choice((1, 1, 1, 2, 3)), prices[medicine_id - 1])
+                for medicine_id in medicines.draw_distinct(generator.randint(1, sizes.items_per_sale))
+            ]
+            amount = round(sum(quantity * unit_price for _sale_id, _medicine_id, quantity, unit_price in items), 2)
+            sale = (id_, opening + datetime.timedelta(seconds=seconds), generator.randint(1, sizes.employees),
+                    customers.draw()[0], amount)
+
+            yield sale, items
+
+
+def generate(connection: sqlite3.Connection, sizes: Sizes, seed: int = 0):
+    """
+    Fill an empty database with generated rows of every table, then migrate it, so that the indexes, search indexes
+    and rollups are built once from the loaded rows instead of being maintained row by row, and analyze it.
+
+    @param connection: Connection to an empty database, outside of any transaction.
+    @type connection: sqlite3.Connection
+    @param sizes: Number of rows of each table.
+    @type sizes: Sizes
+    @param seed: Seed of the generated values.
+    @type seed: int
+    """
+    generator = random.Random(seed)
+
+    connection.executescript(migrations.TABLES)
+    medicine_salt.create_schema(connection)
+    sale_item.create_schema(connection)
+    stock.create_schema(connection)
+
+    cursor = connection.cursor()
+
+    for table, rows in (
+            ('employee', _employees(generator, sizes)),
+            ('customer', _customers(generator, sizes)),
+            ('manufacturer', (
+                (id_, f'{_name(generator, 3)} {generator.choice(("Pharma", "Labs", "Healthcare", "Remedies"))}',
+                 _phone_number(7, id_), generator.choice(_CITIES))
+                for id_ in range(1, sizes.manufacturers + 1)
+            )),
+            ('salt', ((id_, f'{_name(generator, 3)}{generator.choice(("ine", "ol", "ate", "ide"))}')
+                      for id_ in range(1, sizes.salts + 1)))
+    ):
+        for chunk in _chunks(rows):
+            cursor.executemany(f'INSERT INTO {table} VALUES ({", ".join("?" * len(chunk[0]))})', chunk)
+
+    products = _products(generator, sizes)
+    prices = []
+
+    for chunk in _chunks(_medicines(generator, sizes, products)):
+        cursor.executemany('INSERT INTO medicine VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', chunk)
+        cursor.executemany('INSERT INTO stock VALUES (?, ?)', ((row[0], generator.randrange(0, 400)) for row in chunk))
+        cursor.executemany('INSERT INTO medicine_salt (medicine_id, salt_id) VALUES (?, ?)', (
+            (row[0], salt_id) for row in chunk for salt_id in products[(row[0] - 1) % len(products)][3]
+        ))
+        prices += (row[4] for row in chunk)
+
+    sales = _sales(generator, sizes, prices)
+
+    while chunk := list(itertools.islice(sales, CHUNK_SIZE)):
+        cursor.executemany('INSERT INTO sale VALUES (?, ?, ?, ?, ?)', (sale for sale, _items in chunk))
+        cursor.executemany(
+            'INSERT INTO sale_item VALUES (?, ?, ?, ?)', (item for _sale, items in chunk for item in items)
+        )
+
+    cursor.close()
+    connection.commit()
+
+    migrations.migrate(connection)
+    migrations.optimize(connection, analyze=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('path', help='Path of the database to create.')
+    parser.add_argument('--preset', choices=PRESETS, default='small')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--force', action='store_true', help='Replace the database if it exists.')
+
+    for field in fields(Sizes)[:6]:
+        parser.add_argument(f'--{field.name}', type=int, help=f'Number of {field.name}, instead of the preset.')
+
+    arguments = parser.parse_args()
+    sizes = replace(PRESETS[arguments.preset], **{
+        field.name: getattr(arguments, field.name) for field in fields(Sizes)
+        if getattr(arguments, field.name, None) is not None
+    })
+
+    if os.path.exists(arguments.path):
+        if not arguments.force:
+            parser.error(f'{arguments.path} exists, pass --force to replace it.')
+
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(arguments.path + suffix):
+                os.remove(arguments.path + suffix)
+
+    connection = sqlite3.connect(arguments.path)
+    # The database is rebuilt from the seed rather than recovered, so it is loaded without a journal.
+    connection.execute('PRAGMA journal_mode = OFF')
+    connection.execute('PRAGMA synchronous = OFF')
+    generate(connection, sizes, arguments.seed)
+    connection.execute('PRAGMA journal_mode = WAL')
+    connection.close()
+
+    print(f'Generated {arguments.path} with {sizes}.')
+
+
+if __name__ == '__main__':
+    main()
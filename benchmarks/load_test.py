@@ -0,0 +1,455 @@
+"""
+Load test a locally started server with a weighted mix of warehouse reads, searches and update posts sent at a target
+rate, reporting the throughput, error rate and latency percentiles of each route, optionally for every combination of
+server workers, threads and request rates to find where latency turns up.
+
+Requests are scheduled at a fixed rate whatever the server does, and their latency runs from when they were due, so
+that a slow server is charged for the requests it held back. Each client logs in once through the login form, as a
+till would, and keeps its connection open.
+
+Unless --url points at a running server, a server is started for each combination of workers and threads, by default
+with the production settings of gunicorn.conf.py, against a copy of the database.
+
+Run from the repository root, e.g.
+    python -m benchmarks.data static/medium.db --preset medium
+    python -m benchmarks.load_test --database static/medium.db --preset medium --workers 1,2,4 --threads 4,8 \\
+        --rates 50,100,200,400 --duration 30
+"""
+import argparse
+import contextlib
+import dataclasses
+import http.client
+import json
+import os
+import queue
+import random
+import shlex
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from benchmarks import data, suite
+
+SERVER_COMMAND = (
+    '{python} -m gunicorn --config gunicorn.conf.py --workers {workers} --threads {threads} --bind 127.0.0.1:{port} '
+    '--log-level warning wsgi:application'
+)
+SEARCH_PREFIXES = ('al', 'ba', 'cro', 'dol', 'fen', 'ma', 'met', 'pa', 'sol', 'zi')
+
+
+@dataclass(frozen=True, slots=True)
+class Request:
+    """
+    Route of the mix, chosen in proportion to its weight. Its path and form may refer to a random {customer_id},
+    {manufacturer_id}, {medicine_id}, {sale_id} or {salt_id} of the database, or a search {prefix}.
+    """
+    name: str
+    path: str
+    weight: float
+    method: str = 'GET'
+    form: Optional[dict[str, str]] = None
+
+
+@dataclass(frozen=True, slots=True)
+class RouteStats:
+    """Outcome of the requests to a route."""
+    name: str
+    requests: int
+    errors: int
+    throughput: float
+    p50: float
+    p95: float
+    p99: float
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class RunStats:
+    """Outcome of a run at a target rate against a server configuration."""
+    workers: Optional[int]
+    threads: Optional[int]
+    rate: float
+    routes: list[RouteStats]
+    total: RouteStats
+
+
+DEFAULT_MIX: tuple[Request, ...] = (
+    Request('medicines', '/warehouse/medicines', 10),
+    Request('medicine', '/warehouse/medicines/{medicine_id}', 20),
+    Request('substitutes', '/warehouse/api/medicines/{medicine_id}/substitutes', 5),
+    Request('expiring', '/warehouse/medicines/expiring', 2),
+    Request('sales', '/warehouse/sales', 5),
+    Request('sale', '/warehouse/sales/{sale_id}', 10),
+    Request('manufacturer', '/warehouse/manufacturers/{manufacturer_id}', 5),
+    Request('salt', '/warehouse/salts/{salt_id}', 5),
+    Request('search medicine', '/warehouse/api/search/medicine?q={prefix}', 25),
+    Request('search salt', '/warehouse/api/search/salt?q={prefix}', 5),
+    Request('salt update', '/warehouse/salts/update', 2, 'POST', {
+        'salt-id': '{salt_id}', 'salt-name': 'Salt {salt_id}'
+    }),
+    Request('manufacturer update', '/warehouse/manufacturers/update', 1, 'POST', {
+        'manufacturer-id': '{manufacturer_id}', 'manufacturer-name': 'Manufacturer {manufacturer_id}',
+        'manufacturer-phone-number': '+91 7{manufacturer_id:09}', 'manufacturer-address': 'Mumbai'
+    })
+)
+
+
+def load_mix(path: str) -> tuple[Request, ...]:
+    """
+    Read a mix of requests from a JSON array of objects with the fields of Request.
+
+    @param path: Path of the JSON file.
+    @type path: str
+
+    @return: Requests of the mix.
+    @rtype: tuple[Request, ...]
+    """
+    with open(path) as file:
+        return tuple(Request(**request) for request in json.load(file))
+
+
+def percentile(latencies: list[float], fraction: float) -> float:
+    """
+    Get a percentile of sorted latencies by the nearest rank.
+
+    @param latencies: Latencies in ascending order.
+    @type latencies: list[float]
+    @param fraction: Fraction of the latencies at or below the percentile, between 0 and 1.
+    @type fraction: float
+
+    @return: Latency at the percentile, or zero without latencies.
+    @rtype: float
+    """
+    if not latencies:
+        return 0.0
+
+    return latencies[min(max(int(fraction * len(latencies) + 0.5) - 1, 0), len(latencies) - 1)]
+
+
+def summarize(name: str, outcomes: list[tuple[float, bool]], duration: float) -> RouteStats:
+    """
+    Summarize the latencies, in milliseconds, and errors of the requests to a route.
+
+    @param name: Name of the route.
+    @type name: str
+    @param outcomes: Latency and whether it failed, of each request.
+    @type outcomes: list[tuple[float, bool]]
+    @param duration: Length of the run, in seconds.
+    @type duration: float
+
+    @return: Statistics of the route.
+    @rtype: RouteStats
+    """
+    latencies = sorted(latency for latency, _failed in outcomes)
+
+    return RouteStats(
+        name, len(outcomes), sum(failed for _latency, failed in outcomes), len(outcomes) / duration,
+        percentile(latencies, 0.5), percentile(latencies, 0.95), percentile(latencies, 0.99)
+    )
+
+
+class Client:
+    """Till holding a logged in session on a keep-alive connection to the server."""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.cookie = ''
+        self._connection: Optional[http.client.HTTPConnection] = None
+
+    def send(self, method: str, path: str, form: Optional[dict[str, str]] = None) -> http.client.HTTPResponse:
+        """
+        Send a request and read its response, reconnecting once if the server closed the connection.
+
+        @return: Response, already read.
+        """
+        body = urllib.parse.urlencode(form) if form is not None else None
+        headers = {'Cookie': self.cookie, 'Accept-Encoding': 'gzip'}
+
+        if body is not None:
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+
+        for attempt in range(2):
+            if self._connection is None:
+                self._connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+            try:
+                self._connection.request(method, path, body, headers)
+                response = self._connection.getresponse()
+                response.read()
+            except (ConnectionError, http.client.RemoteDisconnected, http.client.BadStatusLine):
+                self.close()
+
+                if attempt:
+                    raise
+                continue
+
+            if response.will_close:
+                self.close()
+
+            return response
+
+    def login(self, email_address: str, password: str):
+        """
+        Log in through the login form, keeping the session cookie.
+
+        @raise RuntimeError: If the server does not accept the credentials.
+        """
+        response = self.send('POST', '/factory/login', {'email-address': email_address, 'password': password})
+        cookie = response.getheader('Set-Cookie')
+
+        if response.status != 302 or cookie is None:
+            raise RuntimeError(f'Could not log in as {email_address}, the server responded with {response.status}.')
+
+        self.cookie = cookie.split(';', 1)[0]
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def _fill(template: str, values: dict[str, object]) -> str:
+    return template.format(**values)
+
+
+def run(
+        url: str, mix: tuple[Request, ...], sizes: data.Sizes, rate: float, duration: float, clients: int,
+        timeout: float = 30.0, seed: int = 0
+) -> tuple[list[RouteStats], RouteStats]:
+    """
+    Send the mix of requests to a server at a target rate for a while, from logged in clients.
+
+    @param url: Base URL of the server.
+    @type url: str
+    @param mix: Requests to choose from.
+    @type mix: tuple[Request, ...]
+    @param sizes: Sizes of the database, bounding the random IDs.
+    @type sizes: data.Sizes
+    @param rate: Target number of requests per second.
+    @type rate: float
+    @param duration: Length of the run, in seconds.
+    @type duration: float
+    @param clients: Number of concurrent clients.
+    @type clients: int
+    @param timeout: Time to wait for a response before counting it as an error, in seconds.
+    @type timeout: float
+    @param seed: Seed of the chosen requests and IDs.
+    @type seed: int
+
+    @return: Statistics of each route of the mix that was requested, and of all of them.
+    @rtype: tuple[list[RouteStats], RouteStats]
+    """
+    address = urllib.parse.urlsplit(url)
+    generator = random.Random(seed)
+    due: queue.Queue[Optional[tuple[float, Request, dict[str, object]]]] = queue.Queue()
+    outcomes: dict[str, list[tuple[float, bool]]] = {request.name: [] for request in mix}
+    lock = threading.Lock()
+
+    tills = [Client(address.hostname, address.port or 80, timeout) for _ in range(clients)]
+
+    for till in tills:
+        till.login(data.ADMINISTRATOR_EMAIL_ADDRESS, data.PASSWORD)
+
+    def work(till: Client):
+        while (item := due.get()) is not None:
+            due_time, request, values = item
+
+            try:
+                response = till.send(
+                    request.method, _fill(request.path, values),
+                    {key: _fill(value, values) for key, value in request.form.items()} if request.form else None
+                )
+                failed = response.status >= 400
+            except (OSError, http.client.HTTPException):
+                till.close()
+                failed = True
+
+            with lock:
+                outcomes[request.name].append(((time.perf_counter() - due_time) * 1000, failed))
+
+    threads = [threading.Thread(target=work, args=(till,), daemon=True) for till in tills]
+
+    for thread in threads:
+        thread.start()
+
+    start = time.perf_counter()
+
+    for index in range(int(rate * duration)):
+        due_time = start + index / rate
+        delay = due_time - time.perf_counter()
+
+        if delay > 0:
+            time.sleep(delay)
+
+        values = {
+            'customer_id': generator.randint(1, sizes.customers),
+            'manufacturer_id': generator.randint(1, sizes.manufacturers),
+            'medicine_id': generator.randint(1, sizes.medicines), 'sale_id': generator.randint(1, sizes.sales),
+            'salt_id': generator.randint(1, sizes.salts), 'prefix': generator.choice(SEARCH_PREFIXES)
+        }
+        due.put((due_time, generator.choices(mix, [request.weight for request in mix])[0], values))
+
+    for _ in threads:
+        due.put(None)
+
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.perf_counter() - start
+
+    for till in tills:
+        till.close()
+
+    routes = [summarize(name, route_outcomes, elapsed) for name, route_outcomes in outcomes.items() if route_outcomes]
+    total = summarize('total', [outcome for route_outcomes in outcomes.values() for outcome in route_outcomes], elapsed)
+
+    return routes, total
+
+
+def _free_port() -> int:
+    with contextlib.closing(socket.socket()) as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def _wait_until_ready(port: int, process: subprocess.Popen, timeout: float):
+    """
+    @raise RuntimeError: If the server exits or does not accept connections in time.
+    """
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'The server exited with status {process.returncode}.')
+
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+
+    raise RuntimeError(f'The server did not accept connections within {timeout} seconds.')
+
+
+@contextlib.contextmanager
+def start_server(command: str, database_path: str, workers: int, threads: int) -> Iterator[str]:
+    """
+    Start a server on a free local port, stopping it gracefully afterwards.
+
+    @param command: Command template of the server, with the {python}, {port}, {workers} and {threads} fields.
+    @type command: str
+    @param database_path: Path of the database to serve.
+    @type database_path: str
+    @param workers: Number of worker processes.
+    @type workers: int
+    @param threads: Number of threads of each worker.
+    @type threads: int
+
+    @return: Base URL of the server.
+    """
+    port = _free_port()
+    environment = {**os.environ, 'DATABASE_PATH': database_path}
+    environment.setdefault('FLASK_SECRET_KEY', 'load-test')
+
+    process = subprocess.Popen(
+        shlex.split(command.format(python=sys.executable, port=port, workers=workers, threads=threads)),
+        env=environment
+    )
+
+    try:
+        _wait_until_ready(port, process, 60)
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        process.terminate()
+
+        try:
+            process.wait(30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def _print_run(run_stats: RunStats, routes: bool):
+    configuration = '' if run_stats.workers is None else f'{run_stats.workers} workers x {run_stats.threads} threads, '
+    print(f'\n{configuration}target {run_stats.rate:g} requests/s')
+    print(f'{"route":<22} {"requests":>9} {"req/s":>8} {"errors":>7} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9}')
+
+    for stats in (run_stats.routes if routes else []) + [run_stats.total]:
+        print(
+            f'{stats.name:<22} {stats.requests:>9} {stats.throughput:>8.1f} {stats.error_rate:>7.1%} '
+            f'{stats.p50:>9.1f} {stats.p95:>9.1f} {stats.p99:>9.1f}'
+        )
+
+
+def _integers(value: str) -> list[int]:
+    return [int(item) for item in value.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help='Base URL of a running server, instead of starting one.')
+    parser.add_argument('--database', help='Database to start the servers against, copied first.')
+    parser.add_argument('--preset', choices=data.PRESETS, default='small', help='Sizes the database was generated at.')
+    parser.add_argument('--server-command', default=SERVER_COMMAND, help='Command template starting a server.')
+    parser.add_argument('--workers', type=_integers, default=[1], help='Comma separated worker counts to sweep.')
+    parser.add_argument('--threads', type=_integers, default=[4], help='Comma separated thread counts to sweep.')
+    parser.add_argument('--rates', type=_integers, default=[50], help='Comma separated request rates to sweep.')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds of each run.')
+    parser.add_argument('--warm-up', type=float, default=3, help='Seconds of requests before each server is measured.')
+    parser.add_argument('--clients', type=int, default=32, help='Concurrent clients, as tills.')
+    parser.add_argument('--mix', help='JSON file of the requests to send, instead of the default mix.')
+    parser.add_argument('--output', help='Path of the JSON file to save the results to.')
+    arguments = parser.parse_args()
+
+    if arguments.url is None and arguments.database is None:
+        parser.error('either --url or --database is required.')
+
+    mix = load_mix(arguments.mix) if arguments.mix else DEFAULT_MIX
+    sizes = data.PRESETS[arguments.preset]
+    results: list[RunStats] = []
+
+    def sweep_rates(url: str, workers: Optional[int], threads: Optional[int]):
+        if arguments.warm_up > 0:
+            run(url, mix, sizes, arguments.rates[0], arguments.warm_up, arguments.clients, seed=-1)
+
+        for rate in arguments.rates:
+            routes, total = run(url, mix, sizes, rate, arguments.duration, arguments.clients)
+            results.append(RunStats(workers, threads, rate, routes, total))
+            _print_run(results[-1], routes=len(arguments.rates) == 1)
+
+    if arguments.url is not None:
+        sweep_rates(arguments.url, None, None)
+    else:
+        for workers in arguments.workers:
+            for threads in arguments.threads:
+                with suite.database_copy(arguments.database) as database_path:
+                    with start_server(arguments.server_command, database_path, workers, threads) as url:
+                        sweep_rates(url, workers, threads)
+
+    if len(results) > 1:
+        print(f'\n{"workers":>7} {"threads":>7} {"target":>7} {"req/s":>8} {"errors":>7} {"p50 ms":>9} {"p99 ms":>9}')
+
+        for run_stats in results:
+            print(
+                f'{run_stats.workers or "-":>7} {run_stats.threads or "-":>7} {run_stats.rate:>7g} '
+                f'{run_stats.total.throughput:>8.1f} {run_stats.total.error_rate:>7.1%} {run_stats.total.p50:>9.1f} '
+                f'{run_stats.total.p99:>9.1f}'
+            )
+
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            json.dump([dataclasses.asdict(run_stats) for run_stats in results], file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Measure first-expiry-first-out allocation from a product with hundreds of active lots, comparing the cached heap of
+lots with querying the product and expiry date index on every allocation.
+
+Run from the repository root, e.g. python -m benchmarks.lot_allocation --lots 500
+"""
+import argparse
+import datetime
+import sqlite3
+import time
+
+from benchmarks.update_pages import SCHEMA
+from src.database import versions
+from src.models import stock
+from src.services import allocation
+
+
+def populate(connection: sqlite3.Connection, lots: int, units: int):
+    """
+    Fill an empty database with the lots of one product among other products, each lot holding some units.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param lots: Number of lots of each product.
+    @type lots: int
+    @param units: Units on hand in each lot.
+    @type units: int
+    """
+    start = datetime.date(2030, 1, 1)
+
+    connection.executescript(SCHEMA)
+    connection.execute('CREATE INDEX medicine_product_index ON medicine (name, manufacturer_id, expiry_date)')
+    connection.executescript(versions.TABLE)
+    stock.create_schema(connection)
+    allocation.create_schema(connection)
+
+    connection.executemany('INSERT INTO medicine VALUES (?, ?, ?, 1, 2, 500, 10, ?, ?, ?)', (
+        (id_, f'Medicine {id_ % 20}', 1, start, start, start + datetime.timedelta(days=id_ // 20))
+        for id_ in range(1, lots * 20 + 1)
+    ))
+    connection.executemany('INSERT INTO stock VALUES (?, ?)', ((id_, units) for id_ in range(1, lots * 20 + 1)))
+    connection.commit()
+
+
+def measure(allocator: allocation.LotAllocator, connection: sqlite3.Connection, lots: int, units: int) -> float:
+    """
+    Time allocations of four units from a product, each in its own write transaction, until its lots are nearly
+    empty, then restock the lots.
+
+    @return: Average time of an allocation, in milliseconds.
+    """
+    product = ('Medicine 7', 1)
+    allocations = lots * units // 4 - 1
+    start = time.perf_counter()
+
+    for _ in range(allocations):
+        connection.execute('BEGIN IMMEDIATE')
+        allocator.allocate(connection, product, 4)
+        connection.execute('COMMIT')
+
+    elapsed = time.perf_counter() - start
+    connection.execute('UPDATE stock SET quantity = ?', (units,))
+
+    return elapsed / allocations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lots', type=int, default=500)
+    parser.add_argument('--units', type=int, default=6, help='Units on hand in each lot.')
+    arguments = parser.parse_args()
+
+    connection = sqlite3.connect(':memory:', isolation_level=None)
+    populate(connection, arguments.lots, arguments.units)
+
+    print(f'{"approach":<12} {"ms/allocation":>14}')
+
+    for name, allocator in (('index query', allocation.LotAllocator(0)), ('cached heap', allocation.LotAllocator())):
+        print(f'{name:<12} {measure(allocator, connection, arguments.lots, arguments.units):>14.4f}')
+
+    connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Measure how many logins per second the password hasher sustains at different hash costs.
+
+Run from the repository root, e.g. python -m benchmarks.password_hashing --logins 64 --concurrency 16
+"""
+import argparse
+import concurrent.futures
+import time
+
+import werkzeug.security as security
+
+from src.services import passwords
+
+METHODS = ('scrypt:8192:8:1', 'scrypt:16384:8:1', 'scrypt:32768:8:1', 'pbkdf2:sha256:260000', 'pbkdf2:sha256:600000')
+
+
+def run(method: str, logins: int, concurrency: int, workers: int, max_pending: int) -> str:
+    """
+    Verify the same password from many request threads at once and report the throughput.
+
+    @param method: Werkzeug hash method and cost.
+    @type method: str
+    @param logins: Number of logins to verify.
+    @type logins: int
+    @param concurrency: Number of request threads submitting logins.
+    @type concurrency: int
+    @param workers: Number of hashing threads.
+    @type workers: int
+    @param max_pending: Queue depth of the hasher before logins are rejected.
+    @type max_pending: int
+
+    @return: One line of results.
+    @rtype: str
+    """
+    hasher = passwords.PasswordHasher(method, workers, max_pending)
+    password_hash = security.generate_password_hash('pass@word1', method)
+
+    def login(_index: int) -> bool:
+        try:
+            return hasher.verify(password_hash, 'pass@word1')
+        except passwords.HasherSaturatedError:
+            return False
+
+    start = time.perf_counter()
+
+    with concurrent.futures.ThreadPoolExecutor(concurrency) as requests:
+        accepted = sum(requests.map(login, range(logins)))
+
+    elapsed = time.perf_counter() - start
+    stats = hasher.stats()
+    hasher.close()
+
+    return (
+        f'{method:<24} {accepted / elapsed:>10.1f} {stats.average_seconds * 1000:>10.1f} '
+        f'{accepted:>9} {stats.rejected:>9}'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--methods', nargs='+', default=METHODS)
+    parser.add_argument('--logins', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, default=16, help='Request threads submitting logins.')
+    parser.add_argument('--workers', type=int, default=None, help='Hashing threads, defaults to the CPU count.')
+    parser.add_argument('--max-pending', type=int, default=32)
+    arguments = parser.parse_args()
+
+    print(f'{"method":<24} {"logins/s":>10} {"ms/hash":>10} {"accepted":>9} {"rejected":>9}')
+
+    for method in arguments.methods:
+        print(run(method, arguments.logins, arguments.concurrency, arguments.workers, arguments.max_pending))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Measure the generic substitute lookup at 100k medicines, whose salts follow a Zipf-like popularity so that the most
+common salts have thousands of postings. The lookup reads every posting of the salts of the medicine, so its time
+grows with the length of the posting lists, which --skew controls.
+
+Run from the repository root, e.g. python -m benchmarks.substitutes --rows 100000 --salts 2000 --skew 0.7
+"""
+import argparse
+import random
+import sqlite3
+import statistics
+import time
+
+from benchmarks.update_pages import populate
+from src.models import medicine_salt
+
+
+def populate_compositions(connection: sqlite3.Connection, rows: int, salts: int, skew: float):
+    """
+    Add salts and give every medicine one to four of them, the lower salt IDs being the most common.
+
+    @param connection: Connection to a database populated with medicines.
+    @type connection: sqlite3.Connection
+    @param rows: Number of medicines.
+    @type rows: int
+    @param salts: Number of salts.
+    @type salts: int
+    @param skew: Exponent of the popularity of the salts by rank, where 0 makes every salt equally common.
+    @type skew: float
+    """
+    generator = random.Random(0)
+    weights = [1 / rank ** skew for rank in range(1, salts + 1)]
+
+    connection.execute('CREATE TABLE salt (id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL)')
+    connection.executemany('INSERT INTO salt VALUES (?, ?)', ((id_, f'Salt {id_}') for id_ in range(1, salts + 1)))
+    medicine_salt.create_schema(connection)
+
+    medicine_salt.upsert_many(connection, (
+        medicine_salt.MedicineSalt(medicine_id, salt_id)
+        for medicine_id in range(1, rows + 1)
+        for salt_id in set(generator.choices(range(1, salts + 1), weights, k=generator.randint(1, 4)))
+    ))
+    connection.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--salts', type=int, default=2000)
+    parser.add_argument('--skew', type=float, default=0.7)
+    parser.add_argument('--lookups', type=int, default=500)
+    arguments = parser.parse_args()
+
+    connection = sqlite3.connect(':memory:')
+    populate(connection, arguments.rows)
+    populate_compositions(connection, arguments.rows, arguments.salts, arguments.skew)
+
+    largest = connection.execute(
+        'SELECT COUNT(*) FROM medicine_salt GROUP BY salt_id ORDER BY COUNT(*) DESC LIMIT 1'
+    ).fetchone()[0]
+    generator = random.Random(1)
+    timings = []
+
+    for _ in range(arguments.lookups):
+        medicine_id = generator.randint(1, arguments.rows)
+        start = time.perf_counter()
+        medicine_salt.find_substitutes(connection, medicine_id, include_expired=True)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    print(f'{arguments.rows} medicines, {arguments.salts} salts, largest posting list {largest}')
+    print(f'median {statistics.median(timings):.3f} ms, '
+          f'p95 {timings[int(len(timings) * 0.95) - 1]:.3f} ms, max {timings[-1]:.3f} ms')
+
+    connection.close()
+
+
+if __name__ == '__main__':
+    main()
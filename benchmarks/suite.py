@@ -0,0 +1,620 @@
+"""
+Measure the time and peak memory of every public function of the models and of every warehouse route against a
+generated database, saving the results so that a run can be compared with a baseline.
+
+Every run starts from a copy of the database, so that the routes committing writes leave the original untouched, and
+model functions that write run inside transactions that are rolled back. The first run of each benchmark is reported
+apart, since it fills the caches the following runs hit. The peak memory is that of the Python allocations of one more
+run under tracemalloc, which excludes the page cache of SQLite.
+
+Run from the repository root, e.g.
+    python -m benchmarks.data static/medium.db --preset medium
+    python -m benchmarks.suite static/medium.db --output medium.json --baseline baseline.json
+"""
+import argparse
+import contextlib
+import dataclasses
+import datetime
+import importlib
+import inspect
+import io
+import json
+import os
+import pkgutil
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+
+import flask
+
+import src.models
+from benchmarks import data
+from src.blueprints.warehouse import warehouse
+from src.database import pool
+from src.models import (
+    customer, employee, expiry_snapshot, identity_map, manufacturer, medicine, medicine_salt, sale, sale_item,
+    sale_rollup, salt, search, stock, view
+)
+
+# Functions creating the schema, run once by the migrations, and helpers that do not query the database.
+UNMEASURED = frozenset({
+    'expiry_snapshot.add_medicine_version', 'expiry_snapshot.create_schema', 'mapper.register_types',
+    'medicine_salt.create_schema', 'sale_item.create_schema', 'sale_rollup.create_schema', 'search.create_indexes',
+    'stock.create_schema', 'view.compile_row_factory'
+})
+
+
+@dataclass(frozen=True, slots=True)
+class Sample:
+    """Rows the benchmarks are run with, taken from the middle of each table of a generated database."""
+    customer_id: int
+    employee_id: int
+    manufacturer: manufacturer.Manufacturer
+    medicine: medicine.Medicine
+    stocked_medicine_id: int
+    sale: sale.Sale
+    salt: salt.Salt
+    medicines: list[medicine.Medicine]
+    sales: list[sale.Sale]
+
+    @property
+    def month(self) -> str:
+        return self.sale.date_time.strftime('%Y-%m')
+
+
+@dataclass(frozen=True, slots=True)
+class Case:
+    """Model function run with representative arguments, inside a transaction that is rolled back if it writes."""
+    name: str
+    run: Callable[[sqlite3.Connection, Sample], Any]
+    write: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class Route:
+    """Request to an endpoint, sent by a client logged in as an administrator."""
+    name: str
+    endpoint: str
+    send: Callable[[Any, Sample], Any]
+
+
+@dataclass(frozen=True, slots=True)
+class Result:
+    """Timings of a benchmark, in milliseconds, and the peak memory allocated by a run, in kibibytes."""
+    name: str
+    runs: int
+    first: float
+    best: float
+    median: float
+    peak_memory: float
+
+
+@dataclass(frozen=True, slots=True)
+class Regression:
+    """Benchmark whose median time grew beyond the tolerance since the baseline."""
+    name: str
+    baseline: float
+    median: float
+
+
+def _consume(iterator: Iterator[Any]) -> int:
+    return sum(1 for _ in iterator)
+
+
+def _new(model: Any) -> Any:
+    return dataclasses.replace(model, id=None)
+
+
+def _insert_sale_items(connection: sqlite3.Connection, sample: Sample):
+    sale_id = sale.insert(connection, _new(sample.sale))
+    sale_item.insert_many(connection, (
+        sale_item.SaleItem(sale_id, model.id, 1, model.sale_price) for model in sample.medicines[:4]
+    ))
+
+
+def _month_range(sample: Sample) -> tuple[datetime.datetime, datetime.datetime]:
+    since = datetime.datetime.strptime(sample.month, '%Y-%m')
+    return since, (since + datetime.timedelta(days=32)).replace(day=1)
+
+
+MODEL_CASES: tuple[Case, ...] = (
+    Case('customer.get_all', lambda c, s: customer.get_all(c)),
+    Case('customer.get_all_ids', lambda c, s: customer.get_all_ids(c)),
+    Case('customer.get_by_id', lambda c, s: customer.get_by_id(c, s.customer_id)),
+    Case('customer.get_page', lambda c, s: customer.get_page(c, s.customer_id)),
+    Case('customer.get_summaries', lambda c, s: customer.get_summaries(c, (model.customer_id for model in s.sales))),
+    Case('customer.iter_all', lambda c, s: _consume(customer.iter_all(c))),
+    Case('employee.get_access', lambda c, s: employee.get_access(c, s.employee_id)),
+    Case('employee.get_all', lambda c, s: employee.get_all(c)),
+    Case('employee.get_all_ids', lambda c, s: employee.get_all_ids(c)),
+    Case('employee.get_by_email_address', lambda c, s: employee.get_by_email_address(c, data.STAFF_EMAIL_ADDRESS)),
+    Case('employee.get_by_id', lambda c, s: employee.get_by_id(c, s.employee_id)),
+    Case('employee.get_page', lambda c, s: employee.get_page(c)),
+    Case('employee.get_summaries', lambda c, s: employee.get_summaries(c, (model.employee_id for model in s.sales))),
+    Case('employee.iter_all', lambda c, s: _consume(employee.iter_all(c))),
+    Case('employee.update_password', lambda c, s: employee.update_password(c, s.employee_id, 'hash'), True),
+    Case('expiry_snapshot.get_by_date', lambda c, s: expiry_snapshot.get_by_date(c, datetime.date.today(), 30)),
+    Case('expiry_snapshot.get_or_take', lambda c, s: expiry_snapshot.get_or_take(c, 30), True),
+    Case('expiry_snapshot.take', lambda c, s: expiry_snapshot.take(c, datetime.date.today(), 90), True),
+    Case('manufacturer.get_all', lambda c, s: manufacturer.get_all(c)),
+    Case('manufacturer.get_all_ids', lambda c, s: manufacturer.get_all_ids(c)),
+    Case('manufacturer.get_all_with_fields', lambda c, s: manufacturer.get_all_with_fields(c, 'id', 'name')),
+    Case('manufacturer.get_by_id', lambda c, s: manufacturer.get_by_id(c, s.manufacturer.id)),
+    Case('manufacturer.get_page', lambda c, s: manufacturer.get_page(c, s.manufacturer.id, order_by='name')),
+    Case('manufacturer.get_page_view', lambda c, s: manufacturer.get_page_view(c, s.manufacturer.id, order_by='name')),
+    Case('manufacturer.insert', lambda c, s: manufacturer.insert(c, dataclasses.replace(
+        s.manufacturer, id=None, phone_number='+91 0000000000'
+    )), True),
+    Case('manufacturer.iter_all', lambda c, s: _consume(manufacturer.iter_all(c))),
+    Case('manufacturer.update', lambda c, s: manufacturer.update(c, s.manufacturer), True),
+    Case('manufacturer.upsert', lambda c, s: manufacturer.upsert(c, s.manufacturer), True),
+    Case('manufacturer.upsert_many', lambda c, s: manufacturer.upsert_many(c, manufacturer.get_page(c)), True),
+    Case('medicine.get_all', lambda c, s: medicine.get_all(c)),
+    Case('medicine.get_all_ids', lambda c, s: medicine.get_all_ids(c)),
+    Case('medicine.get_all_with_fields', lambda c, s: medicine.get_all_with_fields(c, 'id', 'name', 'expiry_date')),
+    Case('medicine.get_by_id', lambda c, s: medicine.get_by_id(c, s.medicine.id)),
+    Case('medicine.get_by_ids', lambda c, s: medicine.get_by_ids(c, (model.id for model in s.medicines))),
+    Case('medicine.get_expired', lambda c, s: medicine.get_expired(c)),
+    Case('medicine.get_expiring', lambda c, s: medicine.get_expiring(c, 90)),
+    Case('medicine.get_page', lambda c, s: medicine.get_page(c, s.medicine.id, order_by='name')),
+    Case('medicine.get_page_view', lambda c, s: medicine.get_page_view(c, s.medicine.id, order_by='name')),
+    Case('medicine.insert', lambda c, s: medicine.insert(c, _new(s.medicine)), True),
+    Case('medicine.iter_all', lambda c, s: _consume(medicine.iter_all(c))),
+    Case('medicine.update', lambda c, s: medicine.update(c, s.medicine), True),
+    Case('medicine.upsert', lambda c, s: medicine.upsert(c, s.medicine), True),
+    Case('medicine.upsert_many', lambda c, s: medicine.upsert_many(c, s.medicines), True),
+    Case('medicine_salt.find_substitutes', lambda c, s: medicine_salt.find_substitutes(c, s.medicine.id)),
+    Case('medicine_salt.get_medicine_ids', lambda c, s: medicine_salt.get_medicine_ids(c, 1)),
+    Case('medicine_salt.get_salt_ids', lambda c, s: medicine_salt.get_salt_ids(c, s.medicine.id)),
+    Case('medicine_salt.set_salts', lambda c, s: medicine_salt.set_salts(c, s.medicine.id, (1, s.salt.id)), True),
+    Case('medicine_salt.upsert_many', lambda c, s: medicine_salt.upsert_many(c, (
+        medicine_salt.MedicineSalt(model.id, s.salt.id) for model in s.medicines
+    )), True),
+    Case('sale.get_all', lambda c, s: sale.get_all(c)),
+    Case('sale.get_all_ids', lambda c, s: sale.get_all_ids(c)),
+    Case('sale.get_all_with_fields', lambda c, s: sale.get_all_with_fields(c, 'id', 'date_time', 'amount')),
+    Case('sale.get_by_id', lambda c, s: sale.get_by_id(c, s.sale.id)),
+    Case('sale.get_by_ids', lambda c, s: sale.get_by_ids(c, (model.id for model in s.sales))),
+    Case('sale.get_many_with_related', lambda c, s: sale.get_many_with_related(c, (model.id for model in s.sales))),
+    Case('sale.get_page', lambda c, s: sale.get_page(c, s.sale.id, order_by='date_time')),
+    Case('sale.get_page_view', lambda c, s: sale.get_page_view(c, s.sale.id, order_by='date_time')),
+    Case('sale.insert', lambda c, s: sale.insert(c, _new(s.sale)), True),
+    Case('sale.iter_all', lambda c, s: _consume(sale.iter_all(c))),
+    Case('sale.iter_filtered', lambda c, s: _consume(sale.iter_filtered(c, *_month_range(s)))),
+    Case('sale.load_related', lambda c, s: sale.load_related(c, s.sales, identities=identity_map.IdentityMap())),
+    Case('sale.update', lambda c, s: sale.update(c, s.sale), True),
+    Case('sale.upsert', lambda c, s: sale.upsert(c, s.sale), True),
+    Case('sale_item.get_by_sale', lambda c, s: sale_item.get_by_sale(c, s.sale.id)),
+    Case('sale_item.insert_many', _insert_sale_items, True),
+    Case('sale_rollup.get_leaders', lambda c, s: sale_rollup.get_leaders(c, 'month', 'customer', s.month, s.month)),
+    Case('sale_rollup.get_periods', lambda c, s: sale_rollup.get_periods(
+        c, 'day', f'{s.month}-01', f'{s.month}-31'
+    )),
+    Case('sale_rollup.rebuild', lambda c, s: sale_rollup.rebuild(c), True),
+    Case('salt.get_all', lambda c, s: salt.get_all(c)),
+    Case('salt.get_all_ids', lambda c, s: salt.get_all_ids(c)),
+    Case('salt.get_all_with_fields', lambda c, s: salt.get_all_with_fields(c, 'id', 'name')),
+    Case('salt.get_by_id', lambda c, s: salt.get_by_id(c, s.salt.id)),
+    Case('salt.get_by_ids', lambda c, s: salt.get_by_ids(c, range(1, 501))),
+    Case('salt.get_page', lambda c, s: salt.get_page(c, s.salt.id, order_by='name')),
+    Case('salt.get_page_view', lambda c, s: salt.get_page_view(c, s.salt.id, order_by='name')),
+    Case('salt.insert', lambda c, s: salt.insert(c, _new(s.salt)), True),
+    Case('salt.iter_all', lambda c, s: _consume(salt.iter_all(c))),
+    Case('salt.update', lambda c, s: salt.update(c, s.salt), True),
+    Case('salt.upsert', lambda c, s: salt.upsert(c, s.salt), True),
+    Case('salt.upsert_many', lambda c, s: salt.upsert_many(c, salt.get_page(c, limit=500)), True),
+    Case('search.search', lambda c, s: search.search(c, 'medicine', s.medicine.name[:4])),
+    Case('stock.get_quantities', lambda c, s: stock.get_quantities(c, (model.id for model in s.medicines))),
+    Case('stock.receive', lambda c, s: stock.receive(c, s.medicine.id, 10), True),
+    Case('stock.take', lambda c, s: stock.take(c, s.stocked_medicine_id, 1), True),
+    Case('view.get_page_view', lambda c, s: view.get_page_view(
+        c, 'SELECT id, name FROM salt ORDER BY name LIMIT 50', (), tuple
+    ))
+)
+
+
+def _import_body() -> dict[str, Any]:
+    catalogue = '\n'.join(json.dumps({'id': id_, 'name': f'Salt {id_}'}) for id_ in range(1, 101))
+    return {'import-table': 'salt', 'import-file': (io.BytesIO(catalogue.encode()), 'salts.ndjson')}
+
+
+ROUTES: tuple[Route, ...] = (
+    Route('GET /warehouse/', 'warehouse.home', lambda c, s: c.get('/warehouse/')),
+    Route('GET /warehouse/manufacturers', 'warehouse.manufacturers', lambda c, s: c.get('/warehouse/manufacturers')),
+    Route('GET /warehouse/manufacturers/<id>', 'warehouse.manufacturer', lambda c, s: c.get(
+        f'/warehouse/manufacturers/{s.manufacturer.id}'
+    )),
+    Route('GET /warehouse/manufacturers/update', 'warehouse.manufacturer_update', lambda c, s: c.get(
+        '/warehouse/manufacturers/update'
+    )),
+    Route('POST /warehouse/manufacturers/update', 'warehouse.manufacturer_update', lambda c, s: c.post(
+        '/warehouse/manufacturers/update', data={
+            'manufacturer-id': s.manufacturer.id, 'manufacturer-name': s.manufacturer.name,
+            'manufacturer-phone-number': s.manufacturer.phone_number, 'manufacturer-address': s.manufacturer.address
+        }
+    )),
+    Route('GET /warehouse/medicines', 'warehouse.medicines', lambda c, s: c.get('/warehouse/medicines')),
+    Route('GET /warehouse/medicines/<id>', 'warehouse.medicine', lambda c, s: c.get(
+        f'/warehouse/medicines/{s.medicine.id}'
+    )),
+    Route('GET /warehouse/api/medicines/<id>/substitutes', 'warehouse.medicine_substitutes_api', lambda c, s: c.get(
+        f'/warehouse/api/medicines/{s.medicine.id}/substitutes'
+    )),
+    Route('GET /warehouse/medicines/update', 'warehouse.medicine_update', lambda c, s: c.get(
+        '/warehouse/medicines/update'
+    )),
+    Route('POST /warehouse/medicines/update', 'warehouse.medicine_update', lambda c, s: c.post(
+        '/warehouse/medicines/update', data={
+            'medicine-id': s.medicine.id, 'medicine-name': s.medicine.name,
+            'medicine-manufacturer-id': s.medicine.manufacturer_id, 'medicine-cost-price': s.medicine.cost_price,
+            'medicine-sale-price': s.medicine.sale_price,
+            'medicine-potency': '' if s.medicine.potency is None else s.medicine.potency,
+            'medicine-quantity-per-unit': s.medicine.quantity_per_unit,
+            'medicine-manufacturing-date': s.medicine.manufacturing_date.isoformat(),
+            'medicine-purchase-date': s.medicine.purchase_date.isoformat(),
+            'medicine-expiry-date': s.medicine.expiry_date.isoformat()
+        }
+    )),
+    Route('GET /warehouse/medicines/expiring', 'warehouse.medicines_expiring', lambda c, s: c.get(
+        '/warehouse/medicines/expiring?within_days=90'
+    )),
+    Route('GET /warehouse/api/medicines/expiring', 'warehouse.medicines_expiring_api', lambda c, s: c.get(
+        '/warehouse/api/medicines/expiring?within_days=90&limit=1000'
+    )),
+    Route('GET /warehouse/sales', 'warehouse.sales', lambda c, s: c.get('/warehouse/sales')),
+    Route('GET /warehouse/sales/<id>', 'warehouse.sale', lambda c, s: c.get(f'/warehouse/sales/{s.sale.id}')),
+    Route('GET /warehouse/sales/update', 'warehouse.sale_update', lambda c, s: c.get('/warehouse/sales/update')),
+    Route('POST /warehouse/sales/update', 'warehouse.sale_update', lambda c, s: c.post(
+        '/warehouse/sales/update', data={
+            'sale-id': s.sale.id, 'sale-date-time': s.sale.date_time.isoformat(),
+            'sale-employee-id': s.sale.employee_id, 'sale-customer-id': s.sale.customer_id,
+            'sale-amount': s.sale.amount
+        }
+    )),
+    Route('GET /warehouse/salts', 'warehouse.salts', lambda c, s: c.get('/warehouse/salts')),
+    Route('GET /warehouse/salts/<id>', 'warehouse.salt', lambda c, s: c.get(f'/warehouse/salts/{s.salt.id}')),
+    Route('GET /warehouse/salts/update', 'warehouse.salt_update', lambda c, s: c.get('/warehouse/salts/update')),
+    Route('POST /warehouse/salts/update', 'warehouse.salt_update', lambda c, s: c.post(
+        '/warehouse/salts/update', data={'salt-id': s.salt.id, 'salt-name': s.salt.name}
+    )),
+    Route('GET /warehouse/api/search/medicine', 'warehouse.search', lambda c, s: c.get(
+        f'/warehouse/api/search/medicine?q={s.medicine.name[:4]}'
+    )),
+    Route('GET /warehouse/api/medicine', 'warehouse.data_api', lambda c, s: c.get(
+        '/warehouse/api/medicine?fields=name,expiry_date', headers={'Accept-Encoding': 'gzip'}
+    )),
+    Route('POST /warehouse/api/checkout', 'warehouse.checkout_api', lambda c, s: c.post(
+        '/warehouse/api/checkout', json={
+            'customer_id': s.customer_id, 'items': [{'medicine_id': s.stocked_medicine_id, 'quantity': 1}]
+        }
+    )),
+    Route('GET /warehouse/export/sales', 'warehouse.sales_export', lambda c, s: c.get(
+        f'/warehouse/export/sales?start={s.month}-01&end={s.month}-28&format=csv'
+    )),
+    Route('GET /warehouse/export/medicines', 'warehouse.medicines_export', lambda c, s: c.get(
+        '/warehouse/export/medicines?format=ndjson'
+    )),
+    Route('GET /warehouse/import', 'warehouse.catalogue_import', lambda c, s: c.get('/warehouse/import')),
+    Route('POST /warehouse/import', 'warehouse.catalogue_import', lambda c, s: c.post(
+        '/warehouse/import', data=_import_body(), content_type='multipart/form-data'
+    ))
+)
+
+
+def take_sample(connection: sqlite3.Connection) -> Sample:
+    """
+    Take the rows the benchmarks are run with from a generated database.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+
+    @return: Rows from the middle of each table.
+    @rtype: Sample
+    """
+    def middle(table: str) -> int:
+        return max(connection.execute(f'SELECT max(id) FROM {table}').fetchone()[0] // 2, 1)
+
+    medicine_id = middle('medicine')
+    sale_id = middle('sale')
+    stocked_medicine_id = connection.execute(
+        'SELECT medicine_id FROM stock WHERE quantity > 100 ORDER BY medicine_id LIMIT 1'
+    ).fetchone()[0]
+
+    return Sample(
+        middle('customer'), middle('employee'), manufacturer.get_by_id(connection, middle('manufacturer')),
+        medicine.get_by_id(connection, medicine_id), stocked_medicine_id, sale.get_by_id(connection, sale_id),
+        salt.get_by_id(connection, middle('salt')), medicine.get_page(connection, medicine_id, 500),
+        sale.get_page(connection, sale_id, 500)
+    )
+
+
+def measure(name: str, function: Callable[[], Any], repeat: int, budget: float) -> Result:
+    """
+    Time the runs of a function, then measure the peak memory allocated by one more run.
+
+    @param name: Name of the benchmark.
+    @type name: str
+    @param function: Function to run.
+    @type function: Callable[[], Any]
+    @param repeat: Number of runs after the first one.
+    @type repeat: int
+    @param budget: Time after which no more runs are started, in seconds, so that slow functions run fewer times.
+    @type budget: float
+
+    @return: Timings and peak memory of the function.
+    @rtype: Result
+    """
+    timings = []
+    deadline = time.perf_counter() + budget
+
+    while len(timings) <= repeat and (len(timings) < 2 or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+
+    try:
+        function()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Result(
+        name, len(timings), timings[0], min(timings[1:]), statistics.median(timings[1:]), round(peak / 1024, 1)
+    )
+
+
+def run_models(connection: sqlite3.Connection, sample: Sample, repeat: int, budget: float) -> list[Result]:
+    """
+    Measure every model case, rolling back the cases that write.
+
+    @param connection: Connection to the database, outside of any transaction.
+    @type connection: sqlite3.Connection
+    @param sample: Rows to run the cases with.
+    @type sample: Sample
+    @param repeat: Number of runs of each case after the first one.
+    @type repeat: int
+    @param budget: Time after which no more runs of a case are started, in seconds.
+    @type budget: float
+
+    @return: Results of the cases, in order.
+    @rtype: list[Result]
+    """
+    results = []
+
+    for case in MODEL_CASES:
+        def run(case: Case = case):
+            if not case.write:
+                return case.run(connection, sample)
+
+            connection.execute('BEGIN')
+
+            try:
+                case.run(connection, sample)
+            finally:
+                connection.rollback()
+
+        results.append(measure(case.name, run, repeat, budget))
+
+    return results
+
+
+def create_client(database_path: str) -> Any:
+    """
+    Load the application against a database and log a test client in as its administrator.
+
+    @param database_path: Path of the database.
+    @type database_path: str
+
+    @return: Logged in test client of the application.
+    @rtype: flask.testing.FlaskClient
+    """
+    application: flask.Flask = importlib.import_module('app').create_app({
+        'DATABASE_PATH': database_path, 'SESSION_COOKIE_SECURE': False
+    })
+    application.secret_key = application.secret_key or 'benchmark'
+
+    client = application.test_client()
+    response = client.post('/factory/login', data={
+        'email-address': data.ADMINISTRATOR_EMAIL_ADDRESS, 'password': data.PASSWORD
+    })
+
+    if response.status_code != 302:
+        raise RuntimeError(f'Could not log in as {data.ADMINISTRATOR_EMAIL_ADDRESS}, is the database generated?')
+
+    return client
+
+
+def run_routes(client: Any, sample: Sample, repeat: int, budget: float) -> list[Result]:
+    """
+    Measure every route, failing on server errors.
+
+    @param client: Test client logged in as an administrator.
+    @type client: flask.testing.FlaskClient
+    @param sample: Rows to send the requests with.
+    @type sample: Sample
+    @param repeat: Number of requests to each route after the first one.
+    @type repeat: int
+    @param budget: Time after which no more requests to a route are sent, in seconds.
+    @type budget: float
+
+    @return: Results of the routes, in order.
+    @rtype: list[Result]
+
+    @raise RuntimeError: If a route responds with a server error.
+    """
+    results = []
+
+    for route in ROUTES:
+        def send(route: Route = route):
+            response = route.send(client, sample)
+            response.get_data()
+
+            if response.status_code >= 500:
+                raise RuntimeError(f'{route.name} responded with {response.status}.')
+
+        results.append(measure(route.name, send, repeat, budget))
+
+    return results
+
+
+def missing_benchmarks() -> list[str]:
+    """
+    Find the public model functions and the warehouse endpoints without a benchmark.
+
+    @return: Names of the functions and endpoints that are not measured.
+    @rtype: list[str]
+    """
+    functions = set()
+
+    for module_info in pkgutil.iter_modules(src.models.__path__):
+        module = importlib.import_module(f'{src.models.__name__}.{module_info.name}')
+        functions.update(
+            f'{module_info.name}.{name}' for name, function in inspect.getmembers(module, inspect.isfunction)
+            if function.__module__ == module.__name__ and not name.startswith('_')
+        )
+
+    application = flask.Flask(__name__)
+    application.register_blueprint(warehouse, url_prefix='/warehouse')
+    endpoints = {rule.endpoint for rule in application.url_map.iter_rules() if rule.endpoint.startswith('warehouse.')}
+
+    return sorted(
+        (functions - UNMEASURED - {case.name for case in MODEL_CASES})
+        | (endpoints - {route.endpoint for route in ROUTES})
+    )
+
+
+def compare(
+        results: list[Result], baseline: list[Result], tolerance: float, floor: float = 0.05
+) -> list[Regression]:
+    """
+    Find the benchmarks whose median time grew by more than a tolerance since a baseline, ignoring the growth of the
+    fastest benchmarks that is within the noise of the timer.
+
+    @param results: Results of the current run.
+    @type results: list[Result]
+    @param baseline: Results of the baseline run.
+    @type baseline: list[Result]
+    @param tolerance: Growth of the median time allowed, as a fraction of the baseline.
+    @type tolerance: float
+    @param floor: Growth of the median time always allowed, in milliseconds.
+    @type floor: float
+
+    @return: Regressions, in the order of the results.
+    @rtype: list[Regression]
+    """
+    baseline_medians = {result.name: result.median for result in baseline}
+
+    return [
+        Regression(result.name, baseline_medians[result.name], result.median) for result in results
+        if result.name in baseline_medians
+        and result.median > max(baseline_medians[result.name] * (1 + tolerance), baseline_medians[result.name] + floor)
+    ]
+
+
+def load_results(path: str) -> list[Result]:
+    with open(path) as file:
+        return [Result(**result) for result in json.load(file)['results']]
+
+
+def save_results(path: str, results: list[Result], connection: sqlite3.Connection):
+    """Save results along with the sizes of the database and the versions they were measured with."""
+    tables = ('customer', 'employee', 'manufacturer', 'medicine', 'sale', 'salt')
+
+    with open(path, 'w') as file:
+        json.dump({
+            'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'rows': {table: connection.execute(f'SELECT count(*) FROM {table}').fetchone()[0] for table in tables},
+            'results': [dataclasses.asdict(result) for result in results]
+        }, file, indent=2)
+
+
+@contextlib.contextmanager
+def database_copy(path: str) -> Iterator[str]:
+    """
+    Copy a database to a temporary directory for the length of a run.
+
+    @return: Path of the copy.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        copy_path = os.path.join(directory, os.path.basename(path))
+
+        with contextlib.closing(sqlite3.connect(path)) as source:
+            with contextlib.closing(sqlite3.connect(copy_path)) as copy:
+                source.backup(copy)
+
+        yield copy_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('database', help='Generated database, created with the preset if it does not exist.')
+    parser.add_argument('--preset', choices=data.PRESETS, default='small')
+    parser.add_argument('--only', choices=('models', 'routes'), help='Run only the model or the route benchmarks.')
+    parser.add_argument('--repeat', type=int, default=10, help='Runs of each benchmark after the first one.')
+    parser.add_argument('--budget', type=float, default=2.0, help='Seconds after which no more runs are started.')
+    parser.add_argument('--output', help='Path of the JSON file to save the results to.')
+    parser.add_argument('--baseline', help='Results of an earlier run to compare with.')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Slowdown of the median reported as regression.')
+    arguments = parser.parse_args()
+
+    for name in missing_benchmarks():
+        print(f'warning: {name} has no benchmark', file=sys.stderr)
+
+    if not os.path.exists(arguments.database):
+        with contextlib.closing(sqlite3.connect(arguments.database)) as connection:
+            data.generate(connection, data.PRESETS[arguments.preset])
+
+    results = []
+
+    with database_copy(arguments.database) as database_path:
+        connection = pool.ConnectionPool(database_path).acquire()
+        sample = take_sample(connection)
+
+        if arguments.only != 'routes':
+            results += run_models(connection, sample, arguments.repeat, arguments.budget)
+
+        if arguments.only != 'models':
+            results += run_routes(create_client(database_path), sample, arguments.repeat, arguments.budget)
+
+        if arguments.output:
+            save_results(arguments.output, results, connection)
+
+        connection.close()
+
+    baseline = {result.name: result for result in load_results(arguments.baseline)} if arguments.baseline else {}
+    print(
+        f'{"benchmark":<52} {"runs":>5} {"first ms":>10} {"best ms":>10} {"median ms":>10} {"peak KiB":>10} '
+        f'{"vs base":>8}'
+    )
+
+    for result in results:
+        change = f'{result.median / baseline[result.name].median:>7.2f}x' if result.name in baseline else ''
+        print(
+            f'{result.name:<52} {result.runs:>5} {result.first:>10.3f} {result.best:>10.3f} {result.median:>10.3f} '
+            f'{result.peak_memory:>10.1f} {change:>8}'
+        )
+
+    regressions = compare(results, list(baseline.values()), arguments.tolerance)
+
+    for regression in regressions:
+        print(
+            f'regression: {regression.name} median {regression.baseline:.3f} ms -> {regression.median:.3f} ms',
+            file=sys.stderr
+        )
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Measure the time to build the medicine update page data at 50k rows, comparing the full-table scans the page used
+to run, paging with per-model JSON encoding, and the single-query page view.
+
+Run from the repository root, e.g. python -m benchmarks.update_pages --rows 50000 --repeat 20
+"""
+import argparse
+import dataclasses
+import datetime
+import json
+import random
+import sqlite3
+import time
+from typing import Callable
+
+from src.models import medicine
+
+SCHEMA = '''
+    CREATE TABLE medicine (
+        id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL, manufacturer_id INTEGER NOT NULL,
+        cost_price DECIMAL NOT NULL, sale_price DECIMAL NOT NULL, potency INTEGER, quantity_per_unit INTEGER NOT NULL,
+        manufacturing_date DATE NOT NULL, purchase_date DATE NOT NULL, expiry_date DATE NOT NULL
+    );
+
+    CREATE INDEX medicine_name_index ON medicine (name);
+'''
+FIELDS = (
+    'id', 'name', 'manufacturer_id', 'cost_price', 'sale_price', 'potency', 'quantity_per_unit', 'manufacturing_date',
+    'purchase_date', 'expiry_date'
+)
+
+
+def populate(connection: sqlite3.Connection, rows: int):
+    """
+    Fill an empty database with random medicines.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param rows: Number of medicines.
+    @type rows: int
+    """
+    generator = random.Random(0)
+    start = datetime.date(2023, 1, 1)
+
+    def row(id_: int) -> tuple:
+        made = start + datetime.timedelta(days=generator.randrange(365))
+        return (
+            id_, f'Medicine {generator.randrange(rows):06}', generator.randrange(1, 500),
+            round(generator.uniform(1, 50), 2), round(generator.uniform(2, 80), 2), generator.choice((None, 250, 500)),
+            generator.randrange(1, 100), made, made + datetime.timedelta(days=30), made + datetime.timedelta(days=730)
+        )
+
+    connection.executescript(SCHEMA)
+    connection.executemany('INSERT INTO medicine VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', map(row, range(1, rows + 1)))
+    connection.commit()
+
+
+def full_scan(connection: sqlite3.Connection) -> str:
+    """The update page before pagination: every model, then every row again as dictionaries."""
+    medicine.get_all(connection)
+    return json.dumps(medicine.get_all_with_fields(connection, *FIELDS))
+
+
+def page_models(connection: sqlite3.Connection) -> str:
+    """A page of models, encoded to JSON from the dataclasses."""
+    page = medicine.get_page(connection, None, 50, order_by='name')
+    return json.dumps([dataclasses.asdict(model) for model in page], default=lambda value: value.isoformat())
+
+
+def page_view(connection: sqlite3.Connection) -> str:
+    """A page of models and its records from a single query, encoded to JSON as stored."""
+    return json.dumps(medicine.get_page_view(connection, None, 50, order_by='name').records)
+
+
+def measure(function: Callable[[sqlite3.Connection], str], connection: sqlite3.Connection, repeat: int) -> float:
+    """
+    Time a function building the page data.
+
+    @param function: Function building the page data.
+    @type function: Callable[[sqlite3.Connection], str]
+    @param connection: Connection to the populated database.
+    @type connection: sqlite3.Connection
+    @param repeat: Number of runs.
+    @type repeat: int
+
+    @return: Best time of a run, in milliseconds.
+    @rtype: float
+    """
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(connection)
+        timings.append(time.perf_counter() - start)
+
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--skip-full-scan', action='store_true', help='Skip the slow full-table baseline.')
+    arguments = parser.parse_args()
+
+    connection = sqlite3.connect(':memory:')
+    populate(connection, arguments.rows)
+
+    print(f'{"approach":<12} {"ms/page":>10}')
+
+    for name, function in (('full scan', full_scan), ('page models', page_models), ('page view', page_view)):
+        if name == 'full scan' and arguments.skip_full_scan:
+            continue
+
+        repeat = min(arguments.repeat, 3) if name == 'full scan' else arguments.repeat
+        print(f'{name:<12} {measure(function, connection, repeat):>10.3f}')
+
+    connection.close()
+
+
+if __name__ == '__main__':
+    main()
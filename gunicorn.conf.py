@@ -0,0 +1,24 @@
+"""Settings of the production server, see wsgi.py."""
+import os
+
+from app import shutdown_worker
+
+bind = os.getenv('GUNICORN_BIND', '127.0.0.1:8000')
+workers = int(os.getenv('WEB_CONCURRENCY', os.cpu_count() or 1))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') != '0'
+
+timeout = 30
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+
+# Replace workers now and then, at different times, so that none holds on to memory it has grown into for good.
+max_requests = 10000
+max_requests_jitter = 1000
+
+
+def worker_exit(_server, worker):
+    # A worker that failed to boot has no application to shut down.
+    if getattr(worker, 'wsgi', None) is not None:
+        shutdown_worker(worker.wsgi)
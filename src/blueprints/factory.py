@@ -1,14 +1,37 @@
-import os
+import datetime
 import sqlite3
 
+import click
 import flask
-import werkzeug.security as security
 
-from src.models import employee
+from src.database import pool
+from src.models import employee, sale_rollup
+from src.services import authorization, metrics, passwords
 
 factory = flask.Blueprint('factory', __name__)
 
 
+def _rehash_password(connection: sqlite3.Connection, employee_id: int, password: str):
+    """
+    Store the password of an employee again with the configured hash method and cost. A saturated pool skips the
+    rehash, which is retried on the next login.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param employee_id: Employee ID.
+    @type employee_id: int
+    @param password: Password in plain text, already verified.
+    @type password: str
+    """
+    try:
+        login_password = passwords.get_hasher().hash(password)
+    except passwords.HasherSaturatedError:
+        return
+
+    employee.update_password(connection, employee_id, login_password)
+    connection.commit()
+
+
 @factory.route('/login', methods=['POST', 'GET'])
 def login() -> flask.Response | str:
     login_message = ''
@@ -17,16 +40,30 @@ def login() -> flask.Response | str:
         email_address = flask.request.form['email-address']
         password = flask.request.form['password']
 
-        connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
+        connection = pool.get_connection()
         login_employee = employee.get_by_email_address(connection, email_address)
-        connection.close()
-
-        if login_employee is not None and security.check_password_hash(login_employee.login_password, password):
+        hasher = passwords.get_hasher()
+
+        try:
+            authenticated = login_employee is not None and hasher.verify(login_employee.login_password, password)
+        except passwords.HasherSaturatedError:
+            response = flask.make_response(
+                flask.render_template('factory/login.html', login_message='Too many logins, try again shortly.'), 503
+            )
+            response.headers['Retry-After'] = '1'
+            return response
+
+        if authenticated:
+            if hasher.needs_rehash(login_employee.login_password):
+                _rehash_password(connection, login_employee.id, password)
+
+            authorization.invalidate(login_employee.id)
             flask.session['employee_id'] = login_employee.id
             flask.session.permanent = True
 
             return flask.redirect(flask.url_for('factory.dashboard'))
 
+        metrics.get_registry().login_failures.inc()
         login_message = 'Invalid email or password.'
 
     return flask.render_template('factory/login.html', login_message=login_message)
@@ -34,39 +71,59 @@ def login() -> flask.Response | str:
 
 @factory.route('/logout')
 def logout() -> flask.Response:
-    flask.session.pop('employee_id', None)
+    employee_id = flask.session.pop('employee_id', None)
+
+    if employee_id is not None:
+        authorization.invalidate(employee_id)
+
     return flask.redirect(flask.url_for('factory.login'))
 
 
 @factory.route('/dashboard')
+@authorization.login_required
 def dashboard() -> flask.Response | str:
-    if 'employee_id' not in flask.session:
-        return flask.redirect(flask.url_for('factory.login'))
+    connection = pool.get_connection()
+
+    today = datetime.date.today()
+    month = today.strftime('%Y-%m')
+    year_ago = f'{today.year - 1}-{today.month:02}'
 
-    return flask.render_template('factory/dashboard.html')
+    daily_sales = sale_rollup.get_periods(
+        connection, 'day', (today - datetime.timedelta(days=29)).isoformat(), today.isoformat()
+    )
+    monthly_sales = sale_rollup.get_periods(connection, 'month', year_ago, month)
+    top_employees = sale_rollup.get_leaders(connection, 'month', 'employee', month, month)
+    top_customers = sale_rollup.get_leaders(connection, 'month', 'customer', month, month)
+
+    return flask.render_template(
+        'factory/dashboard.html', daily_sales=daily_sales, monthly_sales=monthly_sales,
+        top_employees=top_employees, top_customers=top_customers
+    )
 
 
 @factory.route('/profile')
+@authorization.login_required
 def profile() -> flask.Response | str:
-    if 'employee_id' not in flask.session:
-        return flask.redirect(flask.url_for('factory.login'))
-
-    connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
+    connection = pool.get_connection()
     employee_data = employee.get_by_id(connection, flask.session.get('employee_id'))
-    connection.close()
 
     return flask.render_template('factory/profile.html', employee=employee_data)
 
 
 @factory.route('/profile/edit')
+@authorization.login_required
 def profile_edit() -> flask.Response | str:
-    if 'employee_id' not in flask.session:
-        return flask.redirect(flask.url_for('factory.login'))
+    if flask.g.role.is_administrator:
+        return flask.render_template('factory/profile-edit-admin.html')
 
-    connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
-    employee_data = employee.get_by_id(connection, flask.session.get('employee_id'))
-    connection.close()
+    connection = pool.get_connection()
+    employee_data = employee.get_by_id(connection, flask.g.role.employee_id)
 
-    if employee_data.is_administrator:
-        return flask.render_template('factory/profile-edit-admin.html')
     return flask.render_template('factory/profile-edit-default.html', employee=employee_data)
+
+
+@factory.cli.command('rebuild-rollups')
+def rebuild_rollups_command():
+    """Recompute the daily and monthly sales rollups from the sale table."""
+    sale_rollup.rebuild(pool.get_connection())
+    click.echo('Sales rollups rebuilt.')
@@ -0,0 +1,24 @@
+import os
+import sqlite3
+
+import flask
+
+from src.database import pool
+from src.services import metrics
+
+monitoring = flask.Blueprint('monitoring', __name__)
+
+
+@monitoring.route('/metrics')
+def metrics_exposition() -> flask.Response:
+    return flask.Response(metrics.get_registry().render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@monitoring.route('/healthz')
+def health_check() -> tuple[flask.Response, int]:
+    try:
+        pool.get_connection().execute('SELECT 1 FROM sqlite_schema LIMIT 1').fetchall()
+    except (sqlite3.Error, pool.PoolExhaustedError) as error:
+        return flask.jsonify(status='unavailable', pid=os.getpid(), error=str(error)), 503
+
+    return flask.jsonify(status='ok', pid=os.getpid()), 200
@@ -1,51 +1,161 @@
+import dataclasses
 import datetime
+import gzip
+import io
 import json
-import os
-import sqlite3
+from typing import Any, Iterable, Optional
 
+import click
 import flask
 
+from src.database import change_log, instrumentation, pool
 from src.models import customer as customer_model
 from src.models import employee as employee_model
+from src.models import expiry_snapshot as expiry_snapshot_model
 from src.models import manufacturer as manufacturer_model
 from src.models import medicine as medicine_model
+from src.models import medicine_salt as medicine_salt_model
 from src.models import sale as sale_model
+from src.models import sale_item as sale_item_model
 from src.models import salt as salt_model
+from src.models import search as search_model
+from src.models import stock as stock_model
+from src.services import allocation, authorization, checkout, exporter, http_cache, importer, reference_data
 
 warehouse = flask.Blueprint('warehouse', __name__)
 
+PAGE_SIZE = 50
+EXPIRY_WINDOWS = (30, 60, 90, 180)
+GZIP_MIN_SIZE = 1024
+
+_SYNC_MODELS: dict[str, type] = {
+    'manufacturer': manufacturer_model.Manufacturer, 'medicine': medicine_model.Medicine, 'sale': sale_model.Sale,
+    'salt': salt_model.Salt
+}
+
+
+def _next_after(page: list[Any]) -> Optional[int]:
+    """
+    Get the keyset cursor of the page after the given one.
+
+    @param page: Page of models returned by a get_page model function.
+    @type page: list[Any]
+
+    @return: ID of the last model in the page, or None if it is the last page.
+    @rtype: Optional[int]
+    """
+    return page[-1].id if len(page) == PAGE_SIZE else None
+
+
+def _date_argument(name: str) -> Optional[datetime.date]:
+    """
+    Read an optional ISO date from the query string of the request.
+
+    @param name: Name of the query string argument.
+    @type name: str
+
+    @return: Date in the argument, or None if it is missing or empty.
+    @rtype: Optional[datetime.date]
+    """
+    value = flask.request.args.get(name, '')
+
+    if value == '':
+        return None
+
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        flask.abort(400, f'{name} must be a date in YYYY-MM-DD format.')
+
+
+def _export_response(records: Iterable[Any], record_type: type, name: str) -> flask.Response:
+    """
+    Stream records as a file download in the format and compression requested in the query string.
+
+    @param records: Dataclass instances to export.
+    @type records: Iterable[Any]
+    @param record_type: Dataclass of the records.
+    @type record_type: type
+    @param name: Name of the downloaded file, without extensions.
+    @type name: str
+
+    @return: Streaming response of the export.
+    @rtype: flask.Response
+    """
+    file_format = flask.request.args.get('format', 'csv')
+
+    if file_format not in exporter.FORMATS:
+        flask.abort(400, f'format must be one of {", ".join(exporter.FORMATS)}.')
+
+    chunks = exporter.export(records, record_type, file_format)
+    filename = f'{name}.{file_format}'
+    mimetype = exporter.MIMETYPES[file_format]
+
+    if flask.request.args.get('gzip', 0, type=int):
+        chunks = exporter.gzip_chunks(chunks)
+        filename += '.gz'
+        mimetype = 'application/gzip'
+
+    return flask.Response(
+        flask.stream_with_context(chunks), mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
+def _model_dict(model: Any) -> dict[str, Any]:
+    """
+    Convert a model into a dictionary that can be encoded as JSON, with dates and times in ISO format.
+
+    @param model: Dataclass instance to convert.
+    @type model: Any
+
+    @return: Fields of the model.
+    @rtype: dict[str, Any]
+    """
+    return {
+        field: value.isoformat() if isinstance(value, (datetime.date, datetime.datetime)) else value
+        for field, value in dataclasses.asdict(model).items()
+    }
+
+
+def _table_columns(model_name: str) -> tuple[str, ...]:
+    """
+    Get the columns of the table of a synced model, which are the fields of the model in order.
+
+    @param model_name: Name of the model, one of change_log.TABLES.
+    @type model_name: str
+
+    @return: Column names of the table.
+    @rtype: tuple[str, ...]
+    """
+    return tuple(field.name for field in dataclasses.fields(_SYNC_MODELS[model_name]))
+
 
 @warehouse.route('/')
+@authorization.login_required
 def home() -> flask.Response | str:
-    if 'employee_id' not in flask.session:
-        return flask.redirect(flask.url_for('factory.login'))
-
     return flask.render_template('warehouse/home.html')
 
 
 @warehouse.route('/manufacturers')
+@authorization.login_required
+@http_cache.cached_by_tables('manufacturer')
 def manufacturers() -> flask.Response | str:
-    if 'employee_id' not in flask.session:
-        return flask.redirect(flask.url_for('factory.login'))
-
-    connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
-    manufacturer_data = manufacturer_model.get_all_with_fields(connection, 'id', 'name', 'phone_number')
-    connection.close()
-
-    encoder = json.JSONEncoder()
-    manufacturer_json = encoder.encode(manufacturer_data)
+    connection = pool.get_connection()
+    manufacturer_page = manufacturer_model.get_page(
+        connection, flask.request.args.get('after', type=int), PAGE_SIZE, order_by='name'
+    )
 
-    return flask.render_template('warehouse/manufacturers.html', manufacturers=manufacturer_json)
+    return flask.render_template(
+        'warehouse/manufacturers.html', models=manufacturer_page, next_after=_next_after(manufacturer_page)
+    )
 
 
 @warehouse.route('/manufacturers/<int:manufacturer_id>')
+@authorization.login_required
+@http_cache.cached_by_row('manufacturer', 'manufacturer_id')
 def manufacturer(manufacturer_id: int) -> flask.Response | str:
-    if 'employee_id' not in flask.session:
-        return flask.redirect(flask.url_for('factory.login'))
-
-    connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
-    manufacturer_data = manufacturer_model.get_by_id(connection, manufacturer_id)
-    connection.close()
+    manufacturer_data = reference_data.get_snapshot('manufacturer').get(manufacturer_id)
 
     if manufacturer_data is None:
         return flask.redirect(flask.url_for('warehouse.home'))
@@ -54,80 +164,59 @@ def manufacturer(manufacturer_id: int) -> flask.Response | str:
 
 
 @warehouse.route('/manufacturers/update', methods=['GET', 'POST'])
+@authorization.admin_required
 def manufacturer_update() -> flask.Response | str:
+    connection = pool.get_connection()
     submission_message = ''
 
-    if 'employee_id' not in flask.session:
-        return flask.redirect(flask.url_for('factory.login'))
-
-    connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
-    current_user_data = employee_model.get_by_id(connection, flask.session.get('employee_id'))
-    manufacturer_ids = manufacturer_model.get_all_ids(connection)
-    connection.close()
-
-    if not current_user_data.is_administrator:
-        return flask.redirect(flask.url_for('factory.login'))
-
     if flask.request.method == 'POST':
         form_output = flask.request.form
 
-        id_ = int(form_output.get('manufacturer-id'))
+        id_ = int(form_output.get('manufacturer-id')) if form_output.get('manufacturer-id') else None
         name = form_output.get('manufacturer-name')
         phone_number = form_output.get('manufacturer-phone-number')
         address = form_output.get('manufacturer-address')
 
         manufacturer_instance = manufacturer_model.Manufacturer(id_, name, phone_number, address)
 
-        connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
-
-        if id_ not in manufacturer_ids:
-            manufacturer_model.insert(connection, manufacturer_instance)
+        if manufacturer_model.upsert(connection, manufacturer_instance):
             submission_message = 'Manufacturer created.'
         else:
-            manufacturer_model.update(connection, manufacturer_instance)
             submission_message = 'Manufacturer updated.'
 
         connection.commit()
-        connection.close()
-
-    connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
-
-    manufacturers_all = manufacturer_model.get_all(connection)
-    manufacturer_data = manufacturer_model.get_all_with_fields(connection, 'id', 'name', 'phone_number', 'address')
-    connection.close()
 
-    encoder = json.JSONEncoder()
-    manufacturer_json = encoder.encode(manufacturer_data)
+    manufacturer_view = manufacturer_model.get_page_view(
+        connection, flask.request.args.get('after', type=int), PAGE_SIZE, order_by='name'
+    )
 
     return flask.render_template(
-        'warehouse/manufacturer_update.html', model_name='manufacturer', models=manufacturers_all,
-        model_json=manufacturer_json, model_ids=manufacturer_ids, submission_message=submission_message
+        'warehouse/manufacturer_update.html', model_name='manufacturer', models=manufacturer_view.models,
+        model_records=manufacturer_view.records, next_after=_next_after(manufacturer_view.models),
+        submission_message=submission_message
     )
 
 
 @warehouse.route('/medicines')
+@authorization.login_required
+@http_cache.cached_by_tables('medicine')
 def medicines() -> flask.Response | str:
-    if 'employee_id' not in flask.session:
-        return flask.redirect(flask.url_for('factory.login'))
-
-    connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
-    medicine_data = medicine_model.get_all_with_fields(connection, 'id', 'name')
-    connection.close()
-
-    encoder = json.JSONEncoder()
-    medicine_json = encoder.encode(medicine_data)
+    connection = pool.get_connection()
+    medicine_page = medicine_model.get_page(
+        connection, flask.request.args.get('after', type=int), PAGE_SIZE, order_by='name'
+    )
 
-    return flask.render_template('warehouse/medicines.html', medicines=medicine_json)
+    return flask.render_template(
+        'warehouse/medicines.html', models=medicine_page, next_after=_next_after(medicine_page)
+    )
 
 
 @warehouse.route('/medicines/<int:medicine_id>')
+@authorization.login_required
+@http_cache.cached_by_row('medicine', 'medicine_id')
 def medicine(medicine_id: int) -> flask.Response | str:
-    if 'employee_id' not in flask.session:
-        return flask.redirect(flask.url_for('factory.login'))
-
-    connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
+    connection = pool.get_connection()
     medicine_data = medicine_model.get_by_id(connection, medicine_id)
-    connection.close()
 
     if medicine_data is None:
         return flask.redirect(flask.url_for('warehouse.home'))
@@ -135,25 +224,37 @@ def medicine(medicine_id: int) -> flask.Response | str:
     return flask.render_template('warehouse/medicine_view.html', medicine=medicine_data)
 
 
-@warehouse.route('/medicines/update', methods=['GET', 'POST'])
-def medicine_update() -> flask.Response | str:
-    submission_message = ''
+@warehouse.route('/api/medicines/<int:medicine_id>/substitutes')
+@authorization.api_login_required
+def medicine_substitutes_api(medicine_id: int) -> flask.Response:
+    limit = min(max(flask.request.args.get('limit', 10, type=int), 1), 50)
+    connection = pool.get_connection()
+
+    salts = reference_data.get_snapshot('salt').get_many(medicine_salt_model.get_salt_ids(connection, medicine_id))
+    substitutes = medicine_salt_model.find_substitutes(
+        connection, medicine_id, limit, include_expired=bool(flask.request.args.get('expired', 0, type=int))
+    )
 
-    if 'employee_id' not in flask.session:
-        return flask.redirect(flask.url_for('factory.login'))
+    return flask.jsonify(
+        salts=[_model_dict(salt) for salt in salts.values()],
+        substitutes=[
+            {**_model_dict(substitute.medicine), 'shared_salts': substitute.shared_salts,
+             'overlap': round(substitute.overlap, 3)}
+            for substitute in substitutes
+        ]
+    )
 
-    connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
-    current_user_data = employee_model.get_by_id(connection, flask.session.get('employee_id'))
-    medicine_ids = medicine_model.get_all_ids(connection)
-    connection.close()
 
-    if not current_user_data.is_administrator:
-        return flask.redirect(flask.url_for('factory.login'))
+@warehouse.route('/medicines/update', methods=['GET', 'POST'])
+@authorization.admin_required
+def medicine_update() -> flask.Response | str:
+    connection = pool.get_connection()
+    submission_message = ''
 
     if flask.request.method == 'POST':
         form_output = flask.request.form
 
-        id_ = int(form_output.get('medicine-id'))
+        id_ = int(form_output.get('medicine-id')) if form_output.get('medicine-id') else None
         name = form_output.get('medicine-name')
         manufacturer_id = int(form_output.get('medicine-manufacturer-id'))
         cost_price = float(form_output.get('medicine-cost-price'))
@@ -169,86 +270,103 @@ def medicine_update() -> flask.Response | str:
             quantity_per_unit, manufacturing_date, purchase_date, expiry_date
         )
 
-        connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
-
-        if id_ not in medicine_ids:
-            medicine_model.insert(connection, medicine_instance)
+        if medicine_model.upsert(connection, medicine_instance):
             submission_message = 'Medicine created.'
         else:
-            medicine_model.update(connection, medicine_instance)
             submission_message = 'Medicine updated.'
 
         connection.commit()
-        connection.close()
 
-    connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
+    medicine_view = medicine_model.get_page_view(
+        connection, flask.request.args.get('after', type=int), PAGE_SIZE, order_by='name'
+    )
 
-    medicines_all = medicine_model.get_all(connection)
-    medicine_data = medicine_model.get_all_with_fields(
-        connection, 'id', 'name', 'manufacturer_id', 'cost_price', 'sale_price', 'potency', 'quantity_per_unit',
-        'manufacturing_date', 'purchase_date', 'expiry_date'
+    return flask.render_template(
+        'warehouse/medicine_update.html', model_name='medicine', models=medicine_view.models,
+        model_records=medicine_view.records, next_after=_next_after(medicine_view.models),
+        manufacturers=reference_data.get_snapshot('manufacturer').models, submission_message=submission_message
     )
-    manufacturer_ids = manufacturer_model.get_all_ids(connection)
 
-    encoder = json.JSONEncoder()
-    medicine_json = encoder.encode(medicine_data)
+
+def _expiry_window() -> int:
+    """
+    Read the look-ahead window of the expiring medicines from the query string of the request.
+
+    @return: Number of days to look ahead, one of EXPIRY_WINDOWS.
+    @rtype: int
+    """
+    within_days = flask.request.args.get('within_days', EXPIRY_WINDOWS[0], type=int)
+
+    if within_days not in EXPIRY_WINDOWS:
+        flask.abort(400, f'within_days must be one of {", ".join(map(str, EXPIRY_WINDOWS))}.')
+
+    return within_days
+
+
+@warehouse.route('/medicines/expiring')
+@authorization.login_required
+def medicines_expiring() -> flask.Response | str:
+    within_days = _expiry_window()
+    connection = pool.get_connection()
 
     return flask.render_template(
-        'warehouse/medicine_update.html', model_name='medicine', models=medicines_all,
-        model_json=medicine_json, model_ids=medicine_ids, manufacturer_ids=manufacturer_ids,
-        submission_message=submission_message
+        'warehouse/medicines_expiring.html', windows=EXPIRY_WINDOWS,
+        snapshot=expiry_snapshot_model.get_or_take(connection, within_days),
+        medicines_expiring=medicine_model.get_expiring(connection, within_days, PAGE_SIZE),
+        medicines_expired=medicine_model.get_expired(connection, PAGE_SIZE)
     )
 
 
-@warehouse.route('/sales')
-def sales() -> flask.Response | str:
-    if 'employee_id' not in flask.session:
-        return flask.redirect(flask.url_for('factory.login'))
+@warehouse.route('/api/medicines/expiring')
+@authorization.api_login_required
+def medicines_expiring_api() -> flask.Response:
+    within_days = _expiry_window()
+    limit = min(max(flask.request.args.get('limit', PAGE_SIZE, type=int), 1), 1000)
+    connection = pool.get_connection()
+
+    return flask.jsonify(
+        snapshot=_model_dict(expiry_snapshot_model.get_or_take(connection, within_days)),
+        expiring=[_model_dict(item) for item in medicine_model.get_expiring(connection, within_days, limit)],
+        expired=[_model_dict(item) for item in medicine_model.get_expired(connection, limit)]
+    )
 
-    connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
-    sale_data = sale_model.get_all_with_fields(connection, 'id', 'date_time')
-    connection.close()
 
-    encoder = json.JSONEncoder()
-    sale_json = encoder.encode(sale_data)
+@warehouse.route('/sales')
+@authorization.login_required
+@http_cache.cached_by_tables('sale', 'employee', 'customer')
+def sales() -> flask.Response | str:
+    connection = pool.get_connection()
+    sale_page = sale_model.get_page(connection, flask.request.args.get('after', type=int), PAGE_SIZE)
+    related_sales = sale_model.load_related(connection, sale_page, identities=pool.get_identity_map())
 
-    return flask.render_template('warehouse/sales.html', sales=sale_json)
+    return flask.render_template('warehouse/sales.html', models=related_sales, next_after=_next_after(sale_page))
 
 
 @warehouse.route('/sales/<int:sale_id>')
+@authorization.login_required
+@http_cache.cached_by_row('sale', 'sale_id')
 def sale(sale_id: int) -> flask.Response | str:
-    if 'employee_id' not in flask.session:
-        return flask.redirect(flask.url_for('factory.login'))
-
-    connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
+    connection = pool.get_connection()
     sale_data = sale_model.get_by_id(connection, sale_id)
-    connection.close()
 
     if sale_data is None:
         return flask.redirect(flask.url_for('warehouse.home'))
 
-    return flask.render_template('warehouse/sale_view.html', sale=sale_data)
+    return flask.render_template(
+        'warehouse/sale_view.html', sale=sale_data, items=sale_item_model.get_by_sale(connection, sale_id)
+    )
 
 
 @warehouse.route('/sales/update', methods=['GET', 'POST'])
+@authorization.admin_required
 def sale_update() -> flask.Response | str:
+    connection = pool.get_connection()
     submission_message = ''
 
-    if 'employee_id' not in flask.session:
-        return flask.redirect(flask.url_for('factory.login'))
-
-    connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
-    current_user_data = employee_model.get_by_id(connection, flask.session.get('employee_id'))
-    sale_ids = sale_model.get_all_ids(connection)
-    connection.close()
-
-    if not current_user_data.is_administrator:
-        return flask.redirect(flask.url_for('factory.login'))
-
     if flask.request.method == 'POST':
         form_output = flask.request.form
 
-        id_ = int(form_output.get('sale-id'))
+        id_ = int(form_output.get('sale-id')) if form_output.get('sale-id') else None
         date_time = datetime.datetime.fromisoformat(form_output.get('sale-date-time'))
         employee_id = int(form_output.get('sale-employee-id'))
         customer_id = int(form_output.get('sale-customer-id'))
@@ -256,58 +374,46 @@ def sale_update() -> flask.Response | str:
 
         sale_instance = sale_model.Sale(id_, date_time, employee_id, customer_id, amount)
 
-        connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
-
-        if id_ not in sale_ids:
-            sale_model.insert(connection, sale_instance)
+        if not employee_model.get_summaries(connection, (employee_id,)):
+            submission_message = f'Employee {employee_id} does not exist.'
+        elif not customer_model.get_summaries(connection, (customer_id,)):
+            submission_message = f'Customer {customer_id} does not exist.'
+        elif sale_model.upsert(connection, sale_instance):
             submission_message = 'Sale created.'
         else:
-            sale_model.update(connection, sale_instance)
             submission_message = 'Sale updated.'
 
         connection.commit()
-        connection.close()
-
-    connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
 
-    sales_all = sale_model.get_all(connection)
-    sale_data = sale_model.get_all_with_fields(connection, 'id', 'date_time', 'employee_id', 'customer_id', 'amount')
+    sale_view = sale_model.get_page_view(connection, flask.request.args.get('after', type=int), PAGE_SIZE)
+    related_sales = sale_model.load_related(connection, sale_view.models, identities=pool.get_identity_map())
 
-    employee_ids = employee_model.get_all_ids(connection)
-    customer_ids = customer_model.get_all_ids(connection)
-
-    encoder = json.JSONEncoder()
-    sale_json = encoder.encode(sale_data)
+    # Only the employees and customers of the sales in the page are suggested, any other ID can still be typed in.
+    employees = {sale.employee.id: sale.employee for sale in related_sales if sale.employee is not None}
+    customers = {sale.customer.id: sale.customer for sale in related_sales if sale.customer is not None}
 
     return flask.render_template(
-        'warehouse/sale_update.html', model_name='sale', models=sales_all, model_json=sale_json,
-        model_ids=sale_ids, employee_ids=employee_ids, customer_ids=customer_ids, submission_message=submission_message
+        'warehouse/sale_update.html', model_name='sale', models=sale_view.models, model_records=sale_view.records,
+        next_after=_next_after(sale_view.models), employees=sorted(employees.values(), key=lambda model: model.id),
+        customers=sorted(customers.values(), key=lambda model: model.id), submission_message=submission_message
     )
 
 
 @warehouse.route('/salts')
+@authorization.login_required
+@http_cache.cached_by_tables('salt')
 def salts() -> flask.Response | str:
-    if 'employee_id' not in flask.session:
-        return flask.redirect(flask.url_for('factory.login'))
-
-    connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
-    salt_data = salt_model.get_all_with_fields(connection, 'id', 'name')
-    connection.close()
+    connection = pool.get_connection()
+    salt_page = salt_model.get_page(connection, flask.request.args.get('after', type=int), PAGE_SIZE, order_by='name')
 
-    encoder = json.JSONEncoder()
-    salt_json = encoder.encode(salt_data)
-
-    return flask.render_template('warehouse/salts.html', salts=salt_json)
+    return flask.render_template('warehouse/salts.html', models=salt_page, next_after=_next_after(salt_page))
 
 
 @warehouse.route('/salts/<int:salt_id>')
+@authorization.login_required
+@http_cache.cached_by_row('salt', 'salt_id')
 def salt(salt_id: int) -> flask.Response | str:
-    if 'employee_id' not in flask.session:
-        return flask.redirect(flask.url_for('factory.login'))
-
-    connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
-    salt_data = salt_model.get_by_id(connection, salt_id)
-    connection.close()
+    salt_data = reference_data.get_snapshot('salt').get(salt_id)
 
     if salt_data is None:
         return flask.redirect(flask.url_for('warehouse.home'))
@@ -316,49 +422,227 @@ def salt(salt_id: int) -> flask.Response | str:
 
 
 @warehouse.route('/salts/update', methods=['GET', 'POST'])
+@authorization.admin_required
 def salt_update() -> flask.Response | str:
+    connection = pool.get_connection()
     submission_message = ''
 
-    if 'employee_id' not in flask.session:
-        return flask.redirect(flask.url_for('factory.login'))
-
-    connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
-    current_user_data = employee_model.get_by_id(connection, flask.session.get('employee_id'))
-    salt_ids = salt_model.get_all_ids(connection)
-    connection.close()
-
-    if not current_user_data.is_administrator:
-        return flask.redirect(flask.url_for('factory.login'))
-
     if flask.request.method == 'POST':
         form_output = flask.request.form
 
-        id_ = int(form_output.get('salt-id'))
+        id_ = int(form_output.get('salt-id')) if form_output.get('salt-id') else None
         name = form_output.get('salt-name')
 
         salt_instance = salt_model.Salt(id_, name)
 
-        connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
-
-        if id_ not in salt_ids:
-            salt_model.insert(connection, salt_instance)
+        if salt_model.upsert(connection, salt_instance):
             submission_message = 'Salt created.'
         else:
-            salt_model.update(connection, salt_instance)
             submission_message = 'Salt updated.'
 
         connection.commit()
-        connection.close()
 
-    connection = sqlite3.connect(os.getenv('DATABASE_PATH'))
+    salt_view = salt_model.get_page_view(
+        connection, flask.request.args.get('after', type=int), PAGE_SIZE, order_by='name'
+    )
 
-    salts_all = salt_model.get_all(connection)
-    salt_data = salt_model.get_all_with_fields(connection, 'id', 'name')
+    return flask.render_template(
+        'warehouse/salt_update.html', model_name='salt', models=salt_view.models, model_records=salt_view.records,
+        next_after=_next_after(salt_view.models), submission_message=submission_message
+    )
 
-    encoder = json.JSONEncoder()
-    salt_json = encoder.encode(salt_data)
 
-    return flask.render_template(
-        'warehouse/salt_update.html', model_name='salt', models=salts_all, model_json=salt_json,
-        submission_message=submission_message
+@warehouse.route('/api/search/<model_name>')
+@authorization.api_login_required
+def search(model_name: str) -> flask.Response:
+    if model_name not in search_model.SEARCH_FIELDS:
+        flask.abort(404)
+
+    query = flask.request.args.get('q', '')
+    limit = min(max(flask.request.args.get('limit', 6, type=int), 1), 50)
+
+    connection = pool.get_connection()
+    results = search_model.search(connection, model_name, query, limit)
+
+    return flask.jsonify(results)
+
+
+@warehouse.route('/api/<model_name>')
+@authorization.api_login_required
+def data_api(model_name: str) -> flask.Response:
+    if model_name not in change_log.TABLES:
+        flask.abort(404)
+
+    fields = tuple(field for field in flask.request.args.get('fields', '').split(',') if field)
+    fields = ('id',) + tuple(field for field in fields if field != 'id') if fields else ()
+
+    limit = min(max(flask.request.args.get('limit', change_log.PAGE_SIZE, type=int), 1), change_log.PAGE_SIZE)
+
+    try:
+        changes = change_log.get_changes(
+            pool.get_connection(), model_name, fields or _table_columns(model_name),
+            flask.request.args.get('since', type=int), flask.request.args.get('after', type=int), limit
+        )
+    except ValueError as error:
+        flask.abort(400, str(error))
+
+    with instrumentation.timed('json'):
+        body = json.dumps({
+            'change_id': changes.change_id, 'fields': changes.fields, 'rows': changes.rows, 'deleted': changes.deleted,
+            'more': changes.more
+        }, separators=(',', ':')).encode()
+    response = flask.Response(body, mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+
+    if len(body) >= GZIP_MIN_SIZE and 'gzip' in flask.request.accept_encodings:
+        response.set_data(gzip.compress(body, compresslevel=6))
+        response.content_encoding = 'gzip'
+
+    return response
+
+
+@warehouse.route('/api/checkout', methods=['POST'])
+@authorization.api_login_required
+def checkout_api() -> flask.Response | tuple[flask.Response, int]:
+    basket = flask.request.get_json(silent=True)
+
+    if not isinstance(basket, dict) or not isinstance(basket.get('items'), list):
+        flask.abort(400, 'The basket must be a JSON object with a list of items.')
+
+    try:
+        lines = [checkout.BasketLine(int(item['medicine_id']), item['quantity']) for item in basket['items']]
+        customer_id = int(basket['customer_id'])
+    except (KeyError, TypeError, ValueError):
+        flask.abort(400, 'Every item needs a medicine_id and a quantity, and the basket needs a customer_id.')
+
+    if customer_model.get_by_id(pool.get_connection(), customer_id) is None:
+        flask.abort(400, f'Customer {customer_id} does not exist.')
+
+    try:
+        receipt = checkout.checkout(
+            pool.get_connection(), flask.g.role.employee_id, customer_id, lines,
+            flask.current_app.config['CHECKOUT_MAX_ATTEMPTS'], flask.current_app.config['CHECKOUT_RETRY_DELAY'],
+            allocation.get_allocator() if basket.get('fefo', True) else None
+        )
+    except checkout.InsufficientStockError as error:
+        return flask.jsonify(
+            error=str(error), medicine_id=error.medicine_id, requested=error.requested, available=error.available
+        ), 409
+    except checkout.CheckoutError as error:
+        flask.abort(400, str(error))
+    except checkout.CheckoutBusyError:
+        response = flask.jsonify(error='The tills are busy, try again shortly.')
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
+
+    return flask.jsonify(
+        sale=_model_dict(receipt.sale), items=[dataclasses.asdict(item) for item in receipt.items]
+    ), 201
+
+
+@warehouse.route('/export/sales')
+@authorization.admin_required
+def sales_export() -> flask.Response:
+    connection = pool.get_connection()
+
+    start = _date_argument('start')
+    end = _date_argument('end')
+
+    sales_filtered = sale_model.iter_filtered(
+        connection,
+        since=datetime.datetime.combine(start, datetime.time()) if start is not None else None,
+        until=datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time()) if end is not None else None,
+        employee_id=flask.request.args.get('employee_id', type=int),
+        customer_id=flask.request.args.get('customer_id', type=int)
     )
+
+    return _export_response(sales_filtered, sale_model.Sale, 'sales')
+
+
+@warehouse.route('/export/medicines')
+@authorization.admin_required
+def medicines_export() -> flask.Response:
+    connection = pool.get_connection()
+
+    return _export_response(medicine_model.iter_all(connection), medicine_model.Medicine, 'medicines')
+
+
+@warehouse.route('/import', methods=['GET', 'POST'])
+@authorization.admin_required
+def catalogue_import() -> tuple[str, int]:
+    connection = pool.get_connection()
+    report = None
+
+    if flask.request.method == 'POST':
+        table = flask.request.form.get('import-table')
+        catalogue = flask.request.files.get('import-file')
+
+        if table not in importer.TABLES or catalogue is None:
+            flask.abort(400)
+
+        try:
+            file_format = importer.format_of(catalogue.filename or '')
+        except ValueError as error:
+            flask.abort(400, str(error))
+
+        stream = io.TextIOWrapper(catalogue.stream, encoding='utf-8-sig', newline='')
+        report = importer.import_rows(connection, table, importer.read_rows(stream, file_format))
+
+    # The rows read before a catalogue became unreadable are imported, and the report says where it stopped.
+    status = 400 if report is not None and report.error is not None else 200
+
+    return flask.render_template(
+        'warehouse/import.html', tables=sorted(importer.TABLES), formats=importer.FORMATS, report=report
+    ), status
+
+
+@warehouse.cli.command('import')
+@click.argument('table', type=click.Choice(sorted(importer.TABLES)))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'file_format', type=click.Choice(importer.FORMATS), help='Defaults to the file extension.')
+@click.option('--chunk-size', default=5000, show_default=True, help='Rows written per transaction.')
+def import_command(table: str, path: str, file_format: Optional[str], chunk_size: int):
+    """Import a supplier catalogue in CSV, JSON or NDJSON format into TABLE."""
+    file_format = file_format or importer.format_of(path)
+
+    with open(path, encoding='utf-8-sig', newline='') as catalogue:
+        report = importer.import_rows(
+            pool.get_connection(), table, importer.read_rows(catalogue, file_format), chunk_size
+        )
+
+    for row, message in report.errors:
+        click.echo(f'Row {row}: {message}', err=True)
+
+    click.echo(f'Imported {report.imported} rows, rejected {report.failed}.')
+
+    if report.error is not None:
+        raise click.ClickException(report.error)
+
+
+@warehouse.cli.command('receive-stock')
+@click.argument('medicine_id', type=int)
+@click.argument('quantity', type=int)
+def receive_stock_command(medicine_id: int, quantity: int):
+    """Add QUANTITY received units of a medicine to the stock, or write them off if negative."""
+    connection = pool.get_connection()
+
+    if medicine_model.get_by_id(connection, medicine_id) is None:
+        raise click.BadParameter(f'Medicine {medicine_id} does not exist.', param_hint='MEDICINE_ID')
+
+    with connection:
+        on_hand = stock_model.receive(connection, medicine_id, quantity)
+
+    click.echo(f'{on_hand} units of medicine {medicine_id} on hand.')
+
+
+@warehouse.cli.command('snapshot-expiry')
+def snapshot_expiry_command():
+    """Take today's expiry snapshot for every look-ahead window."""
+    connection = pool.get_connection()
+
+    for within_days in EXPIRY_WINDOWS:
+        snapshot = expiry_snapshot_model.take(connection, datetime.date.today(), within_days)
+        click.echo(f'{within_days} days: {snapshot.expiring_count} expiring, {snapshot.expired_count} expired.')
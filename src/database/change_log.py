@@ -0,0 +1,187 @@
+"""Log of the latest change to each row of the synced tables, maintained by triggers, for delta sync of clients."""
+import sqlite3
+from dataclasses import dataclass
+from typing import Any, Optional
+
+TABLES = ('manufacturer', 'medicine', 'sale', 'salt')
+PAGE_SIZE = 1000
+
+TABLE = '''
+    CREATE TABLE IF NOT EXISTS change_log (
+        change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        table_name TEXT NOT NULL,
+        row_id INTEGER NOT NULL,
+        deleted INTEGER NOT NULL,
+        UNIQUE (table_name, row_id)
+    );
+
+    CREATE INDEX IF NOT EXISTS change_log_table_index ON change_log (table_name, change_id);
+'''
+
+
+@dataclass(frozen=True, slots=True)
+class Changes:
+    """
+    Page of the rows of a table changed since a change ID, or of all its rows, with the change ID to resume from and
+    whether more pages follow.
+    """
+    change_id: int
+    fields: tuple[str, ...]
+    rows: list[tuple]
+    deleted: list[int]
+    more: bool = False
+
+
+def _log_change(table: str, row: str, deleted: int, condition: str = '') -> str:
+    """
+    Generate the statements replacing the change logged for a row. The earlier change is deleted rather than replaced
+    by INSERT OR REPLACE, whose conflict resolution an upsert firing the trigger would override with its own.
+
+    @param table: Name of the logged table.
+    @type table: str
+    @param row: Reference to the changed row in the trigger, old or new.
+    @type row: str
+    @param deleted: Whether the row was deleted, 1 or 0.
+    @type deleted: int
+    @param condition: Condition the change is logged under, if any.
+    @type condition: str
+
+    @return: SQL statements of the trigger body.
+    @rtype: str
+    """
+    also = f' AND {condition}' if condition else ''
+    where = f' WHERE {condition}' if condition else ''
+
+    return f'''DELETE FROM change_log WHERE table_name = '{table}' AND row_id = {row}.id{also};
+            INSERT INTO change_log (table_name, row_id, deleted) SELECT '{table}', {row}.id, {deleted}{where};'''
+
+
+def _triggers(table: str) -> str:
+    """
+    Generate the triggers logging the changes to a table. Each row keeps only its latest change, which replaces the
+    earlier ones under a new change ID.
+
+    @param table: Name of the logged table.
+    @type table: str
+
+    @return: SQL script creating the triggers.
+    @rtype: str
+    """
+    return f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_change_log_insert AFTER INSERT ON {table} BEGIN
+            {_log_change(table, 'new', 0)}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS {table}_change_log_update AFTER UPDATE ON {table} BEGIN
+            {_log_change(table, 'old', 1, 'old.id != new.id')}
+            {_log_change(table, 'new', 0)}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS {table}_change_log_delete AFTER DELETE ON {table} BEGIN
+            {_log_change(table, 'old', 1)}
+        END;
+    '''
+
+
+def create_schema(connection: sqlite3.Connection):
+    """
+    Create the change log and the triggers maintaining it.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    """
+    connection.executescript(TABLE + ''.join(_triggers(table) for table in TABLES))
+    connection.commit()
+
+
+def recreate_triggers(connection: sqlite3.Connection):
+    """
+    Replace the triggers maintaining the change log with their current definition.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    """
+    connection.executescript(''.join(
+        f'DROP TRIGGER IF EXISTS {table}_change_log_{event};'
+        for table in TABLES for event in ('insert', 'update', 'delete')
+    ))
+    create_schema(connection)
+
+
+def get_changes(
+        connection: sqlite3.Connection, table: str, fields: tuple[str, ...], since: Optional[int] = None,
+        after: Optional[int] = None, limit: int = PAGE_SIZE
+) -> Changes:
+    """
+    Get a page of the rows of a table changed or deleted since a change ID, or of every row if there is none, reading
+    the rows and the change ID from the same snapshot of the database.
+
+    A full sync pages through the table by ID and keeps the change ID of its first page as a watermark, so that a
+    delta sync since the watermark then brings in every row changed while it was paging. A delta sync pages through
+    the changes in order, and the change ID of a page is that of its last change while more pages follow.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param table: Name of the table, one of TABLES.
+    @type table: str
+    @param fields: Columns of the rows to get, starting with id.
+    @type fields: tuple[str, ...]
+    @param since: Change ID returned by the previous sync, or None for a full sync.
+    @type since: Optional[int]
+    @param after: ID of the last row of the previous page of a full sync, or None for the first page.
+    @type after: Optional[int]
+    @param limit: Maximum number of rows, changed or deleted, in the page.
+    @type limit: int
+
+    @return: Changed rows as stored, IDs of the deleted rows and the change ID to resume from.
+    @rtype: Changes
+
+    @raise ValueError: If the table is not logged or any of the fields is not one of its columns.
+    """
+    if table not in TABLES:
+        raise ValueError(f'Changes to {table} are not logged, expected one of {TABLES}.')
+
+    cursor = connection.cursor()
+    columns = {column[1] for column in cursor.execute(f'PRAGMA table_info({table})').fetchall()}
+
+    for field in fields:
+        if field not in columns:
+            cursor.close()
+            raise ValueError(f'{table} has no column {field!r}.')
+
+    column_names = ', '.join(f'{table}.{field}' for field in fields)
+    started = not connection.in_transaction
+
+    if started:
+        cursor.execute('BEGIN')
+
+    try:
+        change_id = cursor.execute('SELECT COALESCE(MAX(change_id), 0) FROM change_log').fetchone()[0]
+
+        if since is None:
+            condition, parameters = ('', ()) if after is None else ('WHERE id > ?', (after,))
+            rows: list[Any] = cursor.execute(
+                f'SELECT {column_names} FROM {table} {condition} ORDER BY id LIMIT ?', (*parameters, limit)
+            ).fetchall()
+            deleted = []
+            more = len(rows) == limit
+        else:
+            changes = cursor.execute(
+                f'''SELECT change_log.change_id, change_log.row_id, change_log.deleted, {column_names}
+                FROM change_log LEFT JOIN {table} ON {table}.id = change_log.row_id AND NOT change_log.deleted
+                WHERE change_log.table_name = ? AND change_log.change_id > ? ORDER BY change_log.change_id LIMIT ?''',
+                (table, since, limit)
+            ).fetchall()
+            rows = [change[3:] for change in changes if not change[2] and change[3] is not None]
+            deleted = [change[1] for change in changes if change[2]]
+            more = len(changes) == limit
+
+            if more:
+                change_id = changes[-1][0]
+    finally:
+        if started:
+            connection.commit()
+
+        cursor.close()
+
+    return Changes(change_id, fields, rows, deleted, more)
@@ -0,0 +1,321 @@
+"""Per-request instrumentation of the database queries, template rendering and JSON encoding."""
+import collections
+import contextlib
+import contextvars
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+import flask
+from flask.json.provider import DefaultJSONProvider
+
+logger = logging.getLogger(__name__)
+
+_profile: contextvars.ContextVar[Optional['RequestProfile']] = contextvars.ContextVar('request_profile', default=None)
+
+
+@dataclass(slots=True)
+class Query:
+    """Statement run by a cursor, timed from its execution to its last fetch."""
+    statement: str
+    expanded: str
+    duration: float = 0.0
+    rows: int = 0
+
+
+class RequestProfile:
+    """Queries run while handling a request, and the time spent rendering templates and encoding JSON."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries: list[Query] = []
+        self.timings: collections.defaultdict[str, float] = collections.defaultdict(float)
+        self.traced: list[str] = []
+        self._renders: list[float] = []
+
+    @property
+    def database_time(self) -> float:
+        """
+        Calculate the time spent running and fetching queries.
+
+        @return: Total duration of the queries, in seconds.
+        @rtype: float
+        """
+        return sum(query.duration for query in self.queries)
+
+    def repeated_statements(self, threshold: int) -> dict[str, int]:
+        """
+        Find the statements run many times with different parameters, as a loop fetching one row at a time does.
+
+        @param threshold: Number of runs from which a statement counts as repeated.
+        @type threshold: int
+
+        @return: Number of runs of each repeated statement, as prepared.
+        @rtype: dict[str, int]
+        """
+        counts = collections.Counter(query.statement for query in self.queries)
+        return {statement: count for statement, count in counts.items() if count >= threshold}
+
+    def server_timing(self) -> str:
+        """
+        Build the Server-Timing header of the request.
+
+        @return: Durations of the database queries, template rendering, JSON encoding and the whole request.
+        @rtype: str
+        """
+        metrics = [f'db;dur={self.database_time * 1000:.2f};desc="{len(self.queries)} queries"']
+        metrics += [f'{name};dur={duration * 1000:.2f}' for name, duration in self.timings.items()]
+        metrics.append(f'total;dur={(time.perf_counter() - self.start) * 1000:.2f}')
+
+        return ', '.join(metrics)
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Cursor recording the statements it runs in the profile of the current request."""
+    _query: Optional[Query] = None
+
+    @staticmethod
+    def _start() -> float:
+        profile = _profile.get()
+
+        if profile is not None:
+            profile.traced.clear()
+
+        return time.perf_counter()
+
+    def _record(self, statement: str, start: float):
+        profile = _profile.get()
+
+        if profile is None:
+            return
+
+        # SQLite traces each statement as it starts, with its parameters bound, along with the statements of triggers
+        # and the transactions the driver begins implicitly.
+        expanded = next((traced for traced in profile.traced if not traced.startswith(('--', 'BEGIN'))), statement)
+        profile.traced.clear()
+
+        self._query = Query(
+            statement, expanded, time.perf_counter() - start, max(self.rowcount, 0) if self.description is None else 0
+        )
+        profile.queries.append(self._query)
+
+    def _fetched(self, rows: int, start: float):
+        if self._query is not None:
+            self._query.duration += time.perf_counter() - start
+            self._query.rows += rows
+
+    def execute(self, sql: str, parameters: Any = (), /) -> 'ProfiledCursor':
+        start = self._start()
+
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._record(sql, start)
+
+    def executemany(self, sql: str, parameters: Any, /) -> 'ProfiledCursor':
+        start = self._start()
+
+        try:
+            return super().executemany(sql, parameters)
+        finally:
+            self._record(sql, start)
+
+    def executescript(self, sql_script: str, /) -> 'ProfiledCursor':
+        start = self._start()
+
+        try:
+            return super().executescript(sql_script)
+        finally:
+            self._record(sql_script, start)
+
+    def fetchone(self) -> Any:
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(row is not None, start)
+
+        return row
+
+    def fetchmany(self, size: int = 1) -> list[Any]:
+        start = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(len(rows), start)
+
+        return rows
+
+    def fetchall(self) -> list[Any]:
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(len(rows), start)
+
+        return rows
+
+    def __next__(self) -> Any:
+        start = time.perf_counter()
+
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(0, start)
+            raise
+
+        self._fetched(1, start)
+
+        return row
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection handing out profiled cursors while a request is being profiled, and plain ones otherwise."""
+
+    def cursor(self, factory: type[sqlite3.Cursor] = sqlite3.Cursor) -> sqlite3.Cursor:
+        if factory is sqlite3.Cursor and _profile.get() is not None:
+            factory = ProfiledCursor
+
+        return super().cursor(factory)
+
+    # The shortcuts of the driver create their cursors without calling cursor.
+    def execute(self, sql: str, parameters: Any = (), /) -> sqlite3.Cursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, parameters: Any, /) -> sqlite3.Cursor:
+        return self.cursor().executemany(sql, parameters)
+
+    def executescript(self, sql_script: str, /) -> sqlite3.Cursor:
+        return self.cursor().executescript(sql_script)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON provider timing the encoding of responses and of the data embedded in templates."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        with timed('json'):
+            return super().dumps(obj, **kwargs)
+
+
+def trace(statement: str):
+    """
+    Trace callback of the instrumented connections, keeping the statements started during a profiled request.
+
+    @param statement: Statement started by SQLite, with its parameters bound.
+    @type statement: str
+    """
+    profile = _profile.get()
+
+    if profile is not None:
+        profile.traced.append(statement)
+
+
+def get_profile() -> Optional[RequestProfile]:
+    """
+    Get the profile of the current request.
+
+    @return: Profile of the request, or None if it is not being profiled.
+    @rtype: Optional[RequestProfile]
+    """
+    return _profile.get()
+
+
+@contextlib.contextmanager
+def timed(name: str) -> Iterator[None]:
+    """
+    Add the duration of a block to a timing of the current request, if it is being profiled.
+
+    @param name: Name of the timing in the Server-Timing header.
+    @type name: str
+    """
+    profile = _profile.get()
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        if profile is not None:
+            profile.timings[name] += time.perf_counter() - start
+
+
+def _start_profile():
+    flask.g.request_profile_token = _profile.set(RequestProfile())
+
+
+def _before_render_template(_app: flask.Flask, **_extra: Any):
+    profile = _profile.get()
+
+    if profile is not None:
+        profile._renders.append(time.perf_counter())
+
+
+def _template_rendered(_app: flask.Flask, **_extra: Any):
+    profile = _profile.get()
+
+    if profile is not None and profile._renders:
+        profile.timings['template'] += time.perf_counter() - profile._renders.pop()
+
+
+def _report_profile(response: flask.Response) -> flask.Response:
+    """
+    Add the Server-Timing header to a response, and log the slow and repeated queries of the request.
+
+    @param response: Response to the request.
+    @type response: flask.Response
+
+    @return: Response with its Server-Timing header.
+    @rtype: flask.Response
+    """
+    profile = _profile.get()
+
+    if profile is None:
+        return response
+
+    response.headers['Server-Timing'] = profile.server_timing()
+    slow_query_threshold = flask.current_app.config['SLOW_QUERY_THRESHOLD']
+    log_parameters = flask.current_app.config['SLOW_QUERY_LOG_PARAMETERS']
+
+    for query in profile.queries:
+        if query.duration >= slow_query_threshold:
+            logger.warning(
+                'Slow query in %s %s, %.1f ms for %d rows: %s', flask.request.method, flask.request.path,
+                query.duration * 1000, query.rows,
+                query.expanded if log_parameters else ' '.join(query.statement.split())
+            )
+
+    for statement, count in profile.repeated_statements(flask.current_app.config['N_PLUS_ONE_THRESHOLD']).items():
+        logger.warning(
+            'Statement run %d times in %s %s, likely N+1 queries: %s', count, flask.request.method,
+            flask.request.path, ' '.join(statement.split())
+        )
+
+    return response
+
+
+def _end_profile(_exception: Optional[BaseException] = None):
+    token = flask.g.pop('request_profile_token', None)
+
+    if token is not None:
+        _profile.reset(token)
+
+
+def init_app(app: flask.Flask):
+    """
+    Profile the requests of an application, unless QUERY_INSTRUMENTATION is disabled. Slow queries are logged as
+    prepared, and with their parameters bound only if SLOW_QUERY_LOG_PARAMETERS is enabled for debugging, since the
+    parameters hold personal data such as names and email addresses.
+
+    @param app: Flask application to configure.
+    @type app: flask.Flask
+    """
+    app.config.setdefault('QUERY_INSTRUMENTATION', True)
+    app.config.setdefault('SLOW_QUERY_THRESHOLD', 0.1)
+    app.config.setdefault('SLOW_QUERY_LOG_PARAMETERS', False)
+    app.config.setdefault('N_PLUS_ONE_THRESHOLD', 5)
+
+    if not app.config['QUERY_INSTRUMENTATION']:
+        return
+
+    app.json = TimedJSONProvider(app)
+    app.before_request(_start_profile)
+    app.after_request(_report_profile)
+    app.teardown_request(_end_profile)
+
+    flask.before_render_template.connect(_before_render_template, app)
+    flask.template_rendered.connect(_template_rendered, app)
@@ -0,0 +1,219 @@
+"""Versioned schema of the database, migrated on startup and tracked by its user_version."""
+import contextlib
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable
+
+import click
+import flask
+from flask.cli import AppGroup
+
+from src.database import change_log, pool, query_plans, schema, versions
+from src.models import expiry_snapshot, medicine_salt, sale_item, sale_rollup, search, stock
+from src.services import allocation
+
+TABLES = '''
+    CREATE TABLE IF NOT EXISTS customer (
+        id INTEGER PRIMARY KEY,
+        first_name VARCHAR(20) NOT NULL,
+        last_name VARCHAR(20),
+        phone_number VARCHAR(20) NOT NULL UNIQUE,
+        email_address VARCHAR(20) UNIQUE,
+        address VARCHAR(511),
+        gender VARCHAR(1),
+        birth_date DATE
+    );
+
+    CREATE TABLE IF NOT EXISTS employee (
+        id INTEGER PRIMARY KEY,
+        first_name VARCHAR(20) NOT NULL,
+        last_name VARCHAR(20) NOT NULL,
+        phone_number VARCHAR(20) NOT NULL UNIQUE,
+        email_address VARCHAR(20) NOT NULL UNIQUE,
+        address VARCHAR(511) NOT NULL,
+        gender VARCHAR(1) NOT NULL,
+        birth_date DATE NOT NULL,
+        joining_date DATE NOT NULL,
+        designation VARCHAR(20),
+        monthly_salary DECIMAL NOT NULL,
+        login_password VARCHAR(255) NOT NULL,
+        currently_employed BOOLEAN NOT NULL,
+        is_administrator BOOLEAN NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS manufacturer (
+        id INTEGER PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        phone_number VARCHAR(20) NOT NULL UNIQUE,
+        address VARCHAR(511)
+    );
+
+    CREATE TABLE IF NOT EXISTS medicine (
+        id INTEGER PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        manufacturer_id INTEGER NOT NULL REFERENCES manufacturer (id),
+        cost_price DECIMAL NOT NULL,
+        sale_price DECIMAL NOT NULL,
+        potency INTEGER,
+        quantity_per_unit INTEGER NOT NULL,
+        manufacturing_date DATE NOT NULL,
+        purchase_date DATE NOT NULL,
+        expiry_date DATE NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS sale (
+        id INTEGER PRIMARY KEY,
+        date_time DATETIME NOT NULL,
+        employee_id INTEGER NOT NULL REFERENCES employee (id),
+        customer_id INTEGER NOT NULL REFERENCES customer (id),
+        amount DECIMAL NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS salt (
+        id INTEGER PRIMARY KEY,
+        name VARCHAR(255) NOT NULL
+    );
+'''
+
+
+@dataclass(frozen=True, slots=True)
+class Migration:
+    """Step of the schema, applied once to bring a database to its version."""
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def _create_tables(connection: sqlite3.Connection):
+    """
+    Create the tables of the entity relationship diagram if they do not exist.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    """
+    connection.executescript(TABLES)
+
+
+# Every step only creates what does not exist yet, so a step interrupted before its version was recorded is simply
+# applied again, and databases created before the schema was versioned are brought up to date in place.
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(1, 'Create the customer, employee, manufacturer, medicine, sale and salt tables', _create_tables),
+    Migration(2, 'Index the lookups and the ordered and filtered model queries', schema.create_indexes),
+    Migration(3, 'Create the full-text search indexes', search.create_indexes),
+    Migration(4, 'Create the sale rollups', sale_rollup.create_schema),
+    Migration(5, 'Create the expiry snapshots', expiry_snapshot.create_schema),
+    Migration(6, 'Create the medicine salt compositions', medicine_salt.create_schema),
+    Migration(7, 'Create the sale items', sale_item.create_schema),
+    Migration(8, 'Create the stock of each medicine', stock.create_schema),
+    Migration(9, 'Create the table and row change counters', versions.create_schema),
+    Migration(10, 'Count the restocked lots', allocation.create_schema),
+    Migration(11, 'Create the change log', change_log.create_schema),
+    Migration(12, 'Log the changes of upserted rows without a conflict', change_log.recreate_triggers),
+    Migration(13, 'Record the medicine version of the expiry snapshots', expiry_snapshot.add_medicine_version)
+)
+
+database_cli = AppGroup('database', help='Manage the schema of the database.')
+
+
+def get_version(connection: sqlite3.Connection) -> int:
+    """
+    Get the version of the schema of a database.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+
+    @return: Version of the last migration applied, zero for a database never migrated.
+    @rtype: int
+    """
+    return connection.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(connection: sqlite3.Connection) -> list[Migration]:
+    """
+    Apply the migrations a database has not had yet, in order, recording the version after each of them.
+
+    @param connection: Connection to the database, outside of any transaction.
+    @type connection: sqlite3.Connection
+
+    @return: Migrations applied, empty if the database was up to date.
+    @rtype: list[Migration]
+    """
+    applied = []
+
+    for migration in MIGRATIONS:
+        if migration.version <= get_version(connection):
+            continue
+
+        migration.apply(connection)
+        connection.commit()
+
+        # Workers starting together may race through the same migrations, so the version only ever moves forward.
+        if get_version(connection) < migration.version:
+            connection.execute(f'PRAGMA user_version = {migration.version}')
+
+        applied.append(migration)
+
+    return applied
+
+
+def optimize(connection: sqlite3.Connection, analyze: bool = False):
+    """
+    Refresh the statistics the query planner chooses indexes by.
+
+    @param connection: Connection to the database, outside of any transaction.
+    @type connection: sqlite3.Connection
+    @param analyze: Whether to analyze every table and index, instead of only those whose statistics are stale.
+    @type analyze: bool
+    """
+    connection.execute('ANALYZE' if analyze else 'PRAGMA optimize')
+    connection.commit()
+
+
+def init_app(app: flask.Flask):
+    """
+    Add the database commands to the command line interface of an application.
+
+    @param app: Flask application to configure.
+    @type app: flask.Flask
+    """
+    app.cli.add_command(database_cli)
+
+
+@database_cli.command('migrate')
+def migrate_command():
+    """Apply the pending migrations."""
+    for migration in migrate(pool.get_connection()):
+        click.echo(f'{migration.version}: {migration.description}.')
+
+    click.echo(f'Schema at version {get_version(pool.get_connection())}.')
+
+
+@database_cli.command('optimize')
+@click.option('--analyze', is_flag=True, help='Analyze every table and index instead of only the stale ones.')
+def optimize_command(analyze: bool):
+    """Refresh the statistics of the query planner."""
+    optimize(pool.get_connection(), analyze)
+    click.echo('Query planner statistics refreshed.')
+
+
+@database_cli.command('check-plans')
+@click.option('--live', is_flag=True, help='Check the database of the application, with its statistics.')
+def check_plans_command(live: bool):
+    """
+    Fail if any model query scans a whole table where an index was expected, in a database built by the migrations
+    unless the live database is asked for.
+    """
+    if live:
+        problems = query_plans.check(pool.get_connection())
+    else:
+        with contextlib.closing(sqlite3.connect(':memory:')) as connection:
+            migrate(connection)
+            problems = query_plans.check(connection)
+
+    for problem in problems:
+        click.echo(f'{problem.name}: {problem.detail}\n    {" ".join(problem.statement.split())}', err=True)
+
+    if problems:
+        raise click.ClickException(f'{len(problems)} query plan steps read a whole table.')
+
+    click.echo(f'Every one of the {len(query_plans.CHECKS)} model queries uses its indexes.')
@@ -0,0 +1,228 @@
+"""Per-worker SQLite connection pool and request-scoped connection handling."""
+import os
+import queue
+import sqlite3
+import threading
+from typing import Optional
+
+import flask
+
+from src.database import instrumentation
+from src.models import identity_map
+
+PRAGMAS: dict[str, str | int] = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY'
+}
+
+_pool_lock = threading.Lock()
+
+
+class PoolExhaustedError(RuntimeError):
+    """Raised when no connection becomes available before the pool timeout."""
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections owned by a single worker process."""
+
+    def __init__(
+            self, database_path: str, size: int = 8, timeout: float = 5.0, cached_statements: int = 512
+    ):
+        self.database_path = database_path
+        self.size = size
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.pid = os.getpid()
+
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+        self.waits = 0
+        self.exhausted = 0
+
+    @property
+    def in_use(self) -> int:
+        """
+        Calculate the number of connections currently checked out of the pool.
+
+        @return: Number of connections in use.
+        @rtype: int
+        """
+        return self._created - self._idle.qsize()
+
+    @property
+    def idle(self) -> int:
+        """
+        Calculate the number of open connections waiting in the pool.
+
+        @return: Number of idle connections.
+        @rtype: int
+        """
+        return self._idle.qsize()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open a new instrumented connection to the database and apply the tuned pragmas. The driver parses the typed
+        columns of the mapper queries.
+
+        @return: New connection to the database.
+        @rtype: sqlite3.Connection
+        """
+        connection = sqlite3.connect(
+            self.database_path, timeout=self.timeout, detect_types=sqlite3.PARSE_COLNAMES, check_same_thread=False,
+            cached_statements=self.cached_statements, factory=instrumentation.InstrumentedConnection
+        )
+        connection.set_trace_callback(instrumentation.trace)
+
+        for pragma, value in PRAGMAS.items():
+            connection.execute(f'PRAGMA {pragma} = {value}')
+
+        return connection
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Take an idle connection from the pool, opening a new one while the pool is below its size.
+
+        @return: Connection to the database.
+        @rtype: sqlite3.Connection
+
+        @raise PoolExhaustedError: If every connection stays in use for longer than the pool timeout.
+        """
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+
+        if can_create:
+            try:
+                return self._connect()
+            except sqlite3.Error:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        with self._lock:
+            self.waits += 1
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            with self._lock:
+                self.exhausted += 1
+
+            raise PoolExhaustedError(f'No database connection became available within {self.timeout} seconds.')
+
+    def release(self, connection: sqlite3.Connection):
+        """
+        Return a connection to the pool, rolling back any transaction left open by the request.
+
+        @param connection: Connection previously returned by acquire.
+        @type connection: sqlite3.Connection
+        """
+        if connection.in_transaction:
+            connection.rollback()
+
+        self._idle.put(connection)
+
+    def close(self):
+        """Close every idle connection held by the pool."""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                break
+
+            connection.close()
+
+            with self._lock:
+                self._created -= 1
+
+
+def init_app(app: flask.Flask):
+    """
+    Configure the connection pool for an application and return connections to it on teardown.
+
+    @param app: Flask application to configure.
+    @type app: flask.Flask
+    """
+    app.config.setdefault('DATABASE_PATH', os.getenv('DATABASE_PATH'))
+    app.config.setdefault('DATABASE_POOL_SIZE', 8)
+    app.config.setdefault('DATABASE_POOL_TIMEOUT', 5.0)
+
+    app.teardown_appcontext(release_connection)
+
+
+def get_pool(app: Optional[flask.Flask] = None) -> ConnectionPool:
+    """
+    Get the connection pool of the current worker process, creating it after a fork if required.
+
+    @param app: Flask application owning the pool, defaults to the current application.
+    @type app: Optional[flask.Flask]
+
+    @return: Connection pool of the current worker.
+    @rtype: ConnectionPool
+    """
+    app = app or flask.current_app._get_current_object()
+    pool: Optional[ConnectionPool] = app.extensions.get('database_pool')
+
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+
+    with _pool_lock:
+        pool = app.extensions.get('database_pool')
+
+        if pool is None or pool.pid != os.getpid():
+            pool = ConnectionPool(
+                app.config['DATABASE_PATH'], app.config['DATABASE_POOL_SIZE'], app.config['DATABASE_POOL_TIMEOUT']
+            )
+            app.extensions['database_pool'] = pool
+
+    return pool
+
+
+def get_connection() -> sqlite3.Connection:
+    """
+    Get the connection of the current request, acquiring one from the pool on first use.
+
+    @return: Connection to the database.
+    @rtype: sqlite3.Connection
+    """
+    if 'database_connection' not in flask.g:
+        flask.g.database_connection = get_pool().acquire()
+
+    return flask.g.database_connection
+
+
+def get_identity_map() -> identity_map.IdentityMap:
+    """
+    Get the identity map of the current request, so that the rows it references are loaded at most once.
+
+    @return: Identity map of the request.
+    @rtype: identity_map.IdentityMap
+    """
+    if 'identity_map' not in flask.g:
+        flask.g.identity_map = identity_map.IdentityMap()
+
+    return flask.g.identity_map
+
+
+def release_connection(_exception: Optional[BaseException] = None):
+    """
+    Hand the connection of the current request back to the pool.
+
+    @param _exception: Exception raised while handling the request, if any.
+    @type _exception: Optional[BaseException]
+    """
+    connection: Optional[sqlite3.Connection] = flask.g.pop('database_connection', None)
+
+    if connection is not None:
+        get_pool().release(connection)
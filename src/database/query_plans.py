@@ -0,0 +1,200 @@
+"""Check of the query plans of the model queries, catching the full table scans of queries expected to use indexes."""
+import re
+import sqlite3
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable
+
+from src.database import change_log
+from src.models import (
+    customer, employee, expiry_snapshot, manufacturer, medicine, medicine_salt, sale, sale_item, sale_rollup, salt,
+    search, stock
+)
+from src.services import allocation
+
+_SCAN_PATTERN = re.compile(r'^SCAN (\S+)(?: USING (?:COVERING )?INDEX \S+)?$')
+_SUBQUERY_PATTERN = re.compile(r'^(?:MATERIALIZE|CO-ROUTINE) (\S+)$')
+_SHADOW_PATTERN = re.compile(r'^(?:main\.)?\w+_fts_(?:config|data|docsize|idx)$')
+_UNTRACED = ('--', 'BEGIN', 'COMMIT', 'ROLLBACK', 'PRAGMA', 'SAVEPOINT', 'RELEASE')
+
+
+@dataclass(frozen=True, slots=True)
+class PlanCheck:
+    """
+    Model query run with representative arguments. An ordered query may scan a table in the order of its results,
+    since it stops at its limit, but not sort it.
+    """
+    name: str
+    run: Callable[[sqlite3.Connection], Any]
+    ordered: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class PlanProblem:
+    """Step of the plan of a statement that reads a whole table."""
+    name: str
+    statement: str
+    detail: str
+
+
+def _page_checks(name: str, get_page: Callable, page_orders: tuple[str, ...]) -> list[PlanCheck]:
+    """
+    Generate the checks of the first and the following pages of a model in each of its orders.
+
+    @param name: Name of the model.
+    @type name: str
+    @param get_page: get_page function of the model.
+    @type get_page: Callable
+    @param page_orders: Columns the model can be paged by.
+    @type page_orders: tuple[str, ...]
+
+    @return: Checks of the pages.
+    @rtype: list[PlanCheck]
+    """
+    return [check for order_by in page_orders for check in (
+        PlanCheck(f'{name}.get_page by {order_by}', lambda c, o=order_by: get_page(c, None, 50, o), True),
+        PlanCheck(f'{name}.get_page by {order_by} after', lambda c, o=order_by: get_page(c, 1, 50, o), True)
+    )]
+
+
+CHECKS: tuple[PlanCheck, ...] = (
+    PlanCheck('customer.get_by_id', lambda c: customer.get_by_id(c, 1)),
+    *_page_checks('customer', customer.get_page, customer.PAGE_ORDERS),
+    PlanCheck('employee.get_by_id', lambda c: employee.get_by_id(c, 1)),
+    PlanCheck('employee.get_by_email_address', lambda c: employee.get_by_email_address(c, 'staff@example.com')),
+    PlanCheck('employee.get_access', lambda c: employee.get_access(c, 1)),
+    *_page_checks('employee', employee.get_page, employee.PAGE_ORDERS),
+    PlanCheck('manufacturer.get_by_id', lambda c: manufacturer.get_by_id(c, 1)),
+    *_page_checks('manufacturer', manufacturer.get_page, manufacturer.PAGE_ORDERS),
+    PlanCheck('medicine.get_by_id', lambda c: medicine.get_by_id(c, 1)),
+    PlanCheck('medicine.get_by_ids', lambda c: medicine.get_by_ids(c, (1, 2, 3))),
+    PlanCheck('medicine.get_expiring', lambda c: medicine.get_expiring(c, 30), True),
+    PlanCheck('medicine.get_expired', lambda c: medicine.get_expired(c), True),
+    *_page_checks('medicine', medicine.get_page, medicine.PAGE_ORDERS),
+    PlanCheck('sale.get_by_id', lambda c: sale.get_by_id(c, 1)),
+    PlanCheck('sale.get_many_with_related', lambda c: sale.get_many_with_related(c, (1, 2, 3))),
+    PlanCheck('sale.iter_filtered by date', lambda c: list(sale.iter_filtered(
+        c, datetime(2024, 1, 1), datetime(2024, 2, 1)
+    ))),
+    PlanCheck('sale.iter_filtered by employee', lambda c: list(sale.iter_filtered(
+        c, datetime(2024, 1, 1), employee_id=1
+    ))),
+    PlanCheck('sale.iter_filtered by customer', lambda c: list(sale.iter_filtered(c, customer_id=1))),
+    *_page_checks('sale', sale.get_page, sale.PAGE_ORDERS),
+    PlanCheck('salt.get_by_id', lambda c: salt.get_by_id(c, 1)),
+    PlanCheck('salt.get_by_ids', lambda c: salt.get_by_ids(c, (1, 2, 3))),
+    *_page_checks('salt', salt.get_page, salt.PAGE_ORDERS),
+    PlanCheck('sale_item.get_by_sale', lambda c: sale_item.get_by_sale(c, 1)),
+    PlanCheck('stock.get_quantities', lambda c: stock.get_quantities(c, (1, 2, 3))),
+    PlanCheck('medicine_salt.get_salt_ids', lambda c: medicine_salt.get_salt_ids(c, 1)),
+    PlanCheck('medicine_salt.get_medicine_ids', lambda c: medicine_salt.get_medicine_ids(c, 1)),
+    PlanCheck('medicine_salt.find_substitutes', lambda c: medicine_salt.find_substitutes(c, 1)),
+    PlanCheck('sale_rollup.get_periods', lambda c: sale_rollup.get_periods(c, 'day', '2024-01-01', '2024-01-31')),
+    PlanCheck('sale_rollup.get_periods by employee', lambda c: sale_rollup.get_periods(
+        c, 'month', '2024-01', '2024-12', 'employee', 1
+    )),
+    PlanCheck('sale_rollup.get_leaders', lambda c: sale_rollup.get_leaders(
+        c, 'month', 'customer', '2024-01', '2024-12'
+    )),
+    PlanCheck('expiry_snapshot.get_by_date', lambda c: expiry_snapshot.get_by_date(c, date(2024, 1, 1), 30)),
+    PlanCheck('search.search', lambda c: search.search(c, 'medicine', '12 cro')),
+    PlanCheck('change_log.get_changes', lambda c: change_log.get_changes(c, 'medicine', ('id', 'name'), 0)),
+    PlanCheck('change_log.get_changes full', lambda c: change_log.get_changes(c, 'sale', ('id', 'amount'), after=1)),
+    PlanCheck('allocation.get_product', lambda c: allocation.get_product(c, 1)),
+    PlanCheck('allocation.LotAllocator.allocate', lambda c: allocation.LotAllocator(0).allocate(c, ('Crocin', 1), 0))
+)
+
+
+def _trace(connection: sqlite3.Connection, check: PlanCheck) -> list[str]:
+    """
+    Run a check inside a transaction that is rolled back, recording the statements it executes.
+
+    @return: Statements executed by the model query, with their parameters bound, in order of first execution.
+    """
+    statements: dict[str, None] = {}
+
+    def record(statement: str):
+        if not statement.lstrip().upper().startswith(_UNTRACED):
+            statements[statement] = None
+
+    connection.execute('BEGIN')
+    connection.set_trace_callback(record)
+
+    try:
+        check.run(connection)
+    finally:
+        connection.set_trace_callback(None)
+        connection.rollback()
+
+    return list(statements)
+
+
+def explain(connection: sqlite3.Connection, statement: str) -> list[str]:
+    """
+    Get the query plan of a statement.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param statement: Statement without parameters.
+    @type statement: str
+
+    @return: Detail of each step of the plan, in order.
+    @rtype: list[str]
+    """
+    cursor = connection.cursor()
+    steps = cursor.execute(f'EXPLAIN QUERY PLAN {statement}').fetchall()
+    cursor.close()
+
+    return [detail for _id, _parent, _unused, detail in steps]
+
+
+def find_problems(name: str, statement: str, details: list[str], ordered: bool = False) -> list[PlanProblem]:
+    """
+    Find the steps of a plan that scan a whole table or index instead of searching an index. Scans of subqueries
+    materialized by the plan itself, and of full-text indexes and the tables backing them, are not counted.
+
+    @param name: Name of the checked query.
+    @type name: str
+    @param statement: Statement the plan belongs to.
+    @type statement: str
+    @param details: Detail of each step of the plan.
+    @type details: list[str]
+    @param ordered: Whether the statement may scan a table in the order of its results.
+    @type ordered: bool
+
+    @return: Steps of the plan reading a whole table.
+    @rtype: list[PlanProblem]
+    """
+    subqueries = {match.group(1) for match in map(_SUBQUERY_PATTERN.match, details) if match}
+    problems = []
+
+    for detail in details:
+        scan = _SCAN_PATTERN.match(detail)
+
+        if scan and not ordered and scan.group(1) not in subqueries and not _SHADOW_PATTERN.match(scan.group(1)):
+            problems.append(PlanProblem(name, statement, detail))
+        elif ordered and detail.startswith('USE TEMP B-TREE FOR') and 'ORDER BY' in detail:
+            problems.append(PlanProblem(name, statement, detail))
+
+    return problems
+
+
+def check(connection: sqlite3.Connection) -> list[PlanProblem]:
+    """
+    Run every model query expected to use an index with EXPLAIN QUERY PLAN, inside transactions that are rolled
+    back. Once a database is analyzed, the planner may rightly prefer scanning its tables that hold few rows, so the
+    check is meant for a database without statistics or with a representative amount of data.
+
+    @param connection: Connection to a migrated database, outside of any transaction.
+    @type connection: sqlite3.Connection
+
+    @return: Steps of the plans reading a whole table, empty if every query uses its indexes.
+    @rtype: list[PlanProblem]
+    """
+    problems = []
+
+    for plan_check in CHECKS:
+        for statement in _trace(connection, plan_check):
+            problems += find_problems(plan_check.name, statement, explain(connection, statement), plan_check.ordered)
+
+    return problems
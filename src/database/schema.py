@@ -0,0 +1,25 @@
+"""Indexes backing the lookups and the ordered and filtered model queries."""
+import sqlite3
+
+INDEXES = '''
+    CREATE UNIQUE INDEX IF NOT EXISTS employee_email_address_index ON employee (email_address);
+    CREATE INDEX IF NOT EXISTS manufacturer_name_index ON manufacturer (name);
+    CREATE INDEX IF NOT EXISTS medicine_name_index ON medicine (name);
+    CREATE INDEX IF NOT EXISTS medicine_expiry_date_index ON medicine (expiry_date);
+    CREATE INDEX IF NOT EXISTS medicine_product_index ON medicine (name, manufacturer_id, expiry_date);
+    CREATE INDEX IF NOT EXISTS sale_date_time_index ON sale (date_time);
+    CREATE INDEX IF NOT EXISTS sale_employee_id_index ON sale (employee_id, date_time);
+    CREATE INDEX IF NOT EXISTS sale_customer_id_index ON sale (customer_id, date_time);
+    CREATE INDEX IF NOT EXISTS salt_name_index ON salt (name);
+'''
+
+
+def create_indexes(connection: sqlite3.Connection):
+    """
+    Create any missing indexes used by the paged and ordered model queries.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    """
+    connection.executescript(INDEXES)
+    connection.commit()
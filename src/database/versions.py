@@ -0,0 +1,136 @@
+"""Change counters of the tables and of their rows, maintained by triggers, for conditional requests."""
+import sqlite3
+from typing import Iterable
+
+TABLES = ('customer', 'employee', 'manufacturer', 'medicine', 'sale', 'salt')
+
+TABLE = '''
+    CREATE TABLE IF NOT EXISTS table_version (
+        table_name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL
+    ) WITHOUT ROWID;
+
+    CREATE TABLE IF NOT EXISTS row_version (
+        table_name TEXT NOT NULL,
+        row_id INTEGER NOT NULL,
+        version INTEGER NOT NULL,
+        PRIMARY KEY (table_name, row_id)
+    ) WITHOUT ROWID;
+'''
+
+
+def _triggers(table: str) -> str:
+    """
+    Generate the triggers counting the changes to a table and to each of its existing rows. Inserts only change the
+    table, since a row that did not exist has no cached version.
+
+    @param table: Name of the counted table.
+    @type table: str
+
+    @return: SQL script creating the triggers.
+    @rtype: str
+    """
+    bump_table = f'''INSERT INTO table_version VALUES ('{table}', 1)
+            ON CONFLICT DO UPDATE SET version = version + 1;'''
+    bump_row = f'''INSERT INTO row_version VALUES ('{table}', old.id, 1)
+            ON CONFLICT DO UPDATE SET version = version + 1;'''
+
+    return f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_version_insert AFTER INSERT ON {table} BEGIN
+            {bump_table}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS {table}_version_update AFTER UPDATE ON {table} BEGIN
+            {bump_table}
+            {bump_row}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS {table}_version_delete AFTER DELETE ON {table} BEGIN
+            {bump_table}
+            {bump_row}
+        END;
+    '''
+
+
+def create_schema(connection: sqlite3.Connection):
+    """
+    Create the version tables and the triggers maintaining them.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    """
+    connection.executescript(TABLE + ''.join(_triggers(table) for table in TABLES))
+    connection.commit()
+
+
+def get_versions(connection: sqlite3.Connection, *tables: str) -> tuple[int, ...]:
+    """
+    Get the change counters of some tables.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param tables: Names of the tables.
+    @type tables: str
+
+    @return: Number of changes to each table, in the order given, zero for a table that never changed.
+    @rtype: tuple[int, ...]
+    """
+    cursor = connection.cursor()
+    versions = dict(cursor.execute(
+        f'SELECT table_name, version FROM table_version WHERE table_name IN ({", ".join("?" * len(tables))})', tables
+    ).fetchall())
+    cursor.close()
+
+    return tuple(versions.get(table, 0) for table in tables)
+
+
+def get_row_version(connection: sqlite3.Connection, table: str, row_id: int) -> int:
+    """
+    Get the change counter of a row.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param table: Name of the table.
+    @type table: str
+    @param row_id: ID of the row.
+    @type row_id: int
+
+    @return: Number of updates and deletes of the row, zero if it was never changed after being inserted.
+    @rtype: int
+    """
+    cursor = connection.cursor()
+    version = cursor.execute(
+        'SELECT version FROM row_version WHERE table_name = ? AND row_id = ?', (table, row_id)
+    ).fetchone()
+    cursor.close()
+
+    return 0 if version is None else version[0]
+
+
+def get_row_versions(connection: sqlite3.Connection, table: str, row_ids: Iterable[int]) -> dict[int, int]:
+    """
+    Get the change counters of some rows of a table in a single query.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param table: Name of the table.
+    @type table: str
+    @param row_ids: IDs of the rows.
+    @type row_ids: Iterable[int]
+
+    @return: Number of updates and deletes of each row, without the rows never changed after being inserted.
+    @rtype: dict[int, int]
+    """
+    row_ids = tuple(row_ids)
+
+    if not row_ids:
+        return {}
+
+    cursor = connection.cursor()
+    row_versions = dict(cursor.execute(
+        f'SELECT row_id, version FROM row_version WHERE table_name = ? AND row_id IN ({", ".join("?" * len(row_ids))})',
+        (table, *row_ids)
+    ).fetchall())
+    cursor.close()
+
+    return row_versions
@@ -2,7 +2,12 @@
 import sqlite3
 from dataclasses import dataclass
 from datetime import date
-from typing import Optional
+from typing import Optional, Iterable, Iterator
+
+from src.models import mapper
+
+
+PAGE_ORDERS = ('id',)
 
 
 @dataclass(frozen=True, slots=True)
@@ -47,26 +52,26 @@ class Customer:
         )
 
 
-def _create_customer(raw_data: tuple) -> Customer:
-    """
-    Create a customer object from a record returned from the database.
+@dataclass(frozen=True, slots=True)
+class CustomerSummary:
+    """Projection of the customer naming them, without the rest of their record."""
+    id: int
+    first_name: str
+    last_name: str
+
+    @property
+    def full_name(self) -> str:
+        """
+        Generate the full name of the customer using their first and last names.
+
+        @return: Full name of the customer.
+        @rtype: str
+        """
+        return f'{self.first_name} {self.last_name}'
 
-    @param raw_data: Data returned from the database from the customer table.
-    @type raw_data: tuple
 
-    @return: Customer object from the database.
-    @rtype: Customer
-    """
-    return Customer(
-        id=raw_data[0],
-        first_name=raw_data[1],
-        last_name=raw_data[2],
-        phone_number=raw_data[3],
-        email_address=None if raw_data[4] == '' else raw_data[4],
-        address=None if raw_data[5] == '' else raw_data[5],
-        gender=None if raw_data[6] == '' else raw_data[6],
-        birth_date=None if raw_data[7] == '' else date.fromisoformat(raw_data[7])
-    )
+_MAPPER = mapper.TableMapper('customer', Customer, PAGE_ORDERS)
+_SUMMARY_MAPPER = mapper.TableMapper('customer', CustomerSummary)
 
 
 def get_all_ids(connection: sqlite3.Connection) -> set[int]:
@@ -79,11 +84,7 @@ def get_all_ids(connection: sqlite3.Connection) -> set[int]:
     @return: Set of all the IDs of the customers in the database.
     @rtype: set[int]
     """
-    cursor = connection.cursor()
-    ids: list[tuple[int]] = cursor.execute('SELECT id FROM customer').fetchall()
-    cursor.close()
-
-    return {id_[0] for id_ in ids}
+    return _MAPPER.get_all_ids(connection)
 
 
 def get_by_id(connection: sqlite3.Connection, customer_id: int) -> Optional[Customer]:
@@ -98,14 +99,22 @@ def get_by_id(connection: sqlite3.Connection, customer_id: int) -> Optional[Cust
     @return: Customer in the database, or None if the customer does not exist.
     @rtype: Optional[Customer]
     """
-    cursor = connection.cursor()
-    customer_raw = cursor.execute('SELECT * FROM customer WHERE id = ?', (customer_id,)).fetchone()
-    cursor.close()
+    return _MAPPER.get_by_id(connection, customer_id)
 
-    if customer_raw is None:
-        return None
 
-    return _create_customer(customer_raw)
+def get_summaries(connection: sqlite3.Connection, customer_ids: Iterable[int]) -> dict[int, CustomerSummary]:
+    """
+    Get the names of the customers with any of the given IDs in a single query.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param customer_ids: Customer IDs.
+    @type customer_ids: Iterable[int]
+
+    @return: Summaries of the customers in the database keyed by ID, without the IDs that do not exist.
+    @rtype: dict[int, CustomerSummary]
+    """
+    return _SUMMARY_MAPPER.get_by_ids(connection, customer_ids)
 
 
 def get_all(connection: sqlite3.Connection) -> set[Customer]:
@@ -118,13 +127,42 @@ def get_all(connection: sqlite3.Connection) -> set[Customer]:
     @return: Set of all the customers in the database.
     @rtype: set[Customer]
     """
-    customers = set()
+    return _MAPPER.get_all(connection)
+
+
+def iter_all(connection: sqlite3.Connection, batch_size: int = 500) -> Iterator[Customer]:
+    """
+    Iterate over all the customers in the database, fetching them from the cursor in batches.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param batch_size: Number of records fetched from the database at a time.
+    @type batch_size: int
+
+    @return: Iterator over all the customers in the database.
+    @rtype: Iterator[Customer]
+    """
+    return _MAPPER.iter_all(connection, batch_size)
+
+
+def get_page(
+        connection: sqlite3.Connection, after_id: Optional[int] = None, limit: int = 50, order_by: str = 'id'
+) -> list[Customer]:
+    """
+    Get a page of customers using keyset pagination, continuing after the customer with the given ID.
 
-    cursor = connection.cursor()
-    customers_raw = cursor.execute('SELECT * FROM customer').fetchall()
-    cursor.close()
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param after_id: ID of the last customer of the previous page, or None for the first page.
+    @type after_id: Optional[int]
+    @param limit: Maximum number of customers in the page.
+    @type limit: int
+    @param order_by: Indexed column to order the customers by, one of PAGE_ORDERS.
+    @type order_by: str
 
-    for customer in customers_raw:
-        customers.add(_create_customer(customer))
+    @return: List of the customers in the page.
+    @rtype: list[Customer]
 
-    return customers
+    @raise ValueError: If the customers cannot be ordered by the column.
+    """
+    return _MAPPER.get_page(connection, after_id, limit, order_by)
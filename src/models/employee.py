@@ -2,7 +2,12 @@
 import sqlite3
 from dataclasses import dataclass
 from datetime import date
-from typing import Optional
+from typing import Optional, Iterable, Iterator
+
+from src.models import mapper
+
+
+PAGE_ORDERS = ('id',)
 
 
 @dataclass(frozen=True, slots=True)
@@ -47,32 +52,26 @@ class Employee:
         )
 
 
-def _create_employee(raw_data: tuple) -> Employee:
-    """
-    Create an employee object from a record returned from the database.
+@dataclass(frozen=True, slots=True)
+class EmployeeSummary:
+    """Projection of the employee naming them, without the rest of their record."""
+    id: int
+    first_name: str
+    last_name: str
 
-    @param raw_data: Data returned from the database from the employee table.
-    @type raw_data: tuple
+    @property
+    def full_name(self) -> str:
+        """
+        Generate the full name of the employee using their first and last names.
+
+        @return: Full name of the employee.
+        @rtype: str
+        """
+        return f'{self.first_name} {self.last_name}'
 
-    @return: Employee object from the database.
-    @rtype: Employee
-    """
-    return Employee(
-        id=raw_data[0],
-        first_name=raw_data[1],
-        last_name=raw_data[2],
-        phone_number=raw_data[3],
-        email_address=raw_data[4],
-        address=raw_data[5],
-        gender=raw_data[6],
-        birth_date=date.fromisoformat(raw_data[7]),
-        joining_date=date.fromisoformat(raw_data[8]),
-        designation=None if raw_data[9] == '' else raw_data[9],
-        monthly_salary=float(raw_data[10]),
-        login_password=raw_data[11],
-        currently_employed=bool(raw_data[12]),
-        is_administrator=bool(raw_data[13])
-    )
+
+_MAPPER = mapper.TableMapper('employee', Employee, PAGE_ORDERS)
+_SUMMARY_MAPPER = mapper.TableMapper('employee', EmployeeSummary)
 
 
 def get_all_ids(connection: sqlite3.Connection) -> set[int]:
@@ -85,11 +84,7 @@ def get_all_ids(connection: sqlite3.Connection) -> set[int]:
     @return: Set of all the IDs of the employees in the database.
     @rtype: set[int]
     """
-    cursor = connection.cursor()
-    ids: list[tuple[int]] = cursor.execute('SELECT id FROM employee').fetchall()
-    cursor.close()
-
-    return {id_[0] for id_ in ids}
+    return _MAPPER.get_all_ids(connection)
 
 
 def get_by_id(connection: sqlite3.Connection, employee_id: int) -> Optional[Employee]:
@@ -104,14 +99,22 @@ def get_by_id(connection: sqlite3.Connection, employee_id: int) -> Optional[Empl
     @return: Employee in the database, or None if the employee does not exist.
     @rtype: Optional[Employee]
     """
-    cursor = connection.cursor()
-    employee_raw = cursor.execute('SELECT * FROM employee WHERE id = ?', (employee_id,)).fetchone()
-    cursor.close()
+    return _MAPPER.get_by_id(connection, employee_id)
 
-    if employee_raw is None:
-        return None
 
-    return _create_employee(employee_raw)
+def get_summaries(connection: sqlite3.Connection, employee_ids: Iterable[int]) -> dict[int, EmployeeSummary]:
+    """
+    Get the names of the employees with any of the given IDs in a single query.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param employee_ids: Employee IDs.
+    @type employee_ids: Iterable[int]
+
+    @return: Summaries of the employees in the database keyed by ID, without the IDs that do not exist.
+    @rtype: dict[int, EmployeeSummary]
+    """
+    return _SUMMARY_MAPPER.get_by_ids(connection, employee_ids)
 
 
 def get_by_email_address(connection: sqlite3.Connection, employee_email_address: str) -> Optional[Employee]:
@@ -126,16 +129,32 @@ def get_by_email_address(connection: sqlite3.Connection, employee_email_address:
     @return: Employee in the database, or NOne if the employee does not exist.
     @rtype: Optional[Employee]
     """
+    return _MAPPER.get_by(connection, 'email_address', employee_email_address)
+
+
+def get_access(connection: sqlite3.Connection, employee_id: int) -> Optional[tuple[bool, bool]]:
+    """
+    Get only the employment status and administrator flag of an employee, for authorization checks.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param employee_id: Employee ID.
+    @type employee_id: int
+
+    @return: Whether the employee is currently employed and whether they are an administrator, or None if the
+    employee does not exist.
+    @rtype: Optional[tuple[bool, bool]]
+    """
     cursor = connection.cursor()
-    employee_raw = cursor.execute(
-        'SELECT * FROM employee WHERE email_address = ?', (employee_email_address,)
+    access_raw = cursor.execute(
+        'SELECT currently_employed, is_administrator FROM employee WHERE id = ?', (employee_id,)
     ).fetchone()
     cursor.close()
 
-    if employee_raw is None:
+    if access_raw is None:
         return None
 
-    return _create_employee(employee_raw)
+    return bool(access_raw[0]), bool(access_raw[1])
 
 
 def get_all(connection: sqlite3.Connection) -> set[Employee]:
@@ -148,13 +167,58 @@ def get_all(connection: sqlite3.Connection) -> set[Employee]:
     @return: Set of all the employees in the database.
     @rtype: set[Employee]
     """
-    employees = set()
+    return _MAPPER.get_all(connection)
 
-    cursor = connection.cursor()
-    employees_raw = cursor.execute('SELECT * FROM employee').fetchall()
-    cursor.close()
 
-    for employee in employees_raw:
-        employees.add(_create_employee(employee))
+def iter_all(connection: sqlite3.Connection, batch_size: int = 500) -> Iterator[Employee]:
+    """
+    Iterate over all the employees in the database, fetching them from the cursor in batches.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param batch_size: Number of records fetched from the database at a time.
+    @type batch_size: int
+
+    @return: Iterator over all the employees in the database.
+    @rtype: Iterator[Employee]
+    """
+    return _MAPPER.iter_all(connection, batch_size)
+
+
+def get_page(
+        connection: sqlite3.Connection, after_id: Optional[int] = None, limit: int = 50, order_by: str = 'id'
+) -> list[Employee]:
+    """
+    Get a page of employees using keyset pagination, continuing after the employee with the given ID.
 
-    return employees
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param after_id: ID of the last employee of the previous page, or None for the first page.
+    @type after_id: Optional[int]
+    @param limit: Maximum number of employees in the page.
+    @type limit: int
+    @param order_by: Indexed column to order the employees by, one of PAGE_ORDERS.
+    @type order_by: str
+
+    @return: List of the employees in the page.
+    @rtype: list[Employee]
+
+    @raise ValueError: If the employees cannot be ordered by the column.
+    """
+    return _MAPPER.get_page(connection, after_id, limit, order_by)
+
+
+def update_password(connection: sqlite3.Connection, employee_id: int, login_password: str):
+    """
+    Replace the stored password hash of an employee.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param employee_id: Employee ID.
+    @type employee_id: int
+    @param login_password: New password hash.
+    @type login_password: str
+    """
+    cursor = connection.cursor()
+    cursor.execute('UPDATE employee SET login_password = ? WHERE id = ?', (login_password, employee_id))
+    cursor.close()
@@ -0,0 +1,176 @@
+"""Expiry snapshot model and related functions to query the database."""
+import sqlite3
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Optional
+
+from src.database import versions
+
+TABLE = '''
+    CREATE TABLE IF NOT EXISTS expiry_snapshot (
+        snapshot_date DATE NOT NULL,
+        within_days INTEGER NOT NULL,
+        expired_count INTEGER NOT NULL,
+        expired_cost REAL NOT NULL,
+        expiring_count INTEGER NOT NULL,
+        expiring_cost REAL NOT NULL,
+        medicine_version INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (snapshot_date, within_days)
+    ) WITHOUT ROWID;
+'''
+
+
+@dataclass(frozen=True, slots=True)
+class ExpirySnapshot:
+    """
+    Counts and cost of the expired lots and of the lots expiring soon, as of a given day and of the version of the
+    medicine table they were counted from.
+    """
+    snapshot_date: date
+    within_days: int
+    expired_count: int
+    expired_cost: float
+    expiring_count: int
+    expiring_cost: float
+    medicine_version: int = 0
+
+
+def _create_expiry_snapshot(raw_data: tuple) -> ExpirySnapshot:
+    """
+    Create an expiry snapshot object from a record returned from the database.
+
+    @param raw_data: Data returned from the database from the expiry_snapshot table.
+    @type raw_data: tuple
+
+    @return: Expiry snapshot object from the database.
+    @rtype: ExpirySnapshot
+    """
+    return ExpirySnapshot(
+        snapshot_date=date.fromisoformat(raw_data[0]),
+        within_days=raw_data[1],
+        expired_count=raw_data[2],
+        expired_cost=float(raw_data[3]),
+        expiring_count=raw_data[4],
+        expiring_cost=float(raw_data[5]),
+        medicine_version=raw_data[6]
+    )
+
+
+def create_schema(connection: sqlite3.Connection):
+    """
+    Create the expiry snapshot table if it does not exist.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    """
+    connection.executescript(TABLE)
+
+
+def add_medicine_version(connection: sqlite3.Connection):
+    """
+    Add the version of the medicine table to the expiry snapshots if they do not record it yet. Snapshots taken
+    before then count as taken from version zero, so today's snapshot is taken again on its next request.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    """
+    cursor = connection.cursor()
+    columns = {column[1] for column in cursor.execute('PRAGMA table_info(expiry_snapshot)').fetchall()}
+
+    if 'medicine_version' not in columns:
+        cursor.execute('ALTER TABLE expiry_snapshot ADD COLUMN medicine_version INTEGER NOT NULL DEFAULT 0')
+
+    cursor.close()
+    connection.commit()
+
+
+def get_by_date(connection: sqlite3.Connection, snapshot_date: date, within_days: int) -> Optional[ExpirySnapshot]:
+    """
+    Get the snapshot taken on a day for a look-ahead window.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param snapshot_date: Day of the snapshot.
+    @type snapshot_date: date
+    @param within_days: Number of days the snapshot looks ahead for expiring lots.
+    @type within_days: int
+
+    @return: Expiry snapshot in the database, or None if it has not been taken.
+    @rtype: Optional[ExpirySnapshot]
+    """
+    cursor = connection.cursor()
+    snapshot_raw = cursor.execute(
+        'SELECT * FROM expiry_snapshot WHERE snapshot_date = ? AND within_days = ?', (snapshot_date, within_days)
+    ).fetchone()
+    cursor.close()
+
+    if snapshot_raw is None:
+        return None
+
+    return _create_expiry_snapshot(snapshot_raw)
+
+
+def take(connection: sqlite3.Connection, snapshot_date: date, within_days: int) -> ExpirySnapshot:
+    """
+    Compute the snapshot of a day from the expiry date index of the medicines and store it.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param snapshot_date: Day of the snapshot.
+    @type snapshot_date: date
+    @param within_days: Number of days to look ahead for expiring lots.
+    @type within_days: int
+
+    @return: Snapshot that was stored.
+    @rtype: ExpirySnapshot
+    """
+    # The version is read before the counts, so a change made in between only makes the snapshot be taken again.
+    medicine_version, = versions.get_versions(connection, 'medicine')
+
+    cursor = connection.cursor()
+    expired_count, expired_cost = cursor.execute(
+        'SELECT COUNT(*), TOTAL(cost_price) FROM medicine WHERE expiry_date < ?', (snapshot_date,)
+    ).fetchone()
+    expiring_count, expiring_cost = cursor.execute(
+        'SELECT COUNT(*), TOTAL(cost_price) FROM medicine WHERE expiry_date BETWEEN ? AND ?',
+        (snapshot_date, snapshot_date + timedelta(days=within_days))
+    ).fetchone()
+
+    snapshot = ExpirySnapshot(
+        snapshot_date, within_days, expired_count, expired_cost, expiring_count, expiring_cost, medicine_version
+    )
+
+    cursor.execute(
+        'INSERT OR REPLACE INTO expiry_snapshot VALUES (?, ?, ?, ?, ?, ?, ?)',
+        (
+            snapshot.snapshot_date, snapshot.within_days, snapshot.expired_count, snapshot.expired_cost,
+            snapshot.expiring_count, snapshot.expiring_cost, snapshot.medicine_version
+        )
+    )
+    cursor.execute('DELETE FROM expiry_snapshot WHERE snapshot_date < ?', (snapshot_date - timedelta(days=30),))
+    cursor.close()
+    connection.commit()
+
+    return snapshot
+
+
+def get_or_take(connection: sqlite3.Connection, within_days: int) -> ExpirySnapshot:
+    """
+    Get today's snapshot, taking it first if this is the first request for it today or if medicines were added,
+    changed or removed since it was taken, so that it agrees with the live lists of expiring and expired medicines.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param within_days: Number of days to look ahead for expiring lots.
+    @type within_days: int
+
+    @return: Today's expiry snapshot.
+    @rtype: ExpirySnapshot
+    """
+    today = date.today()
+    snapshot = get_by_date(connection, today, within_days)
+
+    if snapshot is None or snapshot.medicine_version != versions.get_versions(connection, 'medicine')[0]:
+        snapshot = take(connection, today, within_days)
+
+    return snapshot
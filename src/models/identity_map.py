@@ -0,0 +1,47 @@
+"""Identity map of the models loaded within a unit of work, so that each row is read from the database once."""
+from typing import Any, Callable, Iterable, Optional
+
+
+class IdentityMap:
+    """
+    Models loaded by ID, kept by model class. IDs found missing are remembered too, so that a reference to a row that
+    does not exist is not looked up again.
+    """
+
+    def __init__(self):
+        self._models: dict[type, dict[int, Optional[Any]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(
+            self, model: type, ids: Iterable[int], load: Callable[[tuple[int, ...]], dict[int, Any]]
+    ) -> dict[int, Any]:
+        """
+        Get the models with any of the IDs, loading only those not seen before, with a single call.
+
+        @param model: Class of the models, keeping them apart from the models of other tables and projections.
+        @type model: type
+        @param ids: IDs of the models.
+        @type ids: Iterable[int]
+        @param load: Function getting the models with any of the IDs, keyed by ID, skipping those that do not exist.
+        @type load: Callable[[tuple[int, ...]], dict[int, Any]]
+
+        @return: Models keyed by ID, without the IDs that do not exist.
+        @rtype: dict[int, Any]
+        """
+        known = self._models.setdefault(model, {})
+        ids = tuple(dict.fromkeys(ids))
+        missing = tuple(id_ for id_ in ids if id_ not in known)
+
+        self.hits += len(ids) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            loaded = load(missing)
+            known.update((id_, loaded.get(id_)) for id_ in missing)
+
+        return {id_: known[id_] for id_ in ids if known[id_] is not None}
+
+    def clear(self):
+        """Forget every model, after the rows they were loaded from may have changed."""
+        self._models.clear()
@@ -1,34 +1,24 @@
 """Manufacturer model and related functions to query the database."""
 import sqlite3
 from dataclasses import dataclass
-from typing import Optional, Any
+from typing import Optional, Any, Iterator, Iterable
+
+from src.models import mapper, view
+
+
+PAGE_ORDERS = ('id', 'name')
 
 
 @dataclass(frozen=True, slots=True)
 class Manufacturer:
     """Manufacturer model."""
-    id: int
+    id: Optional[int]
     name: str
     phone_number: str
     address: Optional[str]
 
 
-def _create_manufacturer(raw_data: tuple) -> Manufacturer:
-    """
-    Create a manufacturer object from a record returned from the database.
-
-    @param raw_data: Data returned from the database from the manufacturer table.
-    @type raw_data: tuple
-
-    @return: Manufacturer object from the database.
-    @rtype: Manufacturer
-    """
-    return Manufacturer(
-        id=raw_data[0],
-        name=raw_data[1],
-        phone_number=raw_data[2],
-        address=None if raw_data[3] == '' else raw_data[3]
-    )
+_MAPPER = mapper.TableMapper('manufacturer', Manufacturer, PAGE_ORDERS)
 
 
 def get_all_ids(connection: sqlite3.Connection) -> set[int]:
@@ -41,11 +31,7 @@ def get_all_ids(connection: sqlite3.Connection) -> set[int]:
     @return: Set of all the IDs of the manufacturers in the database.
     @rtype: set[int]
     """
-    cursor = connection.cursor()
-    ids: list[tuple[int]] = cursor.execute('SELECT id FROM manufacturer').fetchall()
-    cursor.close()
-
-    return {id_[0] for id_ in ids}
+    return _MAPPER.get_all_ids(connection)
 
 
 def get_by_id(connection: sqlite3.Connection, manufacturer_id: int) -> Optional[Manufacturer]:
@@ -60,14 +46,7 @@ def get_by_id(connection: sqlite3.Connection, manufacturer_id: int) -> Optional[
     @return: Manufacturer in the database, or None if the manufacturer does not exist.
     @rtype: Optional[Manufacturer]
     """
-    cursor = connection.cursor()
-    manufacturer_raw = cursor.execute('SELECT * FROM manufacturer WHERE id = ?', (manufacturer_id,)).fetchone()
-    cursor.close()
-
-    if manufacturer_raw is None:
-        return None
-
-    return _create_manufacturer(manufacturer_raw)
+    return _MAPPER.get_by_id(connection, manufacturer_id)
 
 
 def get_all(connection: sqlite3.Connection) -> set[Manufacturer]:
@@ -80,50 +59,128 @@ def get_all(connection: sqlite3.Connection) -> set[Manufacturer]:
     @return: Set of all the manufacturers in the database.
     @rtype: set[Manufacturer]
     """
-    manufacturers = set()
+    return _MAPPER.get_all(connection)
+
+
+def iter_all(connection: sqlite3.Connection, batch_size: int = 500) -> Iterator[Manufacturer]:
+    """
+    Iterate over all the manufacturers in the database, fetching them from the cursor in batches.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param batch_size: Number of records fetched from the database at a time.
+    @type batch_size: int
+
+    @return: Iterator over all the manufacturers in the database.
+    @rtype: Iterator[Manufacturer]
+    """
+    return _MAPPER.iter_all(connection, batch_size)
+
+
+def get_page(
+        connection: sqlite3.Connection, after_id: Optional[int] = None, limit: int = 50, order_by: str = 'id'
+) -> list[Manufacturer]:
+    """
+    Get a page of manufacturers using keyset pagination, continuing after the manufacturer with the given ID.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param after_id: ID of the last manufacturer of the previous page, or None for the first page.
+    @type after_id: Optional[int]
+    @param limit: Maximum number of manufacturers in the page.
+    @type limit: int
+    @param order_by: Indexed column to order the manufacturers by, one of PAGE_ORDERS.
+    @type order_by: str
+
+    @return: List of the manufacturers in the page.
+    @rtype: list[Manufacturer]
+
+    @raise ValueError: If the manufacturers cannot be ordered by the column.
+    """
+    return _MAPPER.get_page(connection, after_id, limit, order_by)
+
+
+def get_page_view(
+        connection: sqlite3.Connection, after_id: Optional[int] = None, limit: int = 50, order_by: str = 'id'
+) -> view.PageView:
+    """
+    Get a page of manufacturers as both models and JSON records, from a single query.
 
-    cursor = connection.cursor()
-    manufacturers_raw = cursor.execute('SELECT * FROM manufacturer').fetchall()
-    cursor.close()
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param after_id: ID of the last manufacturer of the previous page, or None for the first page.
+    @type after_id: Optional[int]
+    @param limit: Maximum number of manufacturers in the page.
+    @type limit: int
+    @param order_by: Indexed column to order the manufacturers by, one of PAGE_ORDERS.
+    @type order_by: str
 
-    for manufacturer in manufacturers_raw:
-        manufacturers.add(_create_manufacturer(manufacturer))
+    @return: Manufacturers of the page and their JSON encoding.
+    @rtype: view.PageView
 
-    return manufacturers
+    @raise ValueError: If the manufacturers cannot be ordered by the column.
+    """
+    return _MAPPER.get_page_view(connection, after_id, limit, order_by)
 
 
 def get_all_with_fields(connection: sqlite3.Connection, *fields: str) -> list[dict[str, Any]]:
-    data = []
-    column_names = ', '.join(fields)
+    """
+    Get some of the fields of all the manufacturers in the database, as stored.
 
-    cursor = connection.cursor()
-    manufacturers_raw = cursor.execute(f'SELECT {column_names} FROM manufacturer').fetchall()
-    cursor.close()
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param fields: Names of the columns to get.
+    @type fields: str
 
-    for manufacturer in manufacturers_raw:
-        dictionary = dict()
+    @return: List of dictionaries mapping each field to its value, one per manufacturer.
+    @rtype: list[dict[str, Any]]
 
-        for idx, field in enumerate(fields):
-            dictionary[field] = manufacturer[idx]
+    @raise ValueError: If any of the fields is not a column of the manufacturer table.
+    """
+    return _MAPPER.get_all_with_fields(connection, *fields)
 
-        data.append(dictionary)
 
-    return data
+def insert(connection: sqlite3.Connection, manufacturer: Manufacturer) -> int:
+    """
+    Insert the manufacturer, letting the database assign its ID if the manufacturer does not have one.
 
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param manufacturer: Manufacturer to insert.
+    @type manufacturer: Manufacturer
 
-def insert(connection: sqlite3.Connection, manufacturer: Manufacturer):
-    cursor = connection.cursor()
-    cursor.execute(
-        'INSERT INTO manufacturer VALUES (?, ?, ?, ?)',
-        (manufacturer.id, manufacturer.name, manufacturer.phone_number, manufacturer.address)
-    )
-    cursor.close()
+    @return: ID of the inserted manufacturer.
+    @rtype: int
+    """
+    return _MAPPER.insert(connection, manufacturer)
 
 
 def update(connection: sqlite3.Connection, manufacturer: Manufacturer):
-    cursor = connection.cursor()
-    cursor.execute(
-        'UPDATE manufacturer SET name = ?, phone_number = ?, address = ? WHERE id = ?',
-        (manufacturer.name, manufacturer.phone_number, manufacturer.address, manufacturer.id)
-    )
-    cursor.close()
+    _MAPPER.update(connection, manufacturer)
+
+
+def upsert(connection: sqlite3.Connection, manufacturer: Manufacturer) -> bool:
+    """
+    Insert the manufacturer, or update it in place if its ID already exists.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param manufacturer: Manufacturer to write, with a server-assigned ID if its ID is None.
+    @type manufacturer: Manufacturer
+
+    @return: True if a new manufacturer was created, False if an existing one was updated.
+    @rtype: bool
+    """
+    return _MAPPER.upsert(connection, manufacturer)
+
+
+def upsert_many(connection: sqlite3.Connection, manufacturers: Iterable[Manufacturer]):
+    """
+    Insert or update many manufacturers with a single prepared statement.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param manufacturers: Manufacturers to write, with server-assigned IDs for those whose ID is None.
+    @type manufacturers: Iterable[Manufacturer]
+    """
+    _MAPPER.upsert_many(connection, manufacturers)
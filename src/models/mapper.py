@@ -0,0 +1,332 @@
+"""Generic mapping between the model classes and their tables, generated from the model definitions."""
+import dataclasses
+import operator
+import sqlite3
+import types
+import typing
+from datetime import date, datetime
+from typing import Any, Callable, Generic, Iterable, Iterator, Optional, TypeVar
+
+from src.models import view
+
+Model = TypeVar('Model')
+
+COLUMN_TYPES: dict[type, str] = {datetime: 'DATETIME', date: 'DATE', float: 'DECIMAL', bool: 'BOOLEAN'}
+
+
+def _parse_date(value: bytes) -> Optional[date]:
+    return date.fromisoformat(value.decode()) if value else None
+
+
+def _parse_datetime(value: bytes) -> Optional[datetime]:
+    return datetime.fromisoformat(value.decode()) if value else None
+
+
+def register_types():
+    """
+    Register the adapters storing dates and times in ISO format, and the converters parsing the typed columns of the
+    mapper queries in the driver on connections opened with detect_types=sqlite3.PARSE_COLNAMES.
+    """
+    sqlite3.register_adapter(date, date.isoformat)
+    sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+
+    sqlite3.register_converter('DATE', _parse_date)
+    sqlite3.register_converter('DATETIME', _parse_datetime)
+    sqlite3.register_converter('DECIMAL', float)
+    sqlite3.register_converter('BOOLEAN', lambda value: value != b'0')
+
+
+register_types()
+
+
+def _coerce_date(value: Any) -> Optional[date]:
+    if value.__class__ is str:
+        return date.fromisoformat(value) if value else None
+    return value
+
+
+def _coerce_datetime(value: Any) -> Optional[datetime]:
+    if value.__class__ is str:
+        return datetime.fromisoformat(value) if value else None
+    return value
+
+
+def _coerce_optional(value: Any) -> Any:
+    return None if value == '' else value
+
+
+def _optional(convert: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    return lambda value: None if value is None or value == '' else convert(value)
+
+
+_COERCIONS: dict[type, Callable[[Any], Any]] = {
+    datetime: _coerce_datetime, date: _coerce_date, float: float, bool: bool
+}
+
+
+def _field_type(annotation: Any) -> tuple[Any, bool]:
+    """
+    Unwrap an Optional annotation of a model field.
+
+    @param annotation: Type annotation of the field.
+    @type annotation: Any
+
+    @return: Type of the field and whether it is optional.
+    @rtype: tuple[Any, bool]
+    """
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        arguments = [argument for argument in typing.get_args(annotation) if argument is not type(None)]
+        return arguments[0], True
+
+    return annotation, False
+
+
+class TableMapper(Generic[Model]):
+    """
+    Queries and statements of a table whose columns are the fields of a model, in order, starting with its integer
+    primary key id. The model is either a dataclass or, for faster hydration, a tuple-backed NamedTuple.
+
+    Rows are converted to models by a function compiled for the model. Typed columns are parsed by the driver on
+    connections opened with detect_types=sqlite3.PARSE_COLNAMES, and in Python otherwise. Optional fields read as
+    None where the database stores an empty string.
+    """
+
+    def __init__(self, table: str, model: type[Model], page_orders: tuple[str, ...] = ('id',)):
+        self.table = table
+        self.model = model
+        self.page_orders = page_orders
+
+        hints = typing.get_type_hints(model)
+        self.tuple_backed = issubclass(model, tuple)
+        self.columns: tuple[str, ...] = (
+            model._fields if self.tuple_backed else tuple(field.name for field in dataclasses.fields(model))
+        )
+
+        fields = [(column, *_field_type(hints[column])) for column in self.columns]
+
+        self.select = 'SELECT {} FROM {}'.format(', '.join(
+            f'{column} AS "{column} [{COLUMN_TYPES[type_]}]"' if type_ in COLUMN_TYPES else column
+            for column, type_, _optional_ in fields
+        ), table)
+        self.select_raw = f'SELECT {", ".join(self.columns)} FROM {table}'
+        self.create: Callable[[tuple], Model] = self._compile_create(fields)
+        self.row_factory: Callable[[sqlite3.Cursor, tuple], Model] = lambda _cursor, row: self.create(row)
+        self.parameters: Callable[[Model], tuple] = operator.attrgetter(*self.columns)
+
+        assignments = ', '.join(f'{column} = excluded.{column}' for column in self.columns if column != 'id')
+        placeholders = ', '.join('?' * len(self.columns))
+
+        self._insert = f'INSERT INTO {table} ({", ".join(self.columns)}) VALUES ({placeholders})'
+        self._update = 'UPDATE {} SET {} WHERE id = ?'.format(
+            table, ', '.join(f'{column} = ?' for column in self.columns if column != 'id')
+        )
+        self._upsert = f'{self._insert} ON CONFLICT(id) DO UPDATE SET {assignments}'
+
+    def _compile_create(self, fields: list[tuple[str, Any, bool]]) -> Callable[[tuple], Model]:
+        """
+        Compile the function creating a model from a row, converting only the columns that need it.
+
+        @param fields: Name, type and optionality of each column.
+        @type fields: list[tuple[str, Any, bool]]
+
+        @return: Function creating a model from a row.
+        @rtype: Callable[[tuple], Model]
+        """
+        namespace: dict[str, Any] = {'model': self.model, 'new': tuple.__new__}
+        arguments = []
+
+        for index, (column, type_, optional) in enumerate(fields):
+            convert = _COERCIONS.get(type_)
+
+            if optional and column != 'id' and type_ not in (date, datetime):
+                convert = _optional(convert) if convert is not None else _coerce_optional
+
+            if convert is None:
+                arguments.append(f'row[{index}]')
+            else:
+                namespace[f'convert_{index}'] = convert
+                arguments.append(f'convert_{index}(row[{index}])')
+
+        if self.tuple_backed:
+            body = f'new(model, ({", ".join(arguments)},))'
+        else:
+            body = f'model({", ".join(arguments)})'
+
+        exec(f'def create(row):\n    return {body}', namespace)
+        return namespace['create']
+
+    def _check_columns(self, *columns: str):
+        """
+        @raise ValueError: If any of the columns is not a column of the table.
+        """
+        for column in columns:
+            if column not in self.columns:
+                raise ValueError(f'{self.table} has no column {column!r}, expected one of {self.columns}.')
+
+    def get_all_ids(self, connection: sqlite3.Connection) -> set[int]:
+        cursor = connection.cursor()
+        ids: list[tuple[int]] = cursor.execute(f'SELECT id FROM {self.table}').fetchall()
+        cursor.close()
+
+        return {id_[0] for id_ in ids}
+
+    def get_by(self, connection: sqlite3.Connection, column: str, value: Any) -> Optional[Model]:
+        """
+        Get the first model whose column has a value.
+
+        @raise ValueError: If the column is not a column of the table.
+        """
+        self._check_columns(column)
+
+        cursor = connection.cursor()
+        row = cursor.execute(f'{self.select} WHERE {column} = ?', (value,)).fetchone()
+        cursor.close()
+
+        return None if row is None else self.create(row)
+
+    def get_by_id(self, connection: sqlite3.Connection, id_: int) -> Optional[Model]:
+        return self.get_by(connection, 'id', id_)
+
+    def get_by_ids(self, connection: sqlite3.Connection, ids: Iterable[int]) -> dict[int, Model]:
+        """Get the models with any of the IDs, keyed by ID, skipping the IDs that do not exist."""
+        ids = tuple(ids)
+
+        if not ids:
+            return {}
+
+        return {model.id: model for model in self.get_where(
+            connection, f'WHERE id IN ({", ".join("?" * len(ids))})', ids
+        )}
+
+    def get_where(self, connection: sqlite3.Connection, clause: str, parameters: Iterable[Any] = ()) -> list[Model]:
+        """
+        Get the models selected by the clause following the FROM of the query, such as WHERE, ORDER BY and LIMIT.
+        """
+        cursor = connection.cursor()
+        cursor.row_factory = self.row_factory
+        models = cursor.execute(f'{self.select} {clause}', tuple(parameters)).fetchall()
+        cursor.close()
+
+        return models
+
+    def iter_where(
+            self, connection: sqlite3.Connection, clause: str = '', parameters: Iterable[Any] = (),
+            batch_size: int = 500
+    ) -> Iterator[Model]:
+        """Iterate over the models selected by the clause, fetching them from the cursor in batches."""
+        cursor = connection.cursor()
+        cursor.row_factory = self.row_factory
+        cursor.execute(f'{self.select} {clause}', tuple(parameters))
+
+        try:
+            while models := cursor.fetchmany(batch_size):
+                yield from models
+        finally:
+            cursor.close()
+
+    def get_all(self, connection: sqlite3.Connection) -> set[Model]:
+        return set(self.get_where(connection, ''))
+
+    def iter_all(self, connection: sqlite3.Connection, batch_size: int = 500) -> Iterator[Model]:
+        return self.iter_where(connection, '', (), batch_size)
+
+    def page_statement(
+            self, after_id: Optional[int], limit: int, order_by: str, select: Optional[str] = None
+    ) -> tuple[str, tuple]:
+        """
+        Build the keyset pagination query of a page, continuing after the row with the given ID.
+
+        @raise ValueError: If the table cannot be paged by the column.
+        """
+        if order_by not in self.page_orders:
+            raise ValueError(f'Cannot order {self.table} by {order_by}, expected one of {self.page_orders}.')
+
+        select = select or self.select
+        ordering = 'id' if order_by == 'id' else f'{order_by}, id'
+
+        if after_id is None:
+            return f'{select} ORDER BY {ordering} LIMIT ?', (limit,)
+
+        if order_by == 'id':
+            return f'{select} WHERE id > ? ORDER BY id LIMIT ?', (after_id, limit)
+
+        return (
+            f'''{select} WHERE ({order_by}, id) > ((SELECT {order_by} FROM {self.table} WHERE id = ?), ?)
+            ORDER BY {ordering} LIMIT ?''',
+            (after_id, after_id, limit)
+        )
+
+    def get_page(
+            self, connection: sqlite3.Connection, after_id: Optional[int], limit: int, order_by: str
+    ) -> list[Model]:
+        cursor = connection.cursor()
+        cursor.row_factory = self.row_factory
+        models = cursor.execute(*self.page_statement(after_id, limit, order_by)).fetchall()
+        cursor.close()
+
+        return models
+
+    def get_page_view(
+            self, connection: sqlite3.Connection, after_id: Optional[int], limit: int, order_by: str
+    ) -> view.PageView:
+        return view.get_page_view(
+            connection, *self.page_statement(after_id, limit, order_by, self.select_raw), self.create
+        )
+
+    def get_all_with_fields(self, connection: sqlite3.Connection, *fields: str) -> list[dict[str, Any]]:
+        """
+        Get the values of some columns of every row, as stored.
+
+        @raise ValueError: If any of the fields is not a column of the table.
+        """
+        self._check_columns(*fields)
+
+        cursor = connection.cursor()
+        cursor.row_factory = lambda _cursor, row: dict(zip(fields, row))
+        data = cursor.execute(f'SELECT {", ".join(fields)} FROM {self.table}').fetchall()
+        cursor.close()
+
+        return data
+
+    def insert(self, connection: sqlite3.Connection, model: Model) -> int:
+        cursor = connection.cursor()
+        cursor.execute(self._insert, self.parameters(model))
+        id_ = cursor.lastrowid
+        cursor.close()
+
+        return id_
+
+    def update(self, connection: sqlite3.Connection, model: Model):
+        parameters = self.parameters(model)
+
+        cursor = connection.cursor()
+        cursor.execute(self._update, parameters[1:] + parameters[:1])
+        cursor.close()
+
+    def upsert(self, connection: sqlite3.Connection, model: Model) -> bool:
+        """
+        Insert the model, or update it in place if its ID already exists. The ID is looked up inside a write
+        transaction, begun immediately if none is open and left open for the caller to commit, so that no other writer
+        can create or delete the row between the lookup and the write.
+
+        @return: True if a new row was created, False if an existing one was updated.
+        """
+        if model.id is None:
+            self.insert(connection, model)
+            return True
+
+        cursor = connection.cursor()
+
+        if not connection.in_transaction:
+            cursor.execute('BEGIN IMMEDIATE')
+
+        exists = cursor.execute(f'SELECT 1 FROM {self.table} WHERE id = ?', (model.id,)).fetchone() is not None
+        cursor.execute(self._upsert, self.parameters(model))
+        cursor.close()
+
+        return not exists
+
+    def upsert_many(self, connection: sqlite3.Connection, models: Iterable[Model]):
+        cursor = connection.cursor()
+        cursor.executemany(self._upsert, map(self.parameters, models))
+        cursor.close()
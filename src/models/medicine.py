@@ -2,13 +2,18 @@
 import sqlite3
 from dataclasses import dataclass
 from datetime import date, timedelta
-from typing import Optional, Any
+from typing import Optional, Any, Iterator, Iterable
+
+from src.models import mapper, view
+
+
+PAGE_ORDERS = ('id', 'name', 'expiry_date')
 
 
 @dataclass(frozen=True, slots=True)
 class Medicine:
     """Medicine model."""
-    id: int
+    id: Optional[int]
     name: str
     manufacturer_id: int
     cost_price: float
@@ -40,28 +45,7 @@ class Medicine:
         return self.expiry_date - date.today()
 
 
-def _create_medicine(raw_data: tuple) -> Medicine:
-    """
-    Create a medicine object from a record returned from the database.
-
-    @param raw_data: Data returned from the database from the medicine table.
-    @type raw_data: tuple
-
-    @return: Medicine object from the database.
-    @rtype: Medicine
-    """
-    return Medicine(
-        id=raw_data[0],
-        name=raw_data[1],
-        manufacturer_id=raw_data[2],
-        cost_price=float(raw_data[3]),
-        sale_price=float(raw_data[4]),
-        potency=None if raw_data[5] == '' else raw_data[5],
-        quantity_per_unit=raw_data[6],
-        manufacturing_date=date.fromisoformat(raw_data[7]),
-        purchase_date=date.fromisoformat(raw_data[8]),
-        expiry_date=date.fromisoformat(raw_data[9])
-    )
+_MAPPER = mapper.TableMapper('medicine', Medicine, PAGE_ORDERS)
 
 
 def get_all_ids(connection: sqlite3.Connection) -> set[int]:
@@ -74,11 +58,7 @@ def get_all_ids(connection: sqlite3.Connection) -> set[int]:
     @return: Set of all the IDs of the medicines in the database.
     @rtype: set[int]
     """
-    cursor = connection.cursor()
-    ids: list[tuple[int]] = cursor.execute('SELECT id FROM medicine').fetchall()
-    cursor.close()
-
-    return {id_[0] for id_ in ids}
+    return _MAPPER.get_all_ids(connection)
 
 
 def get_by_id(connection: sqlite3.Connection, medicine_id: int) -> Optional[Medicine]:
@@ -93,14 +73,22 @@ def get_by_id(connection: sqlite3.Connection, medicine_id: int) -> Optional[Medi
     @return: Medicine in the database, or None if the customer does not exist.
     @rtype: Optional[Medicine]
     """
-    cursor = connection.cursor()
-    medicine_raw = cursor.execute('SELECT * FROM medicine WHERE id = ?', (medicine_id,)).fetchone()
-    cursor.close()
+    return _MAPPER.get_by_id(connection, medicine_id)
 
-    if medicine_raw is None:
-        return None
 
-    return _create_medicine(medicine_raw)
+def get_by_ids(connection: sqlite3.Connection, medicine_ids: Iterable[int]) -> dict[int, Medicine]:
+    """
+    Get the medicines with any of the given IDs in a single query.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param medicine_ids: Medicine IDs.
+    @type medicine_ids: Iterable[int]
+
+    @return: Medicines in the database keyed by ID, without the IDs that do not exist.
+    @rtype: dict[int, Medicine]
+    """
+    return _MAPPER.get_by_ids(connection, medicine_ids)
 
 
 def get_all(connection: sqlite3.Connection) -> set[Medicine]:
@@ -113,60 +101,168 @@ def get_all(connection: sqlite3.Connection) -> set[Medicine]:
     @return: Set of all the medicines in the database.
     @rtype: set[Medicine]
     """
-    medicines = set()
+    return _MAPPER.get_all(connection)
 
-    cursor = connection.cursor()
-    medicines_raw = cursor.execute('SELECT * FROM medicine').fetchall()
-    cursor.close()
 
-    for medicine in medicines_raw:
-        medicines.add(_create_medicine(medicine))
+def iter_all(connection: sqlite3.Connection, batch_size: int = 500) -> Iterator[Medicine]:
+    """
+    Iterate over all the medicines in the database, fetching them from the cursor in batches.
 
-    return medicines
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param batch_size: Number of records fetched from the database at a time.
+    @type batch_size: int
 
+    @return: Iterator over all the medicines in the database.
+    @rtype: Iterator[Medicine]
+    """
+    return _MAPPER.iter_all(connection, batch_size)
 
-def get_all_with_fields(connection: sqlite3.Connection, *fields: str) -> list[dict[str, Any]]:
-    data = []
-    column_names = ', '.join(fields)
 
-    cursor = connection.cursor()
-    medicines_raw = cursor.execute(f'SELECT {column_names} FROM medicine').fetchall()
-    cursor.close()
+def get_page(
+        connection: sqlite3.Connection, after_id: Optional[int] = None, limit: int = 50, order_by: str = 'id'
+) -> list[Medicine]:
+    """
+    Get a page of medicines using keyset pagination, continuing after the medicine with the given ID.
 
-    for medicine in medicines_raw:
-        dictionary = dict()
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param after_id: ID of the last medicine of the previous page, or None for the first page.
+    @type after_id: Optional[int]
+    @param limit: Maximum number of medicines in the page.
+    @type limit: int
+    @param order_by: Indexed column to order the medicines by, one of PAGE_ORDERS.
+    @type order_by: str
+
+    @return: List of the medicines in the page.
+    @rtype: list[Medicine]
+
+    @raise ValueError: If the medicines cannot be ordered by the column.
+    """
+    return _MAPPER.get_page(connection, after_id, limit, order_by)
+
+
+def get_page_view(
+        connection: sqlite3.Connection, after_id: Optional[int] = None, limit: int = 50, order_by: str = 'id'
+) -> view.PageView:
+    """
+    Get a page of medicines as both models and JSON records, from a single query.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param after_id: ID of the last medicine of the previous page, or None for the first page.
+    @type after_id: Optional[int]
+    @param limit: Maximum number of medicines in the page.
+    @type limit: int
+    @param order_by: Indexed column to order the medicines by, one of PAGE_ORDERS.
+    @type order_by: str
+
+    @return: Medicines of the page and their JSON encoding.
+    @rtype: view.PageView
 
-        for idx, field in enumerate(fields):
-            dictionary[field] = medicine[idx]
+    @raise ValueError: If the medicines cannot be ordered by the column.
+    """
+    return _MAPPER.get_page_view(connection, after_id, limit, order_by)
 
-        data.append(dictionary)
 
-    return data
+def get_expiring(connection: sqlite3.Connection, within_days: int, limit: Optional[int] = 50) -> list[Medicine]:
+    """
+    Get the unexpired medicines that expire within a number of days from today, soonest first.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param within_days: Number of days from today to look ahead.
+    @type within_days: int
+    @param limit: Maximum number of medicines, or None for all of them.
+    @type limit: Optional[int]
 
+    @return: List of the expiring medicines.
+    @rtype: list[Medicine]
+    """
+    today = date.today()
 
-def insert(connection: sqlite3.Connection, medicine: Medicine):
-    cursor = connection.cursor()
-    cursor.execute(
-        'INSERT INTO medicine VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
-        (
-            medicine.id, medicine.name, medicine.manufacturer_id, medicine.cost_price, medicine.sale_price,
-            medicine.potency, medicine.quantity_per_unit, medicine.manufacturing_date, medicine.purchase_date,
-            medicine.expiry_date
-        )
+    return _MAPPER.get_where(
+        connection, 'WHERE expiry_date BETWEEN ? AND ? ORDER BY expiry_date, id LIMIT ?',
+        (today, today + timedelta(days=within_days), -1 if limit is None else limit)
     )
-    cursor.close()
 
 
-def update(connection: sqlite3.Connection, medicine: Medicine):
-    cursor = connection.cursor()
-    cursor.execute(
-        '''UPDATE medicine
-        SET name = ?, manufacturer_id = ?, cost_price = ?, sale_price = ?, potency = ?, quantity_per_unit = ?, 
-        manufacturing_date = ?, purchase_date = ?, expiry_date = ? WHERE id = ?''',
-        (
-            medicine.name, medicine.manufacturer_id, medicine.cost_price, medicine.sale_price, medicine.potency,
-            medicine.quantity_per_unit, medicine.manufacturing_date, medicine.purchase_date, medicine.expiry_date,
-            medicine.id
-        )
+def get_expired(connection: sqlite3.Connection, limit: Optional[int] = 50) -> list[Medicine]:
+    """
+    Get the medicines that have already expired, most recently expired first.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param limit: Maximum number of medicines, or None for all of them.
+    @type limit: Optional[int]
+
+    @return: List of the expired medicines.
+    @rtype: list[Medicine]
+    """
+    return _MAPPER.get_where(
+        connection, 'WHERE expiry_date < ? ORDER BY expiry_date DESC, id DESC LIMIT ?',
+        (date.today(), -1 if limit is None else limit)
     )
-    cursor.close()
+
+
+def get_all_with_fields(connection: sqlite3.Connection, *fields: str) -> list[dict[str, Any]]:
+    """
+    Get some of the fields of all the medicines in the database, as stored.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param fields: Names of the columns to get.
+    @type fields: str
+
+    @return: List of dictionaries mapping each field to its value, one per medicine.
+    @rtype: list[dict[str, Any]]
+
+    @raise ValueError: If any of the fields is not a column of the medicine table.
+    """
+    return _MAPPER.get_all_with_fields(connection, *fields)
+
+
+def insert(connection: sqlite3.Connection, medicine: Medicine) -> int:
+    """
+    Insert the medicine, letting the database assign its ID if the medicine does not have one.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param medicine: Medicine to insert.
+    @type medicine: Medicine
+
+    @return: ID of the inserted medicine.
+    @rtype: int
+    """
+    return _MAPPER.insert(connection, medicine)
+
+
+def update(connection: sqlite3.Connection, medicine: Medicine):
+    _MAPPER.update(connection, medicine)
+
+
+def upsert(connection: sqlite3.Connection, medicine: Medicine) -> bool:
+    """
+    Insert the medicine, or update it in place if its ID already exists.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param medicine: Medicine to write, with a server-assigned ID if its ID is None.
+    @type medicine: Medicine
+
+    @return: True if a new medicine was created, False if an existing one was updated.
+    @rtype: bool
+    """
+    return _MAPPER.upsert(connection, medicine)
+
+
+def upsert_many(connection: sqlite3.Connection, medicines: Iterable[Medicine]):
+    """
+    Insert or update many medicines with a single prepared statement.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param medicines: Medicines to write, with server-assigned IDs for those whose ID is None.
+    @type medicines: Iterable[Medicine]
+    """
+    _MAPPER.upsert_many(connection, medicines)
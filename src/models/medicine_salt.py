@@ -0,0 +1,196 @@
+"""Salt composition of the medicines, stored as salt to medicine postings, and the generic substitute lookup."""
+import sqlite3
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable
+
+from src.models import medicine as medicine_model
+
+# The primary key clusters the postings of each salt together, and the second index covers the composition of
+# each medicine, so neither lookup reads the rows of another table.
+TABLE = '''
+    CREATE TABLE IF NOT EXISTS medicine_salt (
+        salt_id INTEGER NOT NULL REFERENCES salt (id),
+        medicine_id INTEGER NOT NULL REFERENCES medicine (id),
+        PRIMARY KEY (salt_id, medicine_id)
+    ) WITHOUT ROWID;
+
+    CREATE UNIQUE INDEX IF NOT EXISTS medicine_salt_medicine_index ON medicine_salt (medicine_id, salt_id);
+
+    CREATE TRIGGER IF NOT EXISTS medicine_salt_check BEFORE INSERT ON medicine_salt BEGIN
+        SELECT RAISE(ABORT, 'medicine does not exist')
+        WHERE NOT EXISTS (SELECT 1 FROM medicine WHERE id = new.medicine_id);
+        SELECT RAISE(ABORT, 'salt does not exist')
+        WHERE NOT EXISTS (SELECT 1 FROM salt WHERE id = new.salt_id);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS medicine_salt_medicine_delete AFTER DELETE ON medicine BEGIN
+        DELETE FROM medicine_salt WHERE medicine_id = old.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS medicine_salt_salt_delete AFTER DELETE ON salt BEGIN
+        DELETE FROM medicine_salt WHERE salt_id = old.id;
+    END;
+'''
+
+
+@dataclass(frozen=True, slots=True)
+class MedicineSalt:
+    """Salt contained in a medicine."""
+    medicine_id: int
+    salt_id: int
+
+
+@dataclass(frozen=True, slots=True)
+class Substitute:
+    """Medicine sharing salts with another one, with the overlap of their compositions."""
+    medicine: medicine_model.Medicine
+    shared_salts: int
+    overlap: float
+
+
+def create_schema(connection: sqlite3.Connection):
+    """
+    Create the composition table, its indexes and the triggers keeping it consistent with the medicines and salts.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    """
+    connection.executescript(TABLE)
+
+
+def get_salt_ids(connection: sqlite3.Connection, medicine_id: int) -> list[int]:
+    """
+    Get the salts contained in a medicine.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param medicine_id: Medicine ID.
+    @type medicine_id: int
+
+    @return: IDs of the salts of the medicine, in ascending order.
+    @rtype: list[int]
+    """
+    cursor = connection.cursor()
+    salt_ids = cursor.execute(
+        'SELECT salt_id FROM medicine_salt WHERE medicine_id = ? ORDER BY salt_id', (medicine_id,)
+    ).fetchall()
+    cursor.close()
+
+    return [salt_id for salt_id, in salt_ids]
+
+
+def get_medicine_ids(connection: sqlite3.Connection, salt_id: int) -> list[int]:
+    """
+    Get the medicines containing a salt.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param salt_id: Salt ID.
+    @type salt_id: int
+
+    @return: IDs of the medicines containing the salt, in ascending order.
+    @rtype: list[int]
+    """
+    cursor = connection.cursor()
+    medicine_ids = cursor.execute(
+        'SELECT medicine_id FROM medicine_salt WHERE salt_id = ? ORDER BY medicine_id', (salt_id,)
+    ).fetchall()
+    cursor.close()
+
+    return [medicine_id for medicine_id, in medicine_ids]
+
+
+def set_salts(connection: sqlite3.Connection, medicine_id: int, salt_ids: Iterable[int]):
+    """
+    Replace the composition of a medicine.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param medicine_id: Medicine ID.
+    @type medicine_id: int
+    @param salt_ids: IDs of the salts the medicine contains.
+    @type salt_ids: Iterable[int]
+
+    @raise sqlite3.IntegrityError: If the medicine or any of the salts does not exist.
+    """
+    cursor = connection.cursor()
+    cursor.execute('DELETE FROM medicine_salt WHERE medicine_id = ?', (medicine_id,))
+    cursor.executemany(
+        'INSERT OR IGNORE INTO medicine_salt (salt_id, medicine_id) VALUES (?, ?)',
+        ((salt_id, medicine_id) for salt_id in salt_ids)
+    )
+    cursor.close()
+
+
+def upsert_many(connection: sqlite3.Connection, medicine_salts: Iterable[MedicineSalt]):
+    """
+    Add many salts to the compositions of their medicines, ignoring those already recorded.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param medicine_salts: Salts contained in medicines.
+    @type medicine_salts: Iterable[MedicineSalt]
+
+    @raise sqlite3.IntegrityError: If any of the medicines or salts does not exist.
+    """
+    cursor = connection.cursor()
+    cursor.executemany(
+        'INSERT OR IGNORE INTO medicine_salt (salt_id, medicine_id) VALUES (?, ?)',
+        ((medicine_salt.salt_id, medicine_salt.medicine_id) for medicine_salt in medicine_salts)
+    )
+    cursor.close()
+
+
+def find_substitutes(
+        connection: sqlite3.Connection, medicine_id: int, limit: int = 10, include_expired: bool = False
+) -> list[Substitute]:
+    """
+    Find the medicines that can replace a medicine, walking the postings of its salts only. The medicines are ranked
+    by the overlap of their compositions, the number of shared salts divided by the number of salts in either, then
+    by how close their potency is, then by price.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param medicine_id: ID of the medicine to replace.
+    @type medicine_id: int
+    @param limit: Maximum number of substitutes.
+    @type limit: int
+    @param include_expired: Whether to also suggest expired medicines.
+    @type include_expired: bool
+
+    @return: Best substitutes first, or an empty list if the medicine has no recorded composition.
+    @rtype: list[Substitute]
+    """
+    cursor = connection.cursor()
+    ranking = cursor.execute(
+        '''
+        WITH target (salt_id) AS (SELECT salt_id FROM medicine_salt WHERE medicine_id = :medicine_id),
+        candidate (medicine_id, shared_salts) AS (
+            SELECT postings.medicine_id, COUNT(*)
+            FROM target JOIN medicine_salt AS postings ON postings.salt_id = target.salt_id
+            WHERE postings.medicine_id != :medicine_id
+            GROUP BY postings.medicine_id
+        )
+        SELECT candidate.medicine_id, candidate.shared_salts, candidate.shared_salts * 1.0 / (
+            (SELECT COUNT(*) FROM medicine_salt WHERE medicine_id = candidate.medicine_id)
+            + (SELECT COUNT(*) FROM target) - candidate.shared_salts
+        ) AS overlap
+        FROM candidate JOIN medicine ON medicine.id = candidate.medicine_id
+        WHERE :include_expired OR medicine.expiry_date >= :today
+        ORDER BY overlap DESC,
+            NULLIF(medicine.potency, '') IS NULL,
+            ABS(medicine.potency - (SELECT NULLIF(potency, '') FROM medicine WHERE id = :medicine_id)),
+            medicine.sale_price, medicine.id
+        LIMIT :limit
+        ''',
+        {'medicine_id': medicine_id, 'include_expired': include_expired, 'today': date.today(), 'limit': limit}
+    ).fetchall()
+    cursor.close()
+
+    medicines = medicine_model.get_by_ids(connection, (candidate_id for candidate_id, _, _ in ranking))
+
+    return [
+        Substitute(medicines[candidate_id], shared_salts, overlap)
+        for candidate_id, shared_salts, overlap in ranking
+    ]
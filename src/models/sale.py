@@ -2,15 +2,19 @@
 import sqlite3
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Any
+from typing import Optional, Any, Iterable, Iterator
 
-from models import employee, customer
+from src.models import employee, customer, identity_map, mapper, view
+
+
+PAGE_ORDERS = ('id', 'date_time')
+RELATIONS = ('employee', 'customer')
 
 
 @dataclass(frozen=True, slots=True)
 class Sale:
     """Sale model."""
-    id: int
+    id: Optional[int]
     date_time: datetime
     employee_id: int
     customer_id: int
@@ -41,23 +45,21 @@ class Sale:
         return customer.get_by_id(connection, self.customer_id)
 
 
-def _create_sale(raw_data: tuple) -> Sale:
-    """
-    Create a sale object from a record returned from the database.
+@dataclass(frozen=True, slots=True)
+class RelatedSale:
+    """Sale with the projections of the employee and the customer it references, where they were loaded."""
+    sale: Sale
+    employee: Optional[employee.EmployeeSummary]
+    customer: Optional[customer.CustomerSummary]
 
-    @param raw_data: Data from the database from the sale table.
-    @type raw_data: tuple
 
-    @return: Sale object from the database.
-    @rtype: Sale
-    """
-    return Sale(
-        id=raw_data[0],
-        date_time=datetime.fromisoformat(raw_data[1]),
-        employee_id=raw_data[2],
-        customer_id=raw_data[3],
-        amount=float(raw_data[4])
-    )
+_MAPPER = mapper.TableMapper('sale', Sale, PAGE_ORDERS)
+
+# Foreign key and the function loading the projections of each relation, keyed by ID.
+_RELATION_LOADERS = {
+    'employee': ('employee_id', employee.EmployeeSummary, employee.get_summaries),
+    'customer': ('customer_id', customer.CustomerSummary, customer.get_summaries)
+}
 
 
 def get_all_ids(connection: sqlite3.Connection) -> set[int]:
@@ -70,11 +72,7 @@ def get_all_ids(connection: sqlite3.Connection) -> set[int]:
     @return: Set of all the IDs of the sales in the database.
     @rtype: set[int]
     """
-    cursor = connection.cursor()
-    ids: list[tuple[int]] = cursor.execute('SELECT id FROM sale').fetchall()
-    cursor.close()
-
-    return {id_[0] for id_ in ids}
+    return _MAPPER.get_all_ids(connection)
 
 
 def get_by_id(connection: sqlite3.Connection, sale_id: int) -> Optional[Sale]:
@@ -89,14 +87,94 @@ def get_by_id(connection: sqlite3.Connection, sale_id: int) -> Optional[Sale]:
     @return: Sale in the database, or None if the sale does not exist.
     @rtype: Optional[Sale]
     """
-    cursor = connection.cursor()
-    sale_raw = cursor.execute('SELECT * FROM sale WHERE id = ?', (sale_id,)).fetchone()
-    cursor.close()
+    return _MAPPER.get_by_id(connection, sale_id)
+
+
+def get_by_ids(connection: sqlite3.Connection, sale_ids: Iterable[int]) -> dict[int, Sale]:
+    """
+    Get the sales with any of the given IDs in a single query.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param sale_ids: Sale IDs.
+    @type sale_ids: Iterable[int]
+
+    @return: Sales in the database keyed by ID, without the IDs that do not exist.
+    @rtype: dict[int, Sale]
+    """
+    return _MAPPER.get_by_ids(connection, sale_ids)
+
+
+def load_related(
+        connection: sqlite3.Connection, sales: Iterable[Sale], include: tuple[str, ...] = RELATIONS,
+        identities: Optional[identity_map.IdentityMap] = None
+) -> list[RelatedSale]:
+    """
+    Attach the projections of the related employees and customers to sales, with one query per relation for all the
+    sales instead of one per sale.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param sales: Sales to attach the related models to.
+    @type sales: Iterable[Sale]
+    @param include: Relations to load, any of RELATIONS.
+    @type include: tuple[str, ...]
+    @param identities: Identity map of the unit of work, so that the models it already holds are not loaded again.
+    @type identities: Optional[identity_map.IdentityMap]
+
+    @return: Sales in the same order, with the requested relations loaded.
+    @rtype: list[RelatedSale]
+
+    @raise ValueError: If any of the relations is not a relation of the sale.
+    """
+    for relation in include:
+        if relation not in _RELATION_LOADERS:
+            raise ValueError(f'sale has no relation {relation!r}, expected one of {RELATIONS}.')
+
+    sales = list(sales)
+    identities = identities if identities is not None else identity_map.IdentityMap()
+    related: dict[str, dict[int, Any]] = {relation: {} for relation in RELATIONS}
+
+    for relation in include:
+        foreign_key, projection, load = _RELATION_LOADERS[relation]
+        related[relation] = identities.get_many(
+            projection, (getattr(sale, foreign_key) for sale in sales), lambda ids, load=load: load(connection, ids)
+        )
+
+    return [
+        RelatedSale(sale, related['employee'].get(sale.employee_id), related['customer'].get(sale.customer_id))
+        for sale in sales
+    ]
+
+
+def get_many_with_related(
+        connection: sqlite3.Connection, sale_ids: Iterable[int], include: tuple[str, ...] = RELATIONS,
+        identities: Optional[identity_map.IdentityMap] = None
+) -> list[RelatedSale]:
+    """
+    Get the sales with any of the given IDs along with the projections of their related employees and customers, in
+    one query for the sales and one per relation.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param sale_ids: Sale IDs.
+    @type sale_ids: Iterable[int]
+    @param include: Relations to load, any of RELATIONS.
+    @type include: tuple[str, ...]
+    @param identities: Identity map of the unit of work, so that the models it already holds are not loaded again.
+    @type identities: Optional[identity_map.IdentityMap]
+
+    @return: Sales in the order of their IDs, without the IDs that do not exist, with the relations loaded.
+    @rtype: list[RelatedSale]
+
+    @raise ValueError: If any of the relations is not a relation of the sale.
+    """
+    sale_ids = tuple(sale_ids)
+    sales = get_by_ids(connection, sale_ids)
 
-    if sale_raw is None:
-        return None
+    ordered = [sales[id_] for id_ in dict.fromkeys(sale_ids) if id_ in sales]
 
-    return _create_sale(sale_raw)
+    return load_related(connection, ordered, include, identities)
 
 
 def get_all(connection: sqlite3.Connection) -> set[Sale]:
@@ -109,50 +187,155 @@ def get_all(connection: sqlite3.Connection) -> set[Sale]:
     @return: Set of all the sales in the database.
     @rtype: set[Sale]
     """
-    sales = set()
+    return _MAPPER.get_all(connection)
+
+
+def iter_all(connection: sqlite3.Connection, batch_size: int = 500) -> Iterator[Sale]:
+    """
+    Iterate over all the sales in the database, fetching them from the cursor in batches.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param batch_size: Number of records fetched from the database at a time.
+    @type batch_size: int
+
+    @return: Iterator over all the sales in the database.
+    @rtype: Iterator[Sale]
+    """
+    return _MAPPER.iter_all(connection, batch_size)
+
+
+def get_page(
+        connection: sqlite3.Connection, after_id: Optional[int] = None, limit: int = 50, order_by: str = 'id'
+) -> list[Sale]:
+    """
+    Get a page of sales using keyset pagination, continuing after the sale with the given ID.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param after_id: ID of the last sale of the previous page, or None for the first page.
+    @type after_id: Optional[int]
+    @param limit: Maximum number of sales in the page.
+    @type limit: int
+    @param order_by: Indexed column to order the sales by, one of PAGE_ORDERS.
+    @type order_by: str
+
+    @return: List of the sales in the page.
+    @rtype: list[Sale]
+
+    @raise ValueError: If the sales cannot be ordered by the column.
+    """
+    return _MAPPER.get_page(connection, after_id, limit, order_by)
+
+
+def get_page_view(
+        connection: sqlite3.Connection, after_id: Optional[int] = None, limit: int = 50, order_by: str = 'id'
+) -> view.PageView:
+    """
+    Get a page of sales as both models and JSON records, from a single query.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param after_id: ID of the last sale of the previous page, or None for the first page.
+    @type after_id: Optional[int]
+    @param limit: Maximum number of sales in the page.
+    @type limit: int
+    @param order_by: Indexed column to order the sales by, one of PAGE_ORDERS.
+    @type order_by: str
+
+    @return: Sales of the page and their JSON encoding.
+    @rtype: view.PageView
+
+    @raise ValueError: If the sales cannot be ordered by the column.
+    """
+    return _MAPPER.get_page_view(connection, after_id, limit, order_by)
+
+
+def iter_filtered(
+        connection: sqlite3.Connection, since: Optional[datetime] = None, until: Optional[datetime] = None,
+        employee_id: Optional[int] = None, customer_id: Optional[int] = None, batch_size: int = 500
+) -> Iterator[Sale]:
+    """
+    Iterate over the sales matching the filters in chronological order, fetching them from the cursor in batches.
 
-    cursor = connection.cursor()
-    sales_raw = cursor.execute('SELECT * FROM sale').fetchall()
-    cursor.close()
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param since: Earliest date and time of the sales, inclusive.
+    @type since: Optional[datetime]
+    @param until: Latest date and time of the sales, exclusive.
+    @type until: Optional[datetime]
+    @param employee_id: ID of the employee who made the sales.
+    @type employee_id: Optional[int]
+    @param customer_id: ID of the customer who made the purchases.
+    @type customer_id: Optional[int]
+    @param batch_size: Number of records fetched from the database at a time.
+    @type batch_size: int
+
+    @return: Iterator over the matching sales.
+    @rtype: Iterator[Sale]
+    """
+    conditions = []
+    parameters = []
 
-    for sale in sales_raw:
-        sales.add(_create_sale(sale))
+    for condition, parameter in (
+            ('date_time >= ?', since), ('date_time < ?', until),
+            ('employee_id = ?', employee_id), ('customer_id = ?', customer_id)
+    ):
+        if parameter is not None:
+            conditions.append(condition)
+            parameters.append(parameter)
 
-    return sales
+    where = f'WHERE {" AND ".join(conditions)} ' if conditions else ''
+
+    return _MAPPER.iter_where(connection, f'{where}ORDER BY date_time, id', parameters, batch_size)
 
 
 def get_all_with_fields(connection: sqlite3.Connection, *fields: str) -> list[dict[str, Any]]:
-    data = []
-    column_names = ', '.join(fields)
+    """
+    Get some of the fields of all the sales in the database, as stored.
 
-    cursor = connection.cursor()
-    sales_raw = cursor.execute(f'SELECT {column_names} FROM sale').fetchall()
-    cursor.close()
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param fields: Names of the columns to get.
+    @type fields: str
 
-    for sale in sales_raw:
-        dictionary = dict()
+    @return: List of dictionaries mapping each field to its value, one per sale.
+    @rtype: list[dict[str, Any]]
 
-        for idx, field in enumerate(fields):
-            dictionary[field] = sale[idx]
+    @raise ValueError: If any of the fields is not a column of the sale table.
+    """
+    return _MAPPER.get_all_with_fields(connection, *fields)
 
-        data.append(dictionary)
 
-    return data
+def insert(connection: sqlite3.Connection, sale: Sale) -> int:
+    """
+    Insert the sale, letting the database assign its ID if the sale does not have one.
 
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param sale: Sale to insert.
+    @type sale: Sale
 
-def insert(connection: sqlite3.Connection, sale: Sale):
-    cursor = connection.cursor()
-    cursor.execute(
-        'INSERT INTO sale VALUES (?, ?, ?, ?, ?)',
-        (sale.id, sale.date_time, sale.employee_id, sale.customer_id, sale.amount)
-    )
-    cursor.close()
+    @return: ID of the inserted sale.
+    @rtype: int
+    """
+    return _MAPPER.insert(connection, sale)
 
 
 def update(connection: sqlite3.Connection, sale: Sale):
-    cursor = connection.cursor()
-    cursor.execute(
-        'UPDATE sale SET date_time = ?, employee_id = ?, customer_id = ?, amount = ? WHERE id = ?',
-        (sale.date_time, sale.employee_id, sale.customer_id, sale.amount, sale.id)
-    )
-    cursor.close()
+    _MAPPER.update(connection, sale)
+
+
+def upsert(connection: sqlite3.Connection, sale: Sale) -> bool:
+    """
+    Insert the sale, or update it in place if its ID already exists.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param sale: Sale to write, with a server-assigned ID if its ID is None.
+    @type sale: Sale
+
+    @return: True if a new sale was created, False if an existing one was updated.
+    @rtype: bool
+    """
+    return _MAPPER.upsert(connection, sale)
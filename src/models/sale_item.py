@@ -0,0 +1,88 @@
+"""Sale item model holding the medicines sold in each sale, and related functions to query the database."""
+import sqlite3
+from dataclasses import dataclass
+from typing import Iterable
+
+TABLE = '''
+    CREATE TABLE IF NOT EXISTS sale_item (
+        sale_id INTEGER NOT NULL REFERENCES sale (id),
+        medicine_id INTEGER NOT NULL REFERENCES medicine (id),
+        quantity INTEGER NOT NULL CHECK (quantity > 0),
+        unit_price DECIMAL NOT NULL,
+        PRIMARY KEY (sale_id, medicine_id)
+    ) WITHOUT ROWID;
+
+    CREATE INDEX IF NOT EXISTS sale_item_medicine_index ON sale_item (medicine_id, sale_id);
+
+    CREATE TRIGGER IF NOT EXISTS sale_item_sale_delete AFTER DELETE ON sale BEGIN
+        DELETE FROM sale_item WHERE sale_id = old.id;
+    END;
+'''
+
+
+@dataclass(frozen=True, slots=True)
+class SaleItem:
+    """Units of a medicine sold in a sale, at the price charged for each."""
+    sale_id: int
+    medicine_id: int
+    quantity: int
+    unit_price: float
+
+    @property
+    def total(self) -> float:
+        """
+        Calculate the amount charged for the item.
+
+        @return: Quantity times the unit price.
+        @rtype: float
+        """
+        return self.quantity * self.unit_price
+
+
+def create_schema(connection: sqlite3.Connection):
+    """
+    Create the sale item table if it does not exist.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    """
+    connection.executescript(TABLE)
+
+
+def get_by_sale(connection: sqlite3.Connection, sale_id: int) -> list[SaleItem]:
+    """
+    Get the items of a sale.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param sale_id: Sale ID.
+    @type sale_id: int
+
+    @return: Items of the sale, ordered by medicine ID.
+    @rtype: list[SaleItem]
+    """
+    cursor = connection.cursor()
+    items_raw = cursor.execute(
+        'SELECT sale_id, medicine_id, quantity, unit_price FROM sale_item WHERE sale_id = ? ORDER BY medicine_id',
+        (sale_id,)
+    ).fetchall()
+    cursor.close()
+
+    return [SaleItem(*item_raw[:3], float(item_raw[3])) for item_raw in items_raw]
+
+
+def insert_many(connection: sqlite3.Connection, items: Iterable[SaleItem]):
+    """
+    Insert many sale items with a single prepared statement.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param items: Items to insert.
+    @type items: Iterable[SaleItem]
+    """
+    cursor = connection.cursor()
+    cursor.executemany(
+        'INSERT INTO sale_item VALUES (?, ?, ?, ?)',
+        ((item.sale_id, item.medicine_id, item.quantity, item.unit_price) for item in items)
+    )
+    cursor.close()
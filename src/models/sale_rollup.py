@@ -0,0 +1,208 @@
+"""Sale rollup model holding daily and monthly sales totals, maintained incrementally by triggers."""
+import sqlite3
+from dataclasses import dataclass
+from typing import Optional
+
+GRANULARITIES = {'day': 10, 'month': 7}
+DIMENSIONS = {'total': '0', 'employee': 'employee_id', 'customer': 'customer_id'}
+
+TABLE = '''
+    CREATE TABLE IF NOT EXISTS sale_rollup (
+        granularity TEXT NOT NULL,
+        period TEXT NOT NULL,
+        dimension TEXT NOT NULL,
+        dimension_id INTEGER NOT NULL,
+        revenue REAL NOT NULL,
+        sale_count INTEGER NOT NULL,
+        PRIMARY KEY (granularity, dimension, dimension_id, period)
+    ) WITHOUT ROWID;
+
+    CREATE INDEX IF NOT EXISTS sale_rollup_period_index ON sale_rollup (granularity, dimension, period);
+'''
+
+
+@dataclass(frozen=True, slots=True)
+class SaleRollup:
+    """Sales of the whole shop, an employee or a customer over a day, a month or a range of them."""
+    period: str
+    dimension: str
+    dimension_id: int
+    revenue: float
+    sale_count: int
+
+    @property
+    def average_ticket(self) -> float:
+        """
+        Calculate the average amount of a sale.
+
+        @return: Average amount of a sale, or zero if there were no sales.
+        @rtype: float
+        """
+        return self.revenue / self.sale_count if self.sale_count else 0.0
+
+
+def _apply_statements(row: str, sign: str) -> str:
+    """
+    Generate the statements adding a sale to, or removing it from, every rollup it belongs to. Rollups left without
+    any sales are deleted.
+
+    @param row: Trigger row of the sale, either new or old.
+    @type row: str
+    @param sign: '+' to add the sale and '-' to remove it.
+    @type sign: str
+
+    @return: SQL statements for use in a trigger body.
+    @rtype: str
+    """
+    statements = []
+
+    for granularity, length in GRANULARITIES.items():
+        for dimension, column in DIMENSIONS.items():
+            dimension_id = column if column == '0' else f'{row}.{column}'
+
+            statements.append(
+                f'''INSERT INTO sale_rollup VALUES (
+                    '{granularity}', substr({row}.date_time, 1, {length}), '{dimension}', {dimension_id},
+                    {sign}{row}.amount, {sign}1
+                ) ON CONFLICT DO UPDATE SET
+                    revenue = revenue + excluded.revenue, sale_count = sale_count + excluded.sale_count;'''
+            )
+
+            if sign == '-':
+                statements.append(
+                    f'''DELETE FROM sale_rollup
+                    WHERE granularity = '{granularity}' AND dimension = '{dimension}' AND dimension_id = {dimension_id}
+                    AND period = substr({row}.date_time, 1, {length}) AND sale_count = 0;'''
+                )
+
+    return '\n'.join(statements)
+
+
+def create_schema(connection: sqlite3.Connection):
+    """
+    Create the rollup table and the triggers maintaining it, rebuilding the rollups if the table is new.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    """
+    cursor = connection.cursor()
+    exists = cursor.execute(
+        'SELECT 1 FROM sqlite_master WHERE type = \'table\' AND name = \'sale_rollup\''
+    ).fetchone() is not None
+
+    cursor.executescript(f'''
+        {TABLE}
+
+        CREATE TRIGGER IF NOT EXISTS sale_rollup_insert AFTER INSERT ON sale BEGIN
+            {_apply_statements('new', '+')}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS sale_rollup_delete AFTER DELETE ON sale BEGIN
+            {_apply_statements('old', '-')}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS sale_rollup_update
+        AFTER UPDATE OF date_time, employee_id, customer_id, amount ON sale BEGIN
+            {_apply_statements('old', '-')}
+            {_apply_statements('new', '+')}
+        END;
+    ''')
+    cursor.close()
+
+    if not exists:
+        rebuild(connection)
+
+
+def rebuild(connection: sqlite3.Connection):
+    """
+    Recompute every rollup from the sale table in a single transaction.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    """
+    with connection:
+        cursor = connection.cursor()
+        cursor.execute('DELETE FROM sale_rollup')
+
+        for granularity, length in GRANULARITIES.items():
+            for dimension, column in DIMENSIONS.items():
+                group_by = 'period' if column == '0' else f'period, {column}'
+
+                cursor.execute(
+                    f'''INSERT INTO sale_rollup
+                    SELECT ?, substr(date_time, 1, {length}) AS period, ?, {column}, SUM(amount), COUNT(*)
+                    FROM sale GROUP BY {group_by}''',
+                    (granularity, dimension)
+                )
+
+        cursor.close()
+
+
+def get_periods(
+        connection: sqlite3.Connection, granularity: str, since: str, until: str, dimension: str = 'total',
+        dimension_id: int = 0
+) -> list[SaleRollup]:
+    """
+    Get the rollups of each day or month in a range that had sales.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param granularity: Either 'day' or 'month'.
+    @type granularity: str
+    @param since: First period of the range, as YYYY-MM-DD for days or YYYY-MM for months.
+    @type since: str
+    @param until: Last period of the range, inclusive.
+    @type until: str
+    @param dimension: One of 'total', 'employee' or 'customer'.
+    @type dimension: str
+    @param dimension_id: ID of the employee or customer, ignored for the shop total.
+    @type dimension_id: int
+
+    @return: Rollups of the periods in chronological order.
+    @rtype: list[SaleRollup]
+    """
+    cursor = connection.cursor()
+    rollups_raw = cursor.execute(
+        '''SELECT period, dimension, dimension_id, revenue, sale_count FROM sale_rollup
+        WHERE granularity = ? AND dimension = ? AND dimension_id = ? AND period BETWEEN ? AND ?
+        ORDER BY period''',
+        (granularity, dimension, 0 if dimension == 'total' else dimension_id, since, until)
+    ).fetchall()
+    cursor.close()
+
+    return [SaleRollup(*rollup) for rollup in rollups_raw]
+
+
+def get_leaders(
+        connection: sqlite3.Connection, granularity: str, dimension: str, since: str, until: str,
+        limit: Optional[int] = 5
+) -> list[SaleRollup]:
+    """
+    Get the employees or customers with the highest revenue over a range of days or months.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param granularity: Either 'day' or 'month'.
+    @type granularity: str
+    @param dimension: Either 'employee' or 'customer'.
+    @type dimension: str
+    @param since: First period of the range, as YYYY-MM-DD for days or YYYY-MM for months.
+    @type since: str
+    @param until: Last period of the range, inclusive.
+    @type until: str
+    @param limit: Maximum number of results, or None for all of them.
+    @type limit: Optional[int]
+
+    @return: Rollups over the whole range, with the period given as 'since..until', highest revenue first.
+    @rtype: list[SaleRollup]
+    """
+    cursor = connection.cursor()
+    rollups_raw = cursor.execute(
+        '''SELECT ? || '..' || ?, dimension, dimension_id, SUM(revenue) AS total_revenue, SUM(sale_count)
+        FROM sale_rollup WHERE granularity = ? AND dimension = ? AND period BETWEEN ? AND ?
+        GROUP BY dimension_id HAVING SUM(sale_count) > 0 ORDER BY total_revenue DESC LIMIT ?''',
+        (since, until, granularity, dimension, since, until, -1 if limit is None else limit)
+    ).fetchall()
+    cursor.close()
+
+    return [SaleRollup(*rollup) for rollup in rollups_raw]
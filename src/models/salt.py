@@ -1,27 +1,22 @@
 """Sale model and related functions to query the database."""
 import sqlite3
 from dataclasses import dataclass
-from typing import Optional, Any
+from typing import Optional, Any, Iterator, Iterable
+
+from src.models import mapper, view
+
+
+PAGE_ORDERS = ('id', 'name')
 
 
 @dataclass(frozen=True, slots=True)
 class Salt:
     """Salt model."""
-    id: int
+    id: Optional[int]
     name: str
 
 
-def _create_salt(raw_data: tuple) -> Salt:
-    """
-    Create a salt object from a record returned from the database.
-
-    @param raw_data: Data returned from the database from the salt table.
-    @type raw_data: tuple
-
-    @return: Salt object from the database.
-    @rtype: Salt
-    """
-    return Salt(id=raw_data[0], name=raw_data[1])
+_MAPPER = mapper.TableMapper('salt', Salt, PAGE_ORDERS)
 
 
 def get_all_ids(connection: sqlite3.Connection) -> set[int]:
@@ -34,11 +29,7 @@ def get_all_ids(connection: sqlite3.Connection) -> set[int]:
     @return: Set of all the IDs of the salts in the database.
     @rtype: set[int]
     """
-    cursor = connection.cursor()
-    ids: list[tuple[int]] = cursor.execute('SELECT id from salt').fetchall()
-    cursor.close()
-
-    return {id_[0] for id_ in ids}
+    return _MAPPER.get_all_ids(connection)
 
 
 def get_by_id(connection: sqlite3.Connection, salt_id: int) -> Optional[Salt]:
@@ -53,14 +44,22 @@ def get_by_id(connection: sqlite3.Connection, salt_id: int) -> Optional[Salt]:
     @return: Salt in the database, or None if the salt does not exist.
     @rtype: Optional[Salt]
     """
-    cursor = connection.cursor()
-    salt_raw = cursor.execute('SELECT * FROM salt WHERE id = ?', (salt_id,)).fetchone()
-    cursor.close()
+    return _MAPPER.get_by_id(connection, salt_id)
 
-    if salt_raw is None:
-        return None
 
-    return _create_salt(salt_raw)
+def get_by_ids(connection: sqlite3.Connection, salt_ids: Iterable[int]) -> dict[int, Salt]:
+    """
+    Get the salts with any of the given IDs in a single query.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param salt_ids: Salt IDs.
+    @type salt_ids: Iterable[int]
+
+    @return: Salts in the database keyed by ID, without the IDs that do not exist.
+    @rtype: dict[int, Salt]
+    """
+    return _MAPPER.get_by_ids(connection, salt_ids)
 
 
 def get_all(connection: sqlite3.Connection) -> set[Salt]:
@@ -73,44 +72,128 @@ def get_all(connection: sqlite3.Connection) -> set[Salt]:
     @return: Set of all the salts in the database.
     @rtype: set[Salt]
     """
-    salts = set()
+    return _MAPPER.get_all(connection)
+
+
+def iter_all(connection: sqlite3.Connection, batch_size: int = 500) -> Iterator[Salt]:
+    """
+    Iterate over all the salts in the database, fetching them from the cursor in batches.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param batch_size: Number of records fetched from the database at a time.
+    @type batch_size: int
+
+    @return: Iterator over all the salts in the database.
+    @rtype: Iterator[Salt]
+    """
+    return _MAPPER.iter_all(connection, batch_size)
+
+
+def get_page(
+        connection: sqlite3.Connection, after_id: Optional[int] = None, limit: int = 50, order_by: str = 'id'
+) -> list[Salt]:
+    """
+    Get a page of salts using keyset pagination, continuing after the salt with the given ID.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param after_id: ID of the last salt of the previous page, or None for the first page.
+    @type after_id: Optional[int]
+    @param limit: Maximum number of salts in the page.
+    @type limit: int
+    @param order_by: Indexed column to order the salts by, one of PAGE_ORDERS.
+    @type order_by: str
+
+    @return: List of the salts in the page.
+    @rtype: list[Salt]
+
+    @raise ValueError: If the salts cannot be ordered by the column.
+    """
+    return _MAPPER.get_page(connection, after_id, limit, order_by)
+
+
+def get_page_view(
+        connection: sqlite3.Connection, after_id: Optional[int] = None, limit: int = 50, order_by: str = 'id'
+) -> view.PageView:
+    """
+    Get a page of salts as both models and JSON records, from a single query.
 
-    cursor = connection.cursor()
-    salts_raw = cursor.execute('SELECT * FROM salt').fetchall()
-    cursor.close()
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param after_id: ID of the last salt of the previous page, or None for the first page.
+    @type after_id: Optional[int]
+    @param limit: Maximum number of salts in the page.
+    @type limit: int
+    @param order_by: Indexed column to order the salts by, one of PAGE_ORDERS.
+    @type order_by: str
 
-    for salt in salts_raw:
-        salts.add(_create_salt(salt))
+    @return: Salts of the page and their JSON encoding.
+    @rtype: view.PageView
 
-    return salts
+    @raise ValueError: If the salts cannot be ordered by the column.
+    """
+    return _MAPPER.get_page_view(connection, after_id, limit, order_by)
 
 
 def get_all_with_fields(connection: sqlite3.Connection, *fields: str) -> list[dict[str, Any]]:
-    data = []
-    column_names = ', '.join(fields)
+    """
+    Get some of the fields of all the salts in the database, as stored.
 
-    cursor = connection.cursor()
-    salts_raw = cursor.execute(f'SELECT {column_names} FROM salt').fetchall()
-    cursor.close()
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param fields: Names of the columns to get.
+    @type fields: str
 
-    for salt in salts_raw:
-        dictionary = dict()
+    @return: List of dictionaries mapping each field to its value, one per salt.
+    @rtype: list[dict[str, Any]]
 
-        for idx, field in enumerate(fields):
-            dictionary[field] = salt[idx]
+    @raise ValueError: If any of the fields is not a column of the salt table.
+    """
+    return _MAPPER.get_all_with_fields(connection, *fields)
 
-        data.append(dictionary)
 
-    return data
+def insert(connection: sqlite3.Connection, salt: Salt) -> int:
+    """
+    Insert the salt, letting the database assign its ID if the salt does not have one.
 
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param salt: Salt to insert.
+    @type salt: Salt
 
-def insert(connection: sqlite3.Connection, salt: Salt):
-    cursor = connection.cursor()
-    cursor.execute('INSERT INTO salt VALUES (?, ?)', (salt.id, salt.name))
-    cursor.close()
+    @return: ID of the inserted salt.
+    @rtype: int
+    """
+    return _MAPPER.insert(connection, salt)
 
 
 def update(connection: sqlite3.Connection, salt: Salt):
-    cursor = connection.cursor()
-    cursor.execute('UPDATE salt SET name = ? WHERE id = ?', (salt.name, salt.id))
-    cursor.close()
+    _MAPPER.update(connection, salt)
+
+
+def upsert(connection: sqlite3.Connection, salt: Salt) -> bool:
+    """
+    Insert the salt, or update it in place if its ID already exists.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param salt: Salt to write, with a server-assigned ID if its ID is None.
+    @type salt: Salt
+
+    @return: True if a new salt was created, False if an existing one was updated.
+    @rtype: bool
+    """
+    return _MAPPER.upsert(connection, salt)
+
+
+def upsert_many(connection: sqlite3.Connection, salts: Iterable[Salt]):
+    """
+    Insert or update many salts with a single prepared statement.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param salts: Salts to write, with server-assigned IDs for those whose ID is None.
+    @type salts: Iterable[Salt]
+    """
+    _MAPPER.upsert_many(connection, salts)
@@ -0,0 +1,131 @@
+"""Full-text search over the warehouse tables backed by SQLite FTS5 indexes."""
+import re
+import sqlite3
+from typing import Any
+
+SEARCH_FIELDS: dict[str, tuple[str, ...]] = {
+    'manufacturer': ('name', 'phone_number'),
+    'medicine': ('name',),
+    'sale': ('date_time',),
+    'salt': ('name',)
+}
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def _index_schema(table: str, fields: tuple[str, ...]) -> str:
+    """
+    Generate the DDL for the FTS5 index of a table and the triggers that keep it in sync.
+
+    @param table: Name of the indexed table.
+    @type table: str
+    @param fields: Indexed text columns of the table.
+    @type fields: tuple[str, ...]
+
+    @return: SQL script creating the index and its triggers.
+    @rtype: str
+    """
+    columns = ', '.join(fields)
+    new_values = ', '.join(f'new.{field}' for field in fields)
+    old_values = ', '.join(f'old.{field}' for field in fields)
+
+    return f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5(
+            {columns}, content='{table}', content_rowid='id', prefix='2 3'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {table}_fts (rowid, {columns}) VALUES (new.id, {new_values});
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO {table}_fts ({table}_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE ON {table} BEGIN
+            INSERT INTO {table}_fts ({table}_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {table}_fts (rowid, {columns}) VALUES (new.id, {new_values});
+        END;
+    '''
+
+
+def create_indexes(connection: sqlite3.Connection):
+    """
+    Create any missing search indexes and populate them from the existing rows.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    """
+    cursor = connection.cursor()
+
+    for table, fields in SEARCH_FIELDS.items():
+        exists = cursor.execute(
+            'SELECT 1 FROM sqlite_master WHERE type = \'table\' AND name = ?', (f'{table}_fts',)
+        ).fetchone() is not None
+
+        cursor.executescript(_index_schema(table, fields))
+
+        if not exists:
+            cursor.execute(f'INSERT INTO {table}_fts ({table}_fts) VALUES (\'rebuild\')')
+
+    cursor.close()
+    connection.commit()
+
+
+def _match_expression(query: str) -> str:
+    """
+    Convert free text typed into a search box into an FTS5 prefix query.
+
+    @param query: Text typed by the user.
+    @type query: str
+
+    @return: FTS5 match expression requiring a prefix match on every word, or an empty string if there are none.
+    @rtype: str
+    """
+    return ' '.join(f'"{token}"*' for token in _TOKEN_PATTERN.findall(query))
+
+
+def search(connection: sqlite3.Connection, table: str, query: str, limit: int = 6) -> list[dict[str, Any]]:
+    """
+    Search a table by ID and by prefix matches on its text columns, best matches first.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param table: Name of the table to search.
+    @type table: str
+    @param query: Text typed by the user.
+    @type query: str
+    @param limit: Maximum number of results.
+    @type limit: int
+
+    @return: ID and searchable fields of each matching record.
+    @rtype: list[dict[str, Any]]
+
+    @raise KeyError: If the table is not searchable.
+    """
+    fields = ('id',) + SEARCH_FIELDS[table]
+    column_names = ', '.join(f'{table}.{field}' for field in fields)
+
+    query = query.strip()
+    expression = _match_expression(query)
+    # Only ASCII digits are looked up as an ID, since str.isdigit also accepts digits such as '²' that int rejects.
+    query_id = int(query) if query.isascii() and query.isdecimal() else None
+    cursor = connection.cursor()
+
+    if expression == '':
+        records = cursor.execute(f'SELECT {column_names} FROM {table} ORDER BY id LIMIT ?', (limit,)).fetchall()
+    else:
+        records = []
+
+        if query_id is not None:
+            records = cursor.execute(f'SELECT {column_names} FROM {table} WHERE id = ?', (query_id,)).fetchall()
+
+        records += cursor.execute(
+            f'''SELECT {column_names} FROM {table}_fts JOIN {table} ON {table}.id = {table}_fts.rowid
+            WHERE {table}_fts MATCH ? AND {table}.id != ? ORDER BY rank LIMIT ?''',
+            (expression, -1 if query_id is None else query_id, limit - len(records))
+        ).fetchall()
+
+    cursor.close()
+
+    return [dict(zip(fields, record)) for record in records]
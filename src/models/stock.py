@@ -0,0 +1,112 @@
+"""Stock model holding the units of each medicine on hand, and related functions to query the database."""
+import sqlite3
+from dataclasses import dataclass
+from typing import Iterable
+
+TABLE = '''
+    CREATE TABLE IF NOT EXISTS stock (
+        medicine_id INTEGER PRIMARY KEY REFERENCES medicine (id),
+        quantity INTEGER NOT NULL CHECK (quantity >= 0)
+    );
+
+    CREATE TRIGGER IF NOT EXISTS stock_medicine_delete AFTER DELETE ON medicine BEGIN
+        DELETE FROM stock WHERE medicine_id = old.id;
+    END;
+'''
+
+
+@dataclass(frozen=True, slots=True)
+class Stock:
+    """Units of a medicine on hand."""
+    medicine_id: int
+    quantity: int
+
+
+def create_schema(connection: sqlite3.Connection):
+    """
+    Create the stock table if it does not exist.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    """
+    connection.executescript(TABLE)
+
+
+def get_quantities(connection: sqlite3.Connection, medicine_ids: Iterable[int]) -> dict[int, int]:
+    """
+    Get the units on hand of some medicines.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param medicine_ids: Medicine IDs.
+    @type medicine_ids: Iterable[int]
+
+    @return: Units on hand keyed by medicine ID, zero for medicines that were never stocked.
+    @rtype: dict[int, int]
+    """
+    medicine_ids = tuple(medicine_ids)
+
+    if not medicine_ids:
+        return {}
+
+    cursor = connection.cursor()
+    quantities = dict(cursor.execute(
+        f'SELECT medicine_id, quantity FROM stock WHERE medicine_id IN ({", ".join("?" * len(medicine_ids))})',
+        medicine_ids
+    ).fetchall())
+    cursor.close()
+
+    return {medicine_id: quantities.get(medicine_id, 0) for medicine_id in medicine_ids}
+
+
+def receive(connection: sqlite3.Connection, medicine_id: int, quantity: int) -> int:
+    """
+    Add received units of a medicine to the stock.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param medicine_id: Medicine ID.
+    @type medicine_id: int
+    @param quantity: Number of units received, or a negative number to write off units.
+    @type quantity: int
+
+    @return: Units on hand after the change.
+    @rtype: int
+
+    @raise sqlite3.IntegrityError: If writing off more units than there are on hand.
+    """
+    cursor = connection.cursor()
+    on_hand = cursor.execute(
+        '''INSERT INTO stock VALUES (?, ?) ON CONFLICT DO UPDATE SET quantity = quantity + excluded.quantity
+        RETURNING quantity''',
+        (medicine_id, quantity)
+    ).fetchone()[0]
+    cursor.close()
+
+    return on_hand
+
+
+def take(connection: sqlite3.Connection, medicine_id: int, quantity: int) -> bool:
+    """
+    Remove units of a medicine from the stock if there are enough on hand, in a single conditional update so that
+    concurrent sales can never take the same units twice.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param medicine_id: Medicine ID.
+    @type medicine_id: int
+    @param quantity: Number of units to take.
+    @type quantity: int
+
+    @return: True if the units were taken, False if there were not enough on hand.
+    @rtype: bool
+    """
+    cursor = connection.cursor()
+    cursor.execute(
+        'UPDATE stock SET quantity = quantity - ? WHERE medicine_id = ? AND quantity >= ?',
+        (quantity, medicine_id, quantity)
+    )
+    taken = cursor.rowcount == 1
+    cursor.close()
+
+    return taken
@@ -0,0 +1,59 @@
+"""Views building the models of a page and their JSON-ready records from a single query."""
+import sqlite3
+from dataclasses import dataclass
+from typing import Any, Callable
+
+RowFactory = Callable[[sqlite3.Cursor, tuple], tuple[Any, dict[str, Any]]]
+
+
+@dataclass(frozen=True, slots=True)
+class PageView:
+    """Models of a page for the template and the same rows as JSON-ready records for its scripts."""
+    models: list[Any]
+    records: list[dict[str, Any]]
+
+
+def compile_row_factory(columns: tuple[str, ...], create: Callable[[tuple], Any]) -> RowFactory:
+    """
+    Compile a row factory producing both the model and the JSON-ready record of each row. Dates and times are
+    passed through as stored, in ISO format, instead of being parsed and formatted again.
+
+    @param columns: Column names of the rows, in order.
+    @type columns: tuple[str, ...]
+    @param create: Function creating the model from a row.
+    @type create: Callable[[tuple], Any]
+
+    @return: Row factory for a cursor.
+    @rtype: RowFactory
+    """
+    def row_factory(_cursor: sqlite3.Cursor, row: tuple) -> tuple[Any, dict[str, Any]]:
+        return create(row), dict(zip(columns, row))
+
+    return row_factory
+
+
+def get_page_view(
+        connection: sqlite3.Connection, query: str, parameters: tuple, create: Callable[[tuple], Any]
+) -> PageView:
+    """
+    Run the query of a page once and build both its models and its records from the same cursor.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param query: Query selecting the rows of the page.
+    @type query: str
+    @param parameters: Parameters of the query.
+    @type parameters: tuple
+    @param create: Function creating the model from a row.
+    @type create: Callable[[tuple], Any]
+
+    @return: Models and records of the page.
+    @rtype: PageView
+    """
+    cursor = connection.cursor()
+    cursor.execute(query, parameters)
+    cursor.row_factory = compile_row_factory(tuple(column[0] for column in cursor.description), create)
+    rows = cursor.fetchall()
+    cursor.close()
+
+    return PageView([model for model, _record in rows], [record for _model, record in rows])
@@ -0,0 +1,243 @@
+"""First-expiry-first-out allocation of the units of a product across its lots, the medicine rows sharing a name and
+manufacturer."""
+import collections
+import heapq
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+import flask
+
+from src.database import versions
+from src.models import stock as stock_model
+
+Product = tuple[str, int]
+
+# Lots whose stock comes back from zero are not in the heaps any more, so restocking them counts as a change.
+TRIGGERS = '''
+    CREATE TRIGGER IF NOT EXISTS stock_restock_insert AFTER INSERT ON stock WHEN new.quantity > 0 BEGIN
+        INSERT INTO table_version VALUES ('stock_restock', 1) ON CONFLICT DO UPDATE SET version = version + 1;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS stock_restock_update AFTER UPDATE OF quantity ON stock
+    WHEN old.quantity = 0 AND new.quantity > 0 BEGIN
+        INSERT INTO table_version VALUES ('stock_restock', 1) ON CONFLICT DO UPDATE SET version = version + 1;
+    END;
+'''
+
+
+class InsufficientLotsError(ValueError):
+    """Raised when the unexpired lots of a product hold fewer units than requested."""
+
+    def __init__(self, product: Product, requested: int, available: int):
+        super().__init__(f'Only {available} unexpired units of {product[0]} are on hand, {requested} requested.')
+        self.product = product
+        self.requested = requested
+        self.available = available
+
+
+@dataclass(frozen=True, slots=True)
+class LotAllocation:
+    """Units taken from a lot."""
+    medicine_id: int
+    expiry_date: date
+    quantity: int
+
+
+class LotAllocator:
+    """
+    Thread-safe cache of a min-heap of the lots of each recently sold product, ordered by expiry date, so that
+    allocations do not query the lots of a product again. A heap is rebuilt when the medicine table or a restock
+    changes which lots a product has, and lots found expired or empty are popped as they are met. Stock is always
+    taken from the database, so a stale heap can only hide lots, never oversell them.
+    """
+
+    def __init__(self, max_products: int = 256):
+        self.max_products = max_products
+        self._heaps: collections.OrderedDict[Product, tuple[tuple[int, ...], list[tuple[str, int]]]] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self, connection: sqlite3.Connection, product: Product) -> list[tuple[str, int]]:
+        """
+        Query the unexpired lots of a product that have stock, using the product and expiry date index.
+
+        @return: Heap of the expiry date and ID of each lot.
+        """
+        cursor = connection.cursor()
+        lots = cursor.execute(
+            '''SELECT medicine.expiry_date, medicine.id FROM medicine JOIN stock ON stock.medicine_id = medicine.id
+            WHERE medicine.name = ? AND medicine.manufacturer_id = ? AND medicine.expiry_date >= ?
+            AND stock.quantity > 0 ORDER BY medicine.expiry_date, medicine.id''',
+            (*product, date.today().isoformat())
+        ).fetchall()
+        cursor.close()
+
+        # Rows sorted by expiry date already satisfy the heap invariant.
+        return lots
+
+    def _heap(self, connection: sqlite3.Connection, product: Product) -> list[tuple[str, int]]:
+        """
+        Get the heap of a product, rebuilding it if the lots changed since it was built.
+
+        @return: Heap of the expiry date and ID of each lot, to be used while holding the lock.
+        """
+        version = versions.get_versions(connection, 'medicine', 'stock_restock')
+        cached = self._heaps.get(product)
+
+        if cached is not None and cached[0] == version:
+            self.hits += 1
+            self._heaps.move_to_end(product)
+            return cached[1]
+
+        self.misses += 1
+        heap = self._load(connection, product)
+        self._heaps[product] = (version, heap)
+        self._heaps.move_to_end(product)
+
+        while len(self._heaps) > self.max_products:
+            self._heaps.popitem(last=False)
+
+        return heap
+
+    def allocate(
+            self, connection: sqlite3.Connection, product: Product, quantity: int, partial: bool = False
+    ) -> list[LotAllocation]:
+        """
+        Take units of a product from its earliest-expiring unexpired lots, splitting the quantity across as many lots
+        as needed. Must be called inside a write transaction, and the product must be invalidated if the transaction
+        is rolled back.
+
+        @param connection: Connection to the database, inside a write transaction.
+        @type connection: sqlite3.Connection
+        @param product: Name and manufacturer ID of the product.
+        @type product: Product
+        @param quantity: Number of units to take.
+        @type quantity: int
+        @param partial: Whether to take what there is when the lots hold fewer units than requested.
+        @type partial: bool
+
+        @return: Units taken from each lot, earliest expiry first.
+        @rtype: list[LotAllocation]
+
+        @raise InsufficientLotsError: If the lots hold fewer units than requested and partial fills are not allowed.
+        The units are not taken.
+        """
+        today = date.today().isoformat()
+        plan = []
+        kept = []
+        remaining = quantity
+
+        with self._lock:
+            heap = self._heap(connection, product)
+
+            while remaining > 0 and heap:
+                lot = heapq.heappop(heap)
+                expiry_date, medicine_id = lot
+
+                if expiry_date < today:
+                    continue
+
+                on_hand = stock_model.get_quantities(connection, (medicine_id,))[medicine_id]
+                taken = min(on_hand, remaining)
+
+                if taken > 0:
+                    plan.append((lot, taken))
+                    remaining -= taken
+
+                if taken < on_hand:
+                    kept.append(lot)
+
+            if remaining > 0 and not partial:
+                kept.extend(lot for lot, _taken in plan)
+                plan = []
+
+            for lot in kept:
+                heapq.heappush(heap, lot)
+
+        if remaining > 0 and not partial:
+            raise InsufficientLotsError(product, quantity, quantity - remaining)
+
+        for (_expiry_date, medicine_id), taken in plan:
+            stock_model.take(connection, medicine_id, taken)
+
+        return [
+            LotAllocation(medicine_id, date.fromisoformat(expiry_date), taken)
+            for (expiry_date, medicine_id), taken in plan
+        ]
+
+    def invalidate(self, product: Product):
+        """
+        Drop the heap of a product, after a transaction that allocated from it was rolled back.
+
+        @param product: Name and manufacturer ID of the product.
+        @type product: Product
+        """
+        with self._lock:
+            self._heaps.pop(product, None)
+
+    def __len__(self) -> int:
+        return len(self._heaps)
+
+
+def create_schema(connection: sqlite3.Connection):
+    """
+    Create the triggers counting the restocked lots.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    """
+    connection.executescript(TRIGGERS)
+    connection.commit()
+
+
+def get_product(connection: sqlite3.Connection, medicine_id: int) -> Optional[Product]:
+    """
+    Get the product a lot belongs to.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param medicine_id: ID of any lot of the product.
+    @type medicine_id: int
+
+    @return: Name and manufacturer ID of the product, or None if the lot does not exist.
+    @rtype: Optional[Product]
+    """
+    cursor = connection.cursor()
+    product = cursor.execute('SELECT name, manufacturer_id FROM medicine WHERE id = ?', (medicine_id,)).fetchone()
+    cursor.close()
+
+    return product
+
+
+def init_app(app: flask.Flask):
+    """
+    Configure the lot allocator for an application.
+
+    @param app: Flask application to configure.
+    @type app: flask.Flask
+    """
+    app.config.setdefault('LOT_ALLOCATOR_PRODUCTS', 256)
+    app.extensions['lot_allocator'] = LotAllocator(app.config['LOT_ALLOCATOR_PRODUCTS'])
+
+
+def get_allocator(app: Optional[flask.Flask] = None) -> LotAllocator:
+    """
+    Get the lot allocator of an application, creating it if the application was not configured.
+
+    @param app: Flask application owning the allocator, defaults to the current application.
+    @type app: Optional[flask.Flask]
+
+    @return: Lot allocator of the application.
+    @rtype: LotAllocator
+    """
+    app = app or flask.current_app._get_current_object()
+    return app.extensions.setdefault(
+        'lot_allocator', LotAllocator(app.config.get('LOT_ALLOCATOR_PRODUCTS', 256))
+    )
@@ -0,0 +1,274 @@
+"""Login and administrator checks for views, backed by a per-worker cache of employee roles."""
+import functools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+import flask
+
+from src.database import pool, versions
+from src.models import employee
+
+
+@dataclass(frozen=True, slots=True)
+class Role:
+    """Authorization context of a logged-in employee."""
+    employee_id: int
+    currently_employed: bool
+    is_administrator: bool
+
+
+class RoleCache:
+    """
+    Thread-safe cache of employee roles. Each role is cached with the change counter of its employee, and the roles of
+    the employees changed since are dropped by refresh. Entries also expire after a fixed time to live.
+    """
+
+    def __init__(self, ttl: float = 60.0, check_interval: float = 1.0):
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self._roles: dict[int, tuple[float, int, Optional[Role]]] = {}
+        self._table_version: Optional[int] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, employee_id: int, load: Callable[[int], tuple[int, Optional[Role]]]) -> Optional[Role]:
+        """
+        Get the role of an employee, loading it if it is not cached or has expired.
+
+        @param employee_id: Employee ID.
+        @type employee_id: int
+        @param load: Function reading the change counter of an employee, then their role, from the database.
+        @type load: Callable[[int], tuple[int, Optional[Role]]]
+
+        @return: Role of the employee, or None if the employee does not exist.
+        @rtype: Optional[Role]
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._roles.get(employee_id)
+
+            if cached is not None and cached[0] > now:
+                self.hits += 1
+                return cached[2]
+
+            self.misses += 1
+
+        row_version, role = load(employee_id)
+
+        with self._lock:
+            self._roles[employee_id] = (now + self.ttl, row_version, role)
+
+        return role
+
+    def due(self) -> bool:
+        """
+        Tell whether the cached roles should be checked against the database, which is at most once per interval.
+
+        @return: True for the first caller once the check interval has passed since the last check.
+        @rtype: bool
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            if now < self._next_check:
+                return False
+
+            self._next_check = now + self.check_interval
+            return True
+
+    def refresh(self, table_version: int, read_row_versions: Callable[[Iterable[int]], dict[int, int]]):
+        """
+        Drop the roles of the employees changed since they were cached, if the employee table changed since the last
+        refresh. Roles cached for employees who did not exist are dropped too, since they may have been created.
+
+        @param table_version: Current change counter of the employee table.
+        @type table_version: int
+        @param read_row_versions: Function reading the change counters of some employees from the database.
+        @type read_row_versions: Callable[[Iterable[int]], dict[int, int]]
+        """
+        with self._lock:
+            if table_version == self._table_version:
+                return
+
+            employee_ids = list(self._roles)
+
+        row_versions = read_row_versions(employee_ids)
+
+        with self._lock:
+            for employee_id in employee_ids:
+                cached = self._roles.get(employee_id)
+
+                if cached is not None and (cached[2] is None or cached[1] != row_versions.get(employee_id, 0)):
+                    del self._roles[employee_id]
+
+            self._table_version = table_version
+
+    def invalidate(self, employee_id: int):
+        """
+        Drop the cached role of an employee, so that it is read again on the next request.
+
+        @param employee_id: Employee ID.
+        @type employee_id: int
+        """
+        with self._lock:
+            self._roles.pop(employee_id, None)
+
+    def clear(self):
+        """Drop every cached role."""
+        with self._lock:
+            self._roles.clear()
+
+
+def init_app(app: flask.Flask):
+    """
+    Configure the role cache for an application.
+
+    @param app: Flask application to configure.
+    @type app: flask.Flask
+    """
+    app.config.setdefault('AUTHORIZATION_CACHE_TTL', 60.0)
+    app.config.setdefault('AUTHORIZATION_CHECK_INTERVAL', 1.0)
+    app.extensions['authorization_cache'] = RoleCache(
+        app.config['AUTHORIZATION_CACHE_TTL'], app.config['AUTHORIZATION_CHECK_INTERVAL']
+    )
+
+
+def get_cache(app: Optional[flask.Flask] = None) -> RoleCache:
+    """
+    Get the role cache of an application, creating it if the application was not configured.
+
+    @param app: Flask application owning the cache, defaults to the current application.
+    @type app: Optional[flask.Flask]
+
+    @return: Role cache of the application.
+    @rtype: RoleCache
+    """
+    app = app or flask.current_app._get_current_object()
+    return app.extensions.setdefault('authorization_cache', RoleCache(
+        app.config.get('AUTHORIZATION_CACHE_TTL', 60.0), app.config.get('AUTHORIZATION_CHECK_INTERVAL', 1.0)
+    ))
+
+
+def _load_role(employee_id: int) -> tuple[int, Optional[Role]]:
+    """
+    Read the change counter and then the role of an employee from the database, so that a change made in between is
+    caught by the next refresh of the cache.
+
+    @param employee_id: Employee ID.
+    @type employee_id: int
+
+    @return: Change counter of the employee, and their role or None if the employee does not exist.
+    @rtype: tuple[int, Optional[Role]]
+    """
+    connection = pool.get_connection()
+    row_version = versions.get_row_version(connection, 'employee', employee_id)
+    access = employee.get_access(connection, employee_id)
+
+    return row_version, None if access is None else Role(employee_id, *access)
+
+
+def get_role(employee_id: int) -> Optional[Role]:
+    """
+    Get the role of an employee from the cache, reading it from the database only when it is missing or expired. At
+    most once per AUTHORIZATION_CHECK_INTERVAL, the cache first drops the roles of the employees changed since.
+
+    @param employee_id: Employee ID.
+    @type employee_id: int
+
+    @return: Role of the employee, or None if the employee does not exist.
+    @rtype: Optional[Role]
+    """
+    cache = get_cache()
+
+    if cache.due():
+        connection = pool.get_connection()
+        cache.refresh(
+            versions.get_versions(connection, 'employee')[0],
+            lambda employee_ids: versions.get_row_versions(connection, 'employee', employee_ids)
+        )
+
+    return cache.get(employee_id, _load_role)
+
+
+def invalidate(employee_id: int):
+    """
+    Drop the cached role of an employee, so that a change to their row takes effect in this worker at once rather than
+    at the next refresh.
+
+    @param employee_id: Employee ID.
+    @type employee_id: int
+    """
+    get_cache().invalidate(employee_id)
+
+
+def _current_role() -> Optional[Role]:
+    """
+    Get the role of the employee logged in to the current session, logging out employees who no longer exist or
+    are no longer employed. The role is stored in flask.g.role for use by the view.
+
+    @return: Role of the logged-in employee, or None if nobody is logged in.
+    @rtype: Optional[Role]
+    """
+    employee_id = flask.session.get('employee_id')
+
+    if employee_id is None:
+        return None
+
+    role = get_role(employee_id)
+
+    if role is None or not role.currently_employed:
+        flask.session.pop('employee_id', None)
+        return None
+
+    flask.g.role = role
+    return role
+
+
+def _require(view: Callable, administrator: bool, api: bool) -> Callable:
+    """
+    Wrap a view so that it only runs for a logged-in employee, and optionally only for an administrator.
+
+    @param view: View to wrap.
+    @type view: Callable
+    @param administrator: Whether the view is restricted to administrators.
+    @type administrator: bool
+    @param api: Whether to answer with 401 instead of redirecting to the login page.
+    @type api: bool
+
+    @return: Wrapped view.
+    @rtype: Callable
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        role = _current_role()
+
+        if role is None or (administrator and not role.is_administrator):
+            if api:
+                flask.abort(401)
+
+            return flask.redirect(flask.url_for('factory.login'))
+
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+def login_required(view: Callable) -> Callable:
+    """Restrict a view to logged-in employees, redirecting anybody else to the login page."""
+    return _require(view, administrator=False, api=False)
+
+
+def admin_required(view: Callable) -> Callable:
+    """Restrict a view to logged-in administrators, redirecting anybody else to the login page."""
+    return _require(view, administrator=True, api=False)
+
+
+def api_login_required(view: Callable) -> Callable:
+    """Restrict an API endpoint to logged-in employees, answering anybody else with 401."""
+    return _require(view, administrator=False, api=True)
@@ -0,0 +1,261 @@
+"""Point-of-sale checkout pricing a basket, taking its stock and recording the sale in one transaction."""
+import collections
+import dataclasses
+import random
+import sqlite3
+import time
+from datetime import date, datetime
+from typing import Iterable, Optional
+
+import flask
+
+from src.models import sale as sale_model
+from src.models import sale_item as sale_item_model
+from src.models import stock as stock_model
+from src.services import allocation, metrics
+
+
+class CheckoutError(ValueError):
+    """Raised when a basket cannot be sold as requested."""
+
+
+class InsufficientStockError(CheckoutError):
+    """Raised when there are fewer units of a medicine on hand than the basket asks for."""
+
+    def __init__(self, medicine_id: int, requested: int, available: int):
+        super().__init__(f'Only {available} units of medicine {medicine_id} are on hand, {requested} requested.')
+        self.medicine_id = medicine_id
+        self.requested = requested
+        self.available = available
+
+
+class CheckoutBusyError(RuntimeError):
+    """Raised when the database stays locked by other writers through every attempt."""
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class BasketLine:
+    """Units of a medicine in a basket."""
+    medicine_id: int
+    quantity: int
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Receipt:
+    """Sale recorded by a checkout and its items."""
+    sale: sale_model.Sale
+    items: list[sale_item_model.SaleItem]
+
+
+def init_app(app: flask.Flask):
+    """
+    Configure the checkout retries for an application.
+
+    @param app: Flask application to configure.
+    @type app: flask.Flask
+    """
+    app.config.setdefault('CHECKOUT_MAX_ATTEMPTS', 5)
+    app.config.setdefault('CHECKOUT_RETRY_DELAY', 0.02)
+
+
+def _merge_lines(lines: Iterable[BasketLine]) -> dict[int, int]:
+    """
+    Validate the lines of a basket and add up the quantities of the medicines listed more than once.
+
+    @param lines: Lines of the basket.
+    @type lines: Iterable[BasketLine]
+
+    @return: Quantity of each medicine, in ascending order of ID so that concurrent checkouts update the stock rows
+    in the same order.
+    @rtype: dict[int, int]
+
+    @raise CheckoutError: If the basket is empty or a quantity is not a positive integer.
+    """
+    quantities: collections.Counter[int] = collections.Counter()
+
+    for line in lines:
+        if not isinstance(line.quantity, int) or isinstance(line.quantity, bool) or line.quantity <= 0:
+            raise CheckoutError(f'Quantity of medicine {line.medicine_id} must be a positive integer.')
+
+        quantities[line.medicine_id] += line.quantity
+
+    if not quantities:
+        raise CheckoutError('The basket is empty.')
+
+    return dict(sorted(quantities.items()))
+
+
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    """
+    Tell whether an error was caused by another connection holding the write lock.
+
+    @param error: Error raised by the database.
+    @type error: sqlite3.OperationalError
+
+    @return: True if the operation can be retried once the lock is released.
+    @rtype: bool
+    """
+    return getattr(error, 'sqlite_errorcode', None) in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+
+
+def _take_medicines(connection: sqlite3.Connection, quantities: dict[int, int]) -> dict[int, int]:
+    """
+    Take the units of each medicine from its own stock.
+
+    @return: Units taken from each medicine.
+
+    @raise CheckoutError: If a medicine does not exist or has expired.
+    @raise InsufficientStockError: If a medicine does not have enough units on hand.
+    """
+    cursor = connection.cursor()
+    expiry_dates = dict(cursor.execute(
+        f'SELECT id, expiry_date FROM medicine WHERE id IN ({", ".join("?" * len(quantities))})', tuple(quantities)
+    ).fetchall())
+    cursor.close()
+
+    today = date.today().isoformat()
+
+    for medicine_id, quantity in quantities.items():
+        if medicine_id not in expiry_dates:
+            raise CheckoutError(f'Medicine {medicine_id} does not exist.')
+
+        if expiry_dates[medicine_id] < today:
+            raise CheckoutError(f'Medicine {medicine_id} has expired.')
+
+        if not stock_model.take(connection, medicine_id, quantity):
+            raise InsufficientStockError(
+                medicine_id, quantity, stock_model.get_quantities(connection, (medicine_id,))[medicine_id]
+            )
+
+    return quantities
+
+
+def _take_lots(
+        connection: sqlite3.Connection, quantities: dict[int, int], allocator: allocation.LotAllocator,
+        products: set[allocation.Product]
+) -> dict[int, int]:
+    """
+    Take the units of the product of each medicine from its earliest-expiring lots.
+
+    @return: Units taken from each lot, in ascending order of lot ID.
+
+    @raise CheckoutError: If a medicine does not exist.
+    @raise InsufficientStockError: If the unexpired lots of a product do not have enough units on hand.
+    """
+    lot_quantities: collections.Counter[int] = collections.Counter()
+
+    for medicine_id, quantity in quantities.items():
+        product = allocation.get_product(connection, medicine_id)
+
+        if product is None:
+            raise CheckoutError(f'Medicine {medicine_id} does not exist.')
+
+        products.add(product)
+
+        try:
+            allocations = allocator.allocate(connection, product, quantity)
+        except allocation.InsufficientLotsError as error:
+            raise InsufficientStockError(medicine_id, quantity, error.available) from error
+
+        for lot in allocations:
+            lot_quantities[lot.medicine_id] += lot.quantity
+
+    return dict(sorted(lot_quantities.items()))
+
+
+def _record_sale(
+        connection: sqlite3.Connection, employee_id: int, customer_id: int, quantities: dict[int, int]
+) -> Receipt:
+    """
+    Price the units taken at the current sale prices and record the sale and its items.
+
+    @return: Recorded sale and its items.
+    """
+    cursor = connection.cursor()
+    prices = {medicine_id: float(sale_price) for medicine_id, sale_price in cursor.execute(
+        f'SELECT id, sale_price FROM medicine WHERE id IN ({", ".join("?" * len(quantities))})', tuple(quantities)
+    ).fetchall()}
+    cursor.close()
+
+    amount = round(sum(prices[medicine_id] * quantity for medicine_id, quantity in quantities.items()), 2)
+    sale = sale_model.Sale(None, datetime.now().replace(microsecond=0), employee_id, customer_id, amount)
+    sale = dataclasses.replace(sale, id=sale_model.insert(connection, sale))
+
+    items = [
+        sale_item_model.SaleItem(sale.id, medicine_id, quantity, prices[medicine_id])
+        for medicine_id, quantity in quantities.items()
+    ]
+    sale_item_model.insert_many(connection, items)
+
+    return Receipt(sale, items)
+
+
+def checkout(
+        connection: sqlite3.Connection, employee_id: int, customer_id: int, lines: Iterable[BasketLine],
+        max_attempts: int = 5, retry_delay: float = 0.02, allocator: Optional[allocation.LotAllocator] = None
+) -> Receipt:
+    """
+    Sell a basket in a single BEGIN IMMEDIATE transaction, which takes the write lock before reading the prices and
+    stock so that concurrent tills are serialised instead of failing at commit. If the lock stays busy past the
+    timeout of the connection, the transaction is retried after an exponentially growing, jittered delay.
+
+    With an allocator, each line names a product by any of its lots, and the units are taken from the
+    earliest-expiring unexpired lots of the product instead of the lot given.
+
+    @param connection: Connection to the database, outside of any transaction.
+    @type connection: sqlite3.Connection
+    @param employee_id: ID of the employee at the till.
+    @type employee_id: int
+    @param customer_id: ID of the customer buying the basket.
+    @type customer_id: int
+    @param lines: Lines of the basket.
+    @type lines: Iterable[BasketLine]
+    @param max_attempts: Number of times to try the transaction.
+    @type max_attempts: int
+    @param retry_delay: Delay before the first retry, in seconds, doubled for every retry after it.
+    @type retry_delay: float
+    @param allocator: Lot allocator choosing the lots to sell from, or None to sell from the lots given.
+    @type allocator: Optional[allocation.LotAllocator]
+
+    @return: Recorded sale and its items.
+    @rtype: Receipt
+
+    @raise CheckoutError: If the basket is invalid, a medicine does not exist or has expired.
+    @raise InsufficientStockError: If a medicine, or the lots of its product, does not have enough units on hand.
+    @raise CheckoutBusyError: If the database stayed locked through every attempt.
+    """
+    quantities = _merge_lines(lines)
+
+    for attempt in range(max_attempts):
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+
+            products: set[allocation.Product] = set()
+
+            try:
+                if allocator is None:
+                    taken = _take_medicines(connection, quantities)
+                else:
+                    taken = _take_lots(connection, quantities, allocator, products)
+
+                receipt = _record_sale(connection, employee_id, customer_id, taken)
+                connection.commit()
+            except BaseException:
+                connection.rollback()
+
+                # The heaps may have dropped lots emptied by the rolled back transaction.
+                for product in products:
+                    allocator.invalidate(product)
+
+                raise
+
+            return receipt
+        except sqlite3.OperationalError as error:
+            if not _is_busy(error):
+                raise
+
+            if attempt + 1 < max_attempts:
+                metrics.record_busy_retry()
+                time.sleep(retry_delay * 2 ** attempt * random.uniform(0.5, 1.5))
+
+    raise CheckoutBusyError(f'The database stayed locked through {max_attempts} checkout attempts.')
@@ -0,0 +1,97 @@
+"""Streaming CSV and NDJSON exports of model records."""
+import csv
+import dataclasses
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Any, Iterable, Iterator
+
+FORMATS = ('csv', 'ndjson')
+MIMETYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+
+def _value(value: Any) -> Any:
+    """
+    Convert a model attribute into a value that can be written to an export.
+
+    @param value: Attribute of a model.
+    @type value: Any
+
+    @return: Dates and times in ISO format, or the value unchanged.
+    @rtype: Any
+    """
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+
+    return value
+
+
+def export(records: Iterable[Any], record_type: type, file_format: str, batch_size: int = 1000) -> Iterator[bytes]:
+    """
+    Encode model records as CSV or NDJSON, yielding one encoded batch of records at a time.
+
+    @param records: Dataclass instances to export, typically a model iterator over a database cursor.
+    @type records: Iterable[Any]
+    @param record_type: Dataclass of the records, used for the column names.
+    @type record_type: type
+    @param file_format: Format of the export, one of FORMATS.
+    @type file_format: str
+    @param batch_size: Number of records encoded per yielded chunk.
+    @type batch_size: int
+
+    @return: Iterator over UTF-8 encoded chunks of the export.
+    @rtype: Iterator[bytes]
+
+    @raise ValueError: If the format is not supported.
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f'Unsupported export format {file_format}, expected one of {FORMATS}.')
+
+    fields = [field.name for field in dataclasses.fields(record_type)]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    if file_format == 'csv':
+        writer.writerow(fields)
+
+    for count, record in enumerate(records, start=1):
+        values = [_value(getattr(record, field)) for field in fields]
+
+        if file_format == 'csv':
+            writer.writerow(values)
+        else:
+            buffer.write(json.dumps(dict(zip(fields, values))))
+            buffer.write('\n')
+
+        if count % batch_size == 0:
+            yield buffer.getvalue().encode()
+
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell() > 0:
+        yield buffer.getvalue().encode()
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """
+    Compress a stream of chunks into a gzip stream without buffering the whole input.
+
+    @param chunks: Uncompressed chunks.
+    @type chunks: Iterable[bytes]
+    @param level: Compression level from 1 to 9.
+    @type level: int
+
+    @return: Iterator over the chunks of the gzip stream.
+    @rtype: Iterator[bytes]
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+
+        if compressed:
+            yield compressed
+
+    yield compressor.flush()
@@ -0,0 +1,216 @@
+"""Conditional GET for the warehouse pages, with ETags derived from the change counters of the database."""
+import collections
+import functools
+import hashlib
+import os
+import threading
+from typing import Callable, Optional
+
+import flask
+from flask.typing import ResponseReturnValue
+
+from src.database import pool, versions
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of rendered page bodies keyed by ETag."""
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._bodies: collections.OrderedDict[str, bytes] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, etag: str) -> Optional[bytes]:
+        """
+        Get a rendered body, marking it as recently used.
+
+        @param etag: ETag of the page.
+        @type etag: str
+
+        @return: Body of the page, or None if it is not cached.
+        @rtype: Optional[bytes]
+        """
+        with self._lock:
+            body = self._bodies.get(etag)
+
+            if body is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._bodies.move_to_end(etag)
+
+            return body
+
+    def put(self, etag: str, body: bytes):
+        """
+        Store a rendered body, evicting the least recently used one if the cache is full.
+
+        @param etag: ETag of the page.
+        @type etag: str
+        @param body: Body of the page.
+        @type body: bytes
+        """
+        with self._lock:
+            self._bodies[etag] = body
+            self._bodies.move_to_end(etag)
+
+            while len(self._bodies) > self.max_entries:
+                self._bodies.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+
+def _template_digest(app: flask.Flask) -> str:
+    """
+    Compute a digest of the templates of an application, which is the same in every worker and across restarts as long
+    as the templates are.
+
+    @param app: Flask application rendering the templates.
+    @type app: flask.Flask
+
+    @return: Hexadecimal digest of the paths and contents of the templates.
+    @rtype: str
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    template_folder = os.path.join(app.root_path, app.template_folder or 'templates')
+
+    for directory, directories, files in os.walk(template_folder):
+        directories.sort()
+
+        for file in sorted(files):
+            path = os.path.join(directory, file)
+            digest.update(os.path.relpath(path, template_folder).encode() + b'\0')
+
+            with open(path, 'rb') as template:
+                digest.update(template.read())
+
+    return digest.hexdigest()
+
+
+def init_app(app: flask.Flask):
+    """
+    Configure the response cache for an application. The ETags of a deployment are told apart from those of another by
+    DEPLOYMENT_ID, which defaults to a digest of the templates, so that every worker issues the same ETags for a page.
+
+    @param app: Flask application to configure.
+    @type app: flask.Flask
+    """
+    app.config.setdefault('RESPONSE_CACHE_SIZE', 128)
+
+    if not app.config.get('DEPLOYMENT_ID'):
+        app.config['DEPLOYMENT_ID'] = os.getenv('DEPLOYMENT_ID') or _template_digest(app)
+
+    app.extensions['response_cache'] = ResponseCache(app.config['RESPONSE_CACHE_SIZE'])
+
+
+def get_cache(app: Optional[flask.Flask] = None) -> ResponseCache:
+    """
+    Get the response cache of an application, creating it if the application was not configured.
+
+    @param app: Flask application owning the cache, defaults to the current application.
+    @type app: Optional[flask.Flask]
+
+    @return: Response cache of the application.
+    @rtype: ResponseCache
+    """
+    app = app or flask.current_app._get_current_object()
+    return app.extensions.setdefault('response_cache', ResponseCache(app.config.get('RESPONSE_CACHE_SIZE', 128)))
+
+
+def _etag(*parts: object) -> str:
+    """
+    Compute the ETag of a page from the route, the role of the employee and the versions of its data.
+
+    @param parts: Values the page depends on.
+    @type parts: object
+
+    @return: Opaque ETag.
+    @rtype: str
+    """
+    role = 'administrator' if flask.g.role.is_administrator else 'employee'
+    deployment = flask.current_app.config.get('DEPLOYMENT_ID', '')
+    key = '\0'.join(map(str, (deployment, flask.request.full_path, role) + parts))
+
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def _conditional_response(etag: str, render: Callable[[], ResponseReturnValue]) -> flask.Response:
+    """
+    Answer 304 if the client already has the page, serve it from the cache if another client requested it, and
+    render it otherwise.
+
+    @param etag: ETag of the page.
+    @type etag: str
+    @param render: Function rendering the page.
+    @type render: Callable[[], ResponseReturnValue]
+
+    @return: Response to the request.
+    @rtype: flask.Response
+    """
+    if etag in flask.request.if_none_match:
+        response = flask.Response(status=304)
+    elif (body := get_cache().get(etag)) is not None:
+        response = flask.Response(body, mimetype='text/html')
+    else:
+        response = flask.make_response(render())
+
+        if response.status_code != 200 or response.is_streamed:
+            return response
+
+        get_cache().put(etag, response.get_data())
+
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+
+    return response
+
+
+def cached_by_tables(*tables: str) -> Callable[[Callable], Callable]:
+    """
+    Make a page conditional on the versions of the tables it lists. Must be applied after the login check, so that
+    the role of the employee is known.
+
+    @param tables: Tables whose rows the page shows.
+    @type tables: str
+
+    @return: Decorator for the view.
+    @rtype: Callable[[Callable], Callable]
+    """
+    def decorator(view: Callable) -> Callable:
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            table_versions = versions.get_versions(pool.get_connection(), *tables)
+            return _conditional_response(_etag(*table_versions), lambda: view(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
+
+
+def cached_by_row(table: str, argument: str) -> Callable[[Callable], Callable]:
+    """
+    Make a detail page conditional on the version of the row it shows, so that edits to other rows do not change it.
+    Must be applied after the login check, so that the role of the employee is known.
+
+    @param table: Table of the row.
+    @type table: str
+    @param argument: Name of the view argument holding the ID of the row.
+    @type argument: str
+
+    @return: Decorator for the view.
+    @rtype: Callable[[Callable], Callable]
+    """
+    def decorator(view: Callable) -> Callable:
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            row_version = versions.get_row_version(pool.get_connection(), table, kwargs[argument])
+            return _conditional_response(_etag(table, row_version), lambda: view(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,394 @@
+"""Bulk import of supplier catalogues into the manufacturer, medicine, salt and composition tables."""
+import csv
+import json
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import date
+from typing import IO, Any, Callable, Iterable, Iterator, Optional
+
+from src.models import manufacturer as manufacturer_model
+from src.models import medicine as medicine_model
+from src.models import medicine_salt as medicine_salt_model
+from src.models import salt as salt_model
+
+FORMATS = ('csv', 'json', 'ndjson')
+MAX_REPORTED_ERRORS = 1000
+READ_SIZE = 65536
+MAX_RECORD_SIZE = 1 << 20
+
+
+@dataclass(slots=True)
+class ImportReport:
+    """Outcome of a bulk import, with the reason the catalogue could not be read to its end, if it could not."""
+    imported: int = 0
+    failed: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+    error: Optional[str] = None
+
+    def add_error(self, row: int, message: str):
+        """
+        Record a row that could not be imported, keeping at most MAX_REPORTED_ERRORS messages.
+
+        @param row: Number of the row in the input, starting from 1.
+        @type row: int
+        @param message: Reason the row was rejected.
+        @type message: str
+        """
+        self.failed += 1
+
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row, message))
+
+
+def _optional(value: Any) -> Optional[Any]:
+    """
+    Treat empty catalogue cells as missing values.
+
+    @param value: Value of a cell in the catalogue.
+    @type value: Any
+
+    @return: The value, or None if the cell is empty.
+    @rtype: Optional[Any]
+    """
+    return None if value is None or value == '' else value
+
+
+def _required(row: dict[str, Any], key: str) -> Any:
+    """
+    Get a value that must be present in a catalogue record.
+
+    @param row: Catalogue record keyed by column name.
+    @type row: dict[str, Any]
+    @param key: Column name.
+    @type key: str
+
+    @return: Value of the column.
+    @rtype: Any
+
+    @raise ValueError: If the value is missing or empty.
+    """
+    value = _optional(row.get(key))
+
+    if value is None:
+        raise ValueError(f'missing {key}')
+
+    return value
+
+
+def _parse_manufacturer(row: dict[str, Any]) -> manufacturer_model.Manufacturer:
+    """
+    Validate a catalogue record and convert it into a manufacturer.
+
+    @param row: Catalogue record keyed by column name.
+    @type row: dict[str, Any]
+
+    @return: Manufacturer described by the record, without an ID if the record does not have one.
+    @rtype: manufacturer_model.Manufacturer
+
+    @raise ValueError: If a value is missing or malformed.
+    """
+    return manufacturer_model.Manufacturer(
+        id=int(row['id']) if _optional(row.get('id')) is not None else None,
+        name=str(_required(row, 'name')),
+        phone_number=str(_required(row, 'phone_number')),
+        address=_optional(row.get('address'))
+    )
+
+
+def _parse_medicine(row: dict[str, Any]) -> medicine_model.Medicine:
+    """
+    Validate a catalogue record and convert it into a medicine.
+
+    @param row: Catalogue record keyed by column name.
+    @type row: dict[str, Any]
+
+    @return: Medicine described by the record, without an ID if the record does not have one.
+    @rtype: medicine_model.Medicine
+
+    @raise ValueError: If a value is missing or malformed.
+    """
+    manufacturing_date = date.fromisoformat(_required(row, 'manufacturing_date'))
+    expiry_date = date.fromisoformat(_required(row, 'expiry_date'))
+
+    if expiry_date < manufacturing_date:
+        raise ValueError('expiry_date is before manufacturing_date')
+
+    return medicine_model.Medicine(
+        id=int(row['id']) if _optional(row.get('id')) is not None else None,
+        name=str(_required(row, 'name')),
+        manufacturer_id=int(_required(row, 'manufacturer_id')),
+        cost_price=float(_required(row, 'cost_price')),
+        sale_price=float(_required(row, 'sale_price')),
+        potency=int(row['potency']) if _optional(row.get('potency')) is not None else None,
+        quantity_per_unit=int(_required(row, 'quantity_per_unit')),
+        manufacturing_date=manufacturing_date,
+        purchase_date=date.fromisoformat(_required(row, 'purchase_date')),
+        expiry_date=expiry_date
+    )
+
+
+def _parse_salt(row: dict[str, Any]) -> salt_model.Salt:
+    """
+    Validate a catalogue record and convert it into a salt.
+
+    @param row: Catalogue record keyed by column name.
+    @type row: dict[str, Any]
+
+    @return: Salt described by the record, without an ID if the record does not have one.
+    @rtype: salt_model.Salt
+
+    @raise ValueError: If a value is missing or malformed.
+    """
+    return salt_model.Salt(
+        id=int(row['id']) if _optional(row.get('id')) is not None else None,
+        name=str(_required(row, 'name'))
+    )
+
+
+def _parse_medicine_salt(row: dict[str, Any]) -> medicine_salt_model.MedicineSalt:
+    """
+    Validate a catalogue record and convert it into a salt contained in a medicine.
+
+    @param row: Catalogue record keyed by column name.
+    @type row: dict[str, Any]
+
+    @return: Salt contained in a medicine described by the record.
+    @rtype: medicine_salt_model.MedicineSalt
+
+    @raise ValueError: If a value is missing or malformed.
+    """
+    return medicine_salt_model.MedicineSalt(
+        medicine_id=int(_required(row, 'medicine_id')),
+        salt_id=int(_required(row, 'salt_id'))
+    )
+
+
+TABLES: dict[str, tuple[Callable[[dict[str, Any]], Any], Callable[[sqlite3.Connection, Iterable[Any]], None]]] = {
+    'manufacturer': (_parse_manufacturer, manufacturer_model.upsert_many),
+    'medicine': (_parse_medicine, medicine_model.upsert_many),
+    'medicine_salt': (_parse_medicine_salt, medicine_salt_model.upsert_many),
+    'salt': (_parse_salt, salt_model.upsert_many)
+}
+
+
+def format_of(filename: str) -> str:
+    """
+    Guess the format of a catalogue file from its extension.
+
+    @param filename: Name of the catalogue file.
+    @type filename: str
+
+    @return: Format of the catalogue, one of FORMATS.
+    @rtype: str
+
+    @raise ValueError: If the extension is not recognised.
+    """
+    extension = os.path.splitext(filename)[1].lstrip('.').lower()
+    file_format = 'ndjson' if extension == 'jsonl' else extension
+
+    if file_format not in FORMATS:
+        raise ValueError(f'Cannot tell the format of {filename}, expected one of {FORMATS}.')
+
+    return file_format
+
+
+def _read_json_array(stream: IO[str]) -> Iterator[Any]:
+    """
+    Decode the items of a JSON array one at a time, reading the stream in blocks of READ_SIZE characters.
+
+    @param stream: Text stream holding a single JSON array.
+    @type stream: IO[str]
+
+    @return: Iterator over the items of the array.
+    @rtype: Iterator[Any]
+
+    @raise ValueError: If the stream does not hold a well-formed JSON array, or one of its items is longer than
+    MAX_RECORD_SIZE characters.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    exhausted = False
+    expected = '['
+
+    while True:
+        while position < len(buffer) and buffer[position].isspace():
+            position += 1
+
+        if position == len(buffer):
+            if exhausted:
+                raise ValueError('The JSON catalogue ends before its array is closed.')
+
+            buffer, position = stream.read(READ_SIZE), 0
+            exhausted = buffer == ''
+            continue
+
+        character = buffer[position]
+
+        if expected in ('[', ','):
+            if character == ']' and expected == ',':
+                return
+
+            if character != expected:
+                raise ValueError(f'Expected {expected!r} but found {character!r} in the JSON catalogue.')
+
+            position += 1
+            expected = 'item' if expected == ',' else 'first item'
+            continue
+
+        if character == ']' and expected == 'first item':
+            return
+
+        # An item is only decoded once a character follows it, so that a number is not cut short at a block boundary.
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+
+                if end < len(buffer) or exhausted:
+                    break
+            except ValueError:
+                if exhausted:
+                    raise
+
+            if len(buffer) - position > MAX_RECORD_SIZE:
+                raise ValueError(f'A record of the JSON catalogue is longer than {MAX_RECORD_SIZE} characters.')
+
+            more = stream.read(READ_SIZE)
+            exhausted = more == ''
+            buffer, position = buffer[position:] + more, 0
+
+        yield item
+        position = end
+        expected = ','
+
+
+def _read_ndjson(stream: IO[str]) -> Iterator[dict[str, Any] | ValueError]:
+    for line in stream:
+        if line.strip() == '':
+            continue
+
+        try:
+            yield json.loads(line)
+        except ValueError as error:
+            yield error
+
+
+def read_rows(stream: IO[str], file_format: str) -> Iterator[dict[str, Any] | ValueError]:
+    """
+    Read the records of a catalogue file one at a time, without loading the file into memory as a whole.
+
+    @param stream: Text stream of the catalogue.
+    @type stream: IO[str]
+    @param file_format: Format of the catalogue, one of FORMATS. JSON files hold a single array of objects, while
+    NDJSON files hold one object per line.
+    @type file_format: str
+
+    @return: Iterator over the records of the catalogue. Malformed NDJSON lines are yielded as the error raised while
+    decoding them, so that they are reported without stopping the import. The iterator raises ValueError or
+    csv.Error where the rest of the catalogue cannot be read, such as after malformed JSON or text that is not UTF-8.
+    @rtype: Iterator[dict[str, Any] | ValueError]
+
+    @raise ValueError: If the format is not supported.
+    """
+    if file_format == 'csv':
+        return iter(csv.DictReader(stream))
+    elif file_format == 'json':
+        return _read_json_array(stream)
+    elif file_format == 'ndjson':
+        return _read_ndjson(stream)
+
+    raise ValueError(f'Unsupported catalogue format {file_format}, expected one of {FORMATS}.')
+
+
+def _write_chunk(
+        connection: sqlite3.Connection, write: Callable[[sqlite3.Connection, Iterable[Any]], None],
+        chunk: list[tuple[int, Any]], report: ImportReport
+):
+    """
+    Write a chunk of parsed rows in one transaction, falling back to one row at a time to isolate failing rows.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param write: Model function writing many rows at once.
+    @type write: Callable[[sqlite3.Connection, Iterable[Any]], None]
+    @param chunk: Row numbers and models of the chunk.
+    @type chunk: list[tuple[int, Any]]
+    @param report: Report to record the outcome in.
+    @type report: ImportReport
+    """
+    try:
+        with connection:
+            write(connection, (model for _, model in chunk))
+
+        report.imported += len(chunk)
+        return
+    except sqlite3.Error:
+        pass
+
+    for row, model in chunk:
+        try:
+            with connection:
+                write(connection, (model,))
+
+            report.imported += 1
+        except sqlite3.Error as error:
+            report.add_error(row, str(error))
+
+
+def import_rows(
+        connection: sqlite3.Connection, table: str, rows: Iterable[dict[str, Any] | ValueError], chunk_size: int = 5000
+) -> ImportReport:
+    """
+    Validate and write catalogue records in chunked transactions, skipping and reporting invalid rows. If the records
+    cannot be read to their end, those read so far are written and the reason is reported as the error of the import.
+
+    @param connection: Connection to the database.
+    @type connection: sqlite3.Connection
+    @param table: Table to import into, one of TABLES.
+    @type table: str
+    @param rows: Records of the catalogue keyed by column name, as returned by read_rows.
+    @type rows: Iterable[dict[str, Any] | ValueError]
+    @param chunk_size: Number of rows written per transaction.
+    @type chunk_size: int
+
+    @return: Number of imported rows, the errors of the rejected ones and the reason the import stopped, if it did.
+    @rtype: ImportReport
+    """
+    parse, write = TABLES[table]
+    report = ImportReport()
+    chunk: list[tuple[int, Any]] = []
+    rows = iter(rows)
+    row_number = 0
+
+    while True:
+        try:
+            row = next(rows)
+        except StopIteration:
+            break
+        except (csv.Error, ValueError) as error:
+            report.error = f'Could not read the catalogue after row {row_number}: {error}'
+            break
+
+        row_number += 1
+
+        if isinstance(row, ValueError):
+            report.add_error(row_number, str(row))
+            continue
+
+        try:
+            chunk.append((row_number, parse(row)))
+        except (AttributeError, KeyError, TypeError, ValueError) as error:
+            report.add_error(row_number, str(error))
+            continue
+
+        if len(chunk) == chunk_size:
+            _write_chunk(connection, write, chunk, report)
+            chunk = []
+
+    if chunk:
+        _write_chunk(connection, write, chunk, report)
+
+    report.errors.sort()
+
+    return report
@@ -0,0 +1,366 @@
+"""In-process metrics of the requests, the connection pool, the caches and the database, in the Prometheus text
+exposition format."""
+import bisect
+import contextvars
+import os
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+import flask
+
+from src.database import pool
+from src.services import allocation, authorization, http_cache, passwords, reference_data
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_request_start: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('request_start', default=None)
+
+# Name, type, help and the name suffix, labels and value of each sample of a metric family.
+Family = tuple[str, str, str, list[tuple[str, dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ''
+
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and value == float('inf'):
+        return '+Inf'
+
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Thread-safe counter of each combination of its labels."""
+
+    def __init__(
+            self, name: str, help_: str, label_names: tuple[str, ...] = (), type_: str = 'counter',
+            lock: Optional[threading.Lock] = None
+    ):
+        self.name = name
+        self.help = help_
+        self.label_names = label_names
+        self.type = type_
+        # A metric without labels has a single series, reported from zero.
+        self._values: dict[tuple[str, ...], float] = {} if label_names else {(): 0}
+        self._lock = lock or threading.Lock()
+
+    def add(self, label_values: tuple[str, ...], amount: float):
+        """Add to the value of a series, while holding the lock of the metric."""
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def inc(self, *label_values: str, amount: float = 1):
+        with self._lock:
+            self.add(label_values, amount)
+
+    def collect(self) -> Family:
+        with self._lock:
+            values = list(self._values.items())
+
+        return self.name, self.type, self.help, [
+            ('', dict(zip(self.label_names, label_values)), value) for label_values, value in values
+        ]
+
+
+class Gauge(Counter):
+    """Thread-safe value of each combination of its labels that can go up and down."""
+
+    def __init__(
+            self, name: str, help_: str, label_names: tuple[str, ...] = (), lock: Optional[threading.Lock] = None
+    ):
+        super().__init__(name, help_, label_names, 'gauge', lock)
+
+    def dec(self, *label_values: str, amount: float = 1):
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram:
+    """Thread-safe distribution of observed values over fixed buckets, for each combination of its labels."""
+
+    def __init__(
+            self, name: str, help_: str, label_names: tuple[str, ...] = (), buckets: tuple[float, ...] = (),
+            lock: Optional[threading.Lock] = None
+    ):
+        self.name = name
+        self.help = help_
+        self.label_names = label_names
+        self.buckets = buckets
+        # Count of the observations in each bucket, the last one unbounded, then their sum.
+        self._series: dict[tuple[str, ...], list[float]] = {}
+        self._lock = lock or threading.Lock()
+
+    def add(self, label_values: tuple[str, ...], value: float):
+        """Add an observation to a series, while holding the lock of the metric."""
+        series = self._series.get(label_values)
+
+        if series is None:
+            series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def observe(self, value: float, *label_values: str):
+        with self._lock:
+            self.add(label_values, value)
+
+    def collect(self) -> Family:
+        with self._lock:
+            series = [(label_values, list(counts)) for label_values, counts in self._series.items()]
+
+        samples = []
+
+        for label_values, counts in series:
+            labels = dict(zip(self.label_names, label_values))
+            cumulative = 0
+
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                samples.append(('_bucket', {**labels, 'le': _format_value(float(bound))}, cumulative))
+
+            samples.append(('_sum', labels, counts[-1]))
+            samples.append(('_count', labels, cumulative))
+
+        return self.name, 'histogram', self.help, samples
+
+
+class MetricsRegistry:
+    """Metrics recorded as requests are handled, and collectors reading the state of other components on scrape."""
+
+    def __init__(self, latency_buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        # The request metrics share a lock, so that recording a request takes it once.
+        self._request_lock = threading.Lock()
+        self.requests = Counter(
+            'http_requests_total', 'Requests handled, by endpoint, method and status.',
+            ('endpoint', 'method', 'status'), lock=self._request_lock
+        )
+        self.latency = Histogram(
+            'http_request_duration_seconds', 'Time spent handling requests, by endpoint and method.',
+            ('endpoint', 'method'), latency_buckets, self._request_lock
+        )
+        self.in_flight = Gauge('http_requests_in_flight', 'Requests being handled.', lock=self._request_lock)
+        self.login_failures = Counter('login_failures_total', 'Logins rejected for a wrong email or password.')
+        self.busy_retries = Counter(
+            'sqlite_busy_retries_total', 'Transactions retried because another connection held the write lock.'
+        )
+        self._collectors: list[Callable[[], Iterable[Family]]] = []
+
+    def record_request(self, endpoint: str, method: str, status: int, duration: float):
+        """
+        Record a request that was handled.
+
+        @param endpoint: Endpoint of the request.
+        @type endpoint: str
+        @param method: HTTP method of the request.
+        @type method: str
+        @param status: Status code of the response.
+        @type status: int
+        @param duration: Time spent handling the request, in seconds.
+        @type duration: float
+        """
+        with self._request_lock:
+            self.latency.add((endpoint, method), duration)
+            self.requests.add((endpoint, method, str(status)), 1)
+            self.in_flight.add((), -1)
+
+    def add_collector(self, collector: Callable[[], Iterable[Family]]):
+        """
+        Add a function reading metric families when the metrics are scraped.
+
+        @param collector: Function returning the metric families.
+        @type collector: Callable[[], Iterable[Family]]
+        """
+        self._collectors.append(collector)
+
+    def collect(self) -> list[Family]:
+        """
+        Read every metric family.
+
+        @return: Metric families, the recorded ones first.
+        @rtype: list[Family]
+        """
+        families = [metric.collect() for metric in (
+            self.requests, self.latency, self.in_flight, self.login_failures, self.busy_retries
+        )]
+
+        for collector in self._collectors:
+            families.extend(collector())
+
+        return families
+
+    def render(self) -> str:
+        """
+        Render every metric family in the text exposition format.
+
+        @return: Exposition of the metrics.
+        @rtype: str
+        """
+        lines = []
+
+        for name, type_, help_, samples in self.collect():
+            lines.append(f'# HELP {name} {_escape(help_)}')
+            lines.append(f'# TYPE {name} {type_}')
+
+            lines += [
+                f'{name}{suffix}{_format_labels(labels)} {_format_value(value)}' for suffix, labels, value in samples
+            ]
+
+        return '\n'.join(lines) + '\n'
+
+
+def _cache_families(caches: dict[str, tuple[int, int]]) -> list[Family]:
+    """
+    Build the lookup counters and hit ratios of some caches.
+
+    @param caches: Hits and misses of each cache, by name.
+    @type caches: dict[str, tuple[int, int]]
+
+    @return: Metric families of the caches.
+    @rtype: list[Family]
+    """
+    lookups = []
+    ratios = []
+
+    for cache, (hits, misses) in caches.items():
+        lookups += [('', {'cache': cache, 'result': 'hit'}, hits), ('', {'cache': cache, 'result': 'miss'}, misses)]
+        ratios.append(('', {'cache': cache}, hits / (hits + misses) if hits + misses else 0.0))
+
+    return [
+        ('cache_lookups_total', 'counter', 'Lookups of the in-process caches, by result.', lookups),
+        ('cache_hit_ratio', 'gauge', 'Share of the lookups of each cache that were hits.', ratios)
+    ]
+
+
+def _collect_application(app: flask.Flask) -> list[Family]:
+    """
+    Read the state of the connection pool, the caches, the password hasher and the write-ahead log of an
+    application, as seen by the current worker process.
+
+    @param app: Flask application to read.
+    @type app: flask.Flask
+
+    @return: Metric families of the application.
+    @rtype: list[Family]
+    """
+    connection_pool = pool.get_pool(app)
+    response_cache = http_cache.get_cache(app)
+    role_cache = authorization.get_cache(app)
+    lot_allocator = allocation.get_allocator(app)
+    reference_stats = reference_data.get_cache(app).stats()
+    hasher_stats = passwords.get_hasher(app).stats()
+
+    wal_path = f'{app.config["DATABASE_PATH"]}-wal'
+    wal_size = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+
+    return [
+        ('database_pool_size', 'gauge', 'Maximum number of connections in the pool.', [('', {}, connection_pool.size)]),
+        ('database_pool_connections', 'gauge', 'Open connections of the pool, by state.', [
+            ('', {'state': 'in_use'}, connection_pool.in_use), ('', {'state': 'idle'}, connection_pool.idle)
+        ]),
+        ('database_pool_waits_total', 'counter', 'Acquisitions that waited for a connection to be released.', [
+            ('', {}, connection_pool.waits)
+        ]),
+        ('database_pool_exhausted_total', 'counter', 'Acquisitions that timed out waiting for a connection.', [
+            ('', {}, connection_pool.exhausted)
+        ]),
+        ('sqlite_wal_size_bytes', 'gauge', 'Size of the write-ahead log of the database.', [('', {}, wal_size)]),
+        *_cache_families({
+            'response': (response_cache.hits, response_cache.misses),
+            'role': (role_cache.hits, role_cache.misses),
+            'lot_heap': (lot_allocator.hits, lot_allocator.misses),
+            **{f'reference_{table}': (stats.hits, stats.misses) for table, stats in reference_stats.items()}
+        }),
+        ('reference_data_reloads_total', 'counter', 'Snapshots of the reference tables taken again after a change.', [
+            ('', {'table': table}, stats.reloads) for table, stats in reference_stats.items()
+        ]),
+        ('reference_data_rows', 'gauge', 'Rows held in the snapshot of each reference table.', [
+            ('', {'table': table}, stats.rows) for table, stats in reference_stats.items()
+        ]),
+        ('password_hashes_total', 'counter', 'Password hashes and checks, by outcome.', [
+            ('', {'result': 'completed'}, hasher_stats.completed), ('', {'result': 'rejected'}, hasher_stats.rejected)
+        ]),
+        ('password_hashes_pending', 'gauge', 'Password hashes and checks queued or running.', [
+            ('', {}, hasher_stats.pending)
+        ])
+    ]
+
+
+def _create_registry(app: flask.Flask) -> MetricsRegistry:
+    registry = MetricsRegistry(tuple(app.config.get('METRICS_LATENCY_BUCKETS', LATENCY_BUCKETS)))
+    registry.add_collector(lambda: _collect_application(app))
+
+    return registry
+
+
+def init_app(app: flask.Flask):
+    """
+    Record the metrics of the requests of an application and collect the state of its components on scrape. The
+    hooks keep the registry and the start time of the request out of the context locals of Flask, whose every access
+    costs about as much as recording the metrics does, and look the registry up in the application, so that a worker
+    process forked from a preloaded application records into its own.
+
+    @param app: Flask application to configure.
+    @type app: flask.Flask
+    """
+    app.config.setdefault('METRICS_LATENCY_BUCKETS', LATENCY_BUCKETS)
+    app.extensions['metrics'] = _create_registry(app)
+
+    def start_request():
+        _request_start.set(time.perf_counter())
+        get_registry(app).in_flight.inc()
+
+    def end_request(status: int):
+        start = _request_start.get()
+
+        if start is None:
+            return
+
+        _request_start.set(None)
+        request = flask.request._get_current_object()
+        get_registry(app).record_request(
+            request.endpoint or 'unmatched', request.method, status, time.perf_counter() - start
+        )
+
+    def record_response(response: flask.Response) -> flask.Response:
+        end_request(response.status_code)
+        return response
+
+    def record_failure(_exception: Optional[BaseException] = None):
+        # Only requests that raised past every error handler are left unrecorded at teardown.
+        end_request(500)
+
+    app.before_request(start_request)
+    app.after_request(record_response)
+    app.teardown_request(record_failure)
+
+
+def get_registry(app: Optional[flask.Flask] = None) -> MetricsRegistry:
+    """
+    Get the metrics registry of an application, creating it if the application was not configured.
+
+    @param app: Flask application owning the registry, defaults to the current application.
+    @type app: Optional[flask.Flask]
+
+    @return: Metrics registry of the application.
+    @rtype: MetricsRegistry
+    """
+    app = app or flask.current_app._get_current_object()
+    registry: Optional[MetricsRegistry] = app.extensions.get('metrics')
+
+    if registry is None:
+        registry = app.extensions.setdefault('metrics', _create_registry(app))
+
+    return registry
+
+
+def record_busy_retry():
+    """Count a transaction retried because the database was locked, if an application is handling it."""
+    if flask.has_app_context():
+        get_registry().busy_retries.inc()
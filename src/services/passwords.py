@@ -0,0 +1,195 @@
+"""Password hashing and verification on a bounded per-worker thread pool."""
+import concurrent.futures
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import flask
+import werkzeug.security as security
+
+_hasher_lock = threading.Lock()
+
+
+class HasherSaturatedError(RuntimeError):
+    """Raised when the hashing queue is full and the request should be rejected immediately."""
+
+
+@dataclass(frozen=True, slots=True)
+class HasherStats:
+    """Throughput counters of a password hasher since it was created."""
+    completed: int
+    rejected: int
+    pending: int
+    busy_seconds: float
+
+    @property
+    def average_seconds(self) -> float:
+        """
+        Calculate the average time spent hashing a password.
+
+        @return: Average seconds per completed hash, or zero if none have completed.
+        @rtype: float
+        """
+        return self.busy_seconds / self.completed if self.completed else 0.0
+
+
+class PasswordHasher:
+    """
+    Runs password hashing on a fixed number of threads. hashlib releases the GIL while hashing, so the threads run
+    in parallel with each other and with the request threads.
+    """
+
+    def __init__(self, method: str = 'scrypt', workers: Optional[int] = None, max_pending: int = 32):
+        self.pid = os.getpid()
+        self.method = method
+        self.max_pending = max_pending
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers or os.cpu_count() or 1, thread_name_prefix='password-hasher'
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._busy_seconds = 0.0
+
+        # Werkzeug fills in the default parameters of a method, so hash once to learn the full prefix.
+        self.method_prefix = security.generate_password_hash('', method).split('$', 1)[0]
+
+    def _run(self, function: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a hashing function on the pool and wait for its result.
+
+        @param function: Werkzeug function hashing or checking a password.
+        @type function: Callable[..., Any]
+        @param args: Arguments of the function.
+        @type args: Any
+
+        @return: Result of the function.
+        @rtype: Any
+
+        @raise HasherSaturatedError: If max_pending hashes are already queued or running.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise HasherSaturatedError('Too many password checks are in progress.')
+
+            self._pending += 1
+
+        def timed():
+            start = time.perf_counter()
+
+            try:
+                return function(*args)
+            finally:
+                elapsed = time.perf_counter() - start
+
+                with self._lock:
+                    self._completed += 1
+                    self._busy_seconds += elapsed
+
+        try:
+            return self._executor.submit(timed).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def hash(self, password: str) -> str:
+        """
+        Hash a password with the configured method.
+
+        @param password: Password in plain text.
+        @type password: str
+
+        @return: Salted hash of the password.
+        @rtype: str
+
+        @raise HasherSaturatedError: If the hashing queue is full.
+        """
+        return self._run(security.generate_password_hash, password, self.method)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        """
+        Check a password against its stored hash.
+
+        @param password_hash: Hash stored for the employee.
+        @type password_hash: str
+        @param password: Password in plain text.
+        @type password: str
+
+        @return: True if the password matches the hash.
+        @rtype: bool
+
+        @raise HasherSaturatedError: If the hashing queue is full.
+        """
+        return self._run(security.check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """
+        Check whether a stored hash was made with a method or cost other than the configured one.
+
+        @param password_hash: Hash stored for the employee.
+        @type password_hash: str
+
+        @return: True if the password should be hashed again.
+        @rtype: bool
+        """
+        return password_hash.split('$', 1)[0] != self.method_prefix
+
+    def stats(self) -> HasherStats:
+        """
+        Get the throughput counters of the hasher.
+
+        @return: Snapshot of the counters.
+        @rtype: HasherStats
+        """
+        with self._lock:
+            return HasherStats(self._completed, self._rejected, self._pending, self._busy_seconds)
+
+    def close(self):
+        """Wait for the running hashes and stop the threads."""
+        self._executor.shutdown()
+
+
+def init_app(app: flask.Flask):
+    """
+    Configure password hashing for an application.
+
+    @param app: Flask application to configure.
+    @type app: flask.Flask
+    """
+    app.config.setdefault('PASSWORD_HASH_METHOD', os.getenv('PASSWORD_HASH_METHOD', 'scrypt'))
+    app.config.setdefault('PASSWORD_HASH_WORKERS', None)
+    app.config.setdefault('PASSWORD_HASH_MAX_PENDING', 32)
+
+
+def get_hasher(app: Optional[flask.Flask] = None) -> PasswordHasher:
+    """
+    Get the password hasher of the current worker process, creating it after a fork if required.
+
+    @param app: Flask application owning the hasher, defaults to the current application.
+    @type app: Optional[flask.Flask]
+
+    @return: Password hasher of the current worker.
+    @rtype: PasswordHasher
+    """
+    app = app or flask.current_app._get_current_object()
+    hasher: Optional[PasswordHasher] = app.extensions.get('password_hasher')
+
+    if hasher is not None and hasher.pid == os.getpid():
+        return hasher
+
+    with _hasher_lock:
+        hasher = app.extensions.get('password_hasher')
+
+        if hasher is None or hasher.pid != os.getpid():
+            hasher = PasswordHasher(
+                app.config.get('PASSWORD_HASH_METHOD', 'scrypt'), app.config.get('PASSWORD_HASH_WORKERS'),
+                app.config.get('PASSWORD_HASH_MAX_PENDING', 32)
+            )
+            app.extensions['password_hasher'] = hasher
+
+    return hasher
@@ -0,0 +1,262 @@
+"""Per-worker read-through cache of the manufacturers and salts, held as immutable snapshots reloaded only when their
+tables change."""
+import os
+import sqlite3
+import threading
+import types
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Mapping, Optional
+
+import flask
+
+from src.database import versions
+from src.models import manufacturer as manufacturer_model
+from src.models import salt as salt_model
+
+LOADERS: dict[str, Callable[[sqlite3.Connection], Iterator[Any]]] = {
+    'manufacturer': manufacturer_model.iter_all,
+    'salt': salt_model.iter_all
+}
+TABLES = tuple(LOADERS)
+
+
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    """Immutable copy of a reference table at a version, with its models indexed by ID and by case-folded name."""
+    table: str
+    version: int
+    models: tuple[Any, ...]
+    by_id: Mapping[int, Any]
+    by_name: Mapping[str, tuple[Any, ...]]
+
+    @classmethod
+    def build(cls, table: str, version: int, models: Iterable[Any]) -> 'Snapshot':
+        """
+        Index the models of a table.
+
+        @param table: Name of the table.
+        @type table: str
+        @param version: Change counter of the table the models were read at.
+        @type version: int
+        @param models: Models of every row of the table.
+        @type models: Iterable[Any]
+
+        @return: Snapshot of the table, its models in ascending order of ID.
+        @rtype: Snapshot
+        """
+        ordered = tuple(sorted(models, key=lambda model: model.id))
+        by_name: dict[str, list[Any]] = {}
+
+        for model in ordered:
+            by_name.setdefault(model.name.casefold(), []).append(model)
+
+        return cls(
+            table, version, ordered, types.MappingProxyType({model.id: model for model in ordered}),
+            types.MappingProxyType({name: tuple(named) for name, named in by_name.items()})
+        )
+
+    @property
+    def ids(self) -> tuple[int, ...]:
+        return tuple(self.by_id)
+
+    def get(self, id_: int) -> Optional[Any]:
+        """
+        Get the model with an ID.
+
+        @param id_: ID of the row.
+        @type id_: int
+
+        @return: Model of the row, or None if it does not exist.
+        @rtype: Optional[Any]
+        """
+        return self.by_id.get(id_)
+
+    def get_many(self, ids: Iterable[int]) -> dict[int, Any]:
+        """
+        Get the models with any of some IDs.
+
+        @param ids: IDs of the rows.
+        @type ids: Iterable[int]
+
+        @return: Models keyed by ID in the order given, without the IDs that do not exist.
+        @rtype: dict[int, Any]
+        """
+        return {id_: self.by_id[id_] for id_ in ids if id_ in self.by_id}
+
+    def find_by_name(self, name: str) -> tuple[Any, ...]:
+        """
+        Find the models with a name, ignoring case.
+
+        @param name: Name to look up.
+        @type name: str
+
+        @return: Models with the name, in ascending order of ID.
+        @rtype: tuple[Any, ...]
+        """
+        return self.by_name.get(name.casefold(), ())
+
+
+@dataclass(frozen=True, slots=True)
+class ReferenceStats:
+    """Lookups of a reference table."""
+    hits: int
+    misses: int
+    reloads: int
+    version: Optional[int]
+    rows: int
+
+
+class ReferenceCache:
+    """
+    Thread-safe cache of the snapshots of the reference tables, owned by a single worker process. Its own connection
+    never writes, so the data version of that connection moves exactly when another connection commits, and only
+    then are the change counters of the tables read again. A snapshot is reloaded when the counter of its table moved.
+    """
+
+    def __init__(self, database_path: str, timeout: float = 5.0):
+        self.database_path = database_path
+        self.timeout = timeout
+        self.pid = os.getpid()
+
+        self._connection: Optional[sqlite3.Connection] = None
+        self._data_version: Optional[int] = None
+        self._snapshots: dict[str, Snapshot] = {}
+        self._lock = threading.Lock()
+
+        self._hits = dict.fromkeys(TABLES, 0)
+        self._misses = dict.fromkeys(TABLES, 0)
+        self._reloads = dict.fromkeys(TABLES, 0)
+        self.checks = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(
+                self.database_path, timeout=self.timeout, detect_types=sqlite3.PARSE_COLNAMES, check_same_thread=False
+            )
+            self._connection.execute('PRAGMA query_only = ON')
+
+        return self._connection
+
+    def _load(self, connection: sqlite3.Connection, table: str) -> Snapshot:
+        """
+        Read a table and its change counter in one transaction, so that the snapshot is of the version it records.
+
+        @return: Snapshot of the table.
+        """
+        connection.execute('BEGIN')
+
+        try:
+            version, = versions.get_versions(connection, table)
+            return Snapshot.build(table, version, LOADERS[table](connection))
+        finally:
+            connection.commit()
+
+    def get(self, table: str) -> Snapshot:
+        """
+        Get the snapshot of a reference table, reloading it if the table changed since it was taken.
+
+        @param table: Name of the table, one of TABLES.
+        @type table: str
+
+        @return: Current snapshot of the table.
+        @rtype: Snapshot
+
+        @raise ValueError: If the table is not a reference table.
+        """
+        if table not in LOADERS:
+            raise ValueError(f'{table} is not a reference table, expected one of {TABLES}.')
+
+        with self._lock:
+            connection = self._connect()
+            data_version = connection.execute('PRAGMA data_version').fetchone()[0]
+
+            if data_version != self._data_version:
+                # Any commit after the pragma moves the data version again, so none is missed by checking now.
+                self._data_version = data_version
+                self.checks += 1
+
+                for name, version in zip(TABLES, versions.get_versions(connection, *TABLES)):
+                    if name in self._snapshots and self._snapshots[name].version != version:
+                        del self._snapshots[name]
+                        self._reloads[name] += 1
+
+            snapshot = self._snapshots.get(table)
+
+            if snapshot is None:
+                snapshot = self._snapshots[table] = self._load(connection, table)
+                self._misses[table] += 1
+            else:
+                self._hits[table] += 1
+
+            return snapshot
+
+    def stats(self) -> dict[str, ReferenceStats]:
+        """
+        Get the lookup counters of each reference table.
+
+        @return: Counters and the cached version and row count of each table, by name.
+        @rtype: dict[str, ReferenceStats]
+        """
+        with self._lock:
+            return {
+                table: ReferenceStats(
+                    self._hits[table], self._misses[table], self._reloads[table],
+                    self._snapshots[table].version if table in self._snapshots else None,
+                    len(self._snapshots[table].models) if table in self._snapshots else 0
+                )
+                for table in TABLES
+            }
+
+    def close(self):
+        """Close the connection of the cache and drop the snapshots."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+            self._data_version = None
+            self._snapshots.clear()
+
+
+def init_app(app: flask.Flask):
+    """
+    Configure the reference data cache for an application.
+
+    @param app: Flask application to configure.
+    @type app: flask.Flask
+    """
+    app.extensions['reference_data'] = ReferenceCache(app.config['DATABASE_PATH'])
+
+
+def get_cache(app: Optional[flask.Flask] = None) -> ReferenceCache:
+    """
+    Get the reference data cache of an application, creating it if the application was not configured.
+
+    @param app: Flask application owning the cache, defaults to the current application.
+    @type app: Optional[flask.Flask]
+
+    @return: Reference data cache of the application.
+    @rtype: ReferenceCache
+    """
+    app = app or flask.current_app._get_current_object()
+    cache: Optional[ReferenceCache] = app.extensions.get('reference_data')
+
+    if cache is None:
+        cache = app.extensions.setdefault('reference_data', ReferenceCache(app.config['DATABASE_PATH']))
+
+    return cache
+
+
+def get_snapshot(table: str) -> Snapshot:
+    """
+    Get the current snapshot of a reference table for the application handling the request.
+
+    @param table: Name of the table, one of TABLES.
+    @type table: str
+
+    @return: Current snapshot of the table.
+    @rtype: Snapshot
+
+    @raise ValueError: If the table is not a reference table.
+    """
+    return get_cache().get(table)
@@ -1,41 +1,83 @@
-function getValidData(dataJSON, fields) {
-    const dataName = document.getElementById('search-box').value.toLowerCase();
-    const validData = [];
+const searchDelay = 200;
 
-    // Show the name of the first five pieces of data if the search box is empty.
-    if (dataName === '') {
-        return dataJSON.slice(0, 5);
+let searchTimeout = null;
+let searchController = null;
+
+// Server-rendered page of each list, shown while the search box is empty.
+const pageLists = {};
+
+/**
+ * Search the local copy of the list for the text currently in the search box, or query the search API of the
+ * warehouse until the list is synced.
+ * @param {string} searchURL URL of the search endpoint of the model.
+ * @returns {Promise<Object[]|null>} Best matching records, or null if the request was superseded.
+ */
+async function getValidData(searchURL) {
+    const dataName = document.getElementById('search-box').value;
+    const localData = typeof searchLocalData === 'function' ? searchLocalData(dataName, 6) : null;
+
+    if (localData !== null) {
+        return localData;
     }
 
-    for (let data of dataJSON) {
-        for (let field of fields) {
-            if (data[field].toString().toLowerCase().includes(dataName)) {
-                validData.push(data);
-                break;
-            }
-        }
+    if (searchController !== null) {
+        searchController.abort();
     }
+    searchController = new AbortController();
 
-    return validData.slice(0, 6);
+    try {
+        const response = await fetch(
+            `${searchURL}?q=${encodeURIComponent(dataName)}&limit=6`, {signal: searchController.signal}
+        );
+        return response.ok ? await response.json() : [];
+    } catch (error) {
+        if (error.name === 'AbortError') {
+            return null;
+        }
+        throw error;
+    }
 }
 
-function getMatchingResult(dataJSON, fields, validListID, dataType) {
-    const validData = getValidData(dataJSON, fields);
-
+async function getMatchingResult(searchURL, fields, validListID, dataType) {
     const validList = document.getElementById(validListID);
+    const pages = document.getElementById('pages');
+
+    if (!(validListID in pageLists)) {
+        pageLists[validListID] = validList.innerHTML;
+    }
+
+    // Show the current page again once the search box is cleared.
+    if (document.getElementById('search-box').value.trim() === '') {
+        if (searchController !== null) {
+            searchController.abort();
+        }
+
+        validList.innerHTML = pageLists[validListID];
+        pages.hidden = false;
+
+        return;
+    }
+
+    const validData = await getValidData(searchURL);
+
+    // A newer search replaced this one before it finished.
+    if (validData === null) {
+        return;
+    }
+
     validList.innerHTML = null;
+    pages.hidden = true;
 
     for (let data of validData) {
         const li = document.createElement('li');
 
-        let innerHTML = `<li>${data.id}`;
+        let text = `${data.id}`;
         for (let field of fields) {
             if (field !== 'id') {
-                innerHTML += ` ${data[field]}`;
+                text += ` ${data[field]}`;
             }
         }
-        innerHTML += `</li>`;
-        li.innerHTML = innerHTML;
+        li.textContent = text;
 
         li.addEventListener('click', () => {
             window.location.href = `${dataType}/${data.id}`
@@ -43,4 +85,12 @@ function getMatchingResult(dataJSON, fields, validListID, dataType) {
 
         validList.appendChild(li);
     }
-}
\ No newline at end of file
+}
+
+/**
+ * Search once the user stops typing for a short while instead of on every keystroke.
+ */
+function scheduleSearch(searchURL, fields, validListID, dataType) {
+    clearTimeout(searchTimeout);
+    searchTimeout = setTimeout(() => getMatchingResult(searchURL, fields, validListID, dataType), searchDelay);
+}
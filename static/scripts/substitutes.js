@@ -0,0 +1,34 @@
+/**
+ * Show the salts of the medicine and the medicines that can replace it, loaded separately so that the page itself
+ * stays cached until the medicine changes.
+ */
+async function showSubstitutes() {
+    const composition = document.getElementById('composition');
+    const response = await fetch(composition.dataset.url);
+
+    if (!response.ok) {
+        return;
+    }
+
+    const data = await response.json();
+    const salts = document.getElementById('medicine-salts');
+    const substitutes = document.getElementById('medicine-substitutes');
+
+    salts.textContent = data.salts.length > 0
+        ? `Salts: ${data.salts.map(salt => salt.name).join(', ')}`
+        : 'No salts recorded.';
+
+    for (let substitute of data.substitutes) {
+        const li = document.createElement('li');
+        const potency = substitute.potency !== null ? ` ${substitute.potency}` : '';
+
+        li.textContent = `${substitute.name}${potency} (${Math.round(substitute.overlap * 100)}% match)`;
+        li.addEventListener('click', () => {
+            redirectToPath('medicines', composition.dataset.medicineId, 'medicines', substitute.id);
+        });
+
+        substitutes.appendChild(li);
+    }
+}
+
+showSubstitutes();
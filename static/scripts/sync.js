@@ -0,0 +1,128 @@
+const syncKeyPrefix = 'warehouse-sync:';
+const wordPattern = /\w+/gu;
+
+// Local copy of the list being searched, or null until it is synced.
+let localIndex = null;
+
+/**
+ * Read the local copy of a list saved by a previous visit.
+ * @param {string} key Storage key of the list.
+ * @returns {Object|null} Saved change ID, fields and rows by ID, or null if there is none.
+ */
+function loadLocalData(key) {
+    try {
+        return JSON.parse(localStorage.getItem(key));
+    } catch (error) {
+        return null;
+    }
+}
+
+/**
+ * Fetch a page of the data API of a model.
+ * @param {string} dataURL URL of the data API of the model.
+ * @param {string[]} fields Fields of the records, starting with id.
+ * @param {string} cursor Query string of the page, after the fields.
+ * @returns {Promise<Object|null>} Page of rows and deleted IDs, or null if the request failed.
+ */
+async function fetchDataPage(dataURL, fields, cursor) {
+    const response = await fetch(`${dataURL}?fields=${fields.join(',')}${cursor}`);
+
+    return response.ok ? await response.json() : null;
+}
+
+/**
+ * Bring the local copy of a list up to date with the rows changed and deleted since it was last synced, paging
+ * through the whole list by ID only on the first visit. The change ID of the first page is kept as a watermark, so
+ * the rows changed while paging are caught up by the delta sync that follows.
+ * @param {string} dataURL URL of the data API of the model.
+ * @param {string[]} fields Fields of the records, starting with id.
+ */
+async function syncLocalData(dataURL, fields) {
+    const key = syncKeyPrefix + dataURL;
+    let stored = loadLocalData(key);
+    let page;
+
+    if (stored === null || stored.fields.join() !== fields.join()) {
+        stored = {changeID: null, fields: fields, rows: {}};
+    }
+
+    if (stored.changeID === null) {
+        let after = null;
+        let watermark = null;
+
+        do {
+            page = await fetchDataPage(dataURL, fields, after === null ? '' : `&after=${after}`);
+
+            if (page === null) {
+                return;
+            }
+
+            watermark = watermark === null ? page.change_id : watermark;
+
+            for (let row of page.rows) {
+                stored.rows[row[0]] = row;
+                after = row[0];
+            }
+        } while (page.more);
+
+        stored.changeID = watermark;
+    }
+
+    do {
+        page = await fetchDataPage(dataURL, fields, `&since=${stored.changeID}`);
+
+        if (page === null) {
+            return;
+        }
+
+        for (let row of page.rows) {
+            stored.rows[row[0]] = row;
+        }
+        for (let id of page.deleted) {
+            delete stored.rows[id];
+        }
+        stored.changeID = page.change_id;
+    } while (page.more);
+
+    try {
+        localStorage.setItem(key, JSON.stringify(stored));
+    } catch (error) {
+        // The list does not fit in the storage quota, so it is only kept for this page.
+        localStorage.removeItem(key);
+    }
+
+    localIndex = Object.values(stored.rows).map(row => ({
+        record: Object.fromEntries(fields.map((field, index) => [field, row[index]])),
+        words: row.slice(1).join(' ').toLowerCase().match(wordPattern) || []
+    }));
+}
+
+/**
+ * Search the local copy of the list by ID and by prefix matches on every word, like the search API.
+ * @param {string} query Text typed by the user.
+ * @param {number} limit Maximum number of results.
+ * @returns {Object[]|null} Matching records, or null if the list is not synced yet.
+ */
+function searchLocalData(query, limit) {
+    if (localIndex === null) {
+        return null;
+    }
+
+    const tokens = query.toLowerCase().match(wordPattern);
+
+    if (tokens === null) {
+        return localIndex.slice(0, limit).map(entry => entry.record);
+    }
+
+    const id = query.trim();
+    const exact = localIndex.filter(entry => `${entry.record.id}` === id);
+    const matches = localIndex.filter(entry => (
+        `${entry.record.id}` !== id && tokens.every(token => entry.words.some(word => word.startsWith(token)))
+    ));
+
+    return exact.concat(matches).slice(0, limit).map(entry => entry.record);
+}
+
+if (typeof dataURL !== 'undefined') {
+    syncLocalData(dataURL, fields);
+}
@@ -0,0 +1,109 @@
+import sqlite3
+from unittest import TestCase
+
+from src.database import change_log
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(':memory:')
+        self.connection.executescript(''.join(
+            f'CREATE TABLE {table} (id INTEGER PRIMARY KEY, name TEXT);' for table in change_log.TABLES
+        ))
+
+        change_log.create_schema(self.connection)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_full_sync(self):
+        self.connection.execute('INSERT INTO salt VALUES (1, \'Aspirin\'), (2, \'Ibuprofen\')')
+        self.connection.execute('INSERT INTO medicine VALUES (1, \'Disprin\')')
+
+        changes = change_log.get_changes(self.connection, 'salt', ('id', 'name'))
+
+        self.assertEqual(3, changes.change_id)
+        self.assertEqual([(1, 'Aspirin'), (2, 'Ibuprofen')], changes.rows)
+        self.assertEqual([], changes.deleted)
+
+    def test_delta_sync(self):
+        self.connection.execute('INSERT INTO salt VALUES (1, \'Aspirin\'), (2, \'Ibuprofen\'), (3, \'Zinc\')')
+        since = change_log.get_changes(self.connection, 'salt', ('id',)).change_id
+
+        self.connection.execute('UPDATE salt SET name = \'Paracetamol\' WHERE id = 2')
+        self.connection.execute('UPDATE salt SET name = \'Acetaminophen\' WHERE id = 2')
+        self.connection.execute('DELETE FROM salt WHERE id = 3')
+        self.connection.execute('INSERT INTO salt VALUES (4, \'Iron\')')
+
+        changes = change_log.get_changes(self.connection, 'salt', ('id', 'name'), since)
+
+        self.assertEqual([(2, 'Acetaminophen'), (4, 'Iron')], changes.rows)
+        self.assertEqual([3], changes.deleted)
+        self.assertEqual(
+            change_log.Changes(changes.change_id, ('id', 'name'), [], []),
+            change_log.get_changes(self.connection, 'salt', ('id', 'name'), changes.change_id)
+        )
+
+    def test_full_sync_pages(self):
+        self.connection.executemany('INSERT INTO salt VALUES (?, ?)', [(id_, f'Salt {id_}') for id_ in range(1, 6)])
+        first = change_log.get_changes(self.connection, 'salt', ('id',), limit=2)
+
+        self.connection.execute('UPDATE salt SET name = \'Zinc\' WHERE id = 1')
+        self.connection.execute('DELETE FROM salt WHERE id = 4')
+
+        second = change_log.get_changes(self.connection, 'salt', ('id',), after=2, limit=2)
+        last = change_log.get_changes(self.connection, 'salt', ('id',), after=5, limit=2)
+
+        self.assertEqual(([(1,), (2,)], True), (first.rows, first.more))
+        self.assertEqual(([(3,), (5,)], True), (second.rows, second.more))
+        self.assertEqual(([], False), (last.rows, last.more))
+
+        # The changes made while paging are caught up from the watermark of the first page.
+        changes = change_log.get_changes(self.connection, 'salt', ('id', 'name'), first.change_id)
+
+        self.assertEqual(([(1, 'Zinc')], [4]), (changes.rows, changes.deleted))
+
+    def test_delta_sync_pages(self):
+        self.connection.executemany('INSERT INTO salt VALUES (?, ?)', [(id_, f'Salt {id_}') for id_ in range(1, 4)])
+        self.connection.execute('DELETE FROM salt WHERE id = 2')
+
+        first = change_log.get_changes(self.connection, 'salt', ('id',), 0, limit=2)
+        second = change_log.get_changes(self.connection, 'salt', ('id',), first.change_id, limit=2)
+
+        # The deletion replaced the insert of the row, so it is the latest change.
+        self.assertEqual(([(1,), (3,)], [], True, 3), (first.rows, first.deleted, first.more, first.change_id))
+        self.assertEqual(([], [2], False), (second.rows, second.deleted, second.more))
+        self.assertEqual(4, second.change_id)
+
+    def test_changed_id(self):
+        self.connection.execute('INSERT INTO salt VALUES (1, \'Aspirin\')')
+        self.connection.execute('UPDATE salt SET id = 5 WHERE id = 1')
+
+        changes = change_log.get_changes(self.connection, 'salt', ('id', 'name'), 1)
+
+        self.assertEqual([(5, 'Aspirin')], changes.rows)
+        self.assertEqual([1], changes.deleted)
+
+    def test_upsert(self):
+        self.connection.execute('INSERT INTO salt VALUES (1, \'Aspirin\')')
+
+        for name in ('Paracetamol', 'Acetaminophen'):
+            self.connection.execute(
+                'INSERT INTO salt VALUES (1, ?) ON CONFLICT (id) DO UPDATE SET name = excluded.name', (name,)
+            )
+
+        changes = change_log.get_changes(self.connection, 'salt', ('id', 'name'), 1)
+
+        self.assertEqual(3, changes.change_id)
+        self.assertEqual([(1, 'Acetaminophen')], changes.rows)
+
+    def test_recreate_triggers(self):
+        change_log.recreate_triggers(self.connection)
+        self.test_upsert()
+
+    def test_invalid_fields(self):
+        with self.assertRaises(ValueError):
+            change_log.get_changes(self.connection, 'salt', ('id', 'password'))
+
+        with self.assertRaises(ValueError):
+            change_log.get_changes(self.connection, 'employee', ('id',))
@@ -0,0 +1,92 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import flask
+
+from src.database import instrumentation, pool
+from src.models import salt
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+        self.app = flask.Flask(__name__)
+        self.app.config['DATABASE_PATH'] = os.path.join(self.directory.name, 'instrumentation.db')
+        self.app.config['N_PLUS_ONE_THRESHOLD'] = 3
+        pool.init_app(self.app)
+        instrumentation.init_app(self.app)
+
+        @self.app.route('/salts')
+        def salts():
+            connection = pool.get_connection()
+            connection.execute('CREATE TABLE IF NOT EXISTS salt (id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL)')
+            connection.execute('INSERT OR IGNORE INTO salt VALUES (1, \'Aspirin\'), (2, \'Ibuprofen\')')
+
+            return flask.jsonify([salt.get_by_id(connection, salt_id) for salt_id in (1, 2, 3)])
+
+        self.client = self.app.test_client()
+
+        # Open the connection before the requests, so that its pragmas are not profiled.
+        with self.app.app_context():
+            pool.get_connection()
+
+    def tearDown(self):
+        pool.get_pool(self.app).close()
+        self.directory.cleanup()
+
+    def test_profile(self):
+        profiles = []
+
+        @self.app.after_request
+        def keep_profile(response):
+            profiles.append(instrumentation.get_profile())
+            return response
+
+        with self.assertLogs(instrumentation.logger, 'WARNING') as logs:
+            response = self.client.get('/salts')
+
+        queries = profiles[0].queries
+
+        self.assertEqual([{'id': 1, 'name': 'Aspirin'}, {'id': 2, 'name': 'Ibuprofen'}, None], response.json)
+        self.assertEqual(5, len(queries))
+        self.assertEqual((2, 'INSERT OR IGNORE INTO salt VALUES (1, \'Aspirin\'), (2, \'Ibuprofen\')'), (
+            queries[1].rows, queries[1].expanded
+        ))
+        self.assertEqual([1, 1, 0], [query.rows for query in queries[2:]])
+        self.assertEqual('SELECT id, name FROM salt WHERE id = 3', queries[4].expanded)
+        self.assertIsNone(instrumentation.get_profile())
+
+        self.assertEqual(1, len(logs.output))
+        self.assertIn('Statement run 3 times in GET /salts', logs.output[0])
+
+        self.assertRegex(
+            response.headers['Server-Timing'], r'^db;dur=[\d.]+;desc="5 queries", json;dur=[\d.]+, total;dur=[\d.]+$'
+        )
+
+    def test_slow_queries(self):
+        self.app.config['SLOW_QUERY_THRESHOLD'] = 0
+
+        with self.assertLogs(instrumentation.logger, 'WARNING') as logs:
+            self.client.get('/salts')
+
+        self.assertEqual(5, sum('Slow query in GET /salts' in line for line in logs.output))
+        self.assertTrue(any(line.endswith('WHERE id = ?') for line in logs.output))
+        self.assertFalse(any('WHERE id = 3' in line for line in logs.output))
+
+    def test_slow_query_parameters(self):
+        self.app.config['SLOW_QUERY_THRESHOLD'] = 0
+        self.app.config['SLOW_QUERY_LOG_PARAMETERS'] = True
+
+        with self.assertLogs(instrumentation.logger, 'WARNING') as logs:
+            self.client.get('/salts')
+
+        self.assertTrue(any(line.endswith('WHERE id = 3') for line in logs.output))
+
+    def test_outside_requests(self):
+        with self.app.app_context():
+            connection = pool.get_connection()
+
+            self.assertIs(type(connection.cursor()), instrumentation.sqlite3.Cursor)
+            self.assertEqual(1, connection.execute('SELECT 1').fetchone()[0])
@@ -0,0 +1,52 @@
+import sqlite3
+from unittest import TestCase
+
+from src.database import migrations
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(':memory:')
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_migrate(self):
+        applied = migrations.migrate(self.connection)
+
+        self.assertEqual([migration.version for migration in migrations.MIGRATIONS], [
+            migration.version for migration in applied
+        ])
+        self.assertEqual(migrations.MIGRATIONS[-1].version, migrations.get_version(self.connection))
+        self.assertEqual([], migrations.migrate(self.connection))
+
+        tables = {name for name, in self.connection.execute('SELECT name FROM sqlite_master WHERE type = \'table\'')}
+        indexes = {name for name, in self.connection.execute('SELECT name FROM sqlite_master WHERE type = \'index\'')}
+
+        self.assertLessEqual(
+            {'customer', 'employee', 'manufacturer', 'medicine', 'sale', 'salt', 'stock', 'sale_item', 'change_log'},
+            tables
+        )
+        self.assertLessEqual({'employee_email_address_index', 'sale_employee_id_index'}, indexes)
+
+    def test_migrate_existing_database(self):
+        self.connection.executescript(migrations.TABLES + 'INSERT INTO salt VALUES (1, \'Aspirin\');')
+
+        self.assertEqual(0, migrations.get_version(self.connection))
+        self.assertEqual(len(migrations.MIGRATIONS), len(migrations.migrate(self.connection)))
+        self.assertEqual([(1, 'Aspirin')], self.connection.execute('SELECT * FROM salt').fetchall())
+        self.assertEqual([(1,)], self.connection.execute(
+            'SELECT rowid FROM salt_fts WHERE salt_fts MATCH \'aspirin\''
+        ).fetchall())
+
+    def test_optimize(self):
+        migrations.migrate(self.connection)
+        self.connection.execute('INSERT INTO salt VALUES (1, \'Aspirin\')')
+        self.connection.commit()
+
+        migrations.optimize(self.connection, analyze=True)
+
+        self.assertIn(('salt', 'salt_name_index'), self.connection.execute(
+            'SELECT tbl, idx FROM sqlite_stat1'
+        ).fetchall())
+        self.assertFalse(self.connection.in_transaction)
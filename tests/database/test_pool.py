@@ -0,0 +1,87 @@
+import os
+import tempfile
+from dataclasses import dataclass
+from datetime import date
+from unittest import TestCase
+
+import flask
+
+from src.database import pool
+from src.models import mapper
+
+
+@dataclass(frozen=True, slots=True)
+class Batch:
+    id: int
+    cost: float
+    expiry_date: date
+    recalled: bool
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.database_path = os.path.join(self.directory.name, 'pool.db')
+
+        self.pool = pool.ConnectionPool(self.database_path, size=2, timeout=0.1)
+
+    def tearDown(self):
+        self.pool.close()
+        self.directory.cleanup()
+
+    def test_pragmas(self):
+        connection = self.pool.acquire()
+
+        self.assertEqual('wal', connection.execute('PRAGMA journal_mode').fetchone()[0])
+        self.assertEqual(1, connection.execute('PRAGMA synchronous').fetchone()[0])
+
+        self.pool.release(connection)
+
+    def test_reuse(self):
+        connection = self.pool.acquire()
+        self.pool.release(connection)
+
+        self.assertIs(connection, self.pool.acquire())
+
+    def test_exhausted(self):
+        self.pool.acquire()
+        self.pool.acquire()
+
+        self.assertEqual(2, self.pool.in_use)
+        self.assertRaises(pool.PoolExhaustedError, self.pool.acquire)
+
+    def test_typed_columns(self):
+        batch_mapper = mapper.TableMapper('batch', Batch)
+        connection = self.pool.acquire()
+        connection.execute(
+            'CREATE TABLE batch (id INTEGER PRIMARY KEY, cost DECIMAL, expiry_date DATE, recalled BOOLEAN)'
+        )
+        batch_mapper.insert(connection, Batch(1, 2.5, date(2024, 3, 1), True))
+
+        # The driver parses the typed columns, before the mapper would in Python.
+        self.assertEqual((1, 2.5, date(2024, 3, 1), True), connection.execute(batch_mapper.select).fetchone())
+        self.assertEqual(Batch(1, 2.5, date(2024, 3, 1), True), batch_mapper.get_by_id(connection, 1))
+
+        self.pool.release(connection)
+
+    def test_release_rolls_back(self):
+        connection = self.pool.acquire()
+        connection.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+        connection.execute('INSERT INTO item VALUES (1)')
+
+        self.pool.release(connection)
+
+        self.assertFalse(connection.in_transaction)
+        self.assertEqual(0, connection.execute('SELECT COUNT(*) FROM item').fetchone()[0])
+
+    def test_request_scope(self):
+        app = flask.Flask(__name__)
+        app.config['DATABASE_PATH'] = self.database_path
+        pool.init_app(app)
+
+        with app.app_context():
+            connection = pool.get_connection()
+            self.assertIs(connection, pool.get_connection())
+            self.assertEqual(1, pool.get_pool().in_use)
+
+        self.assertEqual(0, pool.get_pool(app).in_use)
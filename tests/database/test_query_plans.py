@@ -0,0 +1,42 @@
+import sqlite3
+from unittest import TestCase
+
+from src.database import migrations, query_plans
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(':memory:')
+        migrations.migrate(self.connection)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_check(self):
+        self.assertEqual([], query_plans.check(self.connection))
+        self.assertFalse(self.connection.in_transaction)
+
+    def test_check_missing_index(self):
+        self.connection.executescript('''
+            DROP INDEX sale_employee_id_index;
+            DROP INDEX sale_date_time_index;
+        ''')
+
+        problems = query_plans.check(self.connection)
+
+        self.assertIn('sale.iter_filtered by employee', {problem.name for problem in problems})
+        self.assertIn('sale.get_page by date_time', {problem.name for problem in problems})
+
+    def test_find_problems(self):
+        self.assertEqual(['SCAN medicine'], [problem.detail for problem in query_plans.find_problems(
+            'query', 'SELECT', ['SCAN medicine']
+        )])
+        self.assertEqual([], query_plans.find_problems(
+            'query', 'SELECT', ['SCAN medicine USING INDEX medicine_name_index'], ordered=True
+        ))
+        self.assertEqual([], query_plans.find_problems(
+            'query', 'WITH', ['MATERIALIZE target', 'SCAN target', 'SCAN main.medicine_fts_config']
+        ))
+        self.assertEqual(['USE TEMP B-TREE FOR ORDER BY'], [problem.detail for problem in query_plans.find_problems(
+            'query', 'SELECT', ['SCAN medicine', 'USE TEMP B-TREE FOR ORDER BY'], ordered=True
+        )])
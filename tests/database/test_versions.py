@@ -0,0 +1,42 @@
+import sqlite3
+from unittest import TestCase
+
+from src.database import versions
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(':memory:')
+        self.connection.executescript(''.join(
+            f'CREATE TABLE {table} (id INTEGER PRIMARY KEY, name TEXT);' for table in versions.TABLES
+        ))
+
+        versions.create_schema(self.connection)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_get_versions(self):
+        self.assertEqual((0, 0), versions.get_versions(self.connection, 'salt', 'medicine'))
+
+        self.connection.execute('INSERT INTO salt VALUES (1, \'Aspirin\'), (2, \'Ibuprofen\')')
+        self.connection.execute('UPDATE salt SET name = \'Paracetamol\' WHERE id = 2')
+
+        self.assertEqual((3, 0), versions.get_versions(self.connection, 'salt', 'medicine'))
+
+    def test_get_row_version(self):
+        self.connection.execute('INSERT INTO salt VALUES (1, \'Aspirin\'), (2, \'Ibuprofen\')')
+        self.connection.execute('UPDATE salt SET name = \'Paracetamol\' WHERE id = 2')
+        self.connection.execute('DELETE FROM salt WHERE id = 2')
+
+        self.assertEqual(0, versions.get_row_version(self.connection, 'salt', 1))
+        self.assertEqual(2, versions.get_row_version(self.connection, 'salt', 2))
+        self.assertEqual(0, versions.get_row_version(self.connection, 'medicine', 2))
+
+    def test_get_row_versions(self):
+        self.connection.execute('INSERT INTO salt VALUES (1, \'Aspirin\'), (2, \'Ibuprofen\'), (3, \'Zinc\')')
+        self.connection.execute('UPDATE salt SET name = \'Paracetamol\' WHERE id IN (2, 3)')
+        self.connection.execute('DELETE FROM salt WHERE id = 3')
+
+        self.assertEqual({2: 1, 3: 2}, versions.get_row_versions(self.connection, 'salt', (1, 2, 3, 4)))
+        self.assertEqual({}, versions.get_row_versions(self.connection, 'salt', ()))
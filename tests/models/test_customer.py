@@ -1,16 +1,29 @@
+import os
 import sqlite3
+import tempfile
 from datetime import date
 from unittest import TestCase
 
+from src.database import migrations
 from src.models import customer
 
 
 class Test(TestCase):
     def setUp(self):
-        self.connection = sqlite3.connect('../static/test.db')
+        self.directory = tempfile.TemporaryDirectory()
+        self.connection = sqlite3.connect(os.path.join(self.directory.name, 'test.db'))
+
+        migrations.migrate(self.connection)
+        self.connection.executescript('''
+            INSERT INTO customer VALUES
+                (1, 'Mary', 'Johnson', '111-222-3333', 'mary.j@example.com', '789 Maple St', 'F', '1980-03-15'),
+                (2, 'James', 'Brown', '222-333-4444', 'james.b@example.com', '12 Pine St', 'M', '1975-11-02'),
+                (3, 'Linda', 'Davis', '444-555-6666', NULL, NULL, NULL, NULL);
+        ''')
 
     def tearDown(self):
         self.connection.close()
+        self.directory.cleanup()
 
     def test_get_all_ids(self):
         self.assertEqual({1, 2, 3}, customer.get_all_ids(self.connection))
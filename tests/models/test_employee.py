@@ -1,18 +1,36 @@
+import os
 import sqlite3
+import tempfile
 from datetime import date
 from unittest import TestCase
 
 import werkzeug.security as security
 
+from src.database import migrations
 from src.models import employee
 
+PASSWORD_HASHES = tuple(security.generate_password_hash(f'pass@word{number}') for number in (1, 2, 3))
+
 
 class Test(TestCase):
     def setUp(self):
-        self.connection = sqlite3.connect('../static/test.db')
+        self.directory = tempfile.TemporaryDirectory()
+        self.connection = sqlite3.connect(os.path.join(self.directory.name, 'test.db'))
+
+        migrations.migrate(self.connection)
+        self.connection.executemany('INSERT INTO employee VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', [
+            (1, 'Michael', 'Johnson', '333-444-5555', 'michael.j@example.com', '123 Elm St', 'M', '1985-07-20',
+             '2019-01-15', 'Sales Rep', 3000.0, PASSWORD_HASHES[0], True, False),
+            (2, 'Sarah', 'Smith', '666-777-8888', 'sarah.s@example.com', '456 Oak St', 'F', '1988-03-19',
+             '2020-05-20', 'Pharmacist', 4000.0, PASSWORD_HASHES[1], True, True),
+            (3, 'David', 'Lee', '999-000-1111', 'david.l@example.com', '789 Birch St', 'M', '1992-09-05',
+             '2022-02-01', None, 2500.0, PASSWORD_HASHES[2], False, False)
+        ])
+        self.connection.commit()
 
     def tearDown(self):
         self.connection.close()
+        self.directory.cleanup()
 
     def test_get_all_ids(self):
         self.assertEqual({1, 2, 3}, employee.get_all_ids(self.connection))
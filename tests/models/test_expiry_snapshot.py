@@ -0,0 +1,72 @@
+import sqlite3
+from datetime import date
+from unittest import TestCase
+
+from src.database import versions
+from src.models import expiry_snapshot
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(':memory:')
+        self.connection.executescript('''
+            CREATE TABLE medicine (id INTEGER PRIMARY KEY, expiry_date DATE, cost_price REAL);
+
+            INSERT INTO medicine VALUES (1, '2024-01-31', 10), (2, '2024-02-01', 2), (3, '2024-03-01', 3),
+                                        (4, '2024-06-01', 7);
+        ''')
+        self.connection.executescript(''.join(
+            f'CREATE TABLE {table} (id INTEGER PRIMARY KEY);' for table in versions.TABLES if table != 'medicine'
+        ))
+
+        versions.create_schema(self.connection)
+        expiry_snapshot.create_schema(self.connection)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_take(self):
+        snapshot = expiry_snapshot.take(self.connection, date(2024, 2, 1), 30)
+
+        self.assertEqual(expiry_snapshot.ExpirySnapshot(date(2024, 2, 1), 30, 1, 10, 2, 5), snapshot)
+        self.assertEqual(snapshot, expiry_snapshot.get_by_date(self.connection, date(2024, 2, 1), 30))
+        self.assertIsNone(expiry_snapshot.get_by_date(self.connection, date(2024, 2, 1), 60))
+
+    def test_take_prunes_old_snapshots(self):
+        expiry_snapshot.take(self.connection, date(2024, 1, 1), 30)
+        expiry_snapshot.take(self.connection, date(2024, 2, 15), 30)
+
+        self.assertIsNone(expiry_snapshot.get_by_date(self.connection, date(2024, 1, 1), 30))
+
+    def test_get_or_take_after_medicine_changes(self):
+        self.assertEqual(4, expiry_snapshot.get_or_take(self.connection, 30).expired_count)
+
+        self.connection.execute('DELETE FROM medicine WHERE id = 3')
+        self.connection.commit()
+
+        self.assertEqual(3, expiry_snapshot.get_or_take(self.connection, 30).expired_count)
+
+    def test_add_medicine_version(self):
+        self.connection.executescript('''
+            DROP TABLE expiry_snapshot;
+
+            CREATE TABLE expiry_snapshot (
+                snapshot_date DATE NOT NULL,
+                within_days INTEGER NOT NULL,
+                expired_count INTEGER NOT NULL,
+                expired_cost REAL NOT NULL,
+                expiring_count INTEGER NOT NULL,
+                expiring_cost REAL NOT NULL,
+                PRIMARY KEY (snapshot_date, within_days)
+            ) WITHOUT ROWID;
+
+            INSERT INTO expiry_snapshot VALUES ('2024-02-01', 30, 1, 10, 2, 5);
+        ''')
+
+        expiry_snapshot.add_medicine_version(self.connection)
+        expiry_snapshot.add_medicine_version(self.connection)
+
+        self.assertEqual(
+            expiry_snapshot.ExpirySnapshot(date(2024, 2, 1), 30, 1, 10, 2, 5, 0),
+            expiry_snapshot.get_by_date(self.connection, date(2024, 2, 1), 30)
+        )
@@ -0,0 +1,70 @@
+import sqlite3
+from datetime import date, datetime
+from unittest import TestCase
+
+from src.database import migrations
+from src.models import customer, employee, identity_map, sale
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(':memory:')
+        self.connection.executescript(migrations.TABLES)
+        self.connection.executemany('INSERT INTO employee VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', [
+            (id_, f'Staff {id_}', 'Kumar', f'98000{id_}', f'staff{id_}@example.com', 'Delhi', 'F', date(1990, 1, 1),
+             date(2020, 1, 1), 'Pharmacist', 30000, 'hash', True, False)
+            for id_ in (1, 2)
+        ])
+        self.connection.executemany('INSERT INTO customer VALUES (?, ?, ?, ?, NULL, NULL, NULL, NULL)', [
+            (id_, f'Customer {id_}', 'Shah', f'99000{id_}') for id_ in (1, 2, 3)
+        ])
+        self.connection.executemany('INSERT INTO sale VALUES (?, ?, ?, ?, ?)', [
+            (id_, datetime(2024, 2, id_, 10, 0, 0), id_ % 2 + 1, id_ % 3 + 1, 10.0 * id_) for id_ in range(1, 21)
+        ])
+
+        self.statements = []
+        self.connection.set_trace_callback(self.statements.append)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_get_many_with_related(self):
+        related_sales = sale.get_many_with_related(self.connection, (5, 100, 2, 5))
+
+        self.assertEqual([5, 2], [related.sale.id for related in related_sales])
+        self.assertEqual(employee.EmployeeSummary(2, 'Staff 2', 'Kumar'), related_sales[0].employee)
+        self.assertEqual('Customer 3 Shah', related_sales[0].customer.full_name)
+        self.assertEqual(3, len(self.statements))
+
+    def test_include(self):
+        related_sales = sale.get_many_with_related(self.connection, range(1, 21), include=('customer',))
+
+        self.assertTrue(all(related.employee is None for related in related_sales))
+        self.assertEqual({1, 2, 3}, {related.customer.id for related in related_sales})
+        self.assertEqual(2, len(self.statements))
+        self.assertRaises(ValueError, sale.get_many_with_related, self.connection, (1,), ('manufacturer',))
+
+    def test_identity_map(self):
+        identities = identity_map.IdentityMap()
+        sale.load_related(self.connection, sale.get_page(self.connection, None, 2), identities=identities)
+        self.statements.clear()
+
+        related_sales = sale.load_related(self.connection, sale.get_page(self.connection, 2, 10), identities=identities)
+
+        # The page references every employee, already loaded, and only the first customer is new.
+        self.assertEqual(2, len(self.statements))
+        self.assertIn('IN (1)', self.statements[-1])
+        self.assertEqual(customer.CustomerSummary(1, 'Customer 1', 'Shah'), related_sales[0].customer)
+
+    def test_missing(self):
+        identities = identity_map.IdentityMap()
+        loads = []
+
+        def load(ids: tuple[int, ...]) -> dict[int, str]:
+            loads.append(ids)
+            return {id_: str(id_) for id_ in ids if id_ < 3}
+
+        self.assertEqual({1: '1', 2: '2'}, identities.get_many(str, (1, 2, 3, 2), load))
+        self.assertEqual({2: '2'}, identities.get_many(str, (2, 3), load))
+        self.assertEqual([(1, 2, 3)], loads)
+        self.assertEqual((2, 3), (identities.hits, identities.misses))
@@ -1,15 +1,28 @@
+import os
 import sqlite3
+import tempfile
 from unittest import TestCase
 
+from src.database import migrations
 from src.models import manufacturer
 
 
 class Test(TestCase):
     def setUp(self):
-        self.connection = sqlite3.connect('../static/test.db')
+        self.directory = tempfile.TemporaryDirectory()
+        self.connection = sqlite3.connect(os.path.join(self.directory.name, 'test.db'))
+
+        migrations.migrate(self.connection)
+        self.connection.executescript('''
+            INSERT INTO manufacturer VALUES
+                (1, 'Pfizer', '123-456-7890', '235 East 42nd St'),
+                (2, 'GlaxoSmithKline', '987-654-3210', NULL),
+                (3, 'Novartis', '555-123-4567', NULL);
+        ''')
 
     def tearDown(self):
         self.connection.close()
+        self.directory.cleanup()
 
     def test_get_all_ids(self):
         self.assertEqual({1, 2, 3}, manufacturer.get_all_ids(self.connection))
@@ -26,3 +39,9 @@ class Test(TestCase):
         }
 
         self.assertEqual(manufacturers, manufacturer.get_all(self.connection))
+
+    def test_upsert(self):
+        manufacturer_2 = manufacturer.Manufacturer(2, 'GSK', '987-654-3210', None)
+
+        self.assertFalse(manufacturer.upsert(self.connection, manufacturer_2))
+        self.assertEqual(manufacturer_2, manufacturer.get_by_id(self.connection, 2))
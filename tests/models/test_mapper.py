@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import tempfile
+from dataclasses import dataclass
+from datetime import date
+from typing import NamedTuple, Optional
+from unittest import TestCase
+
+from src.models import mapper
+
+
+@dataclass(frozen=True, slots=True)
+class Batch:
+    id: Optional[int]
+    label: Optional[str]
+    cost: float
+    expiry_date: date
+    recalled: bool
+
+
+class BatchRecord(NamedTuple):
+    id: int
+    label: Optional[str]
+    cost: float
+    expiry_date: date
+    recalled: bool
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(':memory:')
+        self.connection.executescript('''
+            CREATE TABLE batch (id INTEGER PRIMARY KEY, label VARCHAR(20), cost DECIMAL NOT NULL,
+                                expiry_date DATE NOT NULL, recalled BOOLEAN NOT NULL);
+
+            INSERT INTO batch VALUES (1, '', 2, '2024-02-24', 0), (2, 'B2', 3.5, '2025-01-01', 1);
+        ''')
+
+        self.mapper = mapper.TableMapper('batch', Batch, ('id', 'expiry_date'))
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_create(self):
+        self.assertEqual(Batch(1, None, 2.0, date(2024, 2, 24), False), self.mapper.get_by_id(self.connection, 1))
+        self.assertIsInstance(self.mapper.get_by_id(self.connection, 1).cost, float)
+
+    def test_create_parsed_by_driver(self):
+        connection = sqlite3.connect(':memory:', detect_types=sqlite3.PARSE_COLNAMES)
+        connection.executescript('''
+            CREATE TABLE batch (id INTEGER PRIMARY KEY, label VARCHAR(20), cost DECIMAL NOT NULL,
+                                expiry_date DATE NOT NULL, recalled BOOLEAN NOT NULL);
+        ''')
+
+        self.mapper.insert(connection, Batch(None, 'B3', 4.25, date(2024, 3, 1), True))
+
+        self.assertEqual([Batch(1, 'B3', 4.25, date(2024, 3, 1), True)], list(self.mapper.iter_all(connection)))
+        connection.close()
+
+    def test_tuple_backed(self):
+        record_mapper = mapper.TableMapper('batch', BatchRecord)
+
+        self.assertEqual(
+            [BatchRecord(1, None, 2.0, date(2024, 2, 24), False), BatchRecord(2, 'B2', 3.5, date(2025, 1, 1), True)],
+            record_mapper.get_page(self.connection, None, 10, 'id')
+        )
+
+    def test_get_all_with_fields(self):
+        self.assertEqual(
+            [{'id': 1, 'expiry_date': '2024-02-24'}, {'id': 2, 'expiry_date': '2025-01-01'}],
+            self.mapper.get_all_with_fields(self.connection, 'id', 'expiry_date')
+        )
+
+        with self.assertRaises(ValueError):
+            self.mapper.get_all_with_fields(self.connection, 'id', 'label FROM batch; --')
+
+    def test_write(self):
+        self.mapper.update(self.connection, Batch(1, 'B1', 2.5, date(2024, 2, 24), True))
+
+        self.assertFalse(self.mapper.upsert(self.connection, Batch(2, 'B2', 4.0, date(2025, 1, 1), False)))
+        self.assertTrue(self.mapper.upsert(self.connection, Batch(None, 'B3', 1.0, date(2026, 1, 1), False)))
+        self.assertEqual(
+            [Batch(1, 'B1', 2.5, date(2024, 2, 24), True), Batch(2, 'B2', 4.0, date(2025, 1, 1), False)],
+            self.mapper.get_page(self.connection, None, 2, 'expiry_date')
+        )
+
+    def test_concurrent_upsert(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'batch.db')
+            connection, other = sqlite3.connect(path, timeout=0), sqlite3.connect(path, timeout=0)
+            other_writes = []
+
+            def write_concurrently(statement: str):
+                # Another writer tries to create the row between the lookup of the upsert and its write.
+                if statement.startswith('INSERT') and not other_writes:
+                    try:
+                        other.execute('INSERT INTO batch VALUES (3, \'B3\', 1, \'2026-01-01\', 0)')
+                        other.commit()
+                        other_writes.append('written')
+                    except sqlite3.OperationalError:
+                        other_writes.append('locked')
+
+            try:
+                connection.execute('CREATE TABLE batch (id INTEGER PRIMARY KEY, label TEXT, cost DECIMAL, '
+                                   'expiry_date DATE, recalled BOOLEAN)')
+                connection.set_trace_callback(write_concurrently)
+
+                self.assertTrue(self.mapper.upsert(connection, Batch(3, 'B3', 2.0, date(2026, 1, 1), False)))
+                self.assertEqual(['locked'], other_writes)
+            finally:
+                connection.close()
+                other.close()
@@ -1,16 +1,29 @@
+import os
 import sqlite3
+import tempfile
 from datetime import date
 from unittest import TestCase
 
+from src.database import migrations
 from src.models import medicine
 
 
 class Test(TestCase):
     def setUp(self):
-        self.connection = sqlite3.connect('../static/test.db')
+        self.directory = tempfile.TemporaryDirectory()
+        self.connection = sqlite3.connect(os.path.join(self.directory.name, 'test.db'))
+
+        migrations.migrate(self.connection)
+        self.connection.executescript('''
+            INSERT INTO medicine VALUES
+                (1, 'Lipitor', 1, 15.0, 20.0, 10, 50, '2023-05-15', '2023-06-01', '2025-06-01'),
+                (2, 'Zantac', 2, 5.0, 8.0, 150, 30, '2023-07-01', '2023-07-15', '2025-07-01'),
+                (3, 'Diovan', 3, 25.0, 32.0, 80, 28, '2023-08-10', '2023-09-01', '2026-08-10');
+        ''')
 
     def tearDown(self):
         self.connection.close()
+        self.directory.cleanup()
 
     def test_get_all_ids(self):
         self.assertEqual({1, 2, 3}, medicine.get_all_ids(self.connection))
@@ -26,3 +39,18 @@ class Test(TestCase):
     def test_get_all(self):
         medicines = {medicine.get_by_id(self.connection, id_) for id_ in medicine.get_all_ids(self.connection)}
         self.assertEqual(medicines, medicine.get_all(self.connection))
+
+    def test_iter_all(self):
+        self.assertEqual(medicine.get_all(self.connection), set(medicine.iter_all(self.connection, batch_size=2)))
+
+    def test_get_page(self):
+        first_page = medicine.get_page(self.connection, limit=2)
+        second_page = medicine.get_page(self.connection, first_page[-1].id, limit=2)
+
+        self.assertEqual([1, 2], [medicine_.id for medicine_ in first_page])
+        self.assertEqual([3], [medicine_.id for medicine_ in second_page])
+
+        by_name = medicine.get_page(self.connection, limit=3, order_by='name')
+        self.assertEqual(sorted(medicine_.name for medicine_ in by_name), [medicine_.name for medicine_ in by_name])
+
+        self.assertRaises(ValueError, medicine.get_page, self.connection, order_by='cost_price')
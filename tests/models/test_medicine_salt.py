@@ -0,0 +1,68 @@
+import sqlite3
+from unittest import TestCase
+
+from src.models import medicine_salt
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(':memory:')
+        self.connection.executescript('''
+            CREATE TABLE medicine (
+                id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL, manufacturer_id INTEGER NOT NULL,
+                cost_price DECIMAL NOT NULL, sale_price DECIMAL NOT NULL, potency INTEGER,
+                quantity_per_unit INTEGER NOT NULL, manufacturing_date DATE NOT NULL, purchase_date DATE NOT NULL,
+                expiry_date DATE NOT NULL
+            );
+            CREATE TABLE salt (id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL);
+
+            INSERT INTO medicine VALUES
+                (1, 'Combiflam', 1, 10, 15, 400, 10, '2024-01-01', '2024-02-01', '2099-01-01'),
+                (2, 'Brufen', 1, 5, 8, 400, 10, '2024-01-01', '2024-02-01', '2099-01-01'),
+                (3, 'Crocin', 1, 1, 2, 500, 10, '2024-01-01', '2024-02-01', '2099-01-01'),
+                (4, 'Ibugesic Plus', 1, 9, 12, 400, 10, '2024-01-01', '2024-02-01', '2099-01-01'),
+                (5, 'Ibugesic Plus Old', 1, 9, 12, 400, 10, '2024-01-01', '2024-02-01', '2020-01-01'),
+                (6, 'Ibuclin', 1, 9, 14, 200, 10, '2024-01-01', '2024-02-01', '2099-01-01'),
+                (7, 'Zincovit', 1, 3, 4, '', 10, '2024-01-01', '2024-02-01', '2099-01-01');
+            INSERT INTO salt VALUES (1, 'Ibuprofen'), (2, 'Paracetamol'), (3, 'Zinc');
+        ''')
+
+        medicine_salt.create_schema(self.connection)
+        medicine_salt.upsert_many(self.connection, (
+            medicine_salt.MedicineSalt(medicine_id, salt_id) for medicine_id, salt_id in (
+                (1, 1), (1, 2), (2, 1), (3, 2), (4, 1), (4, 2), (5, 1), (5, 2), (6, 1), (6, 2), (7, 3)
+            )
+        ))
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_postings(self):
+        self.assertEqual([1, 2], medicine_salt.get_salt_ids(self.connection, 1))
+        self.assertEqual([1, 3, 4, 5, 6], medicine_salt.get_medicine_ids(self.connection, 2))
+
+        medicine_salt.set_salts(self.connection, 1, [2])
+        self.connection.execute('DELETE FROM medicine WHERE id = 4')
+
+        self.assertEqual([2], medicine_salt.get_salt_ids(self.connection, 1))
+        self.assertEqual([1, 3, 5, 6], medicine_salt.get_medicine_ids(self.connection, 2))
+
+    def test_missing_reference(self):
+        with self.assertRaises(sqlite3.IntegrityError):
+            medicine_salt.upsert_many(self.connection, [medicine_salt.MedicineSalt(8, 1)])
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            medicine_salt.set_salts(self.connection, 1, [4])
+
+    def test_find_substitutes(self):
+        substitutes = medicine_salt.find_substitutes(self.connection, 1)
+
+        self.assertEqual([4, 6, 2, 3], [substitute.medicine.id for substitute in substitutes])
+        self.assertEqual([2, 2, 1, 1], [substitute.shared_salts for substitute in substitutes])
+        self.assertEqual([1.0, 1.0, 0.5, 0.5], [substitute.overlap for substitute in substitutes])
+
+    def test_find_substitutes_expired(self):
+        substitutes = medicine_salt.find_substitutes(self.connection, 1, limit=2, include_expired=True)
+
+        self.assertEqual([4, 5], [substitute.medicine.id for substitute in substitutes])
+        self.assertEqual([], medicine_salt.find_substitutes(self.connection, 7))
@@ -1,16 +1,29 @@
+import os
 import sqlite3
+import tempfile
 from datetime import datetime
 from unittest import TestCase
 
+from src.database import migrations
 from src.models import sale
 
 
 class Test(TestCase):
     def setUp(self):
-        self.connection = sqlite3.connect('../static/test.db')
+        self.directory = tempfile.TemporaryDirectory()
+        self.connection = sqlite3.connect(os.path.join(self.directory.name, 'test.db'))
+
+        migrations.migrate(self.connection)
+        self.connection.executescript('''
+            INSERT INTO sale VALUES
+                (1, '2024-02-24 10:15:00', 2, 1, 42),
+                (2, '2024-02-25 11:30:00', 1, 2, 20),
+                (3, '2024-02-26 16:45:00', 3, 3, 64);
+        ''')
 
     def tearDown(self):
         self.connection.close()
+        self.directory.cleanup()
 
     def test_get_all_ids(self):
         self.assertEqual({1, 2, 3}, sale.get_all_ids(self.connection))
@@ -24,3 +37,17 @@ class Test(TestCase):
     def test_get_all(self):
         sales = {sale.get_by_id(self.connection, id_) for id_ in sale.get_all_ids(self.connection)}
         self.assertEqual(sales, sale.get_all(self.connection))
+
+    def test_upsert(self):
+        sale_new = sale.Sale(None, datetime(2024, 3, 1, 9, 30, 0), 1, 1, 10)
+
+        self.assertTrue(sale.upsert(self.connection, sale_new))
+        self.assertEqual({1, 2, 3, 4}, sale.get_all_ids(self.connection))
+        self.assertEqual(5, sale.insert(self.connection, sale.Sale(None, sale_new.date_time, 1, 1, 5)))
+
+    def test_iter_all(self):
+        self.assertEqual(sale.get_all(self.connection), set(sale.iter_all(self.connection, batch_size=2)))
+
+    def test_get_page(self):
+        self.assertEqual([2, 3], [sale_.id for sale_ in sale.get_page(self.connection, 1, limit=5)])
+        self.assertEqual([], sale.get_page(self.connection, 3))
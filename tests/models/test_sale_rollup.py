@@ -0,0 +1,46 @@
+import sqlite3
+from unittest import TestCase
+
+from src.models import sale_rollup
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(':memory:')
+        self.connection.executescript('''
+            CREATE TABLE sale (id INTEGER PRIMARY KEY, date_time TEXT, employee_id INTEGER, customer_id INTEGER,
+                               amount REAL);
+
+            INSERT INTO sale VALUES (1, '2024-02-24 10:15:00', 2, 1, 42), (2, '2024-02-24 12:00:00', 1, 1, 8);
+        ''')
+
+        sale_rollup.create_schema(self.connection)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def _rollups(self) -> list[tuple]:
+        return self.connection.execute('SELECT * FROM sale_rollup ORDER BY 1, 2, 3, 4').fetchall()
+
+    def test_create_schema(self):
+        self.assertEqual(
+            [sale_rollup.SaleRollup('2024-02-24', 'total', 0, 50, 2)],
+            sale_rollup.get_periods(self.connection, 'day', '2024-02-01', '2024-02-29')
+        )
+        self.assertEqual(25, sale_rollup.get_periods(self.connection, 'month', '2024-02', '2024-02')[0].average_ticket)
+
+    def test_triggers(self):
+        self.connection.execute('INSERT INTO sale VALUES (3, \'2024-03-01 09:00:00\', 1, 2, 5)')
+        self.connection.execute('UPDATE sale SET employee_id = 1, date_time = \'2024-03-02 09:00:00\' WHERE id = 1')
+        self.connection.execute('DELETE FROM sale WHERE id = 2')
+
+        incremental = self._rollups()
+        sale_rollup.rebuild(self.connection)
+
+        self.assertEqual(self._rollups(), incremental)
+
+    def test_get_leaders(self):
+        leaders = sale_rollup.get_leaders(self.connection, 'month', 'employee', '2024-01', '2024-12')
+
+        self.assertEqual([2, 1], [leader.dimension_id for leader in leaders])
+        self.assertEqual('2024-01..2024-12', leaders[0].period)
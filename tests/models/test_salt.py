@@ -1,15 +1,26 @@
+import os
 import sqlite3
+import tempfile
 from unittest import TestCase
 
+from src.database import migrations
 from src.models import salt
 
 
 class Test(TestCase):
     def setUp(self):
-        self.connection = sqlite3.connect('../static/test.db')
+        self.directory = tempfile.TemporaryDirectory()
+        self.connection = sqlite3.connect(os.path.join(self.directory.name, 'test.db'))
+
+        migrations.migrate(self.connection)
+        self.connection.executescript('''
+            INSERT INTO salt VALUES
+                (1, 'Atorvastatin'), (2, 'Ranitidine'), (3, 'Valsartan'), (4, 'Paracetamol'), (5, 'Ibuprofen');
+        ''')
 
     def tearDown(self):
         self.connection.close()
+        self.directory.cleanup()
 
     def test_get_all_ids(self):
         self.assertEqual({1, 2, 3, 4, 5}, salt.get_all_ids(self.connection))
@@ -23,3 +34,9 @@ class Test(TestCase):
     def test_get_all(self):
         salts = {salt.get_by_id(self.connection, id_) for id_ in salt.get_all_ids(self.connection)}
         self.assertEqual(salts, salt.get_all(self.connection))
+
+    def test_upsert(self):
+        self.assertTrue(salt.upsert(self.connection, salt.Salt(6, 'Cetirizine')))
+        self.assertFalse(salt.upsert(self.connection, salt.Salt(6, 'Levocetirizine')))
+
+        self.assertEqual(salt.Salt(6, 'Levocetirizine'), salt.get_by_id(self.connection, 6))
@@ -0,0 +1,48 @@
+import sqlite3
+from unittest import TestCase
+
+from src.models import search
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(':memory:')
+        self.connection.executescript('''
+            CREATE TABLE manufacturer (id INTEGER PRIMARY KEY, name TEXT, phone_number TEXT, address TEXT);
+            CREATE TABLE medicine (id INTEGER PRIMARY KEY, name TEXT);
+            CREATE TABLE sale (id INTEGER PRIMARY KEY, date_time TEXT);
+            CREATE TABLE salt (id INTEGER PRIMARY KEY, name TEXT);
+
+            INSERT INTO medicine VALUES (1, 'Lipitor'), (2, 'Paracetamol'), (3, 'Paracip'), (12, 'Aspirin');
+        ''')
+
+        search.create_indexes(self.connection)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_prefix(self):
+        results = search.search(self.connection, 'medicine', 'para')
+        self.assertEqual({2, 3}, {result['id'] for result in results})
+
+    def test_id(self):
+        results = search.search(self.connection, 'medicine', '12')
+        self.assertEqual([{'id': 12, 'name': 'Aspirin'}], results)
+
+    def test_unicode_digits(self):
+        self.assertEqual([], search.search(self.connection, 'medicine', '²'))
+        self.assertEqual([], search.search(self.connection, 'medicine', '١٢'))
+
+    def test_empty(self):
+        results = search.search(self.connection, 'medicine', '', limit=2)
+        self.assertEqual([1, 2], [result['id'] for result in results])
+
+    def test_triggers(self):
+        self.connection.execute('UPDATE medicine SET name = ? WHERE id = ?', ('Dolo', 2))
+        self.connection.execute('DELETE FROM medicine WHERE id = ?', (3,))
+
+        self.assertEqual([], search.search(self.connection, 'medicine', 'para'))
+        self.assertEqual([{'id': 2, 'name': 'Dolo'}], search.search(self.connection, 'medicine', 'dol'))
+
+    def test_unknown_table(self):
+        self.assertRaises(KeyError, search.search, self.connection, 'employee', 'a')
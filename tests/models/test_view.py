@@ -0,0 +1,36 @@
+import sqlite3
+from datetime import date
+from unittest import TestCase
+
+from src.models import salt, view
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(':memory:')
+        self.connection.executescript('''
+            CREATE TABLE salt (id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL);
+            CREATE TABLE batch (id INTEGER PRIMARY KEY, expiry_date DATE);
+
+            INSERT INTO salt VALUES (1, 'Paracetamol'), (2, 'Aspirin'), (3, 'Ibuprofen');
+            INSERT INTO batch VALUES (1, '2024-02-24');
+        ''')
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_get_page_view(self):
+        page_view = view.get_page_view(
+            self.connection, 'SELECT * FROM batch', (), lambda row: (row[0], date.fromisoformat(row[1]))
+        )
+
+        self.assertEqual([(1, date(2024, 2, 24))], page_view.models)
+        self.assertEqual([{'id': 1, 'expiry_date': '2024-02-24'}], page_view.records)
+
+    def test_model_page_view(self):
+        page_view = salt.get_page_view(self.connection, 2, 2, order_by='name')
+
+        self.assertEqual(salt.get_page(self.connection, 2, 2, order_by='name'), page_view.models)
+        self.assertEqual(
+            [{'id': 3, 'name': 'Ibuprofen'}, {'id': 1, 'name': 'Paracetamol'}], page_view.records
+        )
@@ -0,0 +1,49 @@
+import sqlite3
+from unittest import TestCase
+
+from benchmarks import data
+from src.database import migrations
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(':memory:')
+        data.generate(self.connection, data.PRESETS['tiny'])
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_sizes(self):
+        sizes = data.PRESETS['tiny']
+
+        for table, count in (
+                ('manufacturer', sizes.manufacturers), ('salt', sizes.salts), ('medicine', sizes.medicines),
+                ('employee', sizes.employees), ('customer', sizes.customers), ('sale', sizes.sales),
+                ('stock', sizes.medicines)
+        ):
+            self.assertEqual(count, self.connection.execute(f'SELECT count(*) FROM {table}').fetchone()[0])
+
+        self.assertEqual(migrations.MIGRATIONS[-1].version, migrations.get_version(self.connection))
+
+    def test_consistency(self):
+        self.assertEqual([], self.connection.execute('PRAGMA foreign_key_check').fetchall())
+        self.assertEqual([], self.connection.execute(
+            '''SELECT sale.id FROM sale JOIN sale_item ON sale_item.sale_id = sale.id
+            GROUP BY sale.id HAVING round(sum(quantity * unit_price), 2) != sale.amount'''
+        ).fetchall())
+        self.assertEqual(
+            self.connection.execute('SELECT count(*) FROM sale').fetchone(),
+            self.connection.execute(
+                'SELECT sum(sale_count) FROM sale_rollup WHERE granularity = \'month\' AND dimension = \'total\''
+            ).fetchone()
+        )
+
+    def test_deterministic(self):
+        connection = sqlite3.connect(':memory:')
+        data.generate(connection, data.PRESETS['tiny'])
+
+        for table in ('medicine', 'medicine_salt', 'sale', 'sale_item'):
+            query = f'SELECT * FROM {table} ORDER BY 1, 2'
+            self.assertEqual(self.connection.execute(query).fetchall(), connection.execute(query).fetchall())
+
+        connection.close()
@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+import threading
+from unittest import TestCase
+
+from werkzeug import serving, wrappers
+
+from benchmarks import data, load_test
+
+
+@wrappers.Request.application
+def application(request: wrappers.Request) -> wrappers.Response:
+    if request.path == '/factory/login':
+        response = wrappers.Response(status=302, headers={'Location': '/factory/dashboard'})
+        response.set_cookie('session', 'till')
+        return response
+
+    if request.cookies.get('session') != 'till':
+        return wrappers.Response(status=401)
+
+    return wrappers.Response(status=500 if request.path == '/broken' else 200)
+
+
+class Test(TestCase):
+    def test_percentile(self):
+        latencies = [float(latency) for latency in range(1, 101)]
+
+        self.assertEqual(50.0, load_test.percentile(latencies, 0.5))
+        self.assertEqual(99.0, load_test.percentile(latencies, 0.99))
+        self.assertEqual(1.0, load_test.percentile(latencies, 0.0))
+        self.assertEqual(7.0, load_test.percentile([7.0], 0.95))
+        self.assertEqual(0.0, load_test.percentile([], 0.5))
+
+    def test_summarize(self):
+        stats = load_test.summarize('medicine', [(2.0, False), (1.0, False), (9.0, True), (3.0, False)], 2.0)
+
+        self.assertEqual((4, 1, 2.0), (stats.requests, stats.errors, stats.throughput))
+        self.assertEqual((2.0, 9.0, 9.0), (stats.p50, stats.p95, stats.p99))
+        self.assertEqual(0.25, stats.error_rate)
+
+    def test_load_mix(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'mix.json')
+
+            with open(path, 'w') as file:
+                json.dump([{'name': 'salt', 'path': '/warehouse/salts/{salt_id}', 'weight': 1}], file)
+
+            self.assertEqual((load_test.Request('salt', '/warehouse/salts/{salt_id}', 1),), load_test.load_mix(path))
+
+    def test_run(self):
+        server = serving.make_server('127.0.0.1', 0, application, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        try:
+            mix = (
+                load_test.Request('medicine', '/medicines/{medicine_id}', 3), load_test.Request('broken', '/broken', 1)
+            )
+            routes, total = load_test.run(
+                f'http://127.0.0.1:{server.port}', mix, data.PRESETS['tiny'], rate=200, duration=0.5, clients=4
+            )
+        finally:
+            server.shutdown()
+            thread.join()
+
+        self.assertEqual(100, total.requests)
+        self.assertEqual({'medicine', 'broken'}, {stats.name for stats in routes})
+        self.assertEqual(0, next(stats for stats in routes if stats.name == 'medicine').errors)
+        self.assertEqual(total.errors, next(stats for stats in routes if stats.name == 'broken').requests)
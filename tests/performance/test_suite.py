@@ -0,0 +1,16 @@
+from unittest import TestCase
+
+from benchmarks import suite
+
+
+class Test(TestCase):
+    def test_missing_benchmarks(self):
+        self.assertEqual([], suite.missing_benchmarks())
+
+    def test_compare(self):
+        baseline = [suite.Result('sale.get_page', 5, 1.0, 0.2, 0.25, 9.0), suite.Result('sale.get_all', 2, 9, 8, 8, 90)]
+        results = [suite.Result('sale.get_page', 5, 1.0, 0.3, 0.4, 9.0), suite.Result('sale.get_all', 2, 9, 8, 9, 90)]
+
+        self.assertEqual([suite.Regression('sale.get_page', 0.25, 0.4)], suite.compare(results, baseline, 0.2))
+        self.assertEqual([], suite.compare(results, baseline, 1.0))
+        self.assertEqual([], suite.compare(results, [], 0.2))
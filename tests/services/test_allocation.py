@@ -0,0 +1,104 @@
+import sqlite3
+from datetime import date
+from unittest import TestCase
+
+from src.database import versions
+from src.models import sale_item, stock
+from src.services import allocation, checkout
+
+PRODUCT = ('Crocin', 1)
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(':memory:')
+        self.connection.executescript('''
+            CREATE TABLE medicine (
+                id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL, manufacturer_id INTEGER NOT NULL,
+                cost_price DECIMAL NOT NULL, sale_price DECIMAL NOT NULL, potency INTEGER,
+                quantity_per_unit INTEGER NOT NULL, manufacturing_date DATE NOT NULL, purchase_date DATE NOT NULL,
+                expiry_date DATE NOT NULL
+            );
+            CREATE TABLE sale (
+                id INTEGER PRIMARY KEY, date_time DATETIME NOT NULL, employee_id INTEGER NOT NULL,
+                customer_id INTEGER NOT NULL, amount DECIMAL NOT NULL
+            );
+            CREATE TABLE customer (id INTEGER PRIMARY KEY, name TEXT);
+            CREATE TABLE employee (id INTEGER PRIMARY KEY, name TEXT);
+            CREATE TABLE manufacturer (id INTEGER PRIMARY KEY, name TEXT);
+            CREATE TABLE salt (id INTEGER PRIMARY KEY, name TEXT);
+
+            INSERT INTO medicine VALUES
+                (1, 'Crocin', 1, 1, 2, 500, 10, '2024-01-01', '2024-02-01', '2098-06-01'),
+                (2, 'Crocin', 1, 1, 3, 500, 10, '2024-01-01', '2024-02-01', '2097-01-01'),
+                (3, 'Crocin', 1, 1, 2, 500, 10, '2020-01-01', '2020-02-01', '2021-01-01'),
+                (4, 'Crocin', 1, 1, 2, 500, 10, '2024-01-01', '2024-02-01', '2099-01-01'),
+                (5, 'Crocin', 2, 1, 2, 500, 10, '2024-01-01', '2024-02-01', '2096-01-01');
+        ''')
+
+        versions.create_schema(self.connection)
+        stock.create_schema(self.connection)
+        sale_item.create_schema(self.connection)
+        allocation.create_schema(self.connection)
+
+        for medicine_id, quantity in ((1, 4), (2, 3), (3, 10), (4, 5), (5, 10)):
+            stock.receive(self.connection, medicine_id, quantity)
+
+        self.connection.commit()
+        self.allocator = allocation.LotAllocator()
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_allocate(self):
+        allocations = self.allocator.allocate(self.connection, PRODUCT, 5)
+
+        self.assertEqual([
+            allocation.LotAllocation(2, date(2097, 1, 1), 3), allocation.LotAllocation(1, date(2098, 6, 1), 2)
+        ], allocations)
+        self.assertEqual({1: 2, 2: 0, 3: 10, 4: 5}, stock.get_quantities(self.connection, (1, 2, 3, 4)))
+
+    def test_insufficient_lots(self):
+        with self.assertRaises(allocation.InsufficientLotsError) as context:
+            self.allocator.allocate(self.connection, PRODUCT, 13)
+
+        self.assertEqual(12, context.exception.available)
+        self.assertEqual({1: 4, 2: 3, 4: 5}, stock.get_quantities(self.connection, (1, 2, 4)))
+
+        allocations = self.allocator.allocate(self.connection, PRODUCT, 13, partial=True)
+
+        self.assertEqual([(2, 3), (1, 4), (4, 5)], [(lot.medicine_id, lot.quantity) for lot in allocations])
+
+    def test_heap_coherence(self):
+        self.allocator.allocate(self.connection, PRODUCT, 3)
+        stock.receive(self.connection, 2, 1)
+        self.connection.execute(
+            'INSERT INTO medicine VALUES (6, \'Crocin\', 1, 1, 2, 500, 10, \'2024-01-01\', \'2024-02-01\', '
+            '\'2096-06-01\')'
+        )
+        stock.receive(self.connection, 6, 1)
+
+        allocations = self.allocator.allocate(self.connection, PRODUCT, 3)
+
+        self.assertEqual([(6, 1), (2, 1), (1, 1)], [(lot.medicine_id, lot.quantity) for lot in allocations])
+
+    def test_checkout(self):
+        receipt = checkout.checkout(
+            self.connection, 7, 9, [checkout.BasketLine(4, 5)], allocator=self.allocator
+        )
+
+        self.assertEqual([(1, 2, 2.0), (2, 3, 3.0)], [
+            (item.medicine_id, item.quantity, item.unit_price) for item in receipt.items
+        ])
+        self.assertEqual(13.0, receipt.sale.amount)
+
+        with self.assertRaises(checkout.InsufficientStockError):
+            checkout.checkout(
+                self.connection, 7, 9, [checkout.BasketLine(1, 2), checkout.BasketLine(5, 11)],
+                allocator=self.allocator
+            )
+
+        self.assertEqual({1: 2, 4: 5}, stock.get_quantities(self.connection, (1, 4)))
+        self.assertEqual([(1, 2)], [
+            (lot.medicine_id, lot.quantity) for lot in self.allocator.allocate(self.connection, PRODUCT, 2)
+        ])
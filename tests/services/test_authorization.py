@@ -0,0 +1,79 @@
+from unittest import TestCase
+
+from src.services import authorization
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.loads = []
+        self.row_versions = {}
+
+    def _load(self, employee_id: int) -> tuple[int, authorization.Role]:
+        self.loads.append(employee_id)
+        return self.row_versions.get(employee_id, 0), authorization.Role(employee_id, True, employee_id == 2)
+
+    def test_get(self):
+        cache = authorization.RoleCache(ttl=60)
+
+        self.assertFalse(cache.get(1, self._load).is_administrator)
+        self.assertTrue(cache.get(2, self._load).is_administrator)
+        self.assertEqual(authorization.Role(1, True, False), cache.get(1, self._load))
+        self.assertEqual([1, 2], self.loads)
+
+    def test_get_expired(self):
+        cache = authorization.RoleCache(ttl=0)
+
+        cache.get(1, self._load)
+        cache.get(1, self._load)
+
+        self.assertEqual([1, 1], self.loads)
+
+    def test_get_missing(self):
+        cache = authorization.RoleCache(ttl=60)
+
+        self.assertIsNone(cache.get(3, lambda employee_id: (0, self.loads.append(employee_id))))
+        self.assertIsNone(cache.get(3, lambda employee_id: (0, self.loads.append(employee_id))))
+        self.assertEqual([3], self.loads)
+
+    def test_invalidate(self):
+        cache = authorization.RoleCache(ttl=60)
+
+        cache.get(1, self._load)
+        cache.get(2, self._load)
+        cache.invalidate(1)
+        cache.get(1, self._load)
+        cache.get(2, self._load)
+
+        self.assertEqual([1, 2, 1], self.loads)
+
+    def test_refresh(self):
+        cache = authorization.RoleCache(ttl=60)
+        self.row_versions = {2: 4}
+
+        for employee_id in (1, 2, 3):
+            cache.get(employee_id, self._load)
+
+        cache.refresh(7, lambda employee_ids: self.row_versions.copy())
+
+        # The rows are only checked once the table has changed again.
+        self.row_versions = {1: 1, 2: 4}
+        cache.refresh(7, lambda employee_ids: self.row_versions.copy())
+
+        for employee_id in (1, 2, 3):
+            cache.get(employee_id, self._load)
+
+        self.assertEqual([1, 2, 3], self.loads)
+
+        cache.refresh(8, lambda employee_ids: self.row_versions.copy())
+
+        for employee_id in (1, 2, 3):
+            cache.get(employee_id, self._load)
+
+        self.assertEqual([1, 2, 3, 1], self.loads)
+
+    def test_due(self):
+        cache = authorization.RoleCache(check_interval=60)
+
+        self.assertTrue(cache.due())
+        self.assertFalse(cache.due())
+        self.assertTrue(authorization.RoleCache(check_interval=0).due())
@@ -0,0 +1,113 @@
+import contextlib
+import os
+import sqlite3
+import tempfile
+import threading
+from unittest import TestCase
+
+from src.models import sale_item, stock
+from src.services import checkout
+
+SCHEMA = '''
+    CREATE TABLE medicine (
+        id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL, manufacturer_id INTEGER NOT NULL,
+        cost_price DECIMAL NOT NULL, sale_price DECIMAL NOT NULL, potency INTEGER, quantity_per_unit INTEGER NOT NULL,
+        manufacturing_date DATE NOT NULL, purchase_date DATE NOT NULL, expiry_date DATE NOT NULL
+    );
+    CREATE TABLE sale (
+        id INTEGER PRIMARY KEY, date_time DATETIME NOT NULL, employee_id INTEGER NOT NULL,
+        customer_id INTEGER NOT NULL, amount DECIMAL NOT NULL
+    );
+
+    INSERT INTO medicine VALUES
+        (1, 'Crocin', 1, 1, 2.5, 500, 10, '2024-01-01', '2024-02-01', '2099-01-01'),
+        (2, 'Brufen', 1, 5, 8, 400, 10, '2024-01-01', '2024-02-01', '2099-01-01'),
+        (3, 'Lipitor', 1, 15, 20, 10, 50, '2020-01-01', '2020-02-01', '2021-01-01');
+'''
+
+
+def _create_database(connection: sqlite3.Connection):
+    connection.executescript(SCHEMA)
+    sale_item.create_schema(connection)
+    stock.create_schema(connection)
+
+    for medicine_id, quantity in ((1, 10), (2, 3), (3, 5)):
+        stock.receive(connection, medicine_id, quantity)
+
+    connection.commit()
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(':memory:')
+        _create_database(self.connection)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_checkout(self):
+        receipt = checkout.checkout(self.connection, 7, 9, [
+            checkout.BasketLine(2, 1), checkout.BasketLine(1, 2), checkout.BasketLine(2, 1)
+        ])
+
+        self.assertEqual(21.0, receipt.sale.amount)
+        self.assertEqual((7, 9), (receipt.sale.employee_id, receipt.sale.customer_id))
+        self.assertEqual(receipt.items, sale_item.get_by_sale(self.connection, receipt.sale.id))
+        self.assertEqual([(1, 2, 2.5), (2, 2, 8.0)], [
+            (item.medicine_id, item.quantity, item.unit_price) for item in receipt.items
+        ])
+        self.assertEqual({1: 8, 2: 1}, stock.get_quantities(self.connection, (1, 2)))
+        self.assertFalse(self.connection.in_transaction)
+
+    def test_insufficient_stock(self):
+        with self.assertRaises(checkout.InsufficientStockError) as context:
+            checkout.checkout(self.connection, 7, 9, [checkout.BasketLine(1, 2), checkout.BasketLine(2, 4)])
+
+        self.assertEqual((2, 4, 3), (context.exception.medicine_id, context.exception.requested,
+                                     context.exception.available))
+        self.assertEqual({1: 10, 2: 3}, stock.get_quantities(self.connection, (1, 2)))
+        self.assertEqual(0, self.connection.execute('SELECT COUNT(*) FROM sale').fetchone()[0])
+
+    def test_invalid_basket(self):
+        for lines in ([], [checkout.BasketLine(1, 0)], [checkout.BasketLine(4, 1)], [checkout.BasketLine(3, 1)]):
+            with self.subTest(lines=lines), self.assertRaises(checkout.CheckoutError):
+                checkout.checkout(self.connection, 7, 9, lines)
+
+        self.assertEqual({1: 10, 3: 5}, stock.get_quantities(self.connection, (1, 3)))
+
+    def test_concurrent_tills(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'test.db')
+
+            with contextlib.closing(sqlite3.connect(path)) as connection:
+                connection.execute('PRAGMA journal_mode = WAL')
+                _create_database(connection)
+
+            sold = []
+
+            def till():
+                connection = sqlite3.connect(path, timeout=0.05)
+
+                try:
+                    while True:
+                        try:
+                            checkout.checkout(connection, 7, 9, [checkout.BasketLine(1, 1)], 50, 0.001)
+                        except checkout.InsufficientStockError:
+                            break
+
+                        sold.append(1)
+                finally:
+                    connection.close()
+
+            tills = [threading.Thread(target=till) for _ in range(4)]
+
+            for thread in tills:
+                thread.start()
+
+            for thread in tills:
+                thread.join()
+
+            with contextlib.closing(sqlite3.connect(path)) as connection:
+                self.assertEqual(10, len(sold))
+                self.assertEqual({1: 0}, stock.get_quantities(connection, (1,)))
+                self.assertEqual(10, connection.execute('SELECT SUM(quantity) FROM sale_item').fetchone()[0])
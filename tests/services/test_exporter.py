@@ -0,0 +1,36 @@
+import gzip
+import json
+from datetime import datetime
+from unittest import TestCase
+
+from src.models import sale
+from src.services import exporter
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.sales = [sale.Sale(id_, datetime(2024, 2, id_, 10, 0, 0), 1, 2, 10.5 * id_) for id_ in range(1, 6)]
+
+    def test_csv(self):
+        chunks = list(exporter.export(iter(self.sales), sale.Sale, 'csv', batch_size=2))
+        lines = b''.join(chunks).decode().splitlines()
+
+        self.assertEqual(3, len(chunks))
+        self.assertEqual('id,date_time,employee_id,customer_id,amount', lines[0])
+        self.assertEqual('1,2024-02-01T10:00:00,1,2,10.5', lines[1])
+        self.assertEqual(6, len(lines))
+
+    def test_ndjson(self):
+        lines = b''.join(exporter.export(self.sales, sale.Sale, 'ndjson')).decode().splitlines()
+        self.assertEqual({'id': 5, 'date_time': '2024-02-05T10:00:00', 'employee_id': 1, 'customer_id': 2,
+                          'amount': 52.5}, json.loads(lines[-1]))
+
+    def test_gzip(self):
+        chunks = exporter.export(self.sales, sale.Sale, 'csv', batch_size=1)
+        self.assertEqual(
+            b''.join(exporter.export(self.sales, sale.Sale, 'csv')),
+            gzip.decompress(b''.join(exporter.gzip_chunks(chunks)))
+        )
+
+    def test_format(self):
+        self.assertRaises(ValueError, list, exporter.export(self.sales, sale.Sale, 'xml'))
@@ -0,0 +1,34 @@
+import os
+from unittest import TestCase
+
+import flask
+
+from src.services import http_cache
+
+
+class Test(TestCase):
+    def test_response_cache(self):
+        cache = http_cache.ResponseCache(max_entries=2)
+
+        cache.put('a', b'A')
+        cache.put('b', b'B')
+        self.assertEqual(b'A', cache.get('a'))
+
+        cache.put('c', b'C')
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(b'A', cache.get('a'))
+        self.assertEqual(b'C', cache.get('c'))
+        self.assertEqual(2, len(cache))
+
+    def test_deployment_id(self):
+        root_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        first, second, configured = (flask.Flask('app', root_path=root_path) for _ in range(3))
+        configured.config['DEPLOYMENT_ID'] = 'release-1'
+
+        for app in (first, second, configured):
+            http_cache.init_app(app)
+
+        self.assertRegex(first.config['DEPLOYMENT_ID'], r'^[0-9a-f]{16}$')
+        self.assertEqual(first.config['DEPLOYMENT_ID'], second.config['DEPLOYMENT_ID'])
+        self.assertEqual('release-1', configured.config['DEPLOYMENT_ID'])
@@ -0,0 +1,81 @@
+import io
+import sqlite3
+from unittest import TestCase
+
+from src.models import manufacturer
+from src.services import importer
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(':memory:')
+        self.connection.execute(
+            '''CREATE TABLE manufacturer (
+                id INTEGER PRIMARY KEY, name TEXT NOT NULL, phone_number TEXT NOT NULL UNIQUE, address TEXT
+            )'''
+        )
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_csv(self):
+        catalogue = io.StringIO('id,name,phone_number,address\n1,Cipla,123,\n,Sun Pharma,456,Mumbai\n')
+        report = importer.import_rows(self.connection, 'manufacturer', importer.read_rows(catalogue, 'csv'))
+
+        self.assertEqual((2, 0), (report.imported, report.failed))
+        self.assertEqual(manufacturer.Manufacturer(1, 'Cipla', '123', None), manufacturer.get_by_id(self.connection, 1))
+        self.assertEqual({1, 2}, manufacturer.get_all_ids(self.connection))
+
+    def test_errors(self):
+        catalogue = io.StringIO(
+            '{"name": "Cipla", "phone_number": "123"}\n'
+            '{"name": "Lupin", "phone_number": "123"}\n'
+            '{"name": \n'
+            '{"phone_number": "789"}\n'
+            '{"name": "Sun Pharma", "phone_number": "456"}\n'
+        )
+        report = importer.import_rows(
+            self.connection, 'manufacturer', importer.read_rows(catalogue, 'ndjson'), chunk_size=2
+        )
+
+        self.assertEqual((2, 3), (report.imported, report.failed))
+        self.assertEqual([2, 3, 4], [row for row, _ in report.errors])
+        self.assertEqual({'Cipla', 'Sun Pharma'}, {item.name for item in manufacturer.get_all(self.connection)})
+
+    def test_json(self):
+        records = ', '.join(f'{{"name": "Manufacturer {id_}", "phone_number": "{id_}"}}' for id_ in range(1, 3001))
+        catalogue = io.StringIO(f'[{records}]')
+        report = importer.import_rows(self.connection, 'manufacturer', importer.read_rows(catalogue, 'json'))
+
+        self.assertLess(importer.READ_SIZE, len(catalogue.getvalue()))
+        self.assertEqual((3000, 0, None), (report.imported, report.failed, report.error))
+        self.assertEqual('Manufacturer 3000', manufacturer.get_by_id(self.connection, 3000).name)
+
+    def test_malformed_json(self):
+        catalogue = io.StringIO('[{"name": "Cipla", "phone_number": "123"}, {"name": ')
+        report = importer.import_rows(self.connection, 'manufacturer', importer.read_rows(catalogue, 'json'))
+
+        self.assertEqual((1, 0), (report.imported, report.failed))
+        self.assertTrue(report.error.startswith('Could not read the catalogue after row 1'))
+        self.assertEqual({1}, manufacturer.get_all_ids(self.connection))
+
+    def test_not_utf_8(self):
+        catalogue = io.TextIOWrapper(io.BytesIO('name,phone_number\n'.encode('utf-16')), encoding='utf-8-sig')
+        report = importer.import_rows(self.connection, 'manufacturer', importer.read_rows(catalogue, 'csv'))
+
+        self.assertEqual((0, 0), (report.imported, report.failed))
+        self.assertIn('can\'t decode', report.error)
+
+    def test_write_errors(self):
+        catalogue = io.StringIO(
+            '{"name": "Cipla", "phone_number": "123"}\n'
+            '{"name": "Lupin", "phone_number": "456", "address": ["Mumbai"]}\n'
+        )
+        report = importer.import_rows(self.connection, 'manufacturer', importer.read_rows(catalogue, 'ndjson'))
+
+        self.assertEqual((1, 1), (report.imported, report.failed))
+        self.assertEqual(2, report.errors[0][0])
+
+    def test_format_of(self):
+        self.assertEqual('ndjson', importer.format_of('catalogue.jsonl'))
+        self.assertRaises(ValueError, importer.format_of, 'catalogue.xlsx')
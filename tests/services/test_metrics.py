@@ -0,0 +1,79 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import flask
+
+from src.blueprints.monitoring import monitoring
+from src.database import pool
+from src.services import metrics
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+        self.app = flask.Flask(__name__)
+        self.app.config['DATABASE_PATH'] = os.path.join(self.directory.name, 'metrics.db')
+        self.app.config['METRICS_LATENCY_BUCKETS'] = (0.0, 1.0)
+        pool.init_app(self.app)
+        metrics.init_app(self.app)
+        self.app.register_blueprint(monitoring)
+
+        @self.app.route('/salts/<int:salt_id>')
+        def salt(salt_id: int):
+            if salt_id == 0:
+                raise RuntimeError('No such salt.')
+
+            pool.get_connection().execute('CREATE TABLE IF NOT EXISTS salt (id INTEGER PRIMARY KEY)')
+            return 'Salt'
+
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        pool.get_pool(self.app).close()
+        self.directory.cleanup()
+
+    def test_requests(self):
+        self.client.get('/salts/1')
+        self.client.get('/salts/2')
+        self.client.get('/missing')
+
+        with self.assertLogs(self.app.logger, 'ERROR'):
+            self.client.get('/salts/0')
+
+        exposition = self.client.get('/metrics').get_data(as_text=True)
+
+        for line in (
+                '# TYPE http_request_duration_seconds histogram',
+                'http_request_duration_seconds_bucket{endpoint="salt",method="GET",le="0.0"} 0',
+                'http_request_duration_seconds_bucket{endpoint="salt",method="GET",le="1.0"} 3',
+                'http_request_duration_seconds_bucket{endpoint="salt",method="GET",le="+Inf"} 3',
+                'http_request_duration_seconds_count{endpoint="salt",method="GET"} 3',
+                'http_requests_total{endpoint="salt",method="GET",status="200"} 2',
+                'http_requests_total{endpoint="salt",method="GET",status="500"} 1',
+                'http_requests_total{endpoint="unmatched",method="GET",status="404"} 1',
+                'http_requests_in_flight 1',
+                'sqlite_busy_retries_total 0',
+                'database_pool_connections{state="idle"} 1',
+                'cache_hit_ratio{cache="response"} 0.0'
+        ):
+            self.assertIn(f'\n{line}\n', exposition)
+
+        self.assertRegex(exposition, r'\nsqlite_wal_size_bytes [1-9]\d*\n')
+        self.assertEqual('text/plain; version=0.0.4; charset=utf-8', self.client.get('/metrics').content_type)
+
+    def test_render(self):
+        registry = metrics.MetricsRegistry((0.5,))
+        registry.latency.observe(0.25, 'a "quoted"\nendpoint', 'GET')
+        registry.login_failures.inc(amount=2)
+
+        self.assertEqual([
+            'http_request_duration_seconds_bucket{endpoint="a \\"quoted\\"\\nendpoint",method="GET",le="0.5"} 1',
+            'http_request_duration_seconds_bucket{endpoint="a \\"quoted\\"\\nendpoint",method="GET",le="+Inf"} 1',
+            'http_request_duration_seconds_sum{endpoint="a \\"quoted\\"\\nendpoint",method="GET"} 0.25',
+            'http_request_duration_seconds_count{endpoint="a \\"quoted\\"\\nendpoint",method="GET"} 1',
+            'login_failures_total 2'
+        ], [line for line in registry.render().splitlines() if line.startswith((
+            'http_request_duration_seconds_', 'login_failures_total'
+        ))])
@@ -0,0 +1,52 @@
+import threading
+from unittest import TestCase
+
+import werkzeug.security as security
+
+from src.services import passwords
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.hasher = passwords.PasswordHasher('pbkdf2:sha256:1000', workers=2, max_pending=2)
+
+    def tearDown(self):
+        self.hasher.close()
+
+    def test_verify(self):
+        password_hash = self.hasher.hash('pass@word1')
+
+        self.assertTrue(self.hasher.verify(password_hash, 'pass@word1'))
+        self.assertFalse(self.hasher.verify(password_hash, 'pass@word2'))
+        self.assertEqual(3, self.hasher.stats().completed)
+
+    def test_needs_rehash(self):
+        self.assertFalse(self.hasher.needs_rehash(self.hasher.hash('pass@word1')))
+        self.assertTrue(self.hasher.needs_rehash(security.generate_password_hash('pass@word1', 'pbkdf2:sha256:2000')))
+        self.assertTrue(self.hasher.needs_rehash(security.generate_password_hash('pass@word1', 'scrypt:1024:8:1')))
+
+    def test_saturated(self):
+        release = threading.Event()
+        started = threading.Barrier(3)
+
+        def blocked(*_args):
+            started.wait()
+            release.wait()
+
+        threads = [threading.Thread(target=self.hasher._run, args=(blocked,)) for _ in range(2)]
+
+        for thread in threads:
+            thread.start()
+
+        started.wait()
+
+        with self.assertRaises(passwords.HasherSaturatedError):
+            self.hasher.verify('', 'pass@word1')
+
+        release.set()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, self.hasher.stats().rejected)
+        self.assertEqual(0, self.hasher.stats().pending)
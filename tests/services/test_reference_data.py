@@ -0,0 +1,77 @@
+import os
+import sqlite3
+import tempfile
+from unittest import TestCase
+
+from src.database import migrations, versions
+from src.models import manufacturer, salt
+from src.services import reference_data
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        database_path = os.path.join(self.directory.name, 'reference.db')
+
+        self.connection = sqlite3.connect(database_path)
+        migrations.migrate(self.connection)
+        self.connection.executemany('INSERT INTO salt VALUES (?, ?)', [(2, 'Zinc'), (1, 'Aspirin'), (3, 'aspirin')])
+        self.connection.execute('INSERT INTO manufacturer VALUES (1, \'Cipla\', \'+91 7000000001\', NULL)')
+        self.connection.commit()
+
+        self.cache = reference_data.ReferenceCache(database_path)
+
+    def tearDown(self):
+        self.cache.close()
+        self.connection.close()
+        self.directory.cleanup()
+
+    def test_snapshot(self):
+        snapshot = self.cache.get('salt')
+
+        self.assertEqual((1, 2, 3), snapshot.ids)
+        self.assertEqual(salt.Salt(2, 'Zinc'), snapshot.get(2))
+        self.assertIsNone(snapshot.get(4))
+        self.assertEqual([3, 1], list(snapshot.get_many((3, 4, 1))))
+        self.assertEqual((salt.Salt(1, 'Aspirin'), salt.Salt(3, 'aspirin')), snapshot.find_by_name('ASPIRIN'))
+        self.assertEqual('Cipla', self.cache.get('manufacturer').get(1).name)
+
+        with self.assertRaises(TypeError):
+            snapshot.by_id[4] = salt.Salt(4, 'Iron')
+
+        self.assertRaises(ValueError, self.cache.get, 'medicine')
+
+    def test_unchanged(self):
+        snapshot = self.cache.get('salt')
+        checks = self.cache.checks
+
+        self.assertIs(snapshot, self.cache.get('salt'))
+        self.assertEqual(checks, self.cache.checks)
+        self.assertEqual(reference_data.ReferenceStats(1, 1, 0, snapshot.version, 3), self.cache.stats()['salt'])
+
+    def test_other_table_changed(self):
+        snapshot = self.cache.get('salt')
+
+        manufacturer.upsert(self.connection, manufacturer.Manufacturer(2, 'Lupin', '+91 7000000002', None))
+        self.connection.commit()
+
+        self.assertIs(snapshot, self.cache.get('salt'))
+        self.assertEqual(0, self.cache.stats()['salt'].reloads)
+
+    def test_table_changed(self):
+        self.cache.get('salt')
+
+        salt.upsert(self.connection, salt.Salt(2, 'Iron'))
+        self.connection.commit()
+
+        self.assertEqual('Iron', self.cache.get('salt').get(2).name)
+        self.assertEqual(1, self.cache.stats()['salt'].reloads)
+
+        self.connection.execute('DELETE FROM salt WHERE id = 3')
+        self.connection.commit()
+
+        self.assertEqual((1, 2), self.cache.get('salt').ids)
+        self.assertEqual(
+            reference_data.ReferenceStats(0, 3, 2, versions.get_versions(self.connection, 'salt')[0], 2),
+            self.cache.stats()['salt']
+        )
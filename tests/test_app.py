@@ -0,0 +1,78 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from app import create_app, init_worker, shutdown_worker
+from src.database import migrations, pool
+from src.services import http_cache, metrics
+
+
+class Test(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.app = create_app({'DATABASE_PATH': os.path.join(self.directory.name, 'app.db'), 'SECRET_KEY': 'test'})
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        shutdown_worker(self.app)
+        self.directory.cleanup()
+
+    def test_create_app(self):
+        connection_pool = pool.get_pool(self.app)
+
+        self.assertEqual((0, 0), (connection_pool.idle, connection_pool.in_use))
+
+        with self.app.app_context():
+            self.assertEqual(migrations.MIGRATIONS[-1].version, migrations.get_version(pool.get_connection()))
+
+    def test_health_check(self):
+        response = self.client.get('/healthz')
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('ok', response.json['status'])
+
+        self.app.config['DATABASE_PATH'] = os.path.join(self.directory.name, 'missing', 'app.db')
+        init_worker(self.app)
+
+        self.assertEqual(503, self.client.get('/healthz').status_code)
+
+    def test_fork(self):
+        other = create_app({'DATABASE_PATH': self.app.config['DATABASE_PATH']})
+        self.client.get('/healthz')
+        registry = metrics.get_registry(self.app)
+        other_registry = metrics.get_registry(other)
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+
+        if pid == 0:
+            # The child reports whether it built its own pool, caches and metrics, without running the test runner.
+            forked = (
+                    pool.get_pool(self.app).pid == os.getpid() and pool.get_pool(self.app).idle == 0
+                    and metrics.get_registry(self.app) is not registry
+                    and 'monitoring.health_check' not in metrics.get_registry(self.app).render()
+                    and http_cache.get_cache(self.app).hits == 0
+                    and metrics.get_registry(other) is not other_registry
+            )
+            os.write(write_end, b'1' if forked else b'0')
+            os._exit(0)
+
+        os.close(write_end)
+        os.waitpid(pid, 0)
+
+        with os.fdopen(read_end, 'rb') as result:
+            self.assertEqual(b'1', result.read())
+
+        self.assertIs(registry, metrics.get_registry(self.app))
+        self.assertEqual(1, pool.get_pool(self.app).idle)
+
+    def test_preload_templates(self):
+        preloaded = create_app({'DATABASE_PATH': self.app.config['DATABASE_PATH'], 'PRELOAD_TEMPLATES': True})
+
+        self.assertEqual(len(preloaded.jinja_env.list_templates()), len(preloaded.jinja_env.cache))
+        self.assertEqual(0, len(self.app.jinja_env.cache))
+
+    def test_shutdown_worker(self):
+        self.client.get('/healthz')
+        shutdown_worker(self.app)
+
+        self.assertEqual(0, pool.get_pool(self.app).idle)
@@ -0,0 +1,23 @@
+"""
+Production entry point, serving the application from several pre-forked worker processes with a few threads each, so
+that requests use every core while each worker keeps its own connection pool, caches and metrics.
+
+Run from the repository root, e.g.
+    DATABASE_PATH=static/database.db FLASK_SECRET_KEY=... gunicorn --config gunicorn.conf.py wsgi:application
+
+gunicorn.conf.py reads its settings from the environment:
+    GUNICORN_BIND               Address to listen on, 127.0.0.1:8000 by default.
+    WEB_CONCURRENCY             Worker processes, one per core by default.
+    GUNICORN_THREADS            Threads of each worker, 4 by default.
+    GUNICORN_PRELOAD            Whether the master creates the application once before forking the workers, so that
+                                imports, migrations and template compilation are not repeated, 1 by default.
+    GUNICORN_GRACEFUL_TIMEOUT   Seconds a worker may spend finishing its requests after SIGTERM, 30 by default.
+
+DEPLOYMENT_ID names the release in the ETags of the cached pages, and defaults to a digest of the templates.
+
+/healthz answers 200 while the worker can query the database and 503 otherwise, and /metrics reports the worker that
+answered.
+"""
+from app import create_app
+
+application = create_app({'PRELOAD_TEMPLATES': True})